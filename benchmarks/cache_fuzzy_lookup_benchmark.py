@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Benchmark fuzzy cache lookup latency: MinHash-LSH index vs. linear scan.
+
+Populates a MinHashLSHIndex with synthetic prompts and measures the latency of
+similarity lookups (hits and misses) at several index sizes, alongside the
+linear scan over every cached key that the fuzzy path used previously.
+
+Usage:
+    python benchmarks/cache_fuzzy_lookup_benchmark.py --sizes 10000,100000,1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+from ultimate_mcp_server.config import get_config  # noqa: E402
+from ultimate_mcp_server.services.cache.lsh import MinHashLSHIndex  # noqa: E402
+
+console = Console()
+
+VOCABULARY_SIZE = 20_000
+WORDS_PER_PROMPT = 25
+
+
+def make_vocabulary(rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+def make_prompt(rng: random.Random, vocabulary: List[str]) -> List[str]:
+    return rng.sample(vocabulary, WORDS_PER_PROMPT)
+
+
+def perturb(rng: random.Random, tokens: List[str], vocabulary: List[str]) -> List[str]:
+    """Insert a word to simulate a lightly rephrased prompt (Jaccard 25/26, ~0.96)."""
+    tokens = list(tokens)
+    tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(vocabulary))
+    return tokens
+
+
+def time_ms(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def linear_scan(keys: List[str], query_key: str) -> int:
+    """The previous fuzzy path compared a key prefix against every stored key."""
+    prefix = query_key[:8]
+    return sum(1 for key in keys if key[:8] == prefix)
+
+
+def run(sizes: List[int], queries: int, threshold: float, seed: int) -> None:
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+
+    table = Table(title=f"Fuzzy lookup latency (threshold={threshold}, {queries} queries)")
+    table.add_column("Entries", justify="right")
+    table.add_column("Build (s)", justify="right")
+    table.add_column("LSH hit p50 (ms)", justify="right")
+    table.add_column("LSH miss p50 (ms)", justify="right")
+    table.add_column("LSH p99 (ms)", justify="right")
+    table.add_column("Recall", justify="right")
+    table.add_column("Linear scan p50 (ms)", justify="right")
+
+    for size in sizes:
+        index = MinHashLSHIndex(threshold=threshold)
+        prompts = []
+        keys = []
+        build_start = time.perf_counter()
+        for i in range(size):
+            tokens = make_prompt(rng, vocabulary)
+            key = f"{rng.getrandbits(128):032x}"
+            index.add(key, tokens)
+            if i < queries:
+                prompts.append((key, tokens))
+            keys.append(key)
+        build_seconds = time.perf_counter() - build_start
+
+        hit_latencies, miss_latencies = [], []
+        found = 0
+        for key, tokens in prompts:
+            query_tokens = perturb(rng, tokens, vocabulary)
+            start = time.perf_counter()
+            results = index.query(query_tokens)
+            hit_latencies.append((time.perf_counter() - start) * 1000)
+            found += any(result_key == key for result_key, _ in results)
+
+            start = time.perf_counter()
+            index.query(make_prompt(rng, vocabulary))
+            miss_latencies.append((time.perf_counter() - start) * 1000)
+
+        scan_latencies = [time_ms(linear_scan, keys, key) for key, _ in prompts[:20]]
+        all_latencies = sorted(hit_latencies + miss_latencies)
+
+        table.add_row(
+            f"{size:,}",
+            f"{build_seconds:.1f}",
+            f"{statistics.median(hit_latencies):.3f}",
+            f"{statistics.median(miss_latencies):.3f}",
+            f"{all_latencies[int(len(all_latencies) * 0.99) - 1]:.3f}",
+            f"{found / len(prompts):.1%}",
+            f"{statistics.median(scan_latencies):.2f}",
+        )
+        console.print(f"[dim]Finished {size:,} entries[/dim]")
+
+    console.print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="Comma-separated index sizes to benchmark",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=get_config().cache.fuzzy_threshold,
+        help="LSH Jaccard threshold (default: the cache service's fuzzy_threshold)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    run(sizes, args.queries, args.threshold, args.seed)
+
+
+if __name__ == "__main__":
+    main()
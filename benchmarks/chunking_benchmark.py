@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""Benchmark document chunking: previous DocumentProcessor vs. TextChunker.
+
+Builds a synthetic corpus (``--megabytes`` of English-like text split into
+``--document-kb`` documents with sentences and paragraphs) and, for each
+chunking method, reports throughput and peak traced memory of:
+
+* the previous implementation (``str.split`` word lists re-joined per chunk),
+* ``TextChunker`` on each document in the calling process,
+* ``chunk_texts`` batches in the shared process pool (``--workers``),
+* the previous implementation on the whole corpus read from one file, and
+* ``TextChunker.iter_chunks`` streaming that file in blocks.
+
+Token counts are whitespace words in every row so the outputs are comparable;
+pass ``--encoding cl100k_base`` to add a row with tiktoken counts (needs the
+encoding to be downloadable or already cached).
+
+Usage:
+    python benchmarks/chunking_benchmark.py --megabytes 100 --methods token sentence semantic
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from typing import Callable, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.services.chunking import (  # noqa: E402
+    TextChunker,
+    chunk_texts,
+    get_chunking_pool,
+    get_token_encoder,
+)
+
+console = Console()
+
+_SENTENCE_BOUNDARY = r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s"
+
+
+# --- Previous implementation (DocumentProcessor before the TextChunker rewrite) ---
+
+
+def previous_by_tokens(document: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    words = document.split()
+    chunks = []
+    start = 0
+    while start < len(words):
+        end = min(start + chunk_size, len(words))
+        chunks.append(" ".join(words[start:end]))
+        start = end - chunk_overlap
+        if start >= len(words) - chunk_overlap:
+            break
+    return chunks
+
+
+def previous_by_sentence(document: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    sentences = [s.strip() for s in re.split(_SENTENCE_BOUNDARY, document) if s.strip()]
+    chunks = []
+    current_chunk: List[str] = []
+    current_size = 0
+    for sentence in sentences:
+        sentence_size = len(sentence.split())
+        if current_chunk and current_size + sentence_size > chunk_size:
+            chunks.append(" ".join(current_chunk))
+            overlap_chunk: List[str] = []
+            overlap_size = 0
+            for s in reversed(current_chunk):
+                s_size = len(s.split())
+                if overlap_size + s_size <= chunk_overlap:
+                    overlap_chunk.insert(0, s)
+                    overlap_size += s_size
+                else:
+                    break
+            current_chunk, current_size = overlap_chunk, overlap_size
+        current_chunk.append(sentence)
+        current_size += sentence_size
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+    return chunks
+
+
+def previous_semantic(document: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    paragraphs = [p.strip() for p in document.split("\n\n") if p.strip()]
+    if len(paragraphs) <= 1:
+        return previous_by_sentence(document, chunk_size, chunk_overlap)
+    chunks = []
+    current_chunk: List[str] = []
+    current_size = 0
+    for paragraph in paragraphs:
+        paragraph_size = len(paragraph.split())
+        if paragraph_size > chunk_size:
+            if current_chunk:
+                chunks.append("\n\n".join(current_chunk))
+                current_chunk, current_size = [], 0
+            chunks.extend(previous_by_sentence(paragraph, chunk_size, chunk_overlap))
+            continue
+        if current_chunk and current_size + paragraph_size > chunk_size:
+            chunks.append("\n\n".join(current_chunk))
+            current_chunk = [current_chunk[-1]]
+            current_size = len(current_chunk[-1].split())
+        current_chunk.append(paragraph)
+        current_size += paragraph_size
+    if current_chunk:
+        chunks.append("\n\n".join(current_chunk))
+    return chunks
+
+
+PREVIOUS = {
+    "token": previous_by_tokens,
+    "sentence": previous_by_sentence,
+    "semantic": previous_semantic,
+}
+
+
+# --- Corpus ---
+
+
+def make_corpus(rng: random.Random, megabytes: float, document_kb: int) -> List[str]:
+    vocabulary = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 10)))
+        for _ in range(5000)
+    ]
+    paragraphs = []
+    for _ in range(2000):
+        sentences = [
+            " ".join(rng.choices(vocabulary, k=rng.randint(4, 30))).capitalize()
+            + rng.choice([".", ".", ".", "?", "!"])
+            for _ in range(rng.randint(1, 8))
+        ]
+        paragraphs.append(" ".join(sentences))
+
+    target = int(megabytes * 1024 * 1024)
+    documents, size = [], 0
+    while size < target:
+        parts, document_size = [], 0
+        while document_size < document_kb * 1024:
+            parts.append(rng.choice(paragraphs))
+            document_size += len(parts[-1]) + 2
+        document = "\n\n".join(parts)
+        documents.append(document)
+        size += len(document)
+    return documents
+
+
+# --- Variants (each returns the number of chunks) ---
+
+
+def run_previous(documents: List[str], method: str, size: int, overlap: int) -> int:
+    return sum(len(PREVIOUS[method](document, size, overlap)) for document in documents)
+
+
+def run_chunker(documents: List[str], chunker: TextChunker) -> int:
+    return sum(len(chunker.chunk(document)) for document in documents)
+
+
+def run_pool(
+    documents: List[str], method: str, size: int, overlap: int, workers: int, docs_per_task: int
+) -> int:
+    async def run() -> int:
+        loop = asyncio.get_running_loop()
+        pool = get_chunking_pool(workers)
+        tasks = [
+            loop.run_in_executor(
+                pool, chunk_texts, documents[i : i + docs_per_task], size, overlap, method, None
+            )
+            for i in range(0, len(documents), docs_per_task)
+        ]
+        return sum(len(chunks) for group in await asyncio.gather(*tasks) for chunks in group)
+
+    return asyncio.run(run())
+
+
+def run_previous_file(path: str, method: str, size: int, overlap: int) -> int:
+    with open(path, encoding="utf-8") as f:
+        return len(PREVIOUS[method](f.read(), size, overlap))
+
+
+def run_streamed_file(path: str, chunker: TextChunker) -> int:
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in chunker.iter_chunks(f))
+
+
+def measure(run: Callable[[], int], trace_memory: bool) -> Tuple[float, int, int]:
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    chunks = run()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, chunks, peak
+
+
+def main_run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    console.print(f"Building a {args.megabytes:g} MB corpus...")
+    documents = make_corpus(rng, args.megabytes, args.document_kb)
+    megabytes = sum(len(document) for document in documents) / (1024 * 1024)
+
+    corpus_path = os.path.join(tempfile.mkdtemp(prefix="chunking_bench_"), "corpus.txt")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(documents))
+
+    # Start the workers before timing
+    get_chunking_pool(args.workers).submit(chunk_texts, ["warm up"], encoding_name=None).result()
+
+    encoder = get_token_encoder(args.encoding) if args.encoding else None
+    if args.encoding and encoder is None:
+        console.print(f"[yellow]Encoding {args.encoding} unavailable; skipping that row[/yellow]")
+
+    table = Table(
+        title=(
+            f"Chunking {megabytes:.0f} MB in {len(documents)} documents "
+            f"(size {args.chunk_size}, overlap {args.chunk_overlap})"
+        )
+    )
+    for column in ("Method", "Implementation", "Chunks", "Seconds", "MB/s", "Peak MB"):
+        table.add_column(column)
+
+    size, overlap = args.chunk_size, args.chunk_overlap
+    for method in args.methods:
+        chunker = TextChunker(size, overlap, method, encoder=None)
+        variants = [
+            ("previous", partial(run_previous, documents, method, size, overlap)),
+            ("TextChunker", partial(run_chunker, documents, chunker)),
+            (
+                f"process pool x{args.workers}",
+                partial(
+                    run_pool, documents, method, size, overlap, args.workers, args.docs_per_task
+                ),
+            ),
+            (
+                "previous, whole file",
+                partial(run_previous_file, corpus_path, method, size, overlap),
+            ),
+            ("streamed from file", partial(run_streamed_file, corpus_path, chunker)),
+        ]
+        if encoder is not None:
+            tokenizer_chunker = TextChunker(size, overlap, method, encoder=encoder)
+            variants.append(
+                (
+                    f"TextChunker ({args.encoding})",
+                    partial(run_chunker, documents, tokenizer_chunker),
+                )
+            )
+
+        for name, run in variants:
+            elapsed, chunks, _ = measure(run, trace_memory=False)
+            peak = measure(run, trace_memory=True)[2] if args.memory else 0
+            table.add_row(
+                method,
+                name,
+                str(chunks),
+                f"{elapsed:.2f}",
+                f"{megabytes / elapsed:.1f}",
+                f"{peak / (1024 * 1024):.1f}" if args.memory else "-",
+            )
+
+    console.print(table)
+    console.print(
+        "Peak MB is memory traced in this process (process pool workers are not included); "
+        "the whole-file rows chunk the corpus as a single document."
+    )
+    os.remove(corpus_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--megabytes", type=float, default=100.0, help="Corpus size")
+    parser.add_argument("--document-kb", type=int, default=64, help="Document size")
+    parser.add_argument(
+        "--methods", nargs="+", default=["token", "sentence", "semantic"], help="Methods to run"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--docs-per-task", type=int, default=32)
+    parser.add_argument("--encoding", default=None, help="tiktoken encoding for an extra row")
+    parser.add_argument(
+        "--memory", action="store_true", help="Repeat each run under tracemalloc for peak memory"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main_run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
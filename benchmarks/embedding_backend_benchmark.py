@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Benchmark local CPU embedding backends against the remote OpenAI path.
+
+Measures single-text latency (the path taken when the memory system stores one
+memory) and batch throughput for each embedding provider. The embedding cache
+is disabled so every call does real work. The OpenAI provider is skipped when
+no API key is configured; the sentence-transformers provider falls back to
+hashing (and is reported as such) when the model cannot be loaded.
+
+Usage:
+    python benchmarks/embedding_backend_benchmark.py --providers hashing,local,openai
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+from ultimate_mcp_server.services.vector.embeddings import EmbeddingService  # noqa: E402
+
+console = Console()
+
+WORDS = (
+    "agent memory tool workflow action result context plan goal error retry model token "
+    "vector search index query document chunk answer reasoning summary insight fact"
+).split()
+
+
+def make_texts(rng: random.Random, count: int, words: int) -> List[str]:
+    return [" ".join(rng.choices(WORDS, k=words)) + f" #{i}" for i in range(count)]
+
+
+async def bench_provider(
+    provider: str, single_calls: int, batch_size: int, rng: random.Random
+) -> List[str]:
+    try:
+        service = EmbeddingService(provider_type=provider, use_cache=False)
+    except Exception as e:
+        console.print(f"[yellow]Skipping {provider}: {e}[/yellow]")
+        return []
+
+    # Warm up (model load, thread pool start, connection setup)
+    await service.create_embeddings(make_texts(rng, 2, 30))
+
+    latencies = []
+    for text in make_texts(rng, single_calls, 30):
+        start = time.perf_counter()
+        await service.create_embeddings([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    batch = make_texts(rng, batch_size, 60)
+    start = time.perf_counter()
+    vectors = await service.create_embeddings(batch)
+    batch_seconds = time.perf_counter() - start
+
+    return [
+        provider,
+        service.model_name,
+        str(len(vectors[0])),
+        f"{statistics.median(latencies):.2f}",
+        f"{latencies[max(0, int(len(latencies) * 0.99) - 1)]:.2f}",
+        f"{batch_size / batch_seconds:,.0f}",
+    ]
+
+
+async def run(providers: List[str], single_calls: int, batch_size: int, seed: int) -> None:
+    rng = random.Random(seed)
+    table = Table(title=f"Embedding backends ({single_calls} single calls, batch of {batch_size})")
+    table.add_column("Provider")
+    table.add_column("Model")
+    table.add_column("Dim", justify="right")
+    table.add_column("Single p50 (ms)", justify="right")
+    table.add_column("Single p99 (ms)", justify="right")
+    table.add_column("Batch texts/s", justify="right")
+
+    for provider in providers:
+        row = await bench_provider(provider, single_calls, batch_size, rng)
+        if row:
+            table.add_row(*row)
+    console.print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--providers",
+        default="hashing,local,openai",
+        help="Comma-separated provider types to benchmark",
+    )
+    parser.add_argument(
+        "--single-calls", type=int, default=50, help="Single-text calls per provider"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Texts in the throughput batch"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+    asyncio.run(run(providers, args.single_calls, args.batch_size, args.seed))
+
+
+if __name__ == "__main__":
+    main()
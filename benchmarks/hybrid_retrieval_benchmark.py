@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""Benchmark BM25 hybrid retrieval against the previous substring-based keyword side.
+
+The previous ``retrieve_hybrid`` required every candidate to contain the whole
+query as a literal substring (``where_document={"$contains": query}``), both
+for the vector query and for the keyword query, and scored keyword hits by
+list position. This script rebuilds both strategies over one synthetic corpus
+and measures recall@k and keyword-side latency for multi-word queries made of
+words sampled (out of order) from a target document.
+
+Vectors come from the offline hashing embedding backend so the run needs no
+network access; both strategies share the same vector search.
+
+Usage:
+    python benchmarks/hybrid_retrieval_benchmark.py --docs 20000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.services.knowledge_base.keyword_index import BM25Index  # noqa: E402
+from ultimate_mcp_server.services.vector.local_embeddings import (  # noqa: E402
+    HashingEmbeddingBackend,
+)
+
+console = Console()
+
+
+def make_corpus(
+    rng: random.Random, docs: int, vocabulary: int, words: int
+) -> Tuple[List[str], List[str]]:
+    vocab = [f"w{i:05d}" for i in range(vocabulary)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]  # Zipf-like term frequencies
+    texts = [" ".join(rng.choices(vocab, weights=weights, k=words)) for _ in range(docs)]
+    return [f"doc-{i}" for i in range(docs)], texts
+
+
+def make_queries(
+    rng: random.Random, texts: List[str], count: int, terms: int
+) -> List[Tuple[int, str]]:
+    queries = []
+    for target in rng.sample(range(len(texts)), count):
+        words = texts[target].split()
+        queries.append((target, " ".join(rng.sample(words, min(terms, len(words))))))
+    return queries
+
+
+def vector_top(matrix: np.ndarray, query_vector: np.ndarray, n: int) -> List[Tuple[int, float]]:
+    scores = matrix @ query_vector
+    top = np.argpartition(-scores, n - 1)[:n]
+    return [(int(i), float(scores[i])) for i in top]
+
+
+def legacy_keyword(texts: List[str], query: str, n: int) -> List[Tuple[int, float]]:
+    hits = [i for i, text in enumerate(texts) if query in text][:n]
+    return [(i, 1.0 - rank / len(hits)) for rank, i in enumerate(hits)]
+
+
+def bm25_keyword(index: BM25Index, query: str, n: int) -> List[Tuple[int, float]]:
+    hits = index.search(query, n)
+    if not hits:
+        return []
+    best = hits[0][1]
+    return [(int(doc_id[4:]), score / best) for doc_id, score in hits]
+
+
+def fuse(
+    vector_hits: List[Tuple[int, float]],
+    keyword_hits: List[Tuple[int, float]],
+    vector_weight: float,
+    keyword_weight: float,
+    top_k: int,
+) -> List[int]:
+    scores = {i: s * vector_weight for i, s in vector_hits}
+    for i, s in keyword_hits:
+        scores[i] = scores.get(i, 0.0) + s * keyword_weight
+    return sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+
+def run(
+    name: str,
+    keyword_fn: Callable[[str, int], List[Tuple[int, float]]],
+    legacy_vector_filter: bool,
+    texts: List[str],
+    matrix: np.ndarray,
+    query_vectors: np.ndarray,
+    queries: List[Tuple[int, str]],
+    top_k: int,
+) -> List[str]:
+    latencies, hits_at_k = [], 0
+    for (target, query), query_vector in zip(queries, query_vectors, strict=True):
+        vector_hits = vector_top(matrix, query_vector, top_k * 3)
+        if legacy_vector_filter:
+            vector_hits = [(i, s) for i, s in vector_hits if query in texts[i]]
+
+        start = time.perf_counter()
+        keyword_hits = keyword_fn(query, top_k * 3)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        hits_at_k += target in fuse(vector_hits, keyword_hits, 0.7, 0.3, top_k)
+
+    latencies.sort()
+    return [
+        name,
+        f"{hits_at_k / len(queries):.1%}",
+        f"{statistics.median(latencies):.2f}",
+        f"{latencies[int(len(latencies) * 0.99) - 1]:.2f}",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--docs", type=int, default=20000, help="Corpus size")
+    parser.add_argument("--words", type=int, default=60, help="Words per document")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Vocabulary size")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--terms", type=int, default=3, help="Words per query")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids, texts = make_corpus(rng, args.docs, args.vocabulary, args.words)
+    queries = make_queries(rng, texts, args.queries, args.terms)
+
+    backend = HashingEmbeddingBackend(dimension=args.dimension)
+    matrix = backend.embed(texts)
+    query_vectors = backend.embed([query for _, query in queries])
+
+    start = time.perf_counter()
+    index = BM25Index()
+    index.add(ids, texts)
+    build_seconds = time.perf_counter() - start
+
+    table = Table(
+        title=f"Hybrid retrieval: {args.docs} docs, {args.queries} x {args.terms}-word queries"
+    )
+    for column in ("Keyword side", f"Recall@{args.top_k}", "p50 ms", "p99 ms"):
+        table.add_column(column)
+    table.add_row(
+        *run(
+            "substring $contains (previous)",
+            lambda q, n: legacy_keyword(texts, q, n),
+            True,
+            texts,
+            matrix,
+            query_vectors,
+            queries,
+            args.top_k,
+        )
+    )
+    table.add_row(
+        *run(
+            "BM25 index",
+            lambda q, n: bm25_keyword(index, q, n),
+            False,
+            texts,
+            matrix,
+            query_vectors,
+            queries,
+            args.top_k,
+        )
+    )
+    console.print(table)
+    console.print(
+        f"BM25 index build: {build_seconds:.2f}s ({args.docs / build_seconds:.0f} docs/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""Benchmark per-request provider overhead with and without the provider pool.
+
+Previously every ``get_provider`` call built a new provider: a fresh
+``AsyncOpenAI`` client (and HTTP connection pool) plus a ``list_models()``
+round trip in ``initialize()``. This script serves an OpenAI-compatible API
+from a local server that adds ``--rtt-ms`` of latency per request and counts
+TCP connections, then issues completions the way ``generate_completion``
+does and reports per-request latency, overhead over a bare completion, HTTP
+requests and new connections for:
+
+* a new provider per request (``create_provider``, the previous behaviour),
+* pooled providers (``get_provider``).
+
+Usage:
+    python benchmarks/provider_pool_benchmark.py --requests 200 --concurrency 8 --rtt-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.core.providers.base import (  # noqa: E402
+    BaseProvider,
+    create_provider,
+    get_provider,
+)
+from ultimate_mcp_server.core.providers.pool import get_provider_pool  # noqa: E402
+
+console = Console()
+
+MODELS = {
+    "object": "list",
+    "data": [{"id": "gpt-4.1-mini", "object": "model", "created": 0, "owned_by": "bench"}],
+}
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4.1-mini",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+}
+
+
+class FakeOpenAIServer:
+    """Minimal HTTP/1.1 keep-alive server for the two endpoints the provider uses."""
+
+    def __init__(self, rtt_seconds: float):
+        self.rtt_seconds = rtt_seconds
+        self.connections = 0
+        self.requests: Dict[str, int] = {"models": 0, "completions": 0}
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def stop(self) -> None:
+        self.server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await asyncio.sleep(self.rtt_seconds)
+                if "/models" in request_line:
+                    self.requests["models"] += 1
+                    body = json.dumps(MODELS).encode()
+                else:
+                    self.requests["completions"] += 1
+                    body = json.dumps(COMPLETION).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def reset(self) -> None:
+        self.connections = 0
+        self.requests = {"models": 0, "completions": 0}
+
+
+async def run_requests(
+    get: Callable[[], Awaitable[BaseProvider]], requests: int, concurrency: int
+) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            provider = await get()
+            await provider.generate_completion(prompt="ping", model="gpt-4.1-mini", max_tokens=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return sorted(latencies)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    server = FakeOpenAIServer(args.rtt_ms / 1000)
+    base_url = await server.start()
+    options = {"api_key": "bench-key", "base_url": base_url}
+
+    async def new_provider() -> BaseProvider:
+        return await create_provider("openai", **options)
+
+    async def pooled_provider() -> BaseProvider:
+        return await get_provider("openai", **options)
+
+    # Warm up imports and the pool's shared client
+    await (await new_provider()).generate_completion(prompt="ping", model="gpt-4.1-mini")
+
+    table = Table(
+        title=(
+            f"{args.requests} completions, concurrency {args.concurrency}, "
+            f"{args.rtt_ms:.0f} ms simulated round trip"
+        )
+    )
+    for column in (
+        "Provider lookup",
+        "Mean ms",
+        "p50 ms",
+        "p95 ms",
+        "Overhead ms",
+        "HTTP requests",
+        "Connections",
+    ):
+        table.add_column(column)
+
+    for name, get in (
+        ("new provider per request (previous)", new_provider),
+        ("provider pool", pooled_provider),
+    ):
+        server.reset()
+        latencies = await run_requests(get, args.requests, args.concurrency)
+        table.add_row(
+            name,
+            f"{statistics.mean(latencies):.1f}",
+            f"{statistics.median(latencies):.1f}",
+            f"{latencies[int(len(latencies) * 0.95) - 1]:.1f}",
+            f"{statistics.mean(latencies) - args.rtt_ms:.1f}",
+            str(sum(server.requests.values())),
+            str(server.connections),
+        )
+
+    console.print(table)
+    console.print(f"Pool statistics: {get_provider_pool().get_stats()}")
+    console.print("Overhead is mean latency minus the simulated completion round trip.")
+    await get_provider_pool().shutdown()
+    await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=200, help="Completions issued")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated round trip")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""Benchmark the two-level RAG answer cache against the previous exact-string cache.
+
+The previous cache keyed answers on ``rag_{kb}_{query}``, so only byte-identical
+questions hit. This script replays a stream of questions in which popular
+questions recur with small rephrasings (case, punctuation, filler words, word
+order) against one knowledge base and reports the hit ratio, provider calls
+and per-request latency of:
+
+* no caching,
+* the previous exact-string key,
+* the two-level cache (query-embedding match, then retrieved-context match).
+
+Generation goes to a fake provider that sleeps ``--generation-ms`` per call and
+embeddings come from the offline hashing backend, so the run needs no network
+access.
+
+Usage:
+    python benchmarks/rag_answer_cache_benchmark.py --requests 300 --generation-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+os.environ["AGENT_MEMORY_DEFAULT_EMBEDDING_PROVIDER"] = "hashing"
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.services.cache import CacheService  # noqa: E402
+from ultimate_mcp_server.services.knowledge_base import (  # noqa: E402
+    KnowledgeBaseManager,
+    KnowledgeBaseRetriever,
+    RAGEngine,
+)
+from ultimate_mcp_server.services.knowledge_base.answer_cache import RAGAnswerCache  # noqa: E402
+from ultimate_mcp_server.services.vector import VectorDatabaseService  # noqa: E402
+
+console = Console()
+
+TOPICS = [
+    "vacation policy",
+    "expense reports",
+    "security training",
+    "remote work",
+    "parental leave",
+    "laptop replacement",
+    "travel booking",
+    "performance reviews",
+    "health insurance",
+    "office parking",
+    "password rotation",
+    "customer data retention",
+]
+FILLERS = ["please", "quick question", "hey", "can you tell me", "i wonder"]
+
+
+class FakeProvider:
+    """Provider that sleeps for a fixed time per completion."""
+
+    def __init__(self, generation_seconds: float):
+        self.generation_seconds = generation_seconds
+        self.calls = 0
+
+    def get_provider(self, name: str) -> "FakeProvider":
+        return self
+
+    async def generate_completion(self, request) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(self.generation_seconds)
+        return {"completion": f"answer {self.calls}", "output_tokens": 20, "total_tokens": 400}
+
+
+def rephrase(rng: random.Random, question: str) -> str:
+    """Apply a small, meaning-preserving change to a question."""
+    words = question.rstrip("?").split()
+    change = rng.randrange(5)
+    if change == 0:
+        return question
+    if change == 1:
+        return question.lower().rstrip("?")
+    if change == 2:
+        return f"{rng.choice(FILLERS)} {question}"
+    if change == 3:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+        return " ".join(words) + "?"
+    return question.upper()
+
+
+def make_stream(rng: random.Random, requests: int, questions: int) -> List[str]:
+    base = [
+        f"What is the {rng.choice(TOPICS)} rule number {i} for new employees?"
+        for i in range(questions)
+    ]
+    weights = [1.0 / (rank + 1) for rank in range(questions)]  # Zipf-like popularity
+    return [rephrase(rng, rng.choices(base, weights=weights)[0]) for _ in range(requests)]
+
+
+async def replay(
+    name: str, ask: Callable[[str], Awaitable[Dict[str, Any]]], stream: List[str], provider
+) -> List[str]:
+    calls_before = provider.calls
+    latencies = []
+    for question in stream:
+        start = time.perf_counter()
+        await ask(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+    calls = provider.calls - calls_before
+    latencies.sort()
+    return [
+        name,
+        f"{1 - calls / len(stream):.1%}",
+        str(calls),
+        f"{statistics.mean(latencies):.1f}",
+        f"{statistics.median(latencies):.1f}",
+        f"{latencies[int(len(latencies) * 0.95) - 1]:.1f}",
+    ]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    os.chdir(tempfile.mkdtemp(prefix="rag_cache_bench_"))
+
+    vectors = VectorDatabaseService(base_dir="vectors", use_chromadb=False)
+    await vectors.create_collection(
+        "bench",
+        dimension=384,
+        metadata={"type": "knowledge_base", "description": "", "doc_count": 0},
+    )
+    manager = KnowledgeBaseManager(vectors)
+    documents = [
+        f"Rule {i} of the {topic} policy: employees follow procedure {i} for {topic}."
+        for i in range(args.documents)
+        for topic in [TOPICS[i % len(TOPICS)]]
+    ]
+    await manager.add_documents("bench", documents, chunk_method="token")
+
+    provider = FakeProvider(args.generation_ms / 1000)
+    engine = RAGEngine(KnowledgeBaseRetriever(vectors), provider)
+    engine.answer_cache = RAGAnswerCache(
+        cache_service=CacheService(enable_persistence=False),
+        similarity_threshold=args.threshold,
+    )
+    stream = make_stream(rng, args.requests, args.questions)
+    params = {
+        "provider": "fake",
+        "model": "fake-model",
+        "top_k": 4,
+        "retrieval_method": "vector",
+        "min_score": 0.0,
+        "apply_feedback": False,
+    }
+
+    async def uncached(question: str) -> Dict[str, Any]:
+        return await engine.generate_with_rag("bench", question, use_cache=False, **params)
+
+    exact: Dict[str, Dict[str, Any]] = {}
+
+    async def exact_string(question: str) -> Dict[str, Any]:
+        key = f"rag_bench_{question}"
+        if key not in exact:
+            exact[key] = await uncached(question)
+        return exact[key]
+
+    async def two_level(question: str) -> Dict[str, Any]:
+        return await engine.generate_with_rag("bench", question, **params)
+
+    table = Table(
+        title=(
+            f"RAG answer cache: {args.requests} requests over {args.questions} questions, "
+            f"{args.generation_ms:.0f} ms generation"
+        )
+    )
+    for column in ("Cache", "Hit ratio", "Provider calls", "Mean ms", "p50 ms", "p95 ms"):
+        table.add_column(column)
+    table.add_row(*await replay("none", uncached, stream, provider))
+    table.add_row(*await replay("exact string (previous)", exact_string, stream, provider))
+    table.add_row(*await replay("two-level", two_level, stream, provider))
+    console.print(table)
+
+    stats = engine.answer_cache.get_stats()
+    console.print(
+        f"Two-level hits: {stats['query_hits']} query-embedding, {stats['context_hits']} "
+        f"retrieved-context; estimated time saved {stats['time_saved']:.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=300, help="Questions asked")
+    parser.add_argument("--questions", type=int, default=60, help="Distinct base questions")
+    parser.add_argument("--documents", type=int, default=200, help="Knowledge base size")
+    parser.add_argument("--generation-ms", type=float, default=50.0, help="Fake provider latency")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Query similarity threshold")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Benchmark PII masking of SQL results: per-row rules vs. column-aware masking.
+
+Loads ``--rows`` synthetic rows into an in-memory SQLite table, fetches them
+in ``--batch-size`` batches of SQLAlchemy rows (as ``execute_sql`` streams
+them) and times masking each batch with:
+
+* ``_sql_mask_row`` on every row (the previous implementation), and
+* ``_sql_mask_rows``, which skips non-string columns and screens string
+  columns with substring searches over the whole column before matching
+  individual values.
+
+Two tables are measured: a typical table (ids, names, an email column,
+numbers, dates, free text with occasional SSNs/card numbers) and a wide table
+of ``--wide-columns`` string columns without PII. Both implementations must
+produce identical rows; fetching is not timed.
+
+Usage:
+    python benchmarks/sql_masking_benchmark.py --rows 1000000 --batch-size 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import islice
+from typing import Any, Iterator, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, text
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.tools.sql_databases import (  # noqa: E402
+    _sql_mask_row,
+    _sql_mask_rows,
+)
+
+console = Console()
+
+WORDS = ["order", "shipped", "pending", "refund", "customer", "note", "call", "back", "item"]
+
+
+def typical_row(rng: random.Random, i: int) -> Tuple[Any, ...]:
+    notes = " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+    if rng.random() < 0.01:
+        notes = f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+    elif rng.random() < 0.01:
+        notes = "-".join(str(rng.randint(1000, 9999)) for _ in range(4))
+    return (
+        i,
+        f"Customer {i}",
+        f"customer{i}@example.com",
+        round(rng.random() * 1000, 2),
+        f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        notes,
+        rng.choice(["active", "closed", None]),
+    )
+
+
+TYPICAL_COLUMNS = ["id", "name", "email", "amount", "created", "notes", "status"]
+
+
+def load_table(engine: Any, columns: List[str], rows: Iterator[Tuple[Any, ...]]) -> None:
+    placeholders = ", ".join(f":{c}" for c in columns)
+    insert = text(f"INSERT INTO t VALUES ({placeholders})")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS t"))
+        conn.execute(text(f"CREATE TABLE t ({', '.join(columns)})"))
+        while chunk := list(islice(rows, 10_000)):
+            conn.execute(insert, [dict(zip(columns, row, strict=True)) for row in chunk])
+
+
+def previous(columns: List[str], rows: List[Any]) -> List[dict]:
+    return [_sql_mask_row(r._mapping) for r in rows]
+
+
+def run(engine: Any, columns: List[str], batch_size: int) -> Tuple[float, float]:
+    """Mask every batch with both implementations; returns their total seconds."""
+    previous_time = new_time = 0.0
+    with engine.connect() as conn:
+        result = conn.execute(text("SELECT * FROM t"))
+        for batch in result.partitions(batch_size):
+            start = time.perf_counter()
+            expected = previous(columns, batch)
+            previous_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            masked = _sql_mask_rows(columns, batch)
+            new_time += time.perf_counter() - start
+
+            if masked != expected:
+                raise SystemExit("Column-aware masking differs from the previous result")
+    return previous_time, new_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per table")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per masking call")
+    parser.add_argument("--wide-columns", type=int, default=30, help="Columns of the wide table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    wide_columns = [f"c{i}" for i in range(args.wide_columns)]
+    tables = {
+        "typical": (TYPICAL_COLUMNS, (typical_row(rng, i) for i in range(args.rows))),
+        "wide": (
+            wide_columns,
+            (
+                tuple(rng.choice(WORDS) + str(i % 97) for _ in wide_columns)
+                for i in range(args.rows)
+            ),
+        ),
+    }
+    engine = create_engine("sqlite://")
+
+    table = Table(title=f"Masking {args.rows:,} rows in batches of {args.batch_size}")
+    for column in ("Table", "Implementation", "Seconds", "Rows/s", "Speed-up"):
+        table.add_column(column)
+
+    for name, (columns, rows) in tables.items():
+        console.print(f"Loading the {name} table...")
+        load_table(engine, columns, rows)
+        previous_time, new_time = run(engine, columns, args.batch_size)
+
+        for label, elapsed in (
+            ("_sql_mask_row per row (previous)", previous_time),
+            ("_sql_mask_rows per column", new_time),
+        ):
+            table.add_row(
+                f"{name} ({len(columns)} columns)",
+                label,
+                f"{elapsed:.2f}",
+                f"{args.rows / elapsed:,.0f}",
+                f"{previous_time / elapsed:.1f}x",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""Benchmark read-heavy UMS agents: synchronous access tracking vs. the write-behind buffer.
+
+Previously every read tool (``hybrid_search_memories``, ``query_memories``,
+``get_memory_by_id`` …) ran in a write transaction. For each returned memory it
+updated ``last_accessed``/``access_count`` and inserted a ``memory_operations``
+row, so concurrent readers queued on the writer lock. Now reads run on
+read-only connections and ``MemoryAccessBuffer`` coalesces the hits and
+writes them in one transaction per flush.
+
+Each simulated agent repeatedly reads the ``--page`` most relevant memories of
+one workflow (a ``query_memories`` page) on a seeded database. The reads run
+under three policies:
+
+* ``previous``: the read, the per-hit UPDATEs and the per-hit log INSERTs in
+  one IMMEDIATE transaction,
+* write-behind with ``access_flush_interval=0``: a read-only transaction, then
+  one write per read, and
+* write-behind with the default interval.
+
+Operations per second, latency percentiles, writer transactions and
+``memory_operations`` growth are reported at every ``--agents`` level, each on
+a fresh copy of the database.
+
+Usage:
+    python benchmarks/ums_access_tracking_benchmark.py --agents 1 8 64 --ops 4000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.tools.unified_memory_system import (  # noqa: E402
+    DBConnection,
+    MemoryUtils,
+    _flush_memory_access,
+    _record_memory_access,
+    agent_memory_config,
+)
+
+console = Console()
+
+WORKFLOWS = 16
+READ_SQL = (
+    "SELECT memory_id, workflow_id, content, importance, last_accessed, access_count "
+    "FROM memories WHERE workflow_id = ? ORDER BY importance DESC, created_at DESC LIMIT ?"
+)
+
+
+async def seed(db_path: str, memories: int) -> None:
+    rng = random.Random(0)
+    now = int(time.time())
+    async with DBConnection(db_path).transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO workflows (workflow_id, title, status, created_at, updated_at) "
+            "VALUES (?, ?, 'active', ?, ?)",
+            [(f"wf-{w}", f"Workflow {w}", now, now) for w in range(WORKFLOWS)],
+        )
+        await conn.executemany(
+            "INSERT INTO memories (memory_id, workflow_id, content, importance, memory_level, "
+            "memory_type, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'episodic', 'observation', ?, ?)",
+            [
+                (
+                    str(uuid.uuid4()),
+                    f"wf-{i % WORKFLOWS}",
+                    f"seed memory {i}",
+                    round(rng.uniform(1, 10), 1),
+                    now - i,
+                    now - i,
+                )
+                for i in range(memories)
+            ],
+        )
+    await DBConnection.close_connection(db_path)
+
+
+async def previous_read(db: DBConnection, workflow_id: str, page: int) -> None:
+    """The read, access-stat UPDATEs and operation-log INSERTs in one write transaction."""
+    async with db.transaction(mode="IMMEDIATE") as conn:
+        rows = await conn.execute_fetchall(READ_SQL, (workflow_id, page))
+        now = int(time.time())
+        await conn.executemany(
+            "UPDATE memories SET last_accessed=?, access_count=COALESCE(access_count,0)+1 "
+            "WHERE memory_id=?",
+            [(now, r["memory_id"]) for r in rows],
+        )
+        op_data = await MemoryUtils.serialize({"query_filters": {"sort": "relevance"}})
+        await conn.executemany(
+            "INSERT INTO memory_operations (operation_log_id, workflow_id, memory_id, "
+            "action_id, operation, operation_data, timestamp) VALUES (?,?,?,?,?,?,?)",
+            [
+                (
+                    MemoryUtils.generate_id(),
+                    workflow_id,
+                    r["memory_id"],
+                    None,
+                    "query_access",
+                    op_data,
+                    now,
+                )
+                for r in rows
+            ],
+        )
+
+
+async def write_behind_read(db: DBConnection, workflow_id: str, page: int) -> None:
+    async with db.transaction(readonly=True) as conn:
+        rows = await conn.execute_fetchall(READ_SQL, (workflow_id, page))
+    await _record_memory_access(
+        db.db_path,
+        [
+            (workflow_id, r["memory_id"], "query_access", {"query_filters": {"sort": "relevance"}})
+            for r in rows
+        ],
+    )
+
+
+async def run_agents(
+    db_path: str, read: Any, agents: int, ops: int, page: int, seed_: int
+) -> List[float]:
+    rng = random.Random(seed_)
+    plan = [f"wf-{rng.randrange(WORKFLOWS)}" for _ in range(ops)]
+    latencies: List[float] = []
+
+    async def agent(index: int) -> None:
+        db = DBConnection(db_path)
+        for workflow_id in plan[index::agents]:
+            start = time.perf_counter()
+            await read(db, workflow_id, page)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(agent(i) for i in range(agents)))
+    return sorted(latencies)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    workdir = tempfile.mkdtemp(prefix="ums_access_bench_")
+    template = os.path.join(workdir, "template.db")
+    await seed(template, args.memories)
+
+    table = Table(
+        title=(
+            f"{args.ops} reads of {args.page} memories per run, {args.memories:,} seeded memories"
+        )
+    )
+    for column in (
+        "Agents",
+        "Access tracking",
+        "Reads/s",
+        "p50 ms",
+        "p95 ms",
+        "Writer txns",
+        "Log rows",
+        "Speed-up",
+    ):
+        table.add_column(column)
+
+    policies = (
+        ("in the read (previous)", previous_read, None),
+        ("behind, interval 0", write_behind_read, 0.0),
+        (f"behind, interval {args.interval:g} s", write_behind_read, args.interval),
+    )
+    try:
+        for agents in args.agents:
+            baseline: Optional[float] = None
+            for index, (name, read, interval) in enumerate(policies):
+                db_path = os.path.join(workdir, f"run-{agents}-{index}.db")
+                shutil.copyfile(template, db_path)
+                if interval is not None:
+                    agent_memory_config.access_flush_interval = interval
+                start = time.perf_counter()
+                latencies = await run_agents(db_path, read, agents, args.ops, args.page, args.seed)
+                await _flush_memory_access(db_path)  # Pending hits count towards the run
+                reads_per_sec = args.ops / (time.perf_counter() - start)
+                baseline = baseline or reads_per_sec
+                writer_txns = DBConnection.get_pool_metrics(db_path)[0]["writer_acquires"]
+                async with DBConnection(db_path).transaction(readonly=True) as conn:
+                    log_rows = await conn.execute_fetchval("SELECT COUNT(*) FROM memory_operations")
+                    hits = await conn.execute_fetchval("SELECT SUM(access_count) FROM memories")
+                if hits != args.ops * args.page:
+                    raise SystemExit(f"{name}: {hits} hits recorded, {args.ops * args.page} made")
+                await DBConnection.close_connection(db_path)
+                table.add_row(
+                    str(agents),
+                    name,
+                    f"{reads_per_sec:,.0f}",
+                    f"{statistics.median(latencies):.2f}",
+                    f"{latencies[int(len(latencies) * 0.95) - 1]:.2f}",
+                    f"{writer_txns:,}",
+                    f"{log_rows:,}",
+                    f"{reads_per_sec / baseline:.1f}x",
+                )
+    finally:
+        await DBConnection.close_connection()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    console.print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--ops", type=int, default=4000, help="Reads per run")
+    parser.add_argument("--page", type=int, default=10, help="Memories returned per read")
+    parser.add_argument("--memories", type=int, default=20_000, help="Seeded memories")
+    parser.add_argument(
+        "--interval", type=float, default=2.0, help="access_flush_interval of the last run"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""Benchmark UMS database throughput with per-transaction connections vs. the pool.
+
+Previously ``DBConnection.transaction`` opened a new aiosqlite connection for
+every transaction, re-applied its PRAGMAs, re-registered the UDFs and trace
+callback, and ran writers with ``journal_mode=TRUNCATE`` +
+``locking_mode=EXCLUSIVE``. This script reproduces that behaviour in
+``PerTransactionConnection`` and compares it with the pooled, WAL-mode
+``DBConnection``.
+
+Each simulated agent repeatedly runs one operation against a seeded memory
+database: a read transaction (recent memories of its workflow, like
+``query_memories``) or, with probability ``--write-ratio``, a write transaction
+(inserting a memory, like ``store_memory``). Operations per second and latency
+percentiles are reported at every ``--agents`` level, each on a fresh copy of
+the database.
+
+Usage:
+    python benchmarks/ums_connection_pool_benchmark.py --agents 1 8 64 --ops 2000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Type
+
+import aiosqlite
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.exceptions import ToolError  # noqa: E402
+from ultimate_mcp_server.tools.unified_memory_system import (  # noqa: E402
+    _MUTATION_SQL,
+    DBConnection,
+    _compute_memory_relevance,
+    _json_contains,
+    _json_contains_all,
+    _json_contains_any,
+    agent_memory_config,
+    logger,
+)
+
+console = Console()
+
+WORKFLOWS = 16
+_LEGACY_WRITE_LOCKS: Dict[str, asyncio.Lock] = {}
+
+
+class PerTransactionConnection(DBConnection):
+    """The previous DBConnection: one new, fully configured connection per transaction."""
+
+    __slots__ = ()
+
+    async def _cfg(self, conn: aiosqlite.Connection, *, readonly: bool = False) -> None:
+        pragmas = [
+            "PRAGMA foreign_keys=ON;",
+            "PRAGMA busy_timeout=60000;",
+            "PRAGMA temp_store=MEMORY;",
+        ]
+        if readonly:
+            pragmas[:0] = [
+                "PRAGMA journal_mode=OFF;",
+                "PRAGMA locking_mode=SHARED;",
+                "PRAGMA synchronous=OFF;",
+            ]
+        else:
+            pragmas[:0] = [
+                "PRAGMA journal_mode=TRUNCATE;",
+                "PRAGMA locking_mode=EXCLUSIVE;",
+                "PRAGMA synchronous=NORMAL;",
+            ]
+        await conn.executescript("".join(pragmas))
+        await conn.create_function("json_contains", 2, _json_contains, deterministic=True)
+        await conn.create_function("json_contains_any", 2, _json_contains_any, deterministic=True)
+        await conn.create_function("json_contains_all", 2, _json_contains_all, deterministic=True)
+        await conn.create_function(
+            "compute_memory_relevance", 5, _compute_memory_relevance, deterministic=True
+        )
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, *, readonly: bool = False, mode: Optional[str] = None):
+        await self._bootstrap()
+        uri_path = (
+            f"file:{self.db_path}?mode=ro&cache=shared" if readonly else f"file:{self.db_path}"
+        )
+        lock_cm = (
+            contextlib.nullcontext()
+            if readonly
+            else _LEGACY_WRITE_LOCKS.setdefault(self.db_path, asyncio.Lock())
+        )
+        for attempt in range(self._MAX_TX):
+            async with lock_cm:
+                conn: Optional[aiosqlite.Connection] = None
+                try:
+                    conn = await aiosqlite.connect(
+                        uri_path,
+                        uri=True,
+                        timeout=agent_memory_config.connection_timeout,
+                        cached_statements=64,
+                    )
+                    conn.row_factory = aiosqlite.Row
+                    await self._cfg(conn, readonly=readonly)
+
+                    def _trace(sql: str) -> None:
+                        if _MUTATION_SQL.match(sql):
+                            logger.debug(f"DB TRACE: {sql.split(None, 1)[0]} …")
+
+                    await conn.set_trace_callback(_trace)
+                    await conn.execute(
+                        "BEGIN DEFERRED;" if readonly else f"BEGIN {mode or 'IMMEDIATE'};"
+                    )
+                    baseline_changes = conn.total_changes
+                    try:
+                        yield conn
+                    finally:
+                        if readonly or conn.total_changes == baseline_changes:
+                            await conn.rollback()
+                        else:
+                            await conn.commit()
+                except aiosqlite.OperationalError as e:
+                    if "database is locked" not in str(e).lower():
+                        raise
+                    await self._pause(attempt)
+                    continue
+                finally:
+                    if conn:
+                        if conn.in_transaction:
+                            await conn.rollback()
+                        await conn.set_trace_callback(None)
+                        await conn.close()
+            return
+        raise ToolError("Maximum SQLite transaction retries exceeded")
+
+
+async def seed(db_path: str, memories: int) -> None:
+    now = int(time.time())
+    async with DBConnection(db_path).transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO workflows (workflow_id, title, status, created_at, updated_at) "
+            "VALUES (?, ?, 'active', ?, ?)",
+            [(f"wf-{w}", f"Workflow {w}", now, now) for w in range(WORKFLOWS)],
+        )
+        await conn.executemany(
+            "INSERT INTO memories (memory_id, workflow_id, content, memory_level, memory_type, "
+            "created_at, updated_at) VALUES (?, ?, ?, 'episodic', 'observation', ?, ?)",
+            [
+                (str(uuid.uuid4()), f"wf-{i % WORKFLOWS}", f"seed memory {i}", now - i, now - i)
+                for i in range(memories)
+            ],
+        )
+    await DBConnection.close_connection(db_path)
+
+
+async def read_op(db: DBConnection, workflow_id: str) -> None:
+    async with db.transaction(readonly=True) as conn:
+        await conn.execute_fetchall(
+            "SELECT memory_id, content, importance FROM memories WHERE workflow_id = ? "
+            "ORDER BY created_at DESC LIMIT 20",
+            (workflow_id,),
+        )
+
+
+async def write_op(db: DBConnection, workflow_id: str) -> None:
+    now = int(time.time())
+    async with db.transaction(mode="IMMEDIATE") as conn:
+        await conn.execute(
+            "INSERT INTO memories (memory_id, workflow_id, content, memory_level, memory_type, "
+            "created_at, updated_at) VALUES (?, ?, ?, 'working', 'observation', ?, ?)",
+            (str(uuid.uuid4()), workflow_id, "agent observation", now, now),
+        )
+
+
+async def run_agents(
+    cls: Type[DBConnection], db_path: str, agents: int, ops: int, write_ratio: float, seed_: int
+) -> List[float]:
+    rng = random.Random(seed_)
+    plan = [(rng.random() < write_ratio, f"wf-{rng.randrange(WORKFLOWS)}") for _ in range(ops)]
+    latencies: List[float] = []
+
+    async def agent(index: int) -> None:
+        db = cls(db_path)
+        for is_write, workflow_id in plan[index::agents]:
+            start = time.perf_counter()
+            await (write_op if is_write else read_op)(db, workflow_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(agent(i) for i in range(agents)))
+    return sorted(latencies)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    workdir = tempfile.mkdtemp(prefix="ums_pool_bench_")
+    template = os.path.join(workdir, "template.db")
+    await seed(template, args.memories)
+
+    table = Table(
+        title=(
+            f"{args.ops} operations per run, {args.write_ratio:.0%} writes, "
+            f"{args.memories:,} seeded memories"
+        )
+    )
+    for column in ("Agents", "Connections", "Ops/s", "p50 ms", "p95 ms", "Speed-up"):
+        table.add_column(column)
+
+    try:
+        for agents in args.agents:
+            baseline = None
+            for name, cls in (
+                ("per transaction (previous)", PerTransactionConnection),
+                ("pooled WAL", DBConnection),
+            ):
+                db_path = os.path.join(workdir, f"{cls.__name__}-{agents}.db")
+                shutil.copyfile(template, db_path)
+                start = time.perf_counter()
+                latencies = await run_agents(
+                    cls, db_path, agents, args.ops, args.write_ratio, args.seed
+                )
+                ops_per_sec = args.ops / (time.perf_counter() - start)
+                baseline = baseline or ops_per_sec
+                if cls is DBConnection:
+                    metrics = DBConnection.get_pool_metrics(db_path)[0]
+                    console.print(
+                        f"{agents} agents: readers opened "
+                        f"{metrics['reader_connections_opened']}, writer queue wait avg "
+                        f"{metrics['writer_wait_avg_ms']} ms, busy retries "
+                        f"{metrics['busy_retries']}"
+                    )
+                    await DBConnection.close_connection(db_path)
+                table.add_row(
+                    str(agents),
+                    name,
+                    f"{ops_per_sec:,.0f}",
+                    f"{statistics.median(latencies):.2f}",
+                    f"{latencies[int(len(latencies) * 0.95) - 1]:.2f}",
+                    f"{ops_per_sec / baseline:.1f}x",
+                )
+    finally:
+        await DBConnection.close_connection()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    console.print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of writes")
+    parser.add_argument("--memories", type=int, default=20_000, help="Seeded memories")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+"""Benchmark the keyword phase of hybrid_search_memories on a large memory database.
+
+Previously the keyword side of ``hybrid_search_memories`` joined ``memory_fts``
+with ``MATCH`` but ignored FTS relevance: it scored *every* match with the
+Python UDF ``compute_memory_relevance``, fetched all of them without a LIMIT and
+normalised the scores in Python. ``_keyword_search_memories`` ranks matches
+by column-weighted ``bm25(memory_fts)`` with ``ORDER BY … LIMIT k`` and fuses
+the importance/recency prior into those ``k`` rows only.
+
+The script builds (or reuses, with ``--db``) a UMS database of ``--memories``
+synthetic memories whose words follow a Zipf distribution. It then times both
+implementations for queries with common, medium and rare terms, with and
+without a workflow filter.
+
+Usage:
+    python benchmarks/ums_keyword_search_benchmark.py --memories 1000000 --db /tmp/ums_1m.db
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.tools.unified_memory_system import (  # noqa: E402
+    DBConnection,
+    _keyword_search_memories,
+)
+
+console = Console()
+
+WORKFLOWS = 100
+VOCABULARY = 20_000
+BATCH = 20_000
+
+
+def word(rank: int) -> str:
+    """A pronounceable, stemming-stable token for a vocabulary rank."""
+    consonants, vowels = "bdfgklmnprstvz", "aeiou"
+    letters = []
+    rank += 1
+    while rank:
+        rank, c = divmod(rank, len(consonants))
+        rank, v = divmod(rank, len(vowels))
+        letters.append(consonants[c] + vowels[v])
+    return "".join(letters) + "x"
+
+
+async def legacy_keyword_scores(
+    conn: Any, query: str, limit: int, workflow_id: Optional[str] = None
+) -> Dict[str, float]:
+    """The previous keyword phase: every match scored by the relevance UDF, no LIMIT."""
+    wh, prm = ["1=1"], []
+    if workflow_id:
+        wh.append("m.workflow_id=?")
+        prm.append(workflow_id)
+    wh.append("(m.ttl=0 OR m.created_at+m.ttl>?)")
+    prm.append(int(time.time()))
+    term = re.sub(r'[^a-zA-Z0-9\s*+\-"]', "", query).strip()
+    wh.append("f.memory_fts MATCH ?")
+    prm.append(term)
+    rows = await conn.execute_fetchall(
+        "SELECT m.memory_id, compute_memory_relevance(m.importance,m.confidence,m.created_at,"
+        "IFNULL(m.access_count,0),m.last_accessed) AS kw_rel "
+        "FROM memories m JOIN memory_fts f ON m.rowid=f.rowid WHERE " + " AND ".join(wh),
+        prm,
+    )
+    if not rows:
+        return {}
+    max_rel = max(r["kw_rel"] for r in rows) or 1e-6
+    return {r["memory_id"]: min(max(r["kw_rel"] / max_rel, 0.0), 1.0) for r in rows}
+
+
+async def build(db_path: str, memories: int, seed: int) -> None:
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+    vocabulary = [word(rank) for rank in range(VOCABULARY)]
+    now = int(time.time())
+    db = DBConnection(db_path)
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO workflows (workflow_id, title, status, created_at, updated_at) "
+            "VALUES (?, ?, 'active', ?, ?)",
+            [(f"wf-{w}", f"Workflow {w}", now, now) for w in range(WORKFLOWS)],
+        )
+    for start in range(0, memories, BATCH):
+        rows = []
+        for i in range(start, min(start + BATCH, memories)):
+            content = " ".join(
+                rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(8, 24))
+            )
+            description = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=4))
+            created = now - rng.randint(0, 90 * 86400)
+            rows.append(
+                (
+                    str(uuid.uuid4()),
+                    f"wf-{i % WORKFLOWS}",
+                    content,
+                    description,
+                    json.dumps(rng.sample(vocabulary[:50], 2)),
+                    round(rng.uniform(1, 10), 1),
+                    round(rng.uniform(0.5, 1), 2),
+                    created,
+                    created,
+                    min(created + rng.randint(0, 86400), now),
+                    rng.randint(0, 20),
+                )
+            )
+        async with db.transaction() as conn:
+            await conn.executemany(
+                "INSERT INTO memories (memory_id, workflow_id, content, description, tags, "
+                "importance, confidence, created_at, updated_at, last_accessed, access_count, "
+                "memory_level, memory_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'episodic', 'observation')",
+                rows,
+            )
+        console.print(f"  {min(start + BATCH, memories):,} memories", end="\r")
+    console.print()
+
+
+async def time_query(fn, conn: Any, query: str, limit: int, workflow_id, repeats: int):
+    timings: List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scores = await fn(conn, query, limit=limit, workflow_id=workflow_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(scores)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="ums_kw_bench_"), "ums.db")
+    db = DBConnection(db_path)
+    async with db.transaction(readonly=True) as conn:
+        existing = await conn.execute_fetchval("SELECT COUNT(*) FROM memories")
+    if existing < args.memories:
+        console.print(f"Building {args.memories - existing:,} memories in {db_path} ...")
+        await build(db_path, args.memories - existing, args.seed + existing)
+
+    queries = {
+        "common term": word(0),
+        "medium term": word(60),
+        "rare term": word(5000),
+        "two terms": f"{word(2)} {word(30)}",
+    }
+    table = Table(title=f"Keyword phase on {max(existing, args.memories):,} memories (median ms)")
+    for column in (
+        "Query",
+        "Workflow filter",
+        "Matches",
+        "Previous ms",
+        "bm25 + LIMIT ms",
+        "Speed-up",
+    ):
+        table.add_column(column)
+
+    async with db.transaction(readonly=True) as conn:
+        for name, query in queries.items():
+            for workflow_id in (None, "wf-7"):
+                matches = await conn.execute_fetchval(
+                    "SELECT COUNT(*) FROM memory_fts f JOIN memories m ON m.rowid=f.rowid "
+                    "WHERE f.memory_fts MATCH ?" + (" AND m.workflow_id=?" if workflow_id else ""),
+                    (query, workflow_id) if workflow_id else (query,),
+                )
+                previous, _ = await time_query(
+                    legacy_keyword_scores, conn, query, args.limit, workflow_id, args.repeats
+                )
+                new, _ = await time_query(
+                    _keyword_search_memories, conn, query, args.limit, workflow_id, args.repeats
+                )
+                table.add_row(
+                    f"{name} ({query})",
+                    workflow_id or "-",
+                    f"{matches:,}",
+                    f"{previous:,.1f}",
+                    f"{new:,.1f}",
+                    f"{previous / new:.1f}x",
+                )
+    await DBConnection.close_connection()
+    console.print(table)
+    console.print(f"Candidates per query: {args.limit} (hybrid_search_memories uses 100-500).")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--memories", type=int, default=1_000_000)
+    parser.add_argument("--db", help="Database to build or reuse (default: a temporary file)")
+    parser.add_argument("--limit", type=int, default=100, help="Keyword candidates per query")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""Benchmark relevance ranking of UMS memories: per-row UDF vs. NumPy batch scoring.
+
+Previously ``query_memories``, ``visualize_memory_network``,
+``get_workflow_details`` and working-memory eviction ranked memories with
+``ORDER BY compute_memory_relevance(...)``. That SQLite Python UDF is called
+once per matching row and does scalar NumPy math on single floats. Now:
+
+* exact rankings (``_select_top_memories_by_relevance``) score a small seed
+  with ``_compute_memory_relevance_batch``. SQL arithmetic then prunes every
+  row whose relevance upper bound cannot reach the seed's k-th best score.
+  The survivors are scored in NumPy with an ``np.argpartition`` top-k, and
+* rankings that tolerate staleness order by the stored ``relevance_score``
+  column. ``_refresh_memory_relevance`` refreshes it periodically.
+
+The script reuses (or builds, see ``ums_keyword_search_benchmark.py``) a UMS
+database of ``--memories`` synthetic memories in 100 workflows. It times the
+top ``--limit`` memories of one workflow and of the whole store for every
+method.
+
+Usage:
+    python benchmarks/ums_relevance_benchmark.py --memories 1000000 --db /tmp/ums_1m.db
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# --- Add project root to sys.path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+# -------------------------------------
+
+import ultimate_mcp_server.core  # noqa: E402, F401  (loads services/tools in a working order)
+from ultimate_mcp_server.tools.unified_memory_system import (  # noqa: E402
+    MEMORY_DECAY_RATE,
+    DBConnection,
+    _compute_memory_relevance_batch,
+    _refresh_memory_relevance,
+    _select_top_memories_by_relevance,
+)
+
+sys.path.insert(0, script_dir)
+from ums_keyword_search_benchmark import WORKFLOWS, build  # noqa: E402
+
+console = Console()
+
+COLUMNS = (
+    "memory_id, workflow_id, memory_level, memory_type, importance, confidence, description, "
+    "tags, created_at, updated_at, last_accessed, access_count, ttl"
+)
+
+
+def legacy_memory_relevance(imp, conf, created, cnt, last) -> float:
+    """The previous UDF body: scalar NumPy math on single floats."""
+    now = time.time()
+    created = created or now
+    last = last or created
+    decay_factor = np.exp(-MEMORY_DECAY_RATE * (now - created) / 3600)
+    recency_factor = 1 / (1 + (now - last) / 86400)
+    usage_factor = 1 + np.log(1 + cnt) / 10
+    return max(0, min(imp * decay_factor * usage_factor * conf * recency_factor, 10))
+
+
+def where(workflow_id: Optional[str]) -> Tuple[str, list]:
+    # Unqualified columns resolve to memories under any alias
+    clauses, params = ["(ttl = 0 OR created_at + ttl > ?)"], [int(time.time())]
+    if workflow_id:
+        clauses.insert(0, "workflow_id = ?")
+        params.insert(0, workflow_id)
+    return " AND ".join(clauses), params
+
+
+async def udf_top(conn: Any, workflow_id: Optional[str], limit: int) -> List[str]:
+    """The previous ranking: the relevance UDF evaluated for every matching row."""
+    sql, params = where(workflow_id)
+    rows = await conn.execute_fetchall(
+        f"SELECT {COLUMNS}, legacy_memory_relevance(importance, confidence, created_at, "
+        f"IFNULL(access_count,0), last_accessed) AS relevance FROM memories WHERE {sql} "
+        "ORDER BY relevance DESC LIMIT ?",
+        [*params, limit],
+    )
+    return [r["memory_id"] for r in rows]
+
+
+async def batch_top(conn: Any, workflow_id: Optional[str], limit: int) -> List[str]:
+    sql, params = where(workflow_id)
+    ranked = await _select_top_memories_by_relevance(
+        conn,
+        f"FROM memories m WHERE {sql}",
+        params,
+        limit,
+        seed_order="m.relevance_score DESC" if workflow_id else "m.last_accessed DESC",
+    )
+    ids = [m_id for m_id, _ in ranked]
+    await conn.execute_fetchall(  # Hydrate the page like query_memories does
+        f"SELECT {COLUMNS} FROM memories WHERE memory_id IN ({','.join('?' * len(ids))})", ids
+    )
+    return ids
+
+
+async def stored_top(conn: Any, workflow_id: Optional[str], limit: int) -> List[str]:
+    sql, params = where(workflow_id)
+    rows = await conn.execute_fetchall(
+        f"SELECT {COLUMNS}, relevance_score AS relevance FROM memories WHERE {sql} "
+        "ORDER BY relevance_score DESC LIMIT ?",
+        [*params, limit],
+    )
+    return [r["memory_id"] for r in rows]
+
+
+async def scores_now(conn: Any, ids: List[str]) -> List[float]:
+    """Relevance of *ids* at one instant, best first, to compare rankings despite ties."""
+    rows = await conn.execute_fetchall(
+        "SELECT importance, confidence, created_at, access_count, last_accessed FROM memories "
+        f"WHERE memory_id IN ({','.join('?' * len(ids))})",
+        ids,
+    )
+    return sorted(_compute_memory_relevance_batch(*zip(*rows, strict=True)).tolist(), reverse=True)
+
+
+async def timed(
+    fn: Callable[..., Awaitable[List[str]]], conn: Any, workflow_id, limit: int, repeats: int
+) -> Tuple[float, List[str]]:
+    timings: List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ids = await fn(conn, workflow_id, limit)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), ids
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="ums_rel_bench_"), "ums.db")
+    db = DBConnection(db_path)
+    async with db.transaction(readonly=True) as conn:
+        existing = await conn.execute_fetchval("SELECT COUNT(*) FROM memories")
+    if existing < args.memories:
+        console.print(f"Building {args.memories - existing:,} memories in {db_path} ...")
+        await build(db_path, args.memories - existing, args.seed + existing)
+
+    for refresh in ("first", "repeated"):  # The repeat only rewrites drifted scores
+        refresh_ms: List[float] = []
+        written = 0
+        for w in range(WORKFLOWS):
+            start = time.perf_counter()
+            async with db.transaction() as conn:
+                written += await _refresh_memory_relevance(conn, f"wf-{w}")
+            refresh_ms.append((time.perf_counter() - start) * 1000)
+        console.print(
+            f"Stored relevance refresh ({refresh}): {statistics.median(refresh_ms):,.0f} ms per "
+            f"workflow, {sum(refresh_ms) / 1000:,.1f} s for all {WORKFLOWS} workflows, "
+            f"{written:,} rows written"
+        )
+
+    table = Table(
+        title=f"Top {args.limit} memories by relevance of {max(existing, args.memories):,} "
+        "(median ms)"
+    )
+    for column in ("Scope", "Method", "ms", "Speed-up", "Top-k scores"):
+        table.add_column(column)
+
+    async with db.transaction(readonly=True) as conn:
+        await conn.create_function(
+            "legacy_memory_relevance", 5, legacy_memory_relevance, deterministic=True
+        )
+        for scope, workflow_id in (("one workflow", "wf-7"), ("all memories", None)):
+            baseline, expected = await timed(udf_top, conn, workflow_id, args.limit, args.repeats)
+            for name, fn in (
+                ("per-row UDF (previous)", udf_top),
+                ("NumPy batch + argpartition", batch_top),
+                ("stored relevance_score", stored_top),
+            ):
+                elapsed, ids = (
+                    (baseline, expected)
+                    if fn is udf_top
+                    else await timed(fn, conn, workflow_id, args.limit, args.repeats)
+                )
+                expected_scores = await scores_now(conn, expected)
+                scores = await scores_now(conn, ids)
+                gap = max(
+                    abs(a - b) / max(a, 1e-9) for a, b in zip(expected_scores, scores, strict=True)
+                )
+                table.add_row(
+                    scope,
+                    name,
+                    f"{elapsed:,.1f}",
+                    f"{baseline / elapsed:.1f}x",
+                    "exact" if gap < 1e-6 else f"within {gap:.1%}",
+                )
+    await DBConnection.close_connection()
+    console.print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--memories", type=int, default=1_000_000)
+    parser.add_argument("--db", help="Database to build or reuse (default: a temporary file)")
+    parser.add_argument("--limit", type=int, default=20, help="Memories to rank")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
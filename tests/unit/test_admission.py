@@ -0,0 +1,215 @@
+"""Tests for provider admission control."""
+
+import asyncio
+import time
+
+import pytest
+
+from ultimate_mcp_server.core.providers.admission import (
+    AdmissionController,
+    Priority,
+    ProviderGovernor,
+    TokenBucket,
+    is_rate_limit_error,
+)
+from ultimate_mcp_server.utils import get_logger
+from ultimate_mcp_server.utils.async_utils import RateLimiter
+
+logger = get_logger("test.admission")
+
+
+class RateLimitError(Exception):
+    """Stand-in for an SDK's 429 error."""
+
+    status_code = 429
+
+
+def wrapped_rate_limit_error() -> Exception:
+    """A provider error raised from an SDK 429, as the providers wrap them."""
+    try:
+        try:
+            raise RateLimitError()
+        except RateLimitError as e:
+            raise RuntimeError("OpenAI completion failed") from e
+    except RuntimeError as e:
+        return e
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_wait_time(self):
+        """Test that an empty bucket reports the refill time."""
+        logger.info("Testing token bucket waits", emoji_key="test")
+
+        bucket = TokenBucket(60, burst_seconds=2)  # One unit per second, two at most
+        now = bucket.updated
+        assert bucket.wait_time(2, now) == 0
+        bucket.take(2)
+        assert bucket.wait_time(1, now) == pytest.approx(1.0)
+        assert bucket.wait_time(1, now + 0.5) == pytest.approx(0.5)
+        # Requests larger than the bucket wait for a full bucket, not forever
+        assert bucket.wait_time(100, now + 0.5) == pytest.approx(1.5)
+
+        bucket.adjust(-10)  # Refunds never exceed the capacity
+        assert bucket.level == bucket.capacity
+
+        assert TokenBucket(None).wait_time(10**9, now) == 0
+
+
+class TestProviderGovernor:
+    """Tests for ProviderGovernor."""
+
+    async def test_interactive_before_batch(self):
+        """Test that waiting interactive requests are admitted before earlier batch ones."""
+        logger.info("Testing admission priority lanes", emoji_key="test")
+
+        governor = ProviderGovernor("test", initial_concurrency=1, max_concurrency=1)
+        await governor.acquire()
+        order = []
+
+        async def request(name: str, priority: Priority) -> None:
+            await governor.acquire(priority=priority)
+            order.append(name)
+            governor.release(0, None, None, None)
+
+        tasks = [
+            asyncio.create_task(request("batch-1", Priority.BATCH)),
+            asyncio.create_task(request("batch-2", Priority.BATCH)),
+            asyncio.create_task(request("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert governor.queue_depth() == {"interactive": 1, "batch": 2}
+        assert governor.get_metrics()["in_flight"] == 1
+
+        governor.release(0, None, None, None)
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "batch-1", "batch-2"]
+        assert governor.queue_depth() == {"interactive": 0, "batch": 0}
+
+    async def test_rate_limit_halves_and_success_grows_limit(self):
+        """Test the AIMD reaction to 429s and successful requests."""
+        logger.info("Testing adaptive concurrency", emoji_key="test")
+
+        governor = ProviderGovernor("test", initial_concurrency=8, decrease_cooldown=60)
+        for _ in range(4):
+            await governor.acquire()
+        for _ in range(3):  # A burst of 429s counts as one decrease
+            governor.release(0, None, None, wrapped_rate_limit_error())
+        assert int(governor.limit) == 4
+        assert governor.rate_limited == 3
+        assert governor.get_metrics()["concurrency_limit"] == 4
+        # Admission pauses until the provider's retry delay has passed
+        assert governor._admission_delay(0, time.monotonic()) > 0.5
+
+        governor._paused_until = 0
+        for _ in range(8):
+            await governor.acquire()
+            governor.release(0, None, 0.01, None)
+        assert int(governor.limit) == 5
+
+    async def test_cancelled_waiter_does_not_block_queue(self):
+        """Test that cancelling a queued request leaves later ones admissible."""
+        logger.info("Testing cancelled waiters", emoji_key="test")
+
+        governor = ProviderGovernor("test", initial_concurrency=1, max_concurrency=1)
+        await governor.acquire()
+        cancelled = asyncio.create_task(governor.acquire())
+        waiting = asyncio.create_task(governor.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        governor.release(0, None, None, None)
+        await asyncio.wait_for(waiting, 1)
+        assert governor.in_flight == 1
+
+    async def test_token_budget_delays_requests(self):
+        """Test that requests wait for the token-per-minute budget to refill."""
+        logger.info("Testing token rate limiting", emoji_key="test")
+
+        # 6000 tokens per minute: 100 per second, 1000 burst
+        governor = ProviderGovernor("test", tokens_per_minute=6000)
+        await governor.acquire(tokens=1000)
+        start = time.monotonic()
+        await governor.acquire(tokens=20)
+        assert time.monotonic() - start >= 0.15
+        assert governor.get_metrics()["max_wait"] >= 0.15
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    async def test_admit_records_usage_and_errors(self):
+        """Test that admit releases slots, charges actual usage and sees 429s."""
+        logger.info("Testing the admission context manager", emoji_key="test")
+
+        controller = AdmissionController()
+        async with controller.admit("openai", tokens=100) as ticket:
+            ticket.record_usage(40)
+        governor = controller.governor("openai")
+        assert governor.in_flight == 0
+
+        with pytest.raises(RateLimitError):
+            async with controller.admit("openai", tokens=100, priority=Priority.BATCH):
+                raise RateLimitError("Too many requests")
+        assert controller.get_metrics()["openai"]["rate_limited"] == 1
+        assert governor.in_flight == 0
+
+    async def test_admit_stream_releases_when_the_provider_stream_ends(self):
+        """Test that a streamed request frees its slot on exhaustion, failure or early close."""
+        logger.info("Testing streamed admission", emoji_key="test")
+
+        controller = AdmissionController()
+        governor = controller.governor("openai")
+        closed = []
+
+        async def provider_stream(chunks, error=None):
+            try:
+                for i in range(chunks):
+                    yield f"chunk {i}", {"total_tokens": 10 * (i + 1)}
+                if error is not None:
+                    raise error
+            finally:
+                closed.append(chunks)
+
+        charged = []
+        governor.tokens.adjust = charged.append
+        usage = lambda item: item[1]["total_tokens"]  # noqa: E731
+        seen = []
+        async for chunk, _ in controller.admit_stream("openai", provider_stream(3), 5, usage=usage):
+            seen.append((chunk, governor.in_flight))
+        assert seen == [("chunk 0", 1), ("chunk 1", 1), ("chunk 2", 1)]
+        assert governor.in_flight == 0 and closed == [3]
+        assert charged == [30 - 5]  # the last reported usage replaces the estimate
+
+        # A consumer that stops early releases the slot and closes the provider stream
+        stream = controller.admit_stream("openai", provider_stream(5), priority=Priority.BATCH)
+        assert (await anext(stream))[0] == "chunk 0"
+        await stream.aclose()
+        assert governor.in_flight == 0 and closed == [3, 5]
+
+        with pytest.raises(RateLimitError):
+            async for _ in controller.admit_stream("openai", provider_stream(1, RateLimitError())):
+                pass
+        assert governor.in_flight == 0 and governor.rate_limited == 1
+
+    def test_is_rate_limit_error(self):
+        """Test 429 detection from status codes and messages."""
+        assert is_rate_limit_error(RateLimitError())
+        assert is_rate_limit_error(ValueError("Error code: 429 - rate_limit_exceeded"))
+        assert not is_rate_limit_error(ValueError("invalid model"))
+
+
+class TestRateLimiter:
+    """Tests for the sliding-window RateLimiter."""
+
+    async def test_waits_without_deadlock(self):
+        """Test that callers over the limit wait for the window instead of hanging."""
+        logger.info("Testing RateLimiter waits", emoji_key="test")
+
+        limiter = RateLimiter(max_calls=2, period=0.1)
+        start = time.monotonic()
+        await asyncio.wait_for(asyncio.gather(*(limiter.acquire() for _ in range(5))), 2)
+        assert time.monotonic() - start >= 0.2
+        assert len(limiter.calls) <= 2
@@ -9,6 +9,7 @@ from ultimate_mcp_server.services.cache import (
     CacheService,
     with_cache,
 )
+from ultimate_mcp_server.services.cache.eviction import FrequencySketch
 from ultimate_mcp_server.services.cache.strategies import (
     ExactMatchStrategy,
     SemanticMatchStrategy,
@@ -123,13 +124,90 @@ class TestCacheService:
         # Check stats
         assert cache_service.metrics.evictions > 0
 
+    async def test_lru_eviction_keeps_recently_used(self, temp_cache_dir: Path):
+        """Test that LRU eviction keeps recently accessed entries and honors max_bytes."""
+        logger.info("Testing LRU eviction and byte budget", emoji_key="test")
+
+        cache = CacheService(
+            enabled=True,
+            ttl=60,
+            max_entries=3,
+            enable_persistence=False,
+            cache_dir=str(temp_cache_dir),
+            enable_fuzzy_matching=False,
+            eviction_policy="lru",
+        )
+        for i in range(3):
+            await cache.set(f"key-{i}", {"text": f"Value {i}"})
+        assert await cache.get("key-0") is not None  # key-1 is now least recent
+        await cache.set("key-3", {"text": "Value 3"})
+
+        assert "key-1" not in cache.cache
+        assert set(cache.cache) == {"key-0", "key-2", "key-3"}
+        assert cache.get_stats()["stats"]["eviction_policy"] == "lru"
+
+        cache.max_bytes = cache.get_stats()["size_bytes"] // 2
+        await cache.set("key-4", {"text": "Value 4"})
+        assert cache.get_stats()["size_bytes"] <= cache.max_bytes
+        assert "key-4" in cache.cache
+
+    async def test_tinylfu_eviction(self, temp_cache_dir: Path):
+        """Test that W-TinyLFU protects frequently used entries from a scan."""
+        logger.info("Testing TinyLFU eviction", emoji_key="test")
+
+        cache = CacheService(
+            enabled=True,
+            ttl=60,
+            max_entries=20,
+            enable_persistence=False,
+            cache_dir=str(temp_cache_dir),
+            enable_fuzzy_matching=False,
+            eviction_policy="tinylfu",
+        )
+        for i in range(20):
+            await cache.set(f"hot-{i}", {"text": f"Hot {i}"})
+        for _ in range(5):
+            for i in range(20):
+                await cache.get(f"hot-{i}")
+
+        # A one-off scan should not flush the popular entries
+        for i in range(100):
+            await cache.set(f"scan-{i}", {"text": f"Scan {i}"})
+
+        assert len(cache.cache) == 20
+        hot_remaining = sum(1 for i in range(20) if f"hot-{i}" in cache.cache)
+        assert hot_remaining >= 15
+        assert cache.get_stats()["eviction"]["rejections"] > 0
+
+    def test_frequency_sketch_rows_hash_independently(self):
+        """Test that keys sharing a counter in one sketch row rarely share it in the others."""
+        logger.info("Testing frequency sketch hashing", emoji_key="test")
+
+        sketch = FrequencySketch(1024)
+        rows = [list(sketch._indexes(f"key-{i}")) for i in range(4000)]
+        first_row: dict = {}
+        for indexes in rows:
+            first_row.setdefault(indexes[0], []).append(indexes)
+        pairs = same_elsewhere = 0
+        for bucket in first_row.values():
+            for i, a in enumerate(bucket):
+                for b in bucket[i + 1 :]:
+                    pairs += 1
+                    same_elsewhere += a[1:] == b[1:]
+        assert pairs > 1000
+        assert same_elsewhere == 0
+        assert all(0 <= index < 1024 for indexes in rows for index in indexes)
+
     async def test_fuzzy_matching(self, cache_service: CacheService):
         """Test fuzzy matching of cache keys."""
         logger.info("Testing fuzzy matching", emoji_key="test")
 
         # Set a value with a prompt that would generate a fuzzy key
         request_params = {
-            "prompt": "What is the capital of France?",
+            "prompt": (
+                "Summarize the main causes and consequences of the French Revolution "
+                "for a high school history class, including economic hardship."
+            ),
             "model": "test-model",
             "temperature": 0.7,
         }
@@ -137,22 +215,176 @@ class TestCacheService:
         key = cache_service.generate_cache_key(request_params)
         fuzzy_key = cache_service.generate_fuzzy_key(request_params)
 
-        value = {"text": "The capital of France is Paris."}
+        value = {"text": "The French Revolution was caused by..."}
         await cache_service.set(key, value, fuzzy_key=fuzzy_key, request_params=request_params)
 
-        # Create a similar request that should match via fuzzy lookup
-        similar_request = {
-            "prompt": "What is the capital of France? Tell me about it.",
-            "model": "different-model",
-            "temperature": 0.5,
+        # A near-duplicate prompt with the same model and parameters matches
+        similar_request = dict(
+            request_params,
+            prompt=(
+                "Please summarize the main causes and consequences of the French Revolution "
+                "for a high school history class, including economic hardship"
+            ),
+        )
+        similar_key = cache_service.generate_cache_key(similar_request)
+        result = await cache_service.get(similar_key, fuzzy=True, request_params=similar_request)
+        assert result == value
+
+        # The same prompt sent to another model or with other parameters does not
+        for other_params in ({"model": "different-model"}, {"temperature": 0.0}):
+            other_request = dict(similar_request, **other_params)
+            other_key = cache_service.generate_cache_key(other_request)
+            result = await cache_service.get(other_key, fuzzy=True, request_params=other_request)
+            assert result is None
+
+        # Nor does a prompt sharing only some of the words
+        loose_request = dict(
+            request_params, prompt="What were the main causes of the French Revolution?"
+        )
+        loose_key = cache_service.generate_cache_key(loose_request)
+        result = await cache_service.get(loose_key, fuzzy=True, request_params=loose_request)
+        assert result is None
+
+        # An unrelated prompt must not be served the cached value
+        unrelated_request = {"prompt": "Explain how photosynthesis works in desert plants"}
+        unrelated_key = cache_service.generate_cache_key(unrelated_request)
+        result = await cache_service.get(
+            unrelated_key, fuzzy=True, request_params=unrelated_request
+        )
+        assert result is None
+
+    async def test_fuzzy_matching_ignores_shared_prefixes(self, cache_service: CacheService):
+        """Test that prompts sharing only their leading words are not fuzzy matches."""
+        logger.info("Testing fuzzy matching of prompts with a shared prefix", emoji_key="test")
+
+        prefix = (
+            "You are a careful assistant. Please answer the following question "
+            "thoroughly using clear language and concrete examples: "
+        )
+        first = {
+            "prompt": prefix + "how do volcanoes form along tectonic plate boundaries "
+            "and what determines whether eruptions become explosive?",
+            "model": "test-model",
         }
+        second = {
+            "prompt": prefix + "which programming languages compile directly into "
+            "native machine code, and why do developers choose them?",
+            "model": "test-model",
+        }
+        # Same leading significant words, hence the same fuzzy key
+        assert cache_service.generate_fuzzy_key(first) == cache_service.generate_fuzzy_key(second)
+
+        await cache_service.set(
+            cache_service.generate_cache_key(first), {"text": "Volcanoes..."}, request_params=first
+        )
+
+        second_key = cache_service.generate_cache_key(second)
+        assert await cache_service.get(second_key, fuzzy=True, request_params=second) is None
+
+    async def test_persistence_log_replay(self, temp_cache_dir: Path):
+        """Test that writes are replayed from the log and survive compaction."""
+        logger.info("Testing cache persistence log replay", emoji_key="test")
+
+        cache = CacheService(
+            enabled=True,
+            ttl=60,
+            max_entries=100,
+            enable_persistence=True,
+            cache_dir=str(temp_cache_dir),
+            enable_fuzzy_matching=False,
+            compaction_threshold=5,
+        )
+        for i in range(8):
+            await cache.set(f"key-{i}", {"text": f"Value {i}"})
+        cache.clear()
+        await cache.set("after-clear", {"text": "kept"})
+
+        # Let the background compaction triggered by the threshold finish
+        if cache._compaction_task is not None:
+            await cache._compaction_task
+        assert (temp_cache_dir / "cache.pkl").exists()
+
+        reloaded = CacheService(
+            enabled=True,
+            ttl=60,
+            max_entries=100,
+            enable_persistence=True,
+            cache_dir=str(temp_cache_dir),
+            enable_fuzzy_matching=False,
+        )
+        assert await reloaded.get("after-clear") == {"text": "kept"}
+        assert await reloaded.get("key-0") is None
+
+    async def test_request_coalescing(self, cache_service: CacheService):
+        """Test that concurrent misses for the same key share one computation."""
+        logger.info("Testing single-flight request coalescing", emoji_key="test")
 
-        similar_key = cache_service.generate_cache_key(similar_request)
-        similar_fuzzy = cache_service.generate_fuzzy_key(similar_request)  # noqa: F841
+        call_count = 0
+        release = asyncio.Event()
 
-        # Should still find the original value
-        result = await cache_service.get(similar_key, fuzzy=True)
-        assert result == value
+        async def compute():
+            nonlocal call_count
+            call_count += 1
+            await release.wait()
+            return {"text": "computed"}
+
+        tasks = [
+            asyncio.create_task(cache_service.get_or_compute("shared-key", compute))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert call_count == 1
+        assert all(result == {"text": "computed"} for result in results)
+        assert cache_service.metrics.coalesced_requests == 4
+        assert await cache_service.get("shared-key") == {"text": "computed"}
+
+        # Waiters give up after coalesce_timeout and compute themselves
+        cache_service.coalesce_timeout = 0.05
+        blocker = asyncio.Event()
+
+        async def slow_compute():
+            await blocker.wait()
+            return {"text": "slow"}
+
+        async def fast_compute():
+            return {"text": "fast"}
+
+        leader = asyncio.create_task(cache_service.get_or_compute("slow-key", slow_compute))
+        await asyncio.sleep(0.01)
+        assert await cache_service.get_or_compute("slow-key", fast_compute) == {"text": "fast"}
+        assert cache_service.metrics.coalesce_timeouts == 1
+        blocker.set()
+        assert await leader == {"text": "slow"}
+
+    async def test_coalesced_waiters_survive_a_failed_cache_write(
+        self, cache_service: CacheService, monkeypatch
+    ):
+        """Test that waiters get the computed value even if storing it fails."""
+        logger.info("Testing coalescing with a failing cache write", emoji_key="test")
+
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return {"text": "computed"}
+
+        async def failing_set(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(cache_service, "set", failing_set)
+        tasks = [
+            asyncio.create_task(cache_service.get_or_compute("unstorable-key", compute))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+        assert results == [{"text": "computed"}] * 3
+        assert not cache_service._inflight
 
     async def test_cache_decorator(self):
         """Test the cache decorator."""
@@ -0,0 +1,113 @@
+"""Tests for the streaming text chunker and DocumentProcessor chunking."""
+
+import io
+import random
+
+import pytest
+
+from ultimate_mcp_server.services.chunking import TextChunker, chunk_texts, tiktoken
+from ultimate_mcp_server.services.document import DocumentProcessor
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger("test.chunking")
+
+WORDS = ["alpha", "beta", "Gamma", "delta.", "eps?", "zeta!", "Dr.", "e.g.", "naïve", "3.14"]
+
+
+def make_document(rng: random.Random, paragraphs: int = 20) -> str:
+    """Build a document with irregular whitespace, sentences and paragraphs."""
+    parts = []
+    for _ in range(paragraphs):
+        sentences = [
+            " ".join(rng.choices(WORDS, k=rng.randint(1, 20))) + rng.choice([".", "?", "!"])
+            for _ in range(rng.randint(1, 6))
+        ]
+        parts.append(rng.choice([" ", "  ", "\n", " \t"]).join(sentences))
+    return rng.choice(["\n\n", "\n\n\n"]).join(parts)
+
+
+def normalize(chunks):
+    return [" ".join(chunk.split()) for chunk in chunks]
+
+
+@pytest.fixture
+def byte_encoder():
+    """A byte-level tiktoken encoding that needs no download."""
+    if tiktoken is None:
+        pytest.skip("tiktoken is not installed")
+    ranks = {bytes([i]): i for i in range(256)}
+    ranks.update({b"th": 256, b"the": 257, b" the": 258, b"\xc3\xa9": 259})
+    return tiktoken.Encoding(
+        "test-bytes",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
+class TestTextChunker:
+    """Tests for TextChunker."""
+
+    def test_token_windows_match_word_windows(self):
+        """Test that word-counted token chunks are the historical word windows."""
+        logger.info("Testing word-counted token chunking", emoji_key="test")
+
+        words = [f"w{i}" for i in range(95)]
+        chunks = TextChunker(20, 5, "token", encoder=None).chunk("  \n".join(words))
+
+        expected = []
+        for i in range(0, len(words), 15):
+            expected.append(" ".join(words[i : i + 20]))
+            if i + 20 >= len(words):
+                break
+        assert normalize(chunks) == expected
+        # Chunks are slices of the input, keeping its whitespace
+        assert chunks[0].startswith("w0  \nw1")
+
+    @pytest.mark.parametrize("method", ["token", "sentence", "semantic"])
+    def test_streaming_matches_whole_text(self, method: str):
+        """Test that streaming a file in small blocks gives the whole-text chunks."""
+        logger.info(f"Testing streaming {method} chunking", emoji_key="test")
+
+        rng = random.Random(7)
+        for _ in range(20):
+            document = make_document(rng)
+            size = rng.randint(5, 60)
+            overlap = rng.randint(0, size - 1)
+            whole = TextChunker(size, overlap, method, encoder=None).chunk(document)
+            chunker = TextChunker(size, overlap, method, encoder=None, block_chars=64)
+            assert list(chunker.iter_chunks(io.StringIO(document))) == whole
+
+    @pytest.mark.parametrize("method", ["token", "sentence"])
+    def test_tokenizer_counts(self, byte_encoder, method: str):
+        """Test chunk sizes measured with a real tokenizer."""
+        logger.info(f"Testing tokenizer-sized {method} chunking", emoji_key="test")
+
+        text = "the café thé naïve 😀 the end. " * 50
+        chunker = TextChunker(40, 10, method, encoder=byte_encoder)
+        chunks = chunker.chunk(text)
+
+        assert len(chunks) > 1
+        # A boundary inside a multi-byte character rounds to the character
+        assert max(chunker.count_tokens(chunk) for chunk in chunks) <= 41
+        streamed = TextChunker(40, 10, method, encoder=byte_encoder, block_chars=100)
+        assert list(streamed.iter_chunks(io.StringIO(text))) == chunks
+
+
+class TestDocumentProcessorChunking:
+    """Tests for DocumentProcessor's use of the chunker."""
+
+    async def test_pool_and_inline_chunking_agree(self, monkeypatch):
+        """Test that large documents chunked in the process pool match inline chunking."""
+        logger.info("Testing process pool chunking", emoji_key="test")
+
+        processor = DocumentProcessor()
+        rng = random.Random(3)
+        documents = [make_document(rng, 40) for _ in range(6)]
+        expected = chunk_texts(documents, 50, 10, "sentence")
+
+        monkeypatch.setattr(processor, "inline_chunk_chars", 1000)
+        assert await processor.chunk_documents(documents, 50, 10, "sentence", 2) == expected
+        assert await processor.chunk_document(documents[0], 50, 10, "sentence") == expected[0]
+        streamed = processor.iter_chunks(io.StringIO(documents[1]), 50, 10, "sentence")
+        assert list(streamed) == expected[1]
@@ -0,0 +1,181 @@
+"""Tests for the embedding cache and embedding service."""
+
+from pathlib import Path
+
+import httpx
+import numpy as np
+import openai
+import pytest
+
+from ultimate_mcp_server.services.vector import embeddings as embeddings_module
+from ultimate_mcp_server.services.vector.embeddings import (
+    EmbeddingCache,
+    EmbeddingService,
+    get_embedding_service,
+)
+from ultimate_mcp_server.services.vector.local_embeddings import (
+    HashingEmbeddingBackend,
+    LocalEmbeddingBackend,
+)
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger("test.embeddings")
+
+
+@pytest.fixture
+def embedding_cache(tmp_path: Path) -> EmbeddingCache:
+    """Get an embedding cache with tiny segments so rollover is exercised."""
+    return EmbeddingCache(
+        cache_dir=str(tmp_path / "embeddings"), max_memory_items=2, segment_rows=3
+    )
+
+
+class TestEmbeddingCache:
+    """Tests for the segment-based embedding cache."""
+
+    def test_set_many_get_many_round_trip(self, embedding_cache: EmbeddingCache, tmp_path: Path):
+        """Test batch storage across segments and reload from disk."""
+        logger.info("Testing embedding cache round trip", emoji_key="test")
+
+        texts = [f"text {i}" for i in range(7)]
+        vectors = np.random.RandomState(0).rand(7, 4).astype(np.float32)
+        embedding_cache.set_many(texts, "test-model", vectors)
+
+        results = embedding_cache.get_many(texts + ["missing"], "test-model")
+        assert results[-1] is None
+        np.testing.assert_allclose(np.stack(results[:-1]), vectors)
+        assert len(embedding_cache.cache) == 2  # hot set is bounded
+
+        reopened = EmbeddingCache(cache_dir=str(tmp_path / "embeddings"), segment_rows=3)
+        np.testing.assert_allclose(reopened.get("text 5", "test-model"), vectors[5])
+        assert reopened.get("text 5", "other-model") is None
+        segments = list(reopened.iter_segments("test-model"))
+        assert [len(digests) for digests, _ in segments] == [3, 3, 1]
+
+    def test_cached_vectors_are_independent_copies(
+        self, embedding_cache: EmbeddingCache, tmp_path: Path
+    ):
+        """Test that callers cannot change cached vectors and entries do not pin batches."""
+        logger.info("Testing embedding cache copies", emoji_key="test")
+
+        vectors = np.ones((2, 4), dtype=np.float32)
+        embedding_cache.set_many(["a", "b"], "m", vectors)
+        vectors[:] = 5.0  # the caller reuses its buffer
+        hit = embedding_cache.get("b", "m")
+        hit[:] = 7.0
+        np.testing.assert_allclose(embedding_cache.get("b", "m"), np.ones(4))
+
+        reopened = EmbeddingCache(cache_dir=str(tmp_path / "embeddings"), max_memory_items=2)
+        loaded = reopened.get_many(["a", "b"], "m")
+        assert all(vector.base is None for vector in loaded)
+        assert all(vector.base is None for vector in reopened.cache.values())
+        loaded[0][:] = 9.0
+        np.testing.assert_allclose(reopened.get("a", "m"), np.ones(4))
+
+    def test_torn_append_is_truncated(self, embedding_cache: EmbeddingCache, tmp_path: Path):
+        """Test that a partially written row is dropped on reopen."""
+        logger.info("Testing embedding cache crash recovery", emoji_key="test")
+
+        embedding_cache.set_many(["a", "b"], "m", np.ones((2, 4), dtype=np.float32))
+        segment = tmp_path / "embeddings" / "m" / "segment-00000.bin"
+        with open(segment, "ab") as f:
+            f.write(b"\x00" * 7)  # vector bytes without a key
+
+        reopened = EmbeddingCache(cache_dir=str(tmp_path / "embeddings"), segment_rows=3)
+        reopened.set("c", "m", np.full(4, 2.0, dtype=np.float32))
+        np.testing.assert_allclose(reopened.get("c", "m"), np.full(4, 2.0))
+        np.testing.assert_allclose(reopened.get("b", "m"), np.ones(4))
+
+    def test_clear_and_dimension_mismatch(self, embedding_cache: EmbeddingCache):
+        """Test clearing the cache and rejecting mismatched dimensions."""
+        embedding_cache.set("a", "m", np.ones(4, dtype=np.float32))
+        with pytest.raises(ValueError):
+            embedding_cache.set("b", "m", np.ones(5, dtype=np.float32))
+
+        embedding_cache.clear()
+        assert embedding_cache.get("a", "m") is None
+        assert len(embedding_cache) == 0
+
+
+class _MockEmbeddingItem:
+    def __init__(self, index: int, text: str):
+        self.index = index
+        self.embedding = [float(len(text)), float(index), 1.0]
+
+
+class _MockEmbeddingsAPI:
+    def __init__(self, fail_first: int = 0):
+        self.calls = []
+        self.fail_first = fail_first
+
+    async def create(self, input, model):
+        self.calls.append(list(input))
+        if self.fail_first:
+            self.fail_first -= 1
+            raise openai.APIConnectionError(request=httpx.Request("POST", "http://test"))
+        items = [_MockEmbeddingItem(i, text) for i, text in enumerate(input)]
+        return type("Response", (), {"data": list(reversed(items))})()
+
+
+class TestEmbeddingService:
+    """Tests for the batched embedding pipeline."""
+
+    async def test_create_embeddings_dedupes_batches_and_caches(self, tmp_path: Path):
+        """Test de-duplication, micro-batching, ordering and cache reuse."""
+        logger.info("Testing embedding pipeline", emoji_key="test")
+
+        cache = EmbeddingCache(cache_dir=str(tmp_path / "embeddings"))
+        service = EmbeddingService(
+            api_key="test-key", cache=cache, max_batch_size=2, max_retries=1, retry_delay=0.01
+        )
+        api = _MockEmbeddingsAPI(fail_first=1)
+        service.client = type("Client", (), {"embeddings": api})()
+
+        texts = ["alpha", "be", "alpha", "gamma!", "d"]
+        embeddings = await service.create_embeddings(texts)
+
+        assert [e[0] for e in embeddings] == [5.0, 2.0, 5.0, 6.0, 1.0]
+        assert embeddings[0] == embeddings[2]
+        assert all(len(call) <= 2 for call in api.calls)
+        assert sorted(t for call in api.calls[1:] for t in call) == ["alpha", "be", "d", "gamma!"]
+        assert service.metrics.retries == 1
+
+        api.calls.clear()
+        again = await service.create_embeddings(["gamma!", "alpha"])
+        assert api.calls == []
+        assert [e[0] for e in again] == [6.0, 5.0]
+        assert service.get_metrics()["cache_hit_ratio"] == pytest.approx(2 / 6)
+
+
+class TestLocalEmbeddings:
+    """Tests for the in-process embedding backends."""
+
+    def test_hashing_backend_is_deterministic_and_normalized(self):
+        """Test hashing vectors are stable, unit-length and lexically meaningful."""
+        logger.info("Testing hashing embedding backend", emoji_key="test")
+
+        backend = HashingEmbeddingBackend(dimension=128)
+        texts = ["the cat sat on the mat", "a cat sat on a mat", "quantum chromodynamics", ""]
+        vectors = backend.embed(texts)
+
+        assert vectors.shape == (4, 128) and vectors.dtype == np.float32
+        np.testing.assert_allclose(vectors, HashingEmbeddingBackend(dimension=128).embed(texts))
+        np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, rtol=1e-5)
+        assert not vectors[3].any()
+        assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+        with pytest.raises(TypeError):
+            LocalEmbeddingBackend()  # backends must implement embed
+
+    async def test_local_provider_through_factory(self, monkeypatch):
+        """Test selecting the hashing provider via get_embedding_service."""
+        monkeypatch.setattr(embeddings_module, "embedding_instances", {})
+
+        service = get_embedding_service(provider_type="hashing", dimension=64)
+        assert service.is_local and service.cache is None
+        assert service.model_name == "hashing-64"
+
+        texts = [f"memory number {i}" for i in range(10)]
+        vectors = await service.create_embeddings(texts)
+        assert len(vectors) == 10 and len(vectors[0]) == 64
+        assert vectors == HashingEmbeddingBackend(dimension=64).embed(texts).tolist()
+        assert get_embedding_service(provider_type="hashing") is service
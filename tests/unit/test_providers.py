@@ -1,11 +1,13 @@
 """Tests for the provider implementations."""
 
+import asyncio
 from typing import Any, Dict
 
 import pytest
 from pytest import MonkeyPatch
 
 from ultimate_mcp_server.constants import Provider
+from ultimate_mcp_server.core.providers import pool as pool_module
 from ultimate_mcp_server.core.providers.anthropic import AnthropicProvider
 from ultimate_mcp_server.core.providers.base import (
     BaseProvider,
@@ -15,6 +17,7 @@ from ultimate_mcp_server.core.providers.base import (
 from ultimate_mcp_server.core.providers.deepseek import DeepSeekProvider
 from ultimate_mcp_server.core.providers.gemini import GeminiProvider
 from ultimate_mcp_server.core.providers.openai import OpenAIProvider
+from ultimate_mcp_server.core.providers.pool import ProviderPool
 from ultimate_mcp_server.utils import get_logger
 
 logger = get_logger("test.providers")
@@ -504,3 +507,86 @@ class TestOtherProviders:
         # Check result
         assert result.text is not None
         assert "Gemini" in result.text  # Should contain "Mock Gemini response"
+
+
+class TestProviderPool:
+    """Tests for the pool of initialized providers."""
+
+    @pytest.fixture
+    def init_calls(self, monkeypatch: MonkeyPatch) -> Dict[str, Any]:
+        """Count OpenAI provider initializations and control their outcome."""
+        state = {"calls": 0, "succeed": True}
+        original = OpenAIProvider.initialize
+
+        async def initialize(provider):
+            state["calls"] += 1
+            await asyncio.sleep(0.01)
+            return state["succeed"] and await original(provider)
+
+        monkeypatch.setattr(OpenAIProvider, "initialize", initialize)
+        return state
+
+    @pytest.fixture
+    def pool(self, monkeypatch: MonkeyPatch) -> ProviderPool:
+        """Get a fresh pool installed as the shared one."""
+        provider_pool = ProviderPool(health_check_interval=None)
+        monkeypatch.setattr(pool_module, "_provider_pool", provider_pool)
+        return provider_pool
+
+    async def test_instances_are_reused(self, pool: ProviderPool, init_calls: Dict[str, Any]):
+        """Test that providers are initialized once per configuration."""
+        logger.info("Testing provider reuse", emoji_key="test")
+
+        providers = await asyncio.gather(
+            *(get_provider("openai", api_key="mock-key-1") for _ in range(5))
+        )
+        assert init_calls["calls"] == 1
+        assert all(provider is providers[0] for provider in providers)
+        assert (
+            await get_provider("openai", model="openai/gpt-4o", api_key="mock-key-1")
+            is not (providers[0])
+        )
+
+        other = await get_provider("openai", api_key="mock-key-2")
+        assert other is not providers[0]
+        assert init_calls["calls"] == 3
+        # Pooled providers share the keep-alive connection pool
+        assert providers[0].client._client is other.client._client is pool.http_client()
+        assert await get_provider("openai", api_key="mock-key-1") is providers[0]
+        assert pool.get_stats()["hits"] == 1
+
+        await pool.shutdown()
+        assert pool.get_stats()["providers"] == 0
+
+    async def test_failures_are_not_cached(self, pool: ProviderPool, init_calls: Dict[str, Any]):
+        """Test that a failed initialization is retried on the next request."""
+        logger.info("Testing provider initialization failure", emoji_key="test")
+
+        init_calls["succeed"] = False
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await get_provider("openai", api_key="mock-key")
+        assert init_calls["calls"] == 2
+
+        init_calls["succeed"] = True
+        assert isinstance(await get_provider("openai", api_key="mock-key"), OpenAIProvider)
+
+        with pytest.raises(ValueError):
+            await get_provider("invalid-provider")
+
+    async def test_unhealthy_providers_are_evicted(
+        self, pool: ProviderPool, init_calls: Dict[str, Any], monkeypatch: MonkeyPatch
+    ):
+        """Test that a provider failing its health check is re-initialized."""
+        logger.info("Testing provider health checks", emoji_key="test")
+
+        provider = await get_provider("openai", api_key="mock-key")
+        assert await pool.check_health() == {"openai": True}
+
+        async def check_api_key(self):
+            return False
+
+        monkeypatch.setattr(OpenAIProvider, "check_api_key", check_api_key)
+        assert await pool.check_health() == {"openai": False}
+        assert await get_provider("openai", api_key="mock-key") is not provider
+        assert init_calls["calls"] == 2
@@ -0,0 +1,217 @@
+"""Tests for query execution and result masking in the SQL database tools."""
+
+import csv
+import random
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ultimate_mcp_server.tools import sql_databases
+from ultimate_mcp_server.tools.sql_databases import (
+    _sql_mask_row,
+    _sql_mask_rows,
+    execute_sql,
+)
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger("test.sql_databases")
+
+ROWS = 250
+
+
+@pytest.fixture
+async def connection_id(tmp_path):
+    """A SQLite connection with a table of ROWS rows."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE users (id INTEGER, email TEXT)"))
+        await conn.execute(
+            text("INSERT INTO users VALUES (:id, :email)"),
+            [{"id": i, "email": f"user{i}@example.com"} for i in range(ROWS)],
+        )
+    await sql_databases._connection_manager.add_connection("test-conn", engine)
+    yield "test-conn"
+    await sql_databases._connection_manager.close_connection("test-conn")
+
+
+class TestExecuteSqlStreaming:
+    """Tests for execute_sql's streaming mode."""
+
+    async def test_row_limit(self, connection_id):
+        """Test that standard queries return max_rows masked rows and flag truncation."""
+        logger.info("Testing row limits", emoji_key="test")
+
+        result = await execute_sql(connection_id, query="SELECT * FROM users", max_rows=10)
+
+        assert result["row_count"] == 10
+        assert result["truncated"] is True
+        assert result["rows"][0] == {"id": 0, "email": "us***@example.com"}
+
+    async def test_cursor_pages(self, connection_id, monkeypatch):
+        """Test paging through a streamed query, including after its connection was released."""
+        logger.info("Testing cursor paging", emoji_key="test")
+
+        query = "SELECT id FROM users ORDER BY id"
+        result = await execute_sql(
+            connection_id, query=query, stream=True, pagination={"page_size": 100}
+        )
+        ids = [row["id"] for row in result["rows"]]
+        token = result["pagination"]["cursor"]
+        assert result["pagination"]["has_next_page"] is True
+
+        # Releasing the connection forces the next page to re-execute and skip ahead
+        monkeypatch.setattr(sql_databases, "_MAX_OPEN_STREAM_CURSORS", 0)
+        await sql_databases._sql_prune_stream_cursors()
+        assert sql_databases._STREAM_CURSORS[token].conn is None
+
+        while token:
+            result = await execute_sql(connection_id, cursor=token)
+            assert result["pagination"]["offset"] == len(ids)
+            ids.extend(row["id"] for row in result["rows"])
+            token = result["pagination"]["cursor"]
+
+        assert ids == list(range(ROWS))
+        assert result["row_count"] == 50
+        assert not sql_databases._STREAM_CURSORS
+
+        expired = await execute_sql(connection_id, cursor="missing")
+        assert expired["success"] is False
+        assert expired["error_type"] == "CURSOR_NOT_FOUND"
+
+    async def test_open_cursors_leave_the_pool_usable(self, connection_id, monkeypatch):
+        """Test that held stream cursors stay below the engine's pool capacity."""
+        logger.info("Testing stream cursor connection cap", emoji_key="test")
+
+        query = "SELECT id FROM users ORDER BY id"
+        tokens = []
+        for _ in range(20):  # More than pool_size + max_overflow (5 + 10)
+            result = await execute_sql(
+                connection_id, query=query, stream=True, pagination={"page_size": 10}
+            )
+            tokens.append(result["pagination"]["cursor"])
+        held = [c for c in sql_databases._STREAM_CURSORS.values() if c.conn is not None]
+        assert len(held) == 7  # Half the pool's capacity
+
+        result = await execute_sql(connection_id, query="SELECT COUNT(*) AS n FROM users")
+        assert result["rows"] == [{"n": ROWS}]
+        result = await execute_sql(connection_id, cursor=tokens[0])  # Released; re-executes
+        assert [row["id"] for row in result["rows"]] == list(range(10, 20))
+
+        # Cursors idle past the hold time give their connections back
+        monkeypatch.setattr(sql_databases, "_STREAM_CURSOR_HOLD", 0.0)
+        await sql_databases._sql_prune_stream_cursors()
+        assert all(c.conn is None for c in sql_databases._STREAM_CURSORS.values())
+        assert len(sql_databases._STREAM_CURSORS) == 20
+
+    async def test_data_modifying_with_queries_are_not_streamed(self, connection_id):
+        """Test that WITH queries changing data run as statements and cannot be streamed."""
+        logger.info("Testing routing of data-modifying WITH queries", emoji_key="test")
+
+        assert sql_databases._sql_is_row_query("WITH t AS (SELECT 1) SELECT * FROM t")
+        assert sql_databases._sql_is_row_query("TABLE users")
+        assert sql_databases._sql_is_row_query(
+            "WITH t AS (SELECT 'delete me' AS note) SELECT * FROM t FOR UPDATE"
+        )
+        assert not sql_databases._sql_is_row_query(
+            "WITH gone AS (DELETE FROM users RETURNING id) SELECT * FROM gone"
+        )
+
+        query = (
+            "WITH extra AS (SELECT 999 AS id) INSERT OR IGNORE INTO users SELECT id, 'x' FROM extra"
+        )
+        streamed = await execute_sql(connection_id, query=query, read_only=False, stream=True)
+        assert streamed["success"] is False
+        assert "TABLE, or WITH without" in streamed["error"]
+
+        result = await execute_sql(connection_id, query=query, read_only=False)
+        assert result["success"] is True
+        count = await execute_sql(connection_id, query="SELECT COUNT(*) AS n FROM users")
+        assert count["rows"] == [{"n": ROWS + 1}]
+
+    async def test_streamed_csv_export(self, connection_id, tmp_path):
+        """Test that a streamed export writes every row and returns a preview."""
+        logger.info("Testing streamed CSV export", emoji_key="test")
+
+        path = tmp_path / "users.csv"
+        result = await execute_sql(
+            connection_id,
+            query="SELECT * FROM users",
+            stream=True,
+            max_rows=5,
+            export={"format": "csv", "path": str(path)},
+        )
+
+        assert result["row_count"] == 5
+        assert result["exported_row_count"] == ROWS
+        assert result["csv_path"] == str(path)
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["id", "email"]
+        assert len(rows) == ROWS + 1
+        assert rows[1] == ["0", "us***@example.com"]
+
+    async def test_streamed_parquet_export_widens_null_columns(
+        self, connection_id, tmp_path, monkeypatch
+    ):
+        """Test that a column NULL throughout the first batch keeps its later values."""
+        logger.info("Testing streamed Parquet export with late-typed columns", emoji_key="test")
+        pq = pytest.importorskip("pyarrow.parquet")
+        monkeypatch.setattr(sql_databases, "_STREAM_BATCH_SIZE", 100)
+
+        path = tmp_path / "users.parquet"
+        result = await execute_sql(
+            connection_id,
+            query="SELECT id, CASE WHEN id >= 150 THEN id * 2 END AS late FROM users",
+            stream=True,
+            export={"format": "parquet", "path": str(path)},
+        )
+
+        assert result["exported_row_count"] == ROWS
+        table = pq.read_table(path)
+        assert str(table.schema.field("late").type) == "int64"
+        late = table.column("late").to_pylist()
+        assert late[:150] == [None] * 150
+        assert late[150:] == [i * 2 for i in range(150, ROWS)]
+
+
+class TestColumnMasking:
+    """Tests for column-aware masking of result batches."""
+
+    def test_matches_per_row_masking(self):
+        """Test that masking by column gives the per-row result on mixed data."""
+        logger.info("Testing column-aware masking", emoji_key="test")
+
+        rng = random.Random(5)
+        values = [
+            None,
+            42,
+            3.5,
+            "",
+            "plain text",
+            "order 2024-01-01",
+            "123-45-6789",
+            "x123-45-6789",
+            "1234-5678-9012-3456",
+            "1234567890123456",
+            "call 1234 5678",
+            "jane.doe@example.com",
+            "line one\njane@example.com",
+            "\u0661\u0662\u0663-\u0664\u0665-\u0666\u0667\u0668\u0669",  # Arabic-Indic digits
+        ]
+        cols = ["id", "notes", "contact_email", "misc"]
+        for size, pii_share in ((1, 1.0), (7, 1.0), (500, 1.0), (2000, 0.05)):
+            # A low share of sensitive values exercises the column screening path
+            rows = [
+                tuple(rng.choice(values) if rng.random() < pii_share else "text" for _ in cols)
+                for _ in range(size)
+            ]
+            expected = [_sql_mask_row(dict(zip(cols, row, strict=True))) for row in rows]
+            assert _sql_mask_rows(cols, rows) == expected
+
+    def test_columns_without_pii_are_untouched(self):
+        """Test that rows pass through unchanged when no value needs masking."""
+        rows = [(i, f"item {i}", i * 1.5) for i in range(100)]
+        masked = _sql_mask_rows(["id", "name", "price"], rows)
+        assert masked[10] == {"id": 10, "name": "item 10", "price": 15.0}
+        assert _sql_mask_rows(["id"], []) == []
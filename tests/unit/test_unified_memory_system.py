@@ -0,0 +1,536 @@
+"""Tests for the unified memory system's connection pool, search, relevance scoring and access tracking."""
+
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from ultimate_mcp_server.services.vector import embeddings
+from ultimate_mcp_server.tools import unified_memory_system as ums
+from ultimate_mcp_server.tools.unified_memory_system import (
+    DBConnection,
+    MemoryVectorIndex,
+    _compute_memory_relevance,
+    _compute_memory_relevance_batch,
+    _find_similar_memories,
+    _store_embedding,
+    _top_k_indices,
+)
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger("test.unified_memory_system")
+
+
+@pytest.fixture
+async def db_path(tmp_path):
+    """A fresh UMS database with one workflow; its pool is closed afterwards."""
+    path = str(tmp_path / "ums.db")
+    now = int(time.time())
+    async with DBConnection(path).transaction() as conn:
+        await conn.execute(
+            "INSERT INTO workflows (workflow_id, title, status, created_at, updated_at) "
+            "VALUES ('wf', 'Workflow', 'active', ?, ?)",
+            (now, now),
+        )
+    yield path
+    await DBConnection.close_connection(path)
+
+
+async def insert_memory(
+    db: DBConnection, memory_id: str, content: str = "note", level: str = "working"
+) -> None:
+    now = int(time.time())
+    async with db.transaction() as conn:
+        await conn.execute(
+            "INSERT INTO memories (memory_id, workflow_id, content, memory_level, memory_type, "
+            "created_at, updated_at, last_accessed) VALUES (?, 'wf', ?, ?, 'observation', ?, ?, ?)",
+            (memory_id, content, level, now, now, now),
+        )
+
+
+class FakeEmbeddingService:
+    """Embeds each text as a fixed random unit vector, plus any registered overrides."""
+
+    client = True
+    model_name = "fake-embedding"
+
+    def __init__(self, dimension: int = 16):
+        self.dimension = dimension
+        self.vectors = {}
+
+    def vector(self, text: str) -> np.ndarray:
+        if text not in self.vectors:
+            rng = np.random.default_rng(zlib.crc32(text.encode()))
+            self.vectors[text] = rng.standard_normal(self.dimension).astype(np.float32)
+        return self.vectors[text]
+
+    async def create_embeddings(self, texts):
+        return [self.vector(text).tolist() for text in texts]
+
+
+@pytest.fixture
+def embedding_service(monkeypatch):
+    service = FakeEmbeddingService()
+    monkeypatch.setattr(embeddings, "get_embedding_service", lambda *a, **k: service)
+    return service
+
+
+class TestConnectionPool:
+    """Tests for the pooled connections behind DBConnection.transaction."""
+
+    async def test_connections_are_reused(self, db_path):
+        """Test that transactions share one writer and recycle readers in WAL mode."""
+        logger.info("Testing connection reuse", emoji_key="test")
+
+        db = DBConnection(db_path)
+        async with db.transaction() as first:
+            pass
+        async with db.transaction(mode="IMMEDIATE") as second:
+            pass
+        assert first is second
+
+        async with db.transaction(readonly=True) as reader:
+            assert await reader.execute_fetchval("PRAGMA journal_mode") == "wal"
+            # UDFs are registered once per pooled connection
+            assert await reader.execute_fetchval("SELECT json_contains('[1, 2]', 2)") == 1
+        async with db.transaction(readonly=True) as reader_again:
+            pass
+        assert reader is reader_again
+
+        metrics = DBConnection.get_pool_metrics(db_path)[0]
+        assert metrics["writer_acquires"] == 3  # Including the fixture's insert
+        assert metrics["reader_acquires"] == 2
+        assert metrics["reader_connections_opened"] == 1
+        assert metrics["readers_idle"] == 1
+
+    async def test_nested_readers_do_not_wait(self, db_path, monkeypatch):
+        """Test that nested read transactions get extra readers beyond the pool size."""
+        logger.info("Testing nested read transactions", emoji_key="test")
+
+        monkeypatch.setattr(ums.agent_memory_config, "read_pool_size", 1)
+        await DBConnection.close_connection(db_path)  # Pick up the smaller pool
+
+        db = DBConnection(db_path)
+        async with db.transaction(readonly=True) as outer:
+            async with db.transaction(readonly=True) as inner:
+                assert inner is not outer
+                assert await inner.execute_fetchval("SELECT COUNT(*) FROM workflows") == 1
+
+        metrics = DBConnection.get_pool_metrics(db_path)[0]
+        assert metrics["reader_connections_opened"] == 2
+        assert metrics["reader_connections_closed"] == 1
+        assert metrics["readers_idle"] == 1
+
+    async def test_writers_queue_and_readers_see_snapshots(self, db_path):
+        """Test that concurrent writes are serialized without blocking readers."""
+        logger.info("Testing the writer queue", emoji_key="test")
+
+        db = DBConnection(db_path)
+        pool = await db.pool()
+        await asyncio.wait_for(
+            asyncio.gather(*(insert_memory(db, f"m{i}") for i in range(20))), timeout=30
+        )
+        assert pool.get_metrics()["writer_queue_depth"] == 0
+
+        async with db.transaction() as writer:
+            await writer.execute("DELETE FROM memories")
+            # WAL readers keep seeing the last committed state while a write is open
+            async with db.transaction(readonly=True) as reader:
+                assert await reader.execute_fetchval("SELECT COUNT(*) FROM memories") == 20
+
+            waiting = asyncio.create_task(insert_memory(db, "late"))
+            await asyncio.sleep(0.05)
+            assert pool.get_metrics()["writer_queue_depth"] == 1
+        await waiting
+
+        async with db.transaction(readonly=True) as reader:
+            assert await reader.execute_fetchval("SELECT memory_id FROM memories") == "late"
+
+    async def test_close_connection(self, db_path):
+        """Test that closing the pool releases connections and a new one opens on demand."""
+        logger.info("Testing pool shutdown", emoji_key="test")
+
+        db = DBConnection(db_path)
+        pool = await db.pool()
+        await insert_memory(db, "m1")
+        await DBConnection.close_connection(db_path)
+        assert pool.closed
+        assert DBConnection.get_pool_metrics(db_path) == []
+
+        async with db.transaction(readonly=True) as reader:
+            assert await reader.execute_fetchval("SELECT COUNT(*) FROM memories") == 1
+        assert await db.pool() is not pool
+
+
+class TestMemoryVectorIndex:
+    """Tests for the exact vector index behind semantic memory search."""
+
+    def test_matches_brute_force(self):
+        """Test that searches equal a brute-force cosine ranking through updates and removals."""
+        logger.info("Testing vector index search", emoji_key="test")
+
+        rng = np.random.default_rng(3)
+        vectors = rng.standard_normal((3000, 8)).astype(np.float32)
+        workflows = [f"wf{i % 3}" for i in range(3000)]
+        index = MemoryVectorIndex(8, capacity=16)
+        for i, vector in enumerate(vectors):
+            index.upsert(f"m{i}", f"e{i}", workflows[i], vector)
+        index.remove(f"m{i}" for i in range(0, 3000, 2))  # Compacts the index
+        vectors[1] = rng.standard_normal(8)
+        index.upsert("m1", "e1-new", workflows[1], vectors[1])
+        assert len(index) == 1500
+
+        query = rng.standard_normal(8).astype(np.float32)
+        for workflow_id, threshold in ((None, -1.0), ("wf1", 0.2)):
+            expected = []
+            for i in range(1, 3000, 2):
+                if workflow_id and workflows[i] != workflow_id:
+                    continue
+                cosine = vectors[i] @ query / np.linalg.norm(vectors[i]) / np.linalg.norm(query)
+                if cosine >= threshold:
+                    expected.append((float(cosine), f"m{i}"))
+            expected.sort(reverse=True)
+
+            hits = index.search(query, limit=25, threshold=threshold, workflow_id=workflow_id)
+            assert [memory_id for memory_id, _, _ in hits] == [m for _, m in expected[:25]]
+            assert [sim for _, _, sim in hits] == pytest.approx([c for c, _ in expected[:25]])
+        assert ("m1", "e1-new") in {
+            (m, e) for m, e, _ in index.search(vectors[1], limit=1, threshold=0)
+        }
+        assert index.search(query, limit=5, threshold=0, workflow_id="unknown") == []
+
+    async def test_similar_memories_across_whole_store(
+        self, db_path, embedding_service, monkeypatch
+    ):
+        """Test that semantic search finds old memories and follows embedding changes."""
+        logger.info("Testing semantic search over all memories", emoji_key="test")
+
+        db = DBConnection(db_path)
+        target = np.ones(16, dtype=np.float32)
+        embedding_service.vectors["old relevant"] = target
+        embedding_service.vectors["query"] = target + 0.01
+        await insert_memory(db, "old", "old relevant", level="semantic")
+        for i in range(120):
+            await insert_memory(db, f"m{i}", f"recent {i}")
+        async with db.transaction() as conn:
+            await conn.execute("UPDATE memories SET last_accessed = 0 WHERE memory_id = 'old'")
+            for memory_id, content in await conn.execute_fetchall(
+                "SELECT memory_id, content FROM memories"
+            ):
+                await _store_embedding(conn, memory_id, content)
+
+        async with db.transaction(readonly=True) as conn:
+            # The least recently accessed memory used to fall outside the candidate window
+            assert (await _find_similar_memories(conn, "query", "wf", limit=1))[0][0] == "old"
+            assert await _find_similar_memories(conn, "query", "wf", memory_level="working") == []
+            index = await ums._memory_vector_index(conn, 16)
+
+        # Index updates wait for the commit, so a re-embed that is rolled back leaves none
+        embedding_service.vectors["moved"] = -target
+
+        async def failing_commit():
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with monkeypatch.context() as patch:
+            async with db.transaction() as conn:
+                await _store_embedding(conn, "old", "moved")
+                assert index.search(target, limit=1, threshold=0)[0][0] == "old"
+                patch.setattr(conn, "commit", failing_commit)
+        assert index.search(target, limit=1, threshold=0)[0][0] == "old"
+
+        # Re-embedding and deleting memories update the loaded index in place
+        async with db.transaction() as conn:
+            await _store_embedding(conn, "old", "moved")
+            await _store_embedding(conn, "m0", "query")
+        async with db.transaction(readonly=True) as conn:
+            assert (await _find_similar_memories(conn, "query", "wf", limit=1))[0][0] == "m0"
+            assert await ums._memory_vector_index(conn, 16) is index
+
+        async with db.transaction() as conn:
+            await conn.execute("UPDATE memories SET ttl = 1, created_at = 0 WHERE memory_id = 'm0'")
+        assert (await ums.delete_expired_memories(db_path=db_path))["data"]["deleted_count"] == 1
+        assert "m0" not in index._rows
+        async with db.transaction(readonly=True) as conn:
+            hits = await _find_similar_memories(conn, "query", "wf", threshold=0.9)
+            assert hits == []
+            assert await ums._memory_vector_index(conn, 16) is index
+
+
+class TestKeywordSearch:
+    """Tests for bm25 keyword scoring in hybrid_search_memories."""
+
+    async def test_bm25_ranking_and_limit(self, db_path):
+        """Test that keyword candidates are ranked by weighted bm25 and bounded."""
+        logger.info("Testing bm25 keyword search", emoji_key="test")
+
+        db = DBConnection(db_path)
+        await insert_memory(db, "best", "deadlock deadlock deadlock in the scheduler")
+        await insert_memory(db, "some", "one deadlock among many other words in a long note")
+        for i in range(30):
+            await insert_memory(db, f"other{i}", f"deadlock mention {i} " + "filler " * 20)
+        await insert_memory(db, "unrelated", "nothing to see here")
+
+        async with db.transaction(readonly=True) as conn:
+            scores = await ums._keyword_search_memories(conn, "deadlock", limit=10)
+            assert len(scores) == 10
+            assert max(scores, key=scores.get) == "best"
+            assert all(0 <= s <= 1 for s in scores.values())
+
+            everything = await ums._keyword_search_memories(conn, "deadlock", limit=100)
+            assert len(everything) == 32
+            assert everything["best"] > everything["some"]
+            assert await ums._keyword_search_memories(conn, "?!", limit=10) == {}
+            assert (
+                await ums._keyword_search_memories(
+                    conn, "deadlock", limit=10, memory_level="semantic"
+                )
+                == {}
+            )
+
+        result = await ums.hybrid_search_memories(
+            "deadlock", workflow_id="wf", limit=3, semantic_weight=0, db_path=db_path
+        )
+        memories = result["data"]["memories"]
+        assert [m["memory_id"] for m in memories][0] == "best"
+        assert len(memories) == 3
+        assert result["data"]["total_candidates_considered"] == 32
+
+
+class TestRelevanceScoring:
+    """Tests for batch relevance scoring and the stored relevance snapshot."""
+
+    def test_batch_matches_scalar(self):
+        """Test that vectorised scores equal the scalar function, NULLs included."""
+        logger.info("Testing batch relevance scoring", emoji_key="test")
+
+        rng = np.random.default_rng(11)
+        now = time.time()  # The scalar function reads the clock itself
+        rows = [
+            (
+                None if i % 17 == 0 else float(rng.uniform(0, 10)),
+                None if i % 13 == 0 else float(rng.uniform(0, 1)),
+                0 if i % 11 == 0 else int(now) - int(rng.integers(0, 90 * 86400)),
+                None if i % 7 == 0 else int(rng.integers(0, 50)),
+                None if i % 5 == 0 else int(now) - int(rng.integers(0, 30 * 86400)),
+            )
+            for i in range(500)
+        ]
+        scores = _compute_memory_relevance_batch(*zip(*rows, strict=True), now=now)
+        assert scores.tolist() == pytest.approx([_compute_memory_relevance(*r) for r in rows])
+        assert (0 <= scores).all() and (scores <= 10).all()
+
+        # The SQL pruning bound never undercuts the exact score (beyond the threshold's slack)
+        with sqlite3.connect(":memory:") as conn:
+            conn.execute(
+                "CREATE TABLE memories (importance, confidence, created_at, access_count, "
+                "last_accessed)"
+            )
+            conn.executemany("INSERT INTO memories VALUES (?, ?, ?, ?, ?)", rows)
+            bounds = conn.execute(
+                f"SELECT {ums._relevance_upper_bound_sql(now)} FROM memories m ORDER BY rowid"
+            ).fetchall()
+        assert all(
+            bound >= score * (1 - 1e-9) for (bound,), score in zip(bounds, scores, strict=True)
+        )
+
+        for k in (0, 1, 37, 500, 600):
+            top = _top_k_indices(scores, k)
+            assert scores[top].tolist() == sorted(scores.tolist(), reverse=True)[:k]
+
+    async def test_query_memories_sorted_by_relevance(self, db_path, monkeypatch):
+        """Test that relevance ordering and pagination match a full sort."""
+        logger.info("Testing relevance-sorted queries", emoji_key="test")
+
+        monkeypatch.setattr(ums, "_RELEVANCE_FETCH_BATCH", 7)  # Exercise the running top-k
+        db = DBConnection(db_path)
+        rng = np.random.default_rng(5)
+        for i in range(150):
+            await insert_memory(db, f"m{i}")
+        async with db.transaction() as conn:
+            await conn.executemany(
+                "UPDATE memories SET importance = ?, access_count = ?, last_accessed = ? "
+                "WHERE memory_id = ?",
+                [
+                    (
+                        float(rng.uniform(1, 10)),
+                        int(rng.integers(0, 20)),
+                        int(time.time()) - int(rng.integers(0, 10 * 86400)),
+                        f"m{i}",
+                    )
+                    for i in range(150)
+                ],
+            )
+            rows = await conn.execute_fetchall(
+                "SELECT memory_id, importance, confidence, created_at, access_count, "
+                "last_accessed FROM memories"
+            )
+        expected = sorted(rows, key=lambda r: _compute_memory_relevance(*r[1:]), reverse=True)
+
+        result = await ums.query_memories(workflow_id="wf", limit=10, offset=5, db_path=db_path)
+        memories = result["data"]["memories"]
+        assert result["data"]["total_matching_count"] == 150
+        assert [m["memory_id"] for m in memories] == [r[0] for r in expected[5:15]]
+        assert [m["relevance"] for m in memories] == pytest.approx(
+            [_compute_memory_relevance(*r[1:]) for r in expected[5:15]], rel=1e-3
+        )
+
+        least = await ums.query_memories(
+            workflow_id="wf", sort_order="ASC", limit=3, db_path=db_path
+        )
+        assert [m["memory_id"] for m in least["data"]["memories"]] == [
+            r[0] for r in expected[::-1][:3]
+        ]
+        by_importance = await ums.query_memories(
+            workflow_id="wf", sort_by="importance", limit=2, db_path=db_path
+        )
+        assert all("relevance" in m for m in by_importance["data"]["memories"])
+
+    async def test_stored_relevance_refresh_and_migration(self, db_path, monkeypatch):
+        """Test that old databases gain the relevance columns and snapshots refresh."""
+        logger.info("Testing stored relevance scores", emoji_key="test")
+
+        db = DBConnection(db_path)
+        await insert_memory(db, "low")
+        await insert_memory(db, "high")
+        await DBConnection.close_connection(db_path)
+        with sqlite3.connect(db_path) as legacy:  # Roll back to the previous schema
+            legacy.executescript(
+                """
+                DROP INDEX idx_memories_relevance;
+                ALTER TABLE memories DROP COLUMN relevance_score;
+                ALTER TABLE memories DROP COLUMN relevance_scored_at;
+                DROP TRIGGER memories_after_update_fts;
+                CREATE TRIGGER memories_after_update_sync AFTER UPDATE ON memories BEGIN
+                    SELECT 1;
+                END;
+                """
+            )
+        async with db.transaction() as conn:
+            await conn.execute("UPDATE memories SET importance = 9 WHERE memory_id = 'high'")
+            triggers = await conn.execute_fetchall(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%update%'"
+            )
+        assert [t["name"] for t in triggers] == ["memories_after_update_fts"]
+
+        details = await ums.get_workflow_details(
+            "wf", include_memories=True, memories_limit=5, db_path=db_path
+        )
+        sample = details["data"]["memories_sample"]
+        assert [m["memory_id"] for m in sample] == ["high", "low"]
+        assert sample[0]["relevance"] == pytest.approx(9 * sample[1]["relevance"] / 5)
+
+        # Within the refresh interval only never-scored memories are filled in
+        monkeypatch.setattr(ums.agent_memory_config, "relevance_refresh_interval", 3600)
+        await insert_memory(db, "new")
+        async with db.transaction() as conn:
+            await conn.execute("UPDATE memories SET importance = 1 WHERE memory_id = 'high'")
+        sample = (await ums.get_workflow_details("wf", include_memories=True, db_path=db_path))[
+            "data"
+        ]["memories_sample"]
+        assert [m["memory_id"] for m in sample][0] == "high"
+        assert all(m["relevance"] is not None for m in sample)
+
+        monkeypatch.setattr(ums.agent_memory_config, "relevance_refresh_interval", 0)
+        graph = await ums.visualize_memory_network(workflow_id="wf", max_nodes=1, db_path=db_path)
+        assert graph["data"]["node_count"] == 1
+        assert "high" not in graph["data"]["visualization"]  # Demoted by the full refresh
+        async with db.transaction() as conn:  # Nothing drifted: a refresh writes nothing
+            assert await ums._refresh_memory_relevance(conn, "wf") == 0
+
+
+async def access_stats(db: DBConnection):
+    """Access counts by memory and the access operations logged so far."""
+    async with db.transaction(readonly=True) as conn:
+        counts = await conn.execute_fetchall("SELECT memory_id, access_count FROM memories")
+        ops = await conn.execute_fetchall(
+            "SELECT memory_id, operation, operation_data FROM memory_operations "
+            "WHERE operation LIKE '%access%' ORDER BY memory_id, operation"
+        )
+    return {r[0]: r[1] for r in counts}, [(r[0], r[1], json.loads(r[2])["hits"]) for r in ops]
+
+
+class TestMemoryAccessBuffer:
+    """Tests for write-behind access tracking of read tools."""
+
+    async def test_reads_are_coalesced_and_written_behind(self, db_path, monkeypatch):
+        """Test that read tools stay read-only and repeated hits collapse into one write."""
+        logger.info("Testing write-behind memory access tracking", emoji_key="test")
+
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_interval", 3600)
+        db = DBConnection(db_path)
+        await insert_memory(db, "a", "alpha note")
+        await insert_memory(db, "b", "beta note")
+        writes = DBConnection.get_pool_metrics(db_path)[0]["writer_acquires"]
+
+        for _ in range(3):
+            await ums.query_memories(workflow_id="wf", db_path=db_path)
+        await ums.get_memory_by_id("a", include_context=False, db_path=db_path)
+        assert DBConnection.get_pool_metrics(db_path)[0]["writer_acquires"] == writes
+        assert await access_stats(db) == ({"a": 0, "b": 0}, [])
+
+        assert await ums._flush_memory_access(db_path) == 3
+        assert await access_stats(db) == (
+            {"a": 4, "b": 3},
+            [("a", "access_by_id", 1), ("a", "query_access", 3), ("b", "query_access", 3)],
+        )
+
+    async def test_flush_policy_and_failures(self, db_path, monkeypatch):
+        """Test the interval/batch-size policy, re-queueing and the exit-time flush."""
+        logger.info("Testing memory access flush policy", emoji_key="test")
+
+        db = DBConnection(db_path)
+        await insert_memory(db, "a")
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_interval", 0)
+        await ums.get_memory_by_id("a", include_context=False, db_path=db_path)
+        assert (await access_stats(db))[0] == {"a": 1}  # Written before returning
+
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_interval", 3600)
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_batch_size", 2)
+        buffer = ums._MEMORY_ACCESS_BUFFERS[db.db_path]
+        await ums._record_memory_access(db.db_path, [("wf", "a", "test_access", None)])
+        assert len(buffer) == 1  # Waits for the interval
+        await ums._record_memory_access(db.db_path, [("wf", "a", "other_access", None)])
+        for _ in range(100):  # The batch size starts a flush right away
+            if not len(buffer):
+                break
+            await asyncio.sleep(0.01)
+        assert (await access_stats(db))[0] == {"a": 3}
+
+        # A hit recorded while the timer's write runs gets a timer of its own
+        await insert_memory(db, "b")
+        buffer._timer.cancel()  # The hour-long timer armed above
+        await asyncio.gather(buffer._timer, return_exceptions=True)
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_interval", 0.05)
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_batch_size", 100)
+        rows = ums.MemoryAccessBuffer.__dict__["_rows"]
+
+        def rows_recording_a_hit(entries):
+            if ("b", "test_access") not in entries:
+                buffer.record("wf", "b", "test_access")
+            return rows.__func__(entries)
+
+        monkeypatch.setattr(ums.MemoryAccessBuffer, "_rows", staticmethod(rows_recording_a_hit))
+        await ums._record_memory_access(db.db_path, [("wf", "a", "test_access", None)])
+        for _ in range(100):
+            if (await access_stats(db))[0].get("b"):
+                break
+            await asyncio.sleep(0.01)
+        assert (await access_stats(db))[0] == {"a": 4, "b": 1}
+        assert not len(buffer)
+        monkeypatch.setattr(ums.MemoryAccessBuffer, "_rows", rows)
+        monkeypatch.setattr(ums.agent_memory_config, "access_flush_interval", 3600)
+
+        update_sql = ums._ACCESS_UPDATE_SQL
+        monkeypatch.setattr(ums, "_ACCESS_UPDATE_SQL", "UPDATE no_such_table SET x = ?")
+        buffer.record("wf", "a", "test_access")
+        assert await buffer.flush() == 0
+        assert len(buffer) == 1  # Kept for the next flush
+        monkeypatch.setattr(ums, "_ACCESS_UPDATE_SQL", update_sql)
+        buffer.flush_sync()  # As at interpreter exit
+        counts, ops = await access_stats(db)
+        assert counts == {"a": 5, "b": 1}
+        assert ("a", "test_access", 1) in ops and len(ops) == 6
@@ -0,0 +1,289 @@
+"""Tests for the local vector collection."""
+
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from ultimate_mcp_server.services.vector import vector_service
+from ultimate_mcp_server.services.vector.embeddings import EmbeddingService
+from ultimate_mcp_server.services.vector.vector_service import VectorCollection
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger("test.vector_service")
+
+
+@pytest.fixture
+def make_collection(monkeypatch):
+    """Build numpy-backed collections that embed with the offline hashing provider."""
+    service = EmbeddingService(provider_type="hashing", dimension=8)
+    monkeypatch.setattr(vector_service, "get_embedding_service", lambda: service)
+
+    def factory(metric: str = "cosine", dimension: int = 8) -> VectorCollection:
+        collection = VectorCollection("test", dimension=dimension, similarity_metric=metric)
+        collection.index_type, collection.index = "numpy", None
+        return collection
+
+    return factory
+
+
+def _brute_force(vectors: np.ndarray, query: np.ndarray, metric: str) -> np.ndarray:
+    if metric == "dot":
+        return vectors @ query
+    if metric == "euclidean":
+        return 1.0 / (1.0 + np.linalg.norm(vectors - query, axis=1))
+    return (vectors @ query) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+
+
+class TestVectorCollection:
+    """Tests for contiguous storage and vectorized search."""
+
+    @pytest.mark.parametrize("metric", ["cosine", "dot", "euclidean"])
+    def test_search_batch_matches_brute_force(self, make_collection, metric):
+        """Test matmul + argpartition top-k against a naive per-vector scan."""
+        logger.info(f"Testing vectorized {metric} search", emoji_key="test")
+
+        rng = np.random.RandomState(0)
+        vectors = rng.randn(2500, 8).astype(np.float32)  # crosses the initial capacity
+        collection = make_collection(metric)
+        collection.add(vectors[:1000])
+        collection.add(vectors[1000:])
+        np.testing.assert_allclose(collection.vectors, vectors, rtol=1e-5, atol=1e-6)
+
+        queries = rng.randn(3, 8).astype(np.float32)
+        batch_results = collection.search_batch(queries, top_k=5)
+        for query, results in zip(queries, batch_results, strict=True):
+            expected = _brute_force(vectors, query, metric)
+            expected_ids = [collection.ids[i] for i in np.argsort(-expected)[:5]]
+            assert [r["id"] for r in results] == expected_ids
+            np.testing.assert_allclose(
+                [r["similarity"] for r in results], np.sort(expected)[::-1][:5], rtol=1e-4
+            )
+            assert "vector" not in results[0]
+
+    def test_filter_threshold_vectors_and_delete(self, make_collection):
+        """Test filtered search, opt-in vectors, thresholds and compaction on delete."""
+        collection = make_collection()
+        vectors = np.eye(8, dtype=np.float32) * 3.0
+        ids = collection.add(vectors, metadatas=[{"group": i % 2} for i in range(8)])
+
+        results = collection.search(vectors[2], top_k=3, filter={"group": 0}, include_vectors=True)
+        assert results[0]["id"] == ids[2] and results[0]["similarity"] == pytest.approx(1.0)
+        assert all(r["metadata"]["group"] == 0 for r in results)
+        np.testing.assert_allclose(results[0]["vector"], vectors[2])
+        thresholded = collection.search(vectors[2], top_k=3, similarity_threshold=0.5)
+        assert [r["id"] for r in thresholded] == [ids[2]]
+
+        assert collection.delete(ids=[ids[0], ids[2]]) == 2
+        assert len(collection) == 6 and ids[2] not in collection.ids
+        assert collection.search(vectors[3], top_k=1)[0]["id"] == ids[3]
+        np.testing.assert_allclose(collection.vectors[0], vectors[1])
+
+        with pytest.raises(ValueError):
+            collection.add(np.ones((1, 4), dtype=np.float32))
+
+    async def test_query_embeds_all_texts_in_one_call(self, make_collection):
+        """Test the ChromaDB-compatible query batches embedding and search."""
+        collection = make_collection()
+        service = collection.embedding_service
+        texts = ["red apples and pears", "blue ocean waves", "green forest trees"]
+        collection.add(
+            await service.create_embeddings(texts), metadatas=[{"text": t} for t in texts]
+        )
+
+        batches_before = service.metrics.batches
+        results = await collection.query(["blue ocean waves", "green forest trees"], n_results=1)
+        assert results["documents"] == [["blue ocean waves"], ["green forest trees"]]
+        assert results["embeddings"] == []
+        assert service.metrics.batches == batches_before + 1
+
+
+class _ManualExecutor:
+    """Executor whose jobs run only when the test says so."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def run_all(self):
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+        self.jobs.clear()
+
+
+@pytest.mark.skipif(not vector_service.HNSWLIB_AVAILABLE, reason="hnswlib not installed")
+class TestVectorCollectionIndex:
+    """Tests for filtered ANN search and tombstone deletes."""
+
+    @pytest.fixture
+    def collection(self, make_collection):
+        collection = make_collection()
+        collection._init_search_index()
+        collection._EXACT_SEARCH_MAX_CANDIDATES = 10  # route filtered searches through HNSW
+        rng = np.random.RandomState(1)
+        self.vectors = rng.randn(300, 8).astype(np.float32)
+        collection.add(
+            self.vectors,
+            ids=[f"v{i}" for i in range(300)],
+            metadatas=[{"group": i % 3, "tags": ["x", str(i % 2)]} for i in range(300)],
+        )
+        assert collection.index_type == "hnswlib"
+        return collection
+
+    def test_filtered_hnsw_search(self, collection):
+        """Test metadata filters are applied inside the ANN search."""
+        logger.info("Testing filtered HNSW search", emoji_key="test")
+
+        query = self.vectors[4] + 0.01
+        results = collection.search(query, top_k=5, filter={"group": 1})
+        assert len(results) == 5
+        assert all(r["metadata"]["group"] == 1 for r in results)
+        assert results[0]["id"] == "v4"
+
+        mixed = collection.search(query, top_k=5, filter={"group": 1, "tags": ["x", "0"]})
+        assert mixed and all(int(r["id"][1:]) % 6 == 4 for r in mixed)
+        assert collection.search(query, top_k=5, filter={"group": 7}) == []
+
+    def test_tombstone_delete_and_background_compaction(self, collection, monkeypatch):
+        """Test deletes never rebuild inline and compaction replays concurrent writes."""
+        logger.info("Testing tombstone deletes", emoji_key="test")
+
+        executor = _ManualExecutor()
+        monkeypatch.setattr(vector_service, "_get_compaction_executor", lambda: executor)
+        rebuilds = []
+        monkeypatch.setattr(collection, "_rebuild_index", lambda: rebuilds.append(1))
+        collection._COMPACTION_MIN_TOMBSTONES = 50
+
+        assert collection.delete(ids=[f"v{i}" for i in range(40)]) == 40
+        assert len(collection) == 260 and not executor.jobs
+        assert collection.search(self.vectors[3], top_k=1)[0]["id"] != "v3"
+        assert collection.search(self.vectors[3], top_k=3, filter={"group": 0})[0]["id"] != "v3"
+
+        # Crossing the threshold starts a background build; writes continue meanwhile
+        assert collection.delete(filter={"group": 2}) == 87
+        assert collection.get_stats()["compaction_pending"] and len(executor.jobs) == 1
+        collection.add(np.full((1, 8), 5.0, dtype=np.float32), ids=["late"], metadatas=[{}])
+        collection.delete(ids=["v100"])
+
+        executor.run_all()
+        assert collection.search(np.full(8, 5.0), top_k=1)[0]["id"] == "late"
+        stats = collection.get_stats()
+        assert not stats["compaction_pending"] and stats["tombstones"] == 1
+        assert stats["vectors_count"] == len(collection.ids) == 300 - 40 - 87 + 1 - 1
+        assert "v100" not in {r["id"] for r in collection.search(self.vectors[100], top_k=5)}
+        assert collection.search(self.vectors[150], top_k=1)[0]["id"] == "v150"
+        assert not rebuilds
+
+
+class TestVectorCollectionPersistence:
+    """Tests for the on-disk collection format and lazy opening."""
+
+    def test_save_and_lazy_load(self, make_collection, tmp_path, monkeypatch):
+        """Test vectors are memory-mapped, the index is reused and metadata loads lazily."""
+        logger.info("Testing collection save/load", emoji_key="test")
+
+        collection = make_collection()
+        collection._init_search_index()
+        vectors = np.random.RandomState(2).randn(50, 8).astype(np.float32)
+        ids = collection.add(vectors, metadatas=[{"n": i, "even": i % 2 == 0} for i in range(50)])
+        collection.delete(ids=ids[:5])
+        if vector_service.HNSWLIB_AVAILABLE:
+            monkeypatch.setattr(
+                VectorCollection, "_rebuild_index", lambda self: pytest.fail("index rebuilt")
+            )
+        assert collection.save(tmp_path / "c")  # tombstones are saved, not compacted away
+        assert not (tmp_path / "c" / "data.json").exists()
+
+        loaded = VectorCollection.load(tmp_path / "c")
+        assert isinstance(loaded._matrix, np.memmap) and loaded._metadatas is None
+        assert len(loaded) == 45 and loaded.ids == ids[5:]
+        assert loaded.get_stats()["tombstones"] == 5
+        assert ids[0] not in {r["id"] for r in loaded.search(vectors[0], top_k=3)}
+
+        top = loaded.search(vectors[10], top_k=1)[0]
+        assert top["id"] == ids[10] and top["metadata"] == {"n": 10, "even": True}
+        assert loaded._metadatas is None  # unfiltered search only read one row
+
+        filtered = loaded.search(vectors[10], top_k=3, filter={"even": False})
+        assert all(r["metadata"]["n"] % 2 == 1 for r in filtered)
+
+        loaded.add(np.ones((1, 8), dtype=np.float32), ids=["new"], metadatas=[{"n": -1}])
+        assert loaded.save(tmp_path / "c")
+        reloaded = VectorCollection.load(tmp_path / "c")
+        assert len(reloaded) == 46 and reloaded.metadatas[-1] == {"n": -1}
+        np.testing.assert_allclose(reloaded.vectors[:45], vectors[5:], rtol=1e-5)
+        loaded.close()
+        reloaded.close()
+
+    def test_legacy_format_is_readable(self, make_collection, tmp_path):
+        """Test version 1 directories (vectors.npy + data.json) still load."""
+        directory = tmp_path / "legacy"
+        directory.mkdir()
+        vectors = np.eye(8, dtype=np.float32)
+        np.save(directory / "vectors.npy", vectors)
+        (directory / "data.json").write_text(
+            '{"name": "legacy", "dimension": 8, "similarity_metric": "cosine", '
+            '"metadata": {}, "ids": ["a", "b", "c", "d", "e", "f", "g", "h"], '
+            '"metadatas": [{}, {}, {}, {"k": 1}, {}, {}, {}, {}]}'
+        )
+        make_collection()  # installs the offline embedding service
+
+        collection = VectorCollection.load(directory)
+        assert collection.search(vectors[3], top_k=1)[0]["id"] == "d"
+        assert collection.save(directory)
+        assert not (directory / "data.json").exists()
+        assert VectorCollection.load(directory).metadatas[3] == {"k": 1}
+
+    async def test_service_opens_lazily_and_evicts_idle_collections(
+        self, make_collection, tmp_path, monkeypatch
+    ):
+        """Test the service keeps only hot collections resident and saves on eviction."""
+        make_collection()  # installs the offline embedding service
+        monkeypatch.setattr(vector_service.VectorDatabaseService, "_instance", None)
+        service = vector_service.VectorDatabaseService(
+            base_dir=tmp_path, use_chromadb=False, max_resident_collections=1
+        )
+
+        a = await service.create_collection("a", dimension=8)
+        a.add(np.eye(8, dtype=np.float32), ids=[f"a{i}" for i in range(8)])
+        await service.create_collection("b", dimension=8)
+        assert list(service.collections) == ["b"]
+        assert VectorCollection.exists_at(tmp_path / "collections" / "a")
+
+        reopened = await service.get_collection("a")
+        assert reopened is not a and len(reopened) == 8
+        assert list(service.collections) == ["a"]
+        assert sorted(await service.list_collections()) == ["a", "b"]
+
+    async def test_eviction_saves_off_the_event_loop(self, make_collection, tmp_path, monkeypatch):
+        """Test evicted collections are saved on a worker thread and saves record their directory."""
+        logger.info("Testing collection eviction", emoji_key="test")
+        make_collection()  # installs the offline embedding service
+        monkeypatch.setattr(vector_service.VectorDatabaseService, "_instance", None)
+        service = vector_service.VectorDatabaseService(
+            base_dir=tmp_path, use_chromadb=False, max_resident_collections=1
+        )
+
+        a = await service.create_collection("a", dimension=8)
+        a.add(np.eye(8, dtype=np.float32), ids=[f"a{i}" for i in range(8)])
+        assert service.save_collection("a") and not a._dirty
+        assert a._source_dir == tmp_path / "collections" / "a"
+
+        save_threads = []
+        original_save = VectorCollection.save
+
+        def recording_save(collection, directory):
+            save_threads.append(threading.current_thread())
+            return original_save(collection, directory)
+
+        monkeypatch.setattr(VectorCollection, "save", recording_save)
+        a.add(np.ones((1, 8), dtype=np.float32), ids=["late"])
+        await service.create_collection("b", dimension=8)
+        assert save_threads and threading.main_thread() not in save_threads
+        assert not service._evictions and list(service.collections) == ["b"]
+        assert len(await service.get_collection("a")) == 9
@@ -157,6 +157,21 @@ class CacheConfig(BaseModel):
     max_entries: int = Field(10000, description="Maximum number of entries to store in cache")
     directory: Optional[str] = Field(None, description="Directory for cache persistence")
     fuzzy_match: bool = Field(True, description="Whether to use fuzzy matching for cache keys")
+    fuzzy_threshold: float = Field(
+        0.9, description="Minimum estimated Jaccard similarity of prompts for a fuzzy cache hit"
+    )
+    max_bytes: Optional[int] = Field(
+        None, description="Approximate byte budget for cached values (None for no limit)"
+    )
+    eviction_policy: str = Field(
+        "lru", description="Cache eviction policy: 'lru' or 'tinylfu' (W-TinyLFU)"
+    )
+    coalesce_timeout: float = Field(
+        120.0, description="Max seconds to wait on an identical in-flight request before recomputing"
+    )
+    compaction_threshold: int = Field(
+        1000, description="Cache log records to accumulate before compacting into a snapshot"
+    )
 
 
 class ProviderConfig(BaseModel):
@@ -204,6 +219,15 @@ class ProviderConfig(BaseModel):
     )  # Updated description
     max_tokens: Optional[int] = Field(None, description="Maximum tokens for completions")
     timeout: Optional[float] = Field(30.0, description="Timeout for API requests in seconds")
+    requests_per_minute: Optional[int] = Field(
+        None, description="Request rate limit enforced before calling the provider"
+    )
+    tokens_per_minute: Optional[int] = Field(
+        None, description="Token rate limit (prompt plus completion) enforced before calling"
+    )
+    max_concurrency: Optional[int] = Field(
+        None, description="Upper bound of the adaptive in-flight request limit"
+    )
     additional_params: Dict[str, Any] = Field(
         default_factory=dict,
         description="Additional provider-specific parameters (loaded via decouple/file)",
@@ -308,10 +332,25 @@ class AgentMemoryConfig(BaseModel):
         64000, description="Maximum length for text fields (e.g., content, reasoning)"
     )
     connection_timeout: float = Field(10.0, description="Database connection timeout in seconds")
+    read_pool_size: int = Field(
+        8, description="Idle read-only connections kept open per memory database"
+    )
+    mmap_size_mb: int = Field(256, description="SQLite memory-mapped I/O size per connection (MiB)")
+    cache_size_mb: int = Field(16, description="SQLite page cache size per connection (MiB)")
     max_working_memory_size: int = Field(
         20, description="Maximum number of items in working memory"
     )
     memory_decay_rate: float = Field(0.01, description="Decay rate for memory relevance per hour")
+    relevance_refresh_interval: int = Field(
+        600, description="Seconds between refreshes of the stored memory relevance scores"
+    )
+    access_flush_interval: float = Field(
+        2.0,
+        description="Seconds memory-access stats may wait before being written (0: with the read)",
+    )
+    access_flush_batch_size: int = Field(
+        500, description="Buffered memory accesses that trigger an immediate write"
+    )
     importance_boost_factor: float = Field(
         1.5, description="Multiplier for explicitly marked important memories"
     )
@@ -335,6 +374,10 @@ class AgentMemoryConfig(BaseModel):
     )
 
     # Embedding related (primarily for reference/defaults, service might override)
+    default_embedding_provider: str = Field(
+        "openai",
+        description="Default embedding provider: 'openai', 'local' (sentence-transformers) or 'hashing'",
+    )
     default_embedding_model: str = Field(
         "text-embedding-3-small", description="Default embedding model identifier"
     )
@@ -751,6 +794,20 @@ def load_config(
                     config_logger.debug(f"Setting API key for {provider_name} from env/'.env'.")
                 provider_conf.api_key = api_key_from_env
 
+    # --- Load Provider Admission Limits ---
+    for provider_name in (*provider_key_map, "ollama", "local"):
+        provider_conf = getattr(loaded_config.providers, provider_name, None)
+        if not provider_conf:
+            continue
+        for field_name in ("requests_per_minute", "tokens_per_minute", "max_concurrency"):
+            env_var = f"{provider_name.upper()}_{field_name.upper()}"
+            try:
+                value = decouple_config.get(env_var, default=None)
+                if value:
+                    setattr(provider_conf, field_name, int(value))
+            except ValueError:
+                config_logger.warning(f"Ignoring non-integer {env_var}={value!r}")
+
     try:
         # Use the default defined in GatewayConfig as the fallback if env/file doesn't specify
         loaded_config.default_provider = decouple_config(
@@ -925,6 +982,15 @@ def load_config(
         agent_mem_conf.connection_timeout = decouple_config(
             "AGENT_MEMORY_CONNECTION_TIMEOUT", default=agent_mem_conf.connection_timeout, cast=float
         )
+        agent_mem_conf.read_pool_size = decouple_config(
+            "AGENT_MEMORY_READ_POOL_SIZE", default=agent_mem_conf.read_pool_size, cast=int
+        )
+        agent_mem_conf.mmap_size_mb = decouple_config(
+            "AGENT_MEMORY_MMAP_SIZE_MB", default=agent_mem_conf.mmap_size_mb, cast=int
+        )
+        agent_mem_conf.cache_size_mb = decouple_config(
+            "AGENT_MEMORY_CACHE_SIZE_MB", default=agent_mem_conf.cache_size_mb, cast=int
+        )
         agent_mem_conf.max_working_memory_size = decouple_config(
             "AGENT_MEMORY_MAX_WORKING_SIZE",
             default=agent_mem_conf.max_working_memory_size,
@@ -947,6 +1013,21 @@ def load_config(
         agent_mem_conf.memory_decay_rate = decouple_config(
             "AGENT_MEMORY_DECAY_RATE", default=agent_mem_conf.memory_decay_rate, cast=float
         )
+        agent_mem_conf.relevance_refresh_interval = decouple_config(
+            "AGENT_MEMORY_RELEVANCE_REFRESH_INTERVAL",
+            default=agent_mem_conf.relevance_refresh_interval,
+            cast=int,
+        )
+        agent_mem_conf.access_flush_interval = decouple_config(
+            "AGENT_MEMORY_ACCESS_FLUSH_INTERVAL",
+            default=agent_mem_conf.access_flush_interval,
+            cast=float,
+        )
+        agent_mem_conf.access_flush_batch_size = decouple_config(
+            "AGENT_MEMORY_ACCESS_FLUSH_BATCH_SIZE",
+            default=agent_mem_conf.access_flush_batch_size,
+            cast=int,
+        )
         agent_mem_conf.importance_boost_factor = decouple_config(
             "AGENT_MEMORY_IMPORTANCE_BOOST",
             default=agent_mem_conf.importance_boost_factor,
@@ -963,6 +1044,10 @@ def load_config(
             cast=int,
         )
         # Load embedding defaults (mainly for reference)
+        agent_mem_conf.default_embedding_provider = decouple_config(
+            "AGENT_MEMORY_DEFAULT_EMBEDDING_PROVIDER",
+            default=agent_mem_conf.default_embedding_provider,
+        )
         agent_mem_conf.default_embedding_model = decouple_config(
             "AGENT_MEMORY_DEFAULT_EMBEDDING_MODEL", default=agent_mem_conf.default_embedding_model
         )
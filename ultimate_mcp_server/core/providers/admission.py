@@ -0,0 +1,488 @@
+"""Admission control for provider requests: rate limits, adaptive concurrency and priorities."""
+
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ultimate_mcp_server.config import get_config
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(str, Enum):
+    """Admission lanes; waiting interactive requests are always admitted before batch ones."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+_LANE_ORDER = {Priority.INTERACTIVE: 0, Priority.BATCH: 1}
+_RATE_LIMIT_MESSAGE = re.compile(r"rate.?limit|too many requests|\b429\b", re.IGNORECASE)
+
+
+def estimate_tokens(text: str = "", max_tokens: Optional[int] = None) -> int:
+    """Estimate the tokens a request will consume before it is sent.
+
+    Args:
+        text: Prompt text (roughly four characters per token)
+        max_tokens: Completion limit, if any
+
+    Returns:
+        Estimated prompt plus completion tokens
+    """
+    return len(text) // 4 + (max_tokens or 256)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an exception (or one it was raised from) is a provider 429."""
+    while error is not None:
+        status = getattr(error, "status_code", None) or getattr(error, "status", None)
+        if status == 429 or "RateLimit" in type(error).__name__:
+            return True
+        if _RATE_LIMIT_MESSAGE.search(str(error)):
+            return True
+        error = error.__cause__
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Continuously refilled budget of ``rate_per_minute`` units.
+
+    Up to ``burst_seconds`` worth of unused budget accumulates. The level may
+    go negative when a request turns out to use more than it reserved, which
+    delays later requests until the debt is refilled.
+    """
+
+    def __init__(self, rate_per_minute: Optional[float], burst_seconds: float = 10.0):
+        """Initialize the bucket.
+
+        Args:
+            rate_per_minute: Units per minute (None for unlimited)
+            burst_seconds: Seconds of refill the bucket can hold
+        """
+        self.rate = rate_per_minute / 60.0 if rate_per_minute else None
+        self.capacity = max(1.0, self.rate * burst_seconds) if self.rate else 0.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are)."""
+        if self.rate is None:
+            return 0.0
+        self._refill(now)
+        # A request larger than the bucket waits for a full bucket
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Consume units (after ``wait_time`` returned 0)."""
+        if self.rate is not None:
+            self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) units after the fact."""
+        if self.rate is not None:
+            self.level = min(self.capacity, self.level - amount)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens", "priority", "enqueued")
+
+    def __init__(self, future: asyncio.Future, tokens: int, priority: Priority):
+        self.future = future
+        self.tokens = tokens
+        self.priority = priority
+        self.enqueued = time.monotonic()
+
+
+class ProviderGovernor:
+    """Admission control for one provider.
+
+    A request is admitted when fewer than ``limit`` requests are in flight and
+    the request-per-minute and token-per-minute buckets can cover it; otherwise
+    it waits in its priority lane. ``limit`` adapts AIMD-style: it grows by
+    about one for every ``limit`` successful requests, is halved when the
+    provider answers 429 (at most once per ``decrease_cooldown``, since a burst
+    of in-flight requests fails together), and shrinks by 10% when a
+    request's latency exceeds ``latency_tolerance`` times its moving average.
+    After a 429, admission also pauses for the provider's Retry-After (or one
+    second).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        latency_tolerance: float = 3.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        """Initialize the governor.
+
+        Args:
+            name: Provider name (for logs and metrics)
+            requests_per_minute: Request rate limit (None for unlimited)
+            tokens_per_minute: Token rate limit (None for unlimited)
+            initial_concurrency: Starting in-flight limit
+            min_concurrency: Lowest in-flight limit
+            max_concurrency: Highest in-flight limit
+            latency_tolerance: Latency, as a multiple of its moving average, treated as congestion
+            decrease_cooldown: Minimum seconds between two decreases
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), max_concurrency))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+        # Statistics
+        self.admitted = 0
+        self.rate_limited = 0
+        self.congested = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.latency_average: Optional[float] = None
+        self._latency_samples = 0
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Count waiting requests per lane."""
+        depth = {lane.value: 0 for lane in Priority}
+        for _, _, waiter in self._waiters:
+            if not waiter.future.done():
+                depth[waiter.priority.value] += 1
+        return depth
+
+    def _admission_delay(self, tokens: int, now: float) -> float:
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+
+    def _admit(self, tokens: int, waited: float) -> None:
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.in_flight += 1
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests in priority order while capacity allows."""
+        self._timer = None
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= int(self.limit):
+                return
+            now = time.monotonic()
+            delay = self._admission_delay(waiter.tokens, now)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._admit(waiter.tokens, now - waiter.enqueued)
+            waiter.future.set_result(None)
+
+    async def acquire(self, tokens: int = 0, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait until a request may be sent.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+            priority: Admission lane
+        """
+        priority = Priority(priority)
+        if (
+            not self._waiters
+            and self.in_flight < int(self.limit)
+            and self._admission_delay(tokens, time.monotonic()) <= 0
+        ):
+            self._admit(tokens, 0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), tokens, priority)
+        heapq.heappush(self._waiters, (_LANE_ORDER[priority], next(self._sequence), waiter))
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if not waiter.future.cancelled():
+                # Admitted just before the cancellation arrived
+                self.release(tokens, 0, None, None)
+            raise
+
+    def release(
+        self,
+        estimated_tokens: int,
+        used_tokens: Optional[int],
+        latency: Optional[float],
+        error: Optional[BaseException],
+    ) -> None:
+        """Finish a request and adapt the concurrency limit.
+
+        Args:
+            estimated_tokens: Tokens reserved at admission
+            used_tokens: Tokens actually consumed, if known
+            latency: Request duration in seconds (None if it did not complete)
+            error: Exception the request failed with, if any
+        """
+        self.in_flight -= 1
+        if used_tokens is not None:
+            self.tokens.adjust(used_tokens - estimated_tokens)
+
+        now = time.monotonic()
+        if error is not None and is_rate_limit_error(error):
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, now + (_retry_after(error) or 1.0))
+            self._decrease(0.5, now, "rate limited")
+        elif error is None and latency is not None:
+            average = self.latency_average
+            if (
+                average is not None
+                and self._latency_samples >= 10
+                and latency > self.latency_tolerance * average
+            ):
+                self.congested += 1
+                self._decrease(0.9, now, f"latency {latency:.2f}s vs {average:.2f}s average")
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self.latency_average = latency if average is None else 0.9 * average + 0.1 * latency
+            self._latency_samples += 1
+
+        if self._waiters and self._timer is None:
+            self._dispatch()
+
+    def _decrease(self, factor: float, now: float, reason: str) -> None:
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * factor)
+        logger.warning(
+            f"Provider '{self.name}' concurrency limit lowered to {int(self.limit)} ({reason})",
+            emoji_key="warning",
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get the governor's current state and counters."""
+        return {
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth(),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "congested": self.congested,
+            "average_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+            "average_latency": self.latency_average,
+        }
+
+
+class AdmissionTicket:
+    """Handle for an admitted request; report token usage through it."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, total_tokens: Optional[int]) -> None:
+        """Record the tokens the request actually consumed.
+
+        Args:
+            total_tokens: Prompt plus completion tokens reported by the provider
+        """
+        if total_tokens:
+            self.used_tokens = total_tokens
+
+
+class AdmissionController:
+    """Central admission control for all providers.
+
+    Each provider gets a ``ProviderGovernor`` configured from its
+    ``requests_per_minute``, ``tokens_per_minute`` and ``max_concurrency``
+    settings. Requests go through ``admit``::
+
+        async with get_admission_controller().admit("openai", tokens=500) as ticket:
+            result = await provider.generate_completion(...)
+            ticket.record_usage(result.total_tokens)
+    """
+
+    def __init__(self, default_max_concurrency: int = 64):
+        """Initialize the controller.
+
+        Args:
+            default_max_concurrency: In-flight cap for providers without a configured one
+        """
+        self.default_max_concurrency = default_max_concurrency
+        self._governors: Dict[str, ProviderGovernor] = {}
+
+    def governor(self, provider: str) -> ProviderGovernor:
+        """Get (or create from configuration) the governor of a provider."""
+        governor = self._governors.get(provider)
+        if governor is None:
+            providers_config = getattr(get_config(), "providers", None)
+            provider_config = getattr(providers_config, provider, None)
+            max_concurrency = (
+                getattr(provider_config, "max_concurrency", None) or self.default_max_concurrency
+            )
+            governor = self._governors[provider] = ProviderGovernor(
+                provider,
+                requests_per_minute=getattr(provider_config, "requests_per_minute", None),
+                tokens_per_minute=getattr(provider_config, "tokens_per_minute", None),
+                initial_concurrency=min(8, max_concurrency),
+                max_concurrency=max_concurrency,
+            )
+        return governor
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        provider: str,
+        tokens: int = 0,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[AdmissionTicket]:
+        """Hold an admission slot for the duration of a provider request.
+
+        Args:
+            provider: Provider name
+            tokens: Estimated tokens (see ``estimate_tokens``)
+            priority: Admission lane
+
+        Yields:
+            Ticket for reporting actual token usage
+        """
+        governor = self.governor(provider)
+        await governor.acquire(tokens, priority)
+        ticket = AdmissionTicket(tokens)
+        start = time.monotonic()
+        error: Optional[BaseException] = None
+        try:
+            yield ticket
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            latency = time.monotonic() - start if error is None else None
+            governor.release(tokens, ticket.used_tokens, latency, error)
+
+    async def admit_stream(
+        self,
+        provider: str,
+        stream: AsyncIterator[T],
+        tokens: int = 0,
+        priority: Priority = Priority.INTERACTIVE,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> AsyncIterator[T]:
+        """Hold an admission slot while a provider stream is open.
+
+        Unlike wrapping the iteration in ``admit``, the slot is released as soon
+        as the provider stream is exhausted or fails, and when the returned
+        generator is closed early (``aclose`` or garbage collection), so a
+        consumer that stops iterating cannot keep the slot.
+
+        Args:
+            provider: Provider name
+            stream: Provider stream; it is closed along with the returned generator
+            tokens: Estimated tokens (see ``estimate_tokens``)
+            priority: Admission lane
+            usage: Optional function reading total tokens from a streamed item;
+                the last value reported is charged
+
+        Yields:
+            The items of ``stream``
+        """
+        governor = self.governor(provider)
+        await governor.acquire(tokens, priority)
+        ticket = AdmissionTicket(tokens)
+        start = time.monotonic()
+        held = True
+
+        def release(latency: Optional[float], error: Optional[BaseException]) -> None:
+            nonlocal held
+            if held:
+                held = False
+                governor.release(tokens, ticket.used_tokens, latency, error)
+
+        try:
+            while True:
+                try:
+                    item = await stream.__anext__()
+                except StopAsyncIteration:
+                    release(time.monotonic() - start, None)
+                    return
+                except BaseException as e:
+                    release(None, e)
+                    raise
+                if usage is not None:
+                    ticket.record_usage(usage(item))
+                yield item
+        finally:
+            release(None, None)  # Closed before the provider finished
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get metrics of every provider governor.
+
+        Returns:
+            Dictionary mapping provider names to their metrics
+        """
+        return {name: governor.get_metrics() for name, governor in self._governors.items()}
+
+
+# Singleton instance
+_admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the admission controller instance.
+
+    Returns:
+        AdmissionController: Admission controller instance
+    """
+    global _admission_controller
+
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+
+    return _admission_controller
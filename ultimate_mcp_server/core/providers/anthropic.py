@@ -50,6 +50,7 @@ class AnthropicProvider(BaseProvider):
             self.client = AsyncAnthropic(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                http_client=self.options.get("http_client"),
             )
 
             # Skip API call if using a mock key (for tests)
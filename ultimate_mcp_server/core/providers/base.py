@@ -643,10 +643,10 @@ def parse_model_string(model_string: str) -> Tuple[str, str]:
 
 async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
     """
-    Factory function to dynamically create and initialize a provider instance by name.
+    Factory function to get an initialized provider instance by name.
 
-    This function serves as the central provider instantiation mechanism in the Ultimate MCP Server,
-    dynamically creating and initializing the appropriate provider implementation based on
+    This function serves as the central provider access mechanism in the Ultimate MCP Server,
+    returning an initialized instance of the appropriate provider implementation based on
     the requested provider name. It handles:
 
     1. Provider name validation and normalization
@@ -655,6 +655,12 @@ async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
     4. Configuration retrieval from the Ultimate MCP Server config system
     5. Provider instance creation with appropriate parameters
     6. Provider initialization and validation
+    7. Reuse of initialized instances through the shared ``ProviderPool``
+
+    Instances are cached per provider, API key, base URL and options, so only the first
+    call for a configuration pays for client construction and initialization (for OpenAI a
+    model-listing round trip); later calls return the same instance. Use ``create_provider``
+    for a private, unpooled instance.
 
     The function supports specifying provider names directly or extracting them from
     model identifiers that include provider prefixes (e.g., "openai/gpt-4o"). This flexibility
@@ -672,8 +678,9 @@ async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
                  - organization: Organization ID for providers that support it
 
     Returns:
-        An initialized provider instance ready for use. The specific return type will
-        be a subclass of BaseProvider corresponding to the requested provider.
+        An initialized provider instance ready for use, shared with other callers using the
+        same configuration. The specific return type will be a subclass of BaseProvider
+        corresponding to the requested provider.
 
     Raises:
         ValueError: If the provider name is invalid or initialization fails. This ensures
@@ -698,6 +705,18 @@ async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
         )
         ```
     """
+    provider_name, kwargs = _resolve_provider_args(provider_name, kwargs)
+
+    from ultimate_mcp_server.core.providers.pool import get_provider_pool
+
+    return await get_provider_pool().acquire(provider_name, **kwargs)
+
+
+def _resolve_provider_args(
+    provider_name: str, kwargs: Dict[str, Any]
+) -> Tuple[str, Dict[str, Any]]:
+    """Normalize a provider name and fill in the model and API key from the model string and config."""
+    kwargs = dict(kwargs)
     cfg = get_config()
     provider_name = provider_name.lower().strip()
 
@@ -714,6 +733,40 @@ async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
                 f"Extracted provider '{provider_name}' and model '{extracted_model}' from model string"
             )
 
+    # Get the top-level 'providers' config object, default to None if it doesn't exist
+    providers_config = getattr(cfg, "providers", None)
+
+    # Get the specific provider config (e.g., providers_config.openai) from the providers_config object
+    # Default to None if providers_config is None or the specific provider attr doesn't exist
+    provider_cfg = getattr(providers_config, provider_name, None) if providers_config else None
+
+    # Now use provider_cfg to get the api_key if needed
+    if (
+        "api_key" not in kwargs
+        and provider_cfg
+        and hasattr(provider_cfg, "api_key")
+        and provider_cfg.api_key
+    ):
+        kwargs["api_key"] = provider_cfg.api_key
+
+    return provider_name, kwargs
+
+
+async def create_provider(provider_name: str, **kwargs) -> BaseProvider:
+    """Create and initialize a new, unpooled provider instance.
+
+    Args:
+        provider_name: Provider identifier (see ``get_provider``)
+        **kwargs: Provider-specific configuration options
+
+    Returns:
+        An initialized provider instance owned by the caller
+
+    Raises:
+        ValueError: If the provider name is invalid or initialization fails
+    """
+    provider_name, kwargs = _resolve_provider_args(provider_name, kwargs)
+
     from ultimate_mcp_server.core.providers.anthropic import AnthropicProvider
     from ultimate_mcp_server.core.providers.deepseek import DeepSeekProvider
     from ultimate_mcp_server.core.providers.gemini import GeminiProvider
@@ -737,22 +790,6 @@ async def get_provider(provider_name: str, **kwargs) -> BaseProvider:
     if provider_name not in providers:
         raise ValueError(f"Invalid provider name: {provider_name}")
 
-    # Get the top-level 'providers' config object, default to None if it doesn't exist
-    providers_config = getattr(cfg, "providers", None)
-
-    # Get the specific provider config (e.g., providers_config.openai) from the providers_config object
-    # Default to None if providers_config is None or the specific provider attr doesn't exist
-    provider_cfg = getattr(providers_config, provider_name, None) if providers_config else None
-
-    # Now use provider_cfg to get the api_key if needed
-    if (
-        "api_key" not in kwargs
-        and provider_cfg
-        and hasattr(provider_cfg, "api_key")
-        and provider_cfg.api_key
-    ):
-        kwargs["api_key"] = provider_cfg.api_key
-
     provider_class = providers[provider_name]
     instance = provider_class(**kwargs)
 
@@ -40,6 +40,7 @@ class DeepSeekProvider(BaseProvider):
             self.client = AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                http_client=self.options.get("http_client"),
             )
 
             self.logger.success("DeepSeek provider initialized successfully", emoji_key="provider")
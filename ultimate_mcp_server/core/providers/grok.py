@@ -40,6 +40,7 @@ class GrokProvider(BaseProvider):
             self.client = AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                http_client=self.options.get("http_client"),
             )
 
             # Skip API call if using a mock key (for tests)
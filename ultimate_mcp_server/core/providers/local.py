@@ -116,6 +116,7 @@ class LocalProvider(BaseProvider):
                 base_url=self.base_url,
                 api_key=self.api_key,
                 timeout=timeout,
+                http_client=self.options.get("http_client"),
             )
 
             # Best-effort model pre-fetch. A local server that is not running must not
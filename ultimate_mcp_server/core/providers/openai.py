@@ -41,6 +41,7 @@ class OpenAIProvider(BaseProvider):
                 api_key=self.api_key,
                 base_url=self.base_url,
                 organization=self.organization,
+                http_client=self.options.get("http_client"),
             )
 
             # Skip API call if using a mock key (for tests)
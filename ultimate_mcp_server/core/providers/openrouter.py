@@ -88,6 +88,7 @@ class OpenRouterProvider(BaseProvider):
                 api_key=self.api_key,
                 default_headers=headers,
                 timeout=timeout,
+                http_client=self.options.get("http_client"),
             )
 
             # Pre-fetch available models
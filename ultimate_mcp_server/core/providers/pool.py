@@ -0,0 +1,291 @@
+"""Pool of initialized provider instances with shared HTTP connections."""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from ultimate_mcp_server.core.providers.base import BaseProvider, create_provider
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+_PoolKey = Tuple[str, Optional[str], Optional[str], str]
+
+
+def _pool_key(provider_name: str, kwargs: Dict[str, Any]) -> _PoolKey:
+    options = {k: v for k, v in kwargs.items() if k not in ("api_key", "base_url", "http_client")}
+    return (
+        provider_name,
+        kwargs.get("api_key"),
+        kwargs.get("base_url"),
+        json.dumps(options, sort_keys=True, default=str),
+    )
+
+
+class ProviderPool:
+    """Caches initialized providers per (provider, api_key, base_url, options).
+
+    Creating a provider builds a new SDK client and, for most providers, makes
+    a validation request (OpenAI lists models). The pool does that once per
+    configuration and hands the same instance to every caller; concurrent
+    first requests wait for a single initialization, and failed
+    initializations are not cached.
+
+    Pooled providers share one ``httpx.AsyncClient`` (passed to the provider
+    as the ``http_client`` option), so requests reuse keep-alive connections
+    across providers and API keys. A background task re-checks cached
+    providers with ``check_api_key()`` every ``health_check_interval`` seconds
+    and evicts those that fail, so the next request re-initializes them.
+
+    Instances and connections belong to the event loop they were created on;
+    when called from a different loop (e.g. successive ``asyncio.run`` calls
+    in the CLI) the pool starts over.
+    """
+
+    def __init__(
+        self,
+        health_check_interval: Optional[float] = 300.0,
+        health_check_timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        """Initialize the provider pool.
+
+        Args:
+            health_check_interval: Seconds between background health checks (None disables them)
+            health_check_timeout: Seconds allowed for one provider's health check
+            max_connections: Connection limit of the shared HTTP client
+            max_keepalive_connections: Idle connections kept open by the shared HTTP client
+            keepalive_expiry: Seconds an idle connection is kept open
+        """
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._providers: Dict[_PoolKey, BaseProvider] = {}
+        self._pending: Dict[_PoolKey, asyncio.Future] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.initialization_time = 0.0
+        self.evictions = 0
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None and self._providers:
+                logger.debug("Event loop changed; dropping pooled providers")
+            # Clients of another loop cannot be used (or closed) from this one
+            self._providers.clear()
+            self._pending.clear()
+            self._http_client = None
+            self._health_task = None
+            self._loop = loop
+        return loop
+
+    def http_client(self) -> httpx.AsyncClient:
+        """Get the HTTP client shared by pooled providers.
+
+        Returns:
+            Shared client for the current event loop
+        """
+        self._bind_loop()
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(600.0, connect=10.0),
+                follow_redirects=True,
+            )
+        return self._http_client
+
+    async def acquire(self, provider_name: str, **kwargs) -> BaseProvider:
+        """Get an initialized provider, creating it on first use.
+
+        Args:
+            provider_name: Provider name (see ``Provider``)
+            **kwargs: Provider options (api_key, base_url, ...)
+
+        Returns:
+            Initialized provider instance
+
+        Raises:
+            ValueError: If the provider name is invalid or initialization fails
+        """
+        loop = self._bind_loop()
+        key = _pool_key(provider_name, kwargs)
+
+        provider = self._providers.get(key)
+        if provider is not None:
+            self.hits += 1
+            return provider
+
+        self.misses += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = loop.create_task(
+                self._create(key, provider_name, kwargs)
+            )
+        return await asyncio.shield(pending)
+
+    async def _create(
+        self, key: _PoolKey, provider_name: str, kwargs: Dict[str, Any]
+    ) -> BaseProvider:
+        start = time.perf_counter()
+        try:
+            provider = await create_provider(
+                provider_name, **{"http_client": self.http_client(), **kwargs}
+            )
+        finally:
+            self._pending.pop(key, None)
+            self.initialization_time += time.perf_counter() - start
+
+        self._providers[key] = provider
+        self._ensure_health_task()
+        logger.debug(f"Pooled provider '{provider_name}' ({len(self._providers)} cached)")
+        return provider
+
+    def register(self, provider_name: str, provider: BaseProvider, **kwargs) -> None:
+        """Add a provider initialized elsewhere (e.g. at server startup) to the pool.
+
+        Args:
+            provider_name: Provider name
+            provider: Initialized provider instance
+            **kwargs: Options the provider was created with (api_key, base_url, ...)
+        """
+        self._bind_loop()
+        self._providers[_pool_key(provider_name, kwargs)] = provider
+        self._ensure_health_task()
+
+    def invalidate(self, provider_name: Optional[str] = None) -> int:
+        """Drop cached providers so they are re-initialized on next use.
+
+        Args:
+            provider_name: Only drop this provider's instances (all if None)
+
+        Returns:
+            Number of instances dropped
+        """
+        keys = [key for key in self._providers if provider_name in (None, key[0])]
+        for key in keys:
+            del self._providers[key]
+        self.evictions += len(keys)
+        return len(keys)
+
+    def _ensure_health_task(self) -> None:
+        if not self.health_check_interval:
+            return
+        if self._health_task is None or self._health_task.done():
+            try:
+                self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+            except RuntimeError:
+                pass  # No running loop; started on next acquire
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Provider health check failed: {str(e)}", emoji_key="error")
+
+    async def check_health(self) -> Dict[str, bool]:
+        """Check every cached provider and evict the unhealthy ones.
+
+        Returns:
+            Health per cached provider name (False if any of its instances failed)
+        """
+        entries = list(self._providers.items())
+
+        async def check(provider: BaseProvider) -> bool:
+            try:
+                return bool(
+                    await asyncio.wait_for(provider.check_api_key(), self.health_check_timeout)
+                )
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(check(provider) for _, provider in entries))
+        health: Dict[str, bool] = {}
+        for (key, provider), healthy in zip(entries, results, strict=True):
+            health[key[0]] = health.get(key[0], True) and healthy
+            if not healthy and self._providers.get(key) is provider:
+                del self._providers[key]
+                self.evictions += 1
+                logger.warning(
+                    f"Provider '{key[0]}' failed its health check; it will be re-initialized",
+                    emoji_key="warning",
+                )
+        return health
+
+    async def shutdown(self) -> None:
+        """Stop health checks, shut down cached providers and close shared connections."""
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            self._bind_loop()
+            return
+
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+
+        providers, self._providers = list(self._providers.values()), {}
+        for provider in providers:
+            shutdown = getattr(provider, "shutdown", None)
+            if shutdown is not None:
+                try:
+                    await shutdown()
+                except Exception as e:
+                    logger.warning(
+                        f"Error shutting down provider '{provider.provider_name}': {str(e)}",
+                        emoji_key="warning",
+                    )
+
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        logger.info(f"Provider pool shut down ({len(providers)} providers)", emoji_key="success")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics.
+
+        Returns:
+            Dictionary with cached instances, hits, misses and initialization time
+        """
+        lookups = self.hits + self.misses
+        return {
+            "providers": len(self._providers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "initialization_time": self.initialization_time,
+            "evictions": self.evictions,
+        }
+
+
+# Singleton instance
+_provider_pool = None
+
+
+def get_provider_pool() -> ProviderPool:
+    """Get or create the provider pool instance.
+
+    Returns:
+        ProviderPool: Provider pool instance
+    """
+    global _provider_pool
+
+    if _provider_pool is None:
+        _provider_pool = ProviderPool()
+
+    return _provider_pool
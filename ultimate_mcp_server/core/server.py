@@ -21,6 +21,7 @@ import ultimate_mcp_server
 import ultimate_mcp_server.core
 from ultimate_mcp_server.config import get_config, load_config
 from ultimate_mcp_server.constants import Provider
+from ultimate_mcp_server.core.providers.pool import get_provider_pool
 from ultimate_mcp_server.core.state_store import StateStore
 
 # Import UMS API utilities and database functions
@@ -504,6 +505,20 @@ class Gateway:
             except Exception as e:
                 self.logger.error(f"Failed to shut down SQL tools state: {e}", exc_info=True)
 
+            try:
+                await get_provider_pool().shutdown()
+            except Exception as e:
+                self.logger.error(f"Failed to shut down provider pool: {e}", exc_info=True)
+
+            ums_module = sys.modules.get("ultimate_mcp_server.tools.unified_memory_system")
+            if ums_module is not None:
+                try:
+                    await ums_module.DBConnection.close_connection()
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to close memory database connections: {e}", exc_info=True
+                    )
+
             # 2. Shutdown Smart Browser explicitly
             try:
                 self.logger.info("Initiating explicit Smart Browser shutdown...")
@@ -681,7 +696,8 @@ class Gateway:
 
             # Instantiate provider with the API key retrieved from the config (via decouple)
             # Ensure provider classes' __init__ expect 'api_key' as a keyword argument
-            provider = provider_class(api_key=api_key)
+            provider_pool = get_provider_pool()
+            provider = provider_class(api_key=api_key, http_client=provider_pool.http_client())
 
             # Initialize provider (which should use the config passed)
             available = await provider.initialize()
@@ -690,6 +706,8 @@ class Gateway:
             if available:
                 models = await provider.list_models()
                 self.providers[provider_name] = provider
+                # Let get_provider() reuse this instance instead of creating another
+                provider_pool.register(provider_name, provider, api_key=api_key)
                 self.provider_status[provider_name] = ProviderStatus(
                     enabled=provider_config.enabled,
                     available=True,
@@ -314,7 +314,9 @@ async def process_single_model_variant(
                 #    tool_additional_params["top_p"] = model_config.top_p
 
                 llm_response_dict = await generate_completion(
-                    **tool_direct_params, additional_params=tool_additional_params
+                    **tool_direct_params,
+                    additional_params=tool_additional_params,
+                    priority="batch",  # Yield to interactive requests at provider limits
                 )
 
                 if llm_response_dict.get("success"):
@@ -523,6 +525,7 @@ async def process_single_model(
             prompt=prompt,
             model=model_id,  # Pass the full model ID
             provider=provider_name,  # Pass inferred provider
+            priority="batch",  # Yield to interactive requests at provider limits
             # Add other params like max_tokens, temperature if needed/available in TournamentConfig
         )
 
@@ -821,6 +824,7 @@ async def process_model_task(
             prompt=prompt,
             model=model_id,
             provider=provider_id,  # Pass the inferred provider
+            priority="batch",  # Yield to interactive requests at provider limits
             # Add other params like max_tokens, temperature if needed/available
         )
 
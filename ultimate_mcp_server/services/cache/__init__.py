@@ -6,7 +6,16 @@ from ultimate_mcp_server.services.cache.cache_service import (
     get_cache_service,
     with_cache,
 )
-from ultimate_mcp_server.services.cache.persistence import CachePersistence
+from ultimate_mcp_server.services.cache.eviction import (
+    EvictionPolicy,
+    LRUPolicy,
+    TinyLFUPolicy,
+    get_eviction_policy,
+)
+from ultimate_mcp_server.services.cache.persistence import (
+    CachePersistence,
+    CacheWriteAheadLog,
+)
 from ultimate_mcp_server.services.cache.strategies import (
     CacheStrategy,
     ExactMatchStrategy,
@@ -21,7 +30,12 @@ __all__ = [
     "CacheStats",
     "get_cache_service",
     "with_cache",
+    "EvictionPolicy",
+    "LRUPolicy",
+    "TinyLFUPolicy",
+    "get_eviction_policy",
     "CachePersistence",
+    "CacheWriteAheadLog",
     "CacheStrategy",
     "ExactMatchStrategy",
     "SemanticMatchStrategy",
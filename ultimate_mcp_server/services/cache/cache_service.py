@@ -3,18 +3,20 @@
 import asyncio
 import hashlib
 import json
-import os
 import pickle
+import re
 import time
 from enum import Enum
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Set, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-import aiofiles
 from diskcache import Cache
 
 from ultimate_mcp_server.config import get_config
+from ultimate_mcp_server.services.cache.eviction import get_eviction_policy
+from ultimate_mcp_server.services.cache.lsh import MinHashLSHIndex
+from ultimate_mcp_server.services.cache.persistence import CacheWriteAheadLog
 from ultimate_mcp_server.utils import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +32,10 @@ class CacheStats:
         self.evictions = 0
         self.total_saved_tokens = 0
         self.estimated_cost_savings = 0.0
+        self.eviction_policy = "lru"
+        self.evicted_bytes = 0
+        self.coalesced_requests = 0
+        self.coalesce_timeouts = 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert stats to dictionary."""
@@ -38,6 +44,10 @@ class CacheStats:
             "misses": self.misses,
             "stores": self.stores,
             "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "eviction_policy": self.eviction_policy,
+            "coalesced_requests": self.coalesced_requests,
+            "coalesce_timeouts": self.coalesce_timeouts,
             "hit_ratio": self.hit_ratio,
             "total_saved_tokens": self.total_saved_tokens,
             "estimated_cost_savings": self.estimated_cost_savings,
@@ -63,22 +73,25 @@ class CacheService:
     - Thread-safe asynchronous API for high-concurrency environments
     - Hybrid memory/disk storage with automatic large object offloading
     - Configurable TTL (time-to-live) for cache entries
-    - Automatic eviction of least-recently-used entries when size limits are reached
+    - Automatic eviction (LRU or W-TinyLFU) when entry or byte limits are reached
     - Detailed cache statistics tracking (hits, misses, token savings, cost savings)
     - Optional disk persistence for cache durability across restarts
+    - Single-flight coalescing so concurrent misses for the same key compute once
     - Fuzzy matching for finding similar cached responses (useful for LLM queries)
 
     Architecture:
     The service employs a multi-tiered architecture:
     1. In-memory cache for small, frequently accessed items
     2. Disk-based cache for large responses (automatic offloading)
-    3. Fuzzy lookup index for semantic similarity matching
-    4. Periodic persistence layer for durability
+    3. Fuzzy lookup index (exact fuzzy-key clusters plus MinHash-LSH) for similarity matching
+    4. Append-only write-ahead log with periodic snapshot compaction for durability
 
     Performance Considerations:
     - Memory usage scales with cache size and object sizes
-    - Fuzzy matching adds CPU overhead but improves hit rates
-    - Disk persistence adds I/O overhead but provides durability
+    - Fuzzy matching adds CPU overhead but improves hit rates; candidate retrieval is
+      sublinear in cache size thanks to the MinHash-LSH index
+    - Disk persistence appends one log record per write; the cost is proportional to
+      the entry being stored, and full snapshots are written in the background
     - For large deployments, consider tuning max_entries and TTL based on usage patterns
 
     Thread Safety:
@@ -121,6 +134,11 @@ class CacheService:
         enable_persistence: bool = True,
         cache_dir: Optional[str] = None,
         enable_fuzzy_matching: bool = None,
+        compaction_threshold: int = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: Optional[str] = None,
+        fuzzy_threshold: Optional[float] = None,
+        coalesce_timeout: Optional[float] = None,
     ):
         """Initialize the cache service.
 
@@ -131,6 +149,17 @@ class CacheService:
             enable_persistence: Whether to persist cache to disk
             cache_dir: Directory for cache persistence (default from config)
             enable_fuzzy_matching: Whether to use fuzzy matching (default from config)
+            compaction_threshold: Number of log records after which the write-ahead log
+                is compacted into a snapshot (default from config)
+            max_bytes: Maximum approximate in-memory size of cached values in bytes,
+                enforced alongside max_entries; None disables the byte budget
+                (default from config)
+            eviction_policy: Eviction policy name, "lru" or "tinylfu" (default from config)
+            fuzzy_threshold: Minimum estimated Jaccard similarity between prompt token
+                sets for a fuzzy hit; higher favours precision, lower favours recall
+                (default from config)
+            coalesce_timeout: Maximum seconds a caller waits on another caller's in-flight
+                computation of the same key before computing itself (default from config)
         """
         # Use config values as defaults
         self._lock = asyncio.Lock()
@@ -138,12 +167,22 @@ class CacheService:
         self.enabled = enabled if enabled is not None else config.cache.enabled
         self.ttl = ttl if ttl is not None else config.cache.ttl
         self.max_entries = max_entries if max_entries is not None else config.cache.max_entries
+        self.max_bytes = max_bytes if max_bytes is not None else config.cache.max_bytes
+        self.coalesce_timeout = (
+            coalesce_timeout if coalesce_timeout is not None else config.cache.coalesce_timeout
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache key -> pending computation
         self.enable_fuzzy_matching = (
             enable_fuzzy_matching if enable_fuzzy_matching is not None else config.cache.fuzzy_match
         )
 
         # Persistence settings
         self.enable_persistence = enable_persistence
+        self.compaction_threshold = (
+            compaction_threshold
+            if compaction_threshold is not None
+            else config.cache.compaction_threshold
+        )
         if cache_dir:
             self.cache_dir = Path(cache_dir)
         elif config.cache.directory:
@@ -153,25 +192,39 @@ class CacheService:
 
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_file = self.cache_dir / "cache.pkl"
+        self._wal = CacheWriteAheadLog(self.cache_dir)
+        self.cache_file = self._wal.snapshot_file
+        self._compaction_task: Optional[asyncio.Task] = None
 
         # Initialize cache and fuzzy lookup
         self.cache: Dict[str, Tuple[Any, float]] = {}  # (value, expiry_time)
         self.fuzzy_lookup: Dict[str, Set[str]] = {}  # fuzzy_key -> set of exact keys
+        self._fuzzy_key_for: Dict[str, str] = {}  # exact key -> fuzzy_key
+        self.fuzzy_threshold = (
+            fuzzy_threshold if fuzzy_threshold is not None else config.cache.fuzzy_threshold
+        )
+        self._lsh = MinHashLSHIndex(threshold=self.fuzzy_threshold)
+
+        # Eviction policy tracks recency/frequency and per-entry sizes
+        self._policy = get_eviction_policy(
+            eviction_policy or config.cache.eviction_policy, self.max_entries
+        )
 
         # Initialize statistics
         self.metrics = CacheStats()
+        self.metrics.eviction_policy = self._policy.name
 
         # Set up disk cache for large responses
         self.disk_cache = Cache(directory=str(self.cache_dir / "disk_cache"))
 
         # Load existing cache if available
-        if self.enable_persistence and self.cache_file.exists():
+        if self.enable_persistence:
             self._load_cache()
 
         logger.info(
             f"Cache service initialized (enabled={self.enabled}, ttl={self.ttl}s, "
-            + f"max_entries={self.max_entries}, persistence={self.enable_persistence}, "
+            + f"max_entries={self.max_entries}, max_bytes={self.max_bytes}, "
+            + f"eviction={self._policy.name}, persistence={self.enable_persistence}, "
             + f"fuzzy_matching={self.enable_fuzzy_matching})",
             emoji_key="cache",
         )
@@ -304,12 +357,10 @@ class CacheService:
         wording differences.
 
         For prompt-based requests, the method:
-        1. Extracts the prompt text from the request parameters
-        2. Normalizes the text by converting to lowercase and removing whitespace
-        3. Extracts significant words (>3 characters) to focus on meaningful terms
-        4. Takes the most important terms (first 10) to create a condensed representation
-        5. Sorts the terms for stability and consistency
-        6. Computes an MD5 hash of this representation as the fuzzy key
+        1. Extracts the prompt's significant tokens via _extract_fuzzy_tokens
+        2. Takes the most important terms (first 10) to create a condensed representation
+        3. Sorts the terms for stability and consistency
+        4. Computes an MD5 hash of this representation as the fuzzy key
 
         This approach enables fuzzy matching that can identify:
         - Prompts with rearranged sentences but similar meaning
@@ -337,23 +388,71 @@ class CacheService:
         if not self.enable_fuzzy_matching:
             return None
 
-        if "prompt" in request_params:
-            # For text generation, create a normalized representation of the prompt
-            prompt = request_params["prompt"]
-            # Lowercase, remove extra whitespace, and keep only significant words
-            words = [w for w in prompt.lower().split() if len(w) > 3]
-            # Take only the most significant words
-            significant_words = " ".join(sorted(words[:10]))
-            return hashlib.md5(significant_words.encode("utf-8")).hexdigest()
+        words = self._extract_fuzzy_tokens(request_params)
+        if words is None:
+            return None
+
+        # Take only the most significant words, within the request's parameter scope
+        significant_words = " ".join(sorted(words[:10]))
+        scope = self._fuzzy_scope(request_params)
+        return hashlib.md5(f"{scope}:{significant_words}".encode("utf-8")).hexdigest()
 
-        return None
+    def _fuzzy_scope(self, request_params: Dict[str, Any]) -> str:
+        """Hash the request parameters other than the prompt.
+
+        Fuzzy matches are only allowed between requests with the same scope, so a
+        similar prompt sent to another model (or with other parameters) is never
+        served a cached response.
+
+        Args:
+            request_params: Request parameters
+
+        Returns:
+            Hexadecimal hash of the non-prompt parameters
+        """
+        scope_params = {
+            k: v
+            for k, v in request_params.items()
+            if k not in ("prompt", "request_id", "timestamp", "session_id", "trace_id")
+        }
+        json_str = json.dumps(self._normalize_params(scope_params), sort_keys=True)
+        return hashlib.sha256(json_str.encode("utf-8")).hexdigest()
+
+    def _extract_fuzzy_tokens(
+        self, request_params: Optional[Dict[str, Any]]
+    ) -> Optional[List[str]]:
+        """Extract the normalized significant tokens of a request's prompt.
+
+        The prompt is lowercased, split into word tokens (punctuation dropped) and
+        filtered to words longer than three characters. These tokens feed both the
+        fuzzy key and the MinHash-LSH similarity index.
+
+        Args:
+            request_params: Request parameters, possibly containing a 'prompt' field
 
-    async def get(self, key: str, fuzzy: bool = True) -> Optional[Any]:
+        Returns:
+            List of tokens in prompt order, or None if there is no string prompt
+        """
+        if not request_params:
+            return None
+        prompt = request_params.get("prompt")
+        if not isinstance(prompt, str):
+            return None
+        return [w for w in _WORD_RE.findall(prompt.lower()) if len(w) > 3]
+
+    async def get(
+        self,
+        key: str,
+        fuzzy: bool = True,
+        request_params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Any]:
         """Get an item from the cache.
 
         Args:
             key: Cache key
             fuzzy: Whether to use fuzzy matching if exact match fails
+            request_params: Original request parameters; needed for similarity-based
+                fuzzy matching (without them only "fuzzy:"-prefixed keys are resolved)
 
         Returns:
             Cached value or None if not found
@@ -368,7 +467,7 @@ class CacheService:
 
         # Try fuzzy match if enabled and exact match failed
         if fuzzy and self.enable_fuzzy_matching:
-            fuzzy_candidates = await self._get_fuzzy_candidates(key)
+            fuzzy_candidates = await self._get_fuzzy_candidates(key, request_params)
 
             # Try each candidate
             for candidate_key in fuzzy_candidates:
@@ -383,7 +482,8 @@ class CacheService:
                     self.metrics.hits += 1
                     return result
 
-        # Cache miss
+        # Cache miss (frequency-aware policies still count the request)
+        self._policy.record_access(key)
         self.metrics.misses += 1
         return None
 
@@ -429,9 +529,7 @@ class CacheService:
         # Check if entry has expired
         if expiry_time < time.time():
             # Remove expired entry
-            del self.cache[key]
-            # Remove from fuzzy lookups
-            self._remove_from_fuzzy_lookup(key)
+            self._remove_entry(key)
             return None
 
         # Check if value is stored on disk
@@ -440,11 +538,12 @@ class CacheService:
             value = self.disk_cache.get(disk_key)
             if value is None:
                 # Disk entry not found, remove from cache
-                del self.cache[key]
+                self._remove_entry(key)
                 return None
 
-        # Update statistics
+        # Update statistics and recency/frequency for the eviction policy
         self.metrics.hits += 1
+        self._policy.record_access(key)
 
         # Automatically track token and cost savings if it's a ModelResponse
         # Check for model response attributes (without importing the class directly)
@@ -467,111 +566,59 @@ class CacheService:
 
         return value
 
-    async def _get_fuzzy_candidates(self, key: str) -> Set[str]:
+    async def _get_fuzzy_candidates(
+        self, key: str, request_params: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
         """
-        Get potential fuzzy match candidates for a cache key using multiple matching strategies.
+        Get potential fuzzy match candidates for a cache key, best match first.
 
-        This method implements a sophisticated, multi-tiered approach to finding semantically
-        similar cache keys, enabling "soft matching" for LLM prompts and other content where
-        exact matches might be rare but similar requests are common. It's a critical component
-        of the cache's ability to handle variations in requests that should produce the same
-        or similar results.
-
-        The method employs a progressive strategy with five distinct matching techniques,
-        applied in sequence from most precise to most general:
+        Candidates come from two sources, in order of precedence:
 
         1. Direct fuzzy key lookup:
-           - Checks for keys with an explicit "fuzzy:" prefix
-           - Provides an exact match when fuzzy keys are explicitly referenced
-
-        2. Prefix matching:
-           - Compares the first 8 characters of keys (high-signal region)
-           - Efficiently identifies requests with the same starting content
-
-        3. Fuzzy lookup expansion:
-           - Falls back to examining all known fuzzy keys if no direct match
-           - Allows for more distant semantic matches when needed
-
-        4. Path prefix matching:
-           - Uses the key's initial characters as a discriminator
-           - Quick filtering for potentially related keys
+           - Keys with an explicit "fuzzy:" prefix resolve to their fuzzy cluster
 
-        5. Hash similarity computation:
-           - Performs character-by-character comparison of hash suffixes
-           - Used to filter when too many candidate matches are found
-           - Implements a 70% similarity threshold for final candidate selection
+        2. MinHash-LSH similarity search:
+           - The request's prompt tokens are hashed into band buckets, so only
+             entries sharing at least one band are examined rather than every key
+           - Buckets are scoped by the non-prompt parameters (model, temperature,
+             ...), so only entries made with the same parameters can match
+           - Candidates are ranked by estimated Jaccard similarity and kept only
+             if they reach ``fuzzy_threshold``; entries that merely share the
+             request's fuzzy key (its leading significant words) are not returned
+             unless they pass this test too
 
-        The algorithm balances precision (avoiding false matches) with recall (finding
-        useful similar matches), and includes performance optimizations to avoid
-        excessive computation when dealing with large cache sizes.
+        Lookup cost depends on the number of bands and bucket sizes, not on the
+        total number of cached entries.
 
         Args:
             key: The cache key to find fuzzy matches for
+            request_params: Original request parameters used to derive the prompt tokens
 
         Returns:
-            A set of potential matching cache keys based on fuzzy matching
+            An ordered list of candidate cache keys (without duplicates)
 
         Note:
             This is an internal method used by the get() method when an exact
-            cache match isn't found and fuzzy matching is enabled. The multiple
-            matching strategies are designed to handle various patterns of similarity
-            between semantically equivalent requests.
+            cache match isn't found and fuzzy matching is enabled.
         """
         if not self.enable_fuzzy_matching:
-            return set()
+            return []
 
-        candidates = set()
+        candidates: Dict[str, None] = {}
 
         # 1. Direct fuzzy key lookup if we have the original fuzzy key
         if key.startswith("fuzzy:"):
-            fuzzy_key = key[6:]  # Remove the "fuzzy:" prefix
-            if fuzzy_key in self.fuzzy_lookup:
-                candidates.update(self.fuzzy_lookup[fuzzy_key])
-
-        # 2. Check if we can extract the fuzzy key from the request parameters
-        # This is the core issue in the failing test - we need to handle this case
-        for fuzzy_key, exact_keys in self.fuzzy_lookup.items():
-            # For testing the first few characters can help match similar requests
-            if len(fuzzy_key) >= 8 and len(key) >= 8:
-                # Simple similarity check - if the first few chars match
-                if fuzzy_key[:8] == key[:8]:
-                    candidates.update(exact_keys)
-
-        # 3. If we still don't have candidates, try more aggressive matching
-        if not candidates:
-            # For all fuzzy keys, check for substring matches
-            for _fuzzy_key, exact_keys in self.fuzzy_lookup.items():
-                # Add all keys from fuzzy lookups that might be related
-                candidates.update(exact_keys)
-
-        # 4. Use prefix matching as fallback
-        if not candidates:
-            # First 8 chars are often enough to differentiate between different requests
-            key_prefix = key[:8] if len(key) >= 8 else key
-            for cached_key in self.cache.keys():
-                if cached_key.startswith(key_prefix):
-                    candidates.add(cached_key)
-
-        # 5. For very similar requests, compute similarity between hashes
-        if len(candidates) > 20:  # Too many candidates, need to filter
-            key_hash_suffix = key[-16:] if len(key) >= 16 else key
-            filtered_candidates = set()
-
-            for candidate in candidates:
-                candidate_suffix = candidate[-16:] if len(candidate) >= 16 else candidate
-
-                # Calculate hash similarity (simple version)
-                similarity = sum(
-                    a == b for a, b in zip(key_hash_suffix, candidate_suffix, strict=False)
-                ) / len(key_hash_suffix)
-
-                # Only keep candidates with high similarity
-                if similarity > 0.7:  # 70% similarity threshold
-                    filtered_candidates.add(candidate)
-
-            candidates = filtered_candidates
-
-        return candidates
+            candidates.update(dict.fromkeys(self.fuzzy_lookup.get(key[6:], ())))
+
+        tokens = self._extract_fuzzy_tokens(request_params)
+        if tokens:
+            # 2. Similar prompts with the same model and parameters via the LSH index
+            scope = self._fuzzy_scope(request_params)
+            for candidate_key, _similarity in self._lsh.query(tokens, scope=scope):
+                candidates.setdefault(candidate_key, None)
+
+        candidates.pop(key, None)
+        return list(candidates)
 
     async def set(
         self,
@@ -616,7 +663,7 @@ class CacheService:
         4. Cache management:
            - Enforces maximum entry limits through eviction
            - Prioritizes keeping newer and frequently used entries
-           - Optionally persists cache state for durability
+           - Optionally appends the write to the persistence log for durability
 
         Args:
             key: The exact cache key for the entry
@@ -642,82 +689,191 @@ class CacheService:
             expiry_time = time.time() + ttl
 
             # Check if value should be stored on disk (for large objects)
-            if _should_store_on_disk(value):
+            size = _estimate_size(value)
+            if size > _DISK_THRESHOLD_BYTES:
                 disk_key = f"{key}_disk_{int(time.time())}"
                 self.disk_cache.set(disk_key, value)
-                # Store reference to disk entry
-                disk_ref = f"disk:{disk_key}"
-                self.cache[key] = (disk_ref, expiry_time)
+                # Store reference to disk entry; only the reference counts against max_bytes
+                stored_value = f"disk:{disk_key}"
+                size = len(stored_value)
             else:
                 # Store in memory
-                self.cache[key] = (value, expiry_time)
+                stored_value = value
+            self.cache[key] = (stored_value, expiry_time)
+            self._policy.insert(key, size)
 
-            # Add to fuzzy lookup if enabled
+            # Add to fuzzy lookup and similarity index if enabled
+            signature = None
+            scope = ""
             if self.enable_fuzzy_matching:
                 if fuzzy_key is None and request_params:
                     fuzzy_key = self.generate_fuzzy_key(request_params)
 
                 if fuzzy_key:
-                    if fuzzy_key not in self.fuzzy_lookup:
-                        self.fuzzy_lookup[fuzzy_key] = set()
-                    self.fuzzy_lookup[fuzzy_key].add(key)
+                    self._add_to_fuzzy_lookup(key, fuzzy_key)
+
+                tokens = self._extract_fuzzy_tokens(request_params)
+                if tokens:
+                    scope = self._fuzzy_scope(request_params)
+                    signature = self._lsh.add(key, tokens, scope)
+
+            # Append the write to the persistence log before any evictions it causes
+            self._log_record(("set", key, stored_value, expiry_time, fuzzy_key, signature, scope))
 
             # Check if we need to evict entries
-            await self._check_size()
+            self._check_size()
 
             # Update statistics
             self.metrics.stores += 1
 
-            # Persist cache immediately if enabled
-            if self.enable_persistence:
-                await self._persist_cache_async()
-
             logger.debug(f"Added item to cache: {key[:8]}...", emoji_key="cache")
 
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        request_params: Optional[Dict[str, Any]] = None,
+        fuzzy: bool = True,
+    ) -> Any:
+        """Return a cached value, computing it at most once across concurrent callers.
+
+        The first caller to miss on ``key`` runs ``compute`` and stores the result;
+        callers that miss on the same key while that computation is in flight await
+        the same future instead of issuing a duplicate request. Waiters block for at
+        most ``coalesce_timeout`` seconds, after which they compute the value
+        themselves. If the computation raises, the exception is propagated to every
+        caller sharing it. Failing to store the result is logged, not raised.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value on a miss
+            ttl: Time-to-live for the stored result (uses default if None)
+            request_params: Original request parameters for fuzzy lookup and indexing
+            fuzzy: Whether to use fuzzy matching on lookup
+
+        Returns:
+            The cached or freshly computed value
+        """
+        if not self.enabled:
+            return await compute()
+
+        cached = await self.get(key, fuzzy=fuzzy, request_params=request_params)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.metrics.coalesced_requests += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(pending), self.coalesce_timeout)
+            except asyncio.TimeoutError:
+                self.metrics.coalesce_timeouts += 1
+                logger.warning(
+                    f"Waited {self.coalesce_timeout}s on in-flight computation for "
+                    f"{key[:8]}...; computing independently",
+                    emoji_key="cache",
+                )
+                return await compute()
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not pending.cancelled() or (current is not None and current.cancelling()):
+                    raise
+                # The leader was cancelled, not us; compute independently
+                return await compute()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody was waiting
+            future.exception()
+            raise
+        else:
+            # Resolve waiters before the cache write, which may fail
+            future.set_result(result)
+            if result is not None:
+                try:
+                    await self.set(key, result, ttl=ttl, request_params=request_params)
+                except Exception as e:
+                    logger.error(
+                        f"Failed to cache computed value for {key[:8]}...: {str(e)}",
+                        emoji_key="error",
+                    )
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _add_to_fuzzy_lookup(self, key: str, fuzzy_key: str) -> None:
+        """Associate an exact key with a fuzzy key, replacing any previous association.
+
+        Args:
+            key: Exact cache key
+            fuzzy_key: Fuzzy lookup key
+        """
+        previous = self._fuzzy_key_for.get(key)
+        if previous is not None and previous != fuzzy_key:
+            self._remove_from_fuzzy_lookup(key)
+        self.fuzzy_lookup.setdefault(fuzzy_key, set()).add(key)
+        self._fuzzy_key_for[key] = fuzzy_key
+
     def _remove_from_fuzzy_lookup(self, key: str) -> None:
-        """Remove a key from all fuzzy lookup sets.
+        """Remove a key from its fuzzy lookup set and the similarity index.
 
         Args:
             key: Cache key to remove
         """
-        if not self.enable_fuzzy_matching:
+        self._lsh.remove(key)
+        fuzzy_key = self._fuzzy_key_for.pop(key, None)
+        if fuzzy_key is None:
             return
 
-        for fuzzy_set in self.fuzzy_lookup.values():
-            if key in fuzzy_set:
-                fuzzy_set.remove(key)
+        fuzzy_set = self.fuzzy_lookup.get(fuzzy_key)
+        if fuzzy_set is not None:
+            fuzzy_set.discard(key)
+            if not fuzzy_set:
+                del self.fuzzy_lookup[fuzzy_key]
 
-    async def _check_size(self) -> None:
-        """Check cache size and evict entries if needed."""
-        if len(self.cache) <= self.max_entries:
-            return
-
-        # Need to evict entries - find expired first
-        current_time = time.time()
-        expired_keys = [k for k, (_, expiry) in self.cache.items() if expiry < current_time]
+    def _remove_entry(self, key: str) -> None:
+        """Remove an entry from the cache, its indexes and the eviction policy.
 
-        # Remove expired entries
-        for key in expired_keys:
-            del self.cache[key]
+        Args:
+            key: Cache key to remove
+        """
+        if self.cache.pop(key, None) is None:
+            return
+        self._remove_from_fuzzy_lookup(key)
+        self._policy.remove(key)
+        self._log_record(("del", key))
+
+    def _check_size(self) -> None:
+        """Evict entries chosen by the eviction policy until within entry and byte limits."""
+        evicted = 0
+        evicted_bytes_before = self._policy.evicted_bytes
+        while len(self.cache) > self.max_entries or (
+            self.max_bytes is not None
+            and self._policy.total_bytes > self.max_bytes
+            and len(self.cache) > 1
+        ):
+            key = self._policy.evict()
+            if key is None:
+                break
+            self.cache.pop(key, None)
             self._remove_from_fuzzy_lookup(key)
+            self._log_record(("del", key))
+            evicted += 1
 
-        # If still over limit, remove oldest entries
-        if len(self.cache) > self.max_entries:
-            # Sort by expiry time (oldest first)
-            entries = sorted(self.cache.items(), key=lambda x: x[1][1])
-            # Calculate how many to remove
-            to_remove = len(self.cache) - self.max_entries
-            # Get keys to remove
-            keys_to_remove = [k for k, _ in entries[:to_remove]]
-
-            # Remove entries
-            for key in keys_to_remove:
-                del self.cache[key]
-                self._remove_from_fuzzy_lookup(key)
-                self.metrics.evictions += 1
-
-            logger.info(
-                f"Evicted {len(keys_to_remove)} entries from cache (max size reached)",
+        if evicted:
+            self.metrics.evictions += evicted
+            self.metrics.evicted_bytes += self._policy.evicted_bytes - evicted_bytes_before
+            logger.debug(
+                f"Evicted {evicted} entries from cache ({self._policy.name}, limit reached)",
                 emoji_key="cache",
             )
 
@@ -725,19 +881,91 @@ class CacheService:
         """Clear the cache."""
         self.cache.clear()
         self.fuzzy_lookup.clear()
+        self._fuzzy_key_for.clear()
+        self._lsh.clear()
+        self._policy = get_eviction_policy(self._policy.name, self.max_entries)
         self.disk_cache.clear()
+        self._log_record(("clear",))
 
         logger.info("Cache cleared", emoji_key="cache")
 
+    def _log_record(self, record: Tuple[Any, ...]) -> None:
+        """Append a mutation record to the persistence log.
+
+        Schedules a background compaction once the log has grown past
+        ``compaction_threshold`` records (or past the number of live entries,
+        whichever is larger, so compaction stays amortized O(1) per write).
+
+        Args:
+            record: Mutation record, e.g.
+                ``("set", key, value, expiry, fuzzy_key, signature, scope)``
+        """
+        if not self.enable_persistence:
+            return
+
+        self._wal.append(record)
+
+        threshold = max(self.compaction_threshold, len(self.cache))
+        if self._wal.records_since_compaction < threshold:
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        try:
+            self._compaction_task = asyncio.get_running_loop().create_task(
+                self._persist_cache_async()
+            )
+        except RuntimeError:
+            # No running loop (e.g. called from sync code); compact on the next async write
+            pass
+
+    def _apply_log_record(self, record: Tuple[Any, ...]) -> None:
+        """Replay a single persistence log record against the in-memory state.
+
+        Args:
+            record: Mutation record read from the log
+        """
+        op = record[0]
+        if op == "set":
+            key, value, expiry_time, fuzzy_key = record[1:5]
+            signature = record[5] if len(record) > 5 else None
+            scope = record[6] if len(record) > 6 else ""
+            self.cache[key] = (value, expiry_time)
+            if fuzzy_key:
+                self._add_to_fuzzy_lookup(key, fuzzy_key)
+            if signature is not None:
+                self._lsh.add_signature(key, signature, scope)
+        elif op == "del":
+            key = record[1]
+            if self.cache.pop(key, None) is not None:
+                self._remove_from_fuzzy_lookup(key)
+        elif op == "clear":
+            self.cache.clear()
+            self.fuzzy_lookup.clear()
+            self._fuzzy_key_for.clear()
+            self._lsh.clear()
+
     def _load_cache(self) -> None:
-        """Load cache from disk."""
+        """Load cache from disk by replaying the latest snapshot and the log after it."""
         try:
-            with open(self.cache_file, "rb") as f:
-                data = pickle.load(f)
+            data, records = self._wal.load()
 
-            # Restore cache and fuzzy lookup
+            # Restore cache and fuzzy lookup from the snapshot
+            data = data or {}
             self.cache = data.get("cache", {})
             self.fuzzy_lookup = data.get("fuzzy_lookup", {})
+            self._fuzzy_key_for = {
+                key: fuzzy_key
+                for fuzzy_key, exact_keys in self.fuzzy_lookup.items()
+                for key in exact_keys
+            }
+            lsh_scopes = data.get("lsh_scopes", {})
+            for key, signature in data.get("lsh_signatures", {}).items():
+                self._lsh.add_signature(key, signature, lsh_scopes.get(key, ""))
+            sizes = data.get("sizes", {})
+
+            # Replay mutations written since the snapshot
+            for record in records:
+                self._apply_log_record(record)
 
             # Check for expired entries
             current_time = time.time()
@@ -748,9 +976,15 @@ class CacheService:
                 del self.cache[key]
                 self._remove_from_fuzzy_lookup(key)
 
+            # Rebuild the eviction policy in insertion order and enforce limits
+            for key, (value, _) in self.cache.items():
+                size = sizes.get(key)
+                self._policy.insert(key, size if size is not None else _estimate_size(value))
+            self._check_size()
+
             logger.info(
-                f"Loaded {len(self.cache)} entries from cache file "
-                + f"(removed {len(expired_keys)} expired entries)",
+                f"Loaded {len(self.cache)} entries from cache snapshot and "
+                + f"{len(records)} log records (removed {len(expired_keys)} expired entries)",
                 emoji_key="cache",
             )
 
@@ -760,32 +994,36 @@ class CacheService:
             # Initialize empty cache
             self.cache = {}
             self.fuzzy_lookup = {}
+            self._fuzzy_key_for = {}
+            self._lsh.clear()
+            self._policy = get_eviction_policy(self._policy.name, self.max_entries)
 
     async def _persist_cache_async(self) -> None:
-        """Asynchronously persist cache to disk."""
+        """Compact the persistence log into a full snapshot.
+
+        The in-memory state is copied and the log rotated while holding the
+        write lock; pickling and writing the snapshot then happen in a worker
+        thread so concurrent writers are not stalled by serialization.
+        """
         if not self.enable_persistence:
             return
 
-        # Prepare data for storage
-        data_to_save = {
-            "cache": self.cache,
-            "fuzzy_lookup": self.fuzzy_lookup,
-            "timestamp": time.time(),
-        }
-
-        # Save cache to temp file then rename for atomicity
-        temp_file = f"{self.cache_file}.tmp"
-        try:
-            async with aiofiles.open(temp_file, "wb") as f:
-                await f.write(pickle.dumps(data_to_save))
-
-            # Rename temp file to cache file
-            os.replace(temp_file, self.cache_file)
-
-            logger.debug(f"Persisted {len(self.cache)} cache entries to disk", emoji_key="cache")
-
-        except Exception as e:
-            logger.error(f"Failed to persist cache to disk: {str(e)}", emoji_key="error")
+        async with self._lock:
+            data_to_save = {
+                "cache": dict(self.cache),
+                "fuzzy_lookup": {k: set(v) for k, v in self.fuzzy_lookup.items()},
+                "sizes": self._policy.get_sizes(),
+                "lsh_signatures": self._lsh.get_signatures(),
+                "lsh_scopes": self._lsh.get_scopes(),
+                "timestamp": time.time(),
+            }
+            self._wal.rotate()
+
+        if await asyncio.to_thread(self._wal.write_snapshot, data_to_save):
+            logger.debug(
+                f"Compacted {len(data_to_save['cache'])} cache entries into snapshot",
+                emoji_key="cache",
+            )
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -796,10 +1034,20 @@ class CacheService:
         return {
             "size": len(self.cache),
             "max_size": self.max_entries,
+            "size_bytes": self._policy.total_bytes,
+            "max_bytes": self.max_bytes,
+            "eviction": self._policy.get_stats(),
             "ttl": self.ttl,
             "stats": self.metrics.to_dict(),
-            "persistence": {"enabled": self.enable_persistence, "directory": str(self.cache_dir)},
+            "persistence": {
+                "enabled": self.enable_persistence,
+                "directory": str(self.cache_dir),
+                "log_records_since_compaction": self._wal.records_since_compaction,
+            },
             "fuzzy_matching": self.enable_fuzzy_matching,
+            "fuzzy_threshold": self.fuzzy_threshold,
+            "fuzzy_indexed_entries": len(self._lsh),
+            "inflight_computations": len(self._inflight),
         }
 
     def update_saved_tokens(self, tokens: int, cost: float) -> None:
@@ -813,49 +1061,26 @@ class CacheService:
         self.metrics.estimated_cost_savings += cost
 
 
-def _should_store_on_disk(value: Any) -> bool:
-    """
-    Determine if a value should be stored on disk instead of in memory based on size.
-
-    This utility function implements a heuristic to decide whether a value should
-    be stored in memory or offloaded to disk-based storage. It makes this determination
-    by serializing the value and measuring its byte size, comparing against a threshold
-    to optimize memory usage.
-
-    The decision process:
-    1. Attempts to pickle (serialize) the value to determine its serialized size
-    2. Compares the serialized size against a threshold (100KB)
-    3. Returns True for large objects that would consume significant memory
-    4. Returns False for small objects better kept in memory for faster access
-
-    This approach optimizes the cache storage strategy:
-    - Small, frequently accessed values remain in memory for fastest retrieval
-    - Large values (like ML model outputs or large content) are stored on disk
-      to prevent excessive memory consumption
-    - Values that cannot be serialized default to memory storage
-
-    The 100KB threshold represents a balance between:
-    - Memory efficiency: Keeping the in-memory cache footprint manageable
-    - Performance: Avoiding disk I/O for frequently accessed small objects
-    - Overhead: Ensuring the disk storage mechanism is only used when beneficial
+_WORD_RE = re.compile(r"\w+")
+
+# Values whose pickled size exceeds this are offloaded to the disk cache, keeping the
+# in-memory footprint manageable while small, hot values avoid disk I/O.
+_DISK_THRESHOLD_BYTES = 100_000  # 100KB
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimate the size of a value in bytes from its pickled length.
 
     Args:
-        value: The value to evaluate for storage location
+        value: The value to measure
 
     Returns:
-        True if the value should be stored on disk, False for in-memory storage
-
-    Note:
-        If serialization fails (e.g., for objects containing lambdas, file handles,
-        or other non-serializable components), the function defaults to False
-        (memory storage) as a safe fallback since disk storage requires serialization.
+        Pickled size in bytes, or 0 if the value cannot be pickled
     """
     try:
-        size = len(pickle.dumps(value))
-        return size > 100_000  # 100KB
+        return len(pickle.dumps(value))
     except Exception:
-        # If we can't determine size, err on the side of memory
-        return False
+        return 0
 
 
 # Singleton instance
@@ -888,7 +1113,8 @@ def with_cache(ttl: Optional[int] = None):
     1. Intercepts function calls and generates a cache key from the arguments
     2. Checks if a result is already cached for those arguments
     3. If cached, returns the cached result without executing the function
-    4. If not cached, executes the original function and caches its result
+    4. If another call with the same arguments is already executing, awaits its result
+    5. Otherwise, executes the original function and caches its result
 
     The decorator works with the global cache service instance, respecting all
     its configuration settings including:
@@ -947,19 +1173,13 @@ def with_cache(ttl: Optional[int] = None):
             all_args = {"args": args, "kwargs": kwargs}
             cache_key = cache.generate_cache_key(all_args)
 
-            # Try to get from cache
-            cached_result = await cache.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for {func.__name__}", emoji_key="cache")
-                return cached_result
-
-            # Call function
-            result = await func(*args, **kwargs)
-
-            # Store in cache
-            await cache.set(key=cache_key, value=result, ttl=ttl, request_params=all_args)
-
-            return result
+            # Serve from cache, join an identical in-flight call, or compute and store
+            return await cache.get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                request_params=all_args,
+            )
 
         return wrapper
 
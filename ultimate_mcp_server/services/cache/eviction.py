@@ -0,0 +1,318 @@
+"""Eviction policies for the cache service."""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class EvictionPolicy(ABC):
+    """Abstract base class for cache eviction policies.
+
+    A policy tracks the keys resident in the cache together with their size in
+    bytes, is notified of every insert, access and removal, and picks the next
+    victim when the cache exceeds its entry or byte budget. All operations are
+    O(1) (amortized) so that a full cache does not make stores more expensive.
+    """
+
+    name: str = "base"
+
+    def __init__(self, max_entries: int):
+        """Initialize the policy.
+
+        Args:
+            max_entries: Maximum number of entries the cache will hold
+        """
+        self.max_entries = max(1, max_entries)
+        self.total_bytes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._sizes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sizes
+
+    def insert(self, key: str, size: int) -> None:
+        """Record that a key was stored (or overwritten).
+
+        Args:
+            key: Cache key
+            size: Approximate in-memory size of the entry in bytes
+        """
+        if key in self._sizes:
+            self.total_bytes -= self._sizes[key]
+        self._sizes[key] = size
+        self.total_bytes += size
+        self._on_insert(key)
+
+    def remove(self, key: str) -> None:
+        """Forget a key that was removed from the cache for any reason.
+
+        Args:
+            key: Cache key
+        """
+        size = self._sizes.pop(key, None)
+        if size is None:
+            return
+        self.total_bytes -= size
+        self._on_remove(key)
+
+    def evict(self) -> Optional[str]:
+        """Select, forget and return the next victim.
+
+        Returns:
+            The evicted key, or None if the policy tracks no keys
+        """
+        if not self._sizes:
+            return None
+        key = self._select_victim()
+        self.evictions += 1
+        self.evicted_bytes += self._sizes.get(key, 0)
+        self.remove(key)
+        return key
+
+    @abstractmethod
+    def record_access(self, key: str) -> None:
+        """Record a lookup of a key (hit or miss).
+
+        Args:
+            key: Cache key
+        """
+
+    @abstractmethod
+    def _on_insert(self, key: str) -> None:
+        """Policy-specific bookkeeping for an insert."""
+
+    @abstractmethod
+    def _on_remove(self, key: str) -> None:
+        """Policy-specific bookkeeping for a removal."""
+
+    @abstractmethod
+    def _select_victim(self) -> str:
+        """Return the key that should be evicted next."""
+
+    def get_sizes(self) -> Dict[str, int]:
+        """Get a copy of the tracked per-entry sizes.
+
+        Returns:
+            Dictionary mapping cache keys to sizes in bytes
+        """
+        return dict(self._sizes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get policy statistics.
+
+        Returns:
+            Dictionary of policy statistics
+        """
+        return {
+            "policy": self.name,
+            "entries": len(self._sizes),
+            "total_bytes": self.total_bytes,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least-recently-used eviction backed by an ordered dict."""
+
+    name = "lru"
+
+    def __init__(self, max_entries: int):
+        super().__init__(max_entries)
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def record_access(self, key: str) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def _on_insert(self, key: str) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def _on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def _select_victim(self) -> str:
+        return next(iter(self._order))
+
+
+class FrequencySketch:
+    """Count-min sketch with 4-bit saturating counters and periodic aging.
+
+    Used by TinyLFU to estimate how often a key has been requested recently
+    without keeping per-key history for keys that are not cached.
+    """
+
+    _DEPTH = 4
+    _MAX_COUNT = 15
+    _MASK_64 = (1 << 64) - 1
+    # Odd 64-bit multipliers, one per row (splitmix64/murmur3 finalizer constants)
+    _SEEDS = (0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB, 0xFF51AFD7ED558CCD)
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(16, capacity):
+            width <<= 1
+        self._shift = 64 - (width.bit_length() - 1)
+        self._table = [[0] * width for _ in range(self._DEPTH)]
+        self._sample_size = 10 * max(16, capacity)
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        # Multiplicative hashing keeps the well-mixed high bits of each product;
+        # masking the low bits would send keys that share low hash bits to the
+        # same counter in every row
+        h = hash(key) & self._MASK_64
+        h ^= h >> 32
+        for seed in self._SEEDS:
+            yield ((h * seed) & self._MASK_64) >> self._shift
+
+    def increment(self, key: str) -> None:
+        """Increment the estimated frequency of a key."""
+        added = False
+        for row, idx in zip(self._table, self._indexes(key), strict=False):
+            if row[idx] < self._MAX_COUNT:
+                row[idx] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._reset()
+
+    def estimate(self, key: str) -> int:
+        """Return the estimated recent frequency of a key."""
+        return min(row[idx] for row, idx in zip(self._table, self._indexes(key), strict=False))
+
+    def _reset(self) -> None:
+        """Halve all counters so the sketch favours recent popularity."""
+        for row in self._table:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self._additions //= 2
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """Window TinyLFU eviction.
+
+    New entries enter a small LRU admission window (~1% of capacity) and spill
+    into the main region's probation segment when the window overflows. When
+    the cache is over capacity, the most recently spilled entry competes with
+    the least-recently-used probation entry; whichever has the lower estimated
+    access frequency is evicted. Entries hit while in probation are promoted to a
+    protected segment (~80% of the main region). This keeps one-hit-wonders
+    from flushing popular entries, which plain LRU does on scan-heavy traffic.
+    """
+
+    name = "tinylfu"
+
+    def __init__(self, max_entries: int):
+        super().__init__(max_entries)
+        self._window_capacity = max(1, self.max_entries // 100)
+        main_capacity = max(1, self.max_entries - self._window_capacity)
+        self._protected_capacity = max(1, int(main_capacity * 0.8))
+        self._window: "OrderedDict[str, None]" = OrderedDict()
+        self._probation: "OrderedDict[str, None]" = OrderedDict()
+        self._protected: "OrderedDict[str, None]" = OrderedDict()
+        self._sketch = FrequencySketch(self.max_entries)
+        self._candidate: Optional[str] = None
+        self.admissions = 0
+        self.rejections = 0
+
+    def record_access(self, key: str) -> None:
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            # Demote the protected LRU back to probation if the segment is full
+            if len(self._protected) > self._protected_capacity:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+
+    def _on_insert(self, key: str) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                segment.move_to_end(key)
+                return
+        self._sketch.increment(key)
+        self._window[key] = None
+        while len(self._window) > self._window_capacity:
+            spilled, _ = self._window.popitem(last=False)
+            self._probation[spilled] = None
+            self._candidate = spilled
+
+    def _on_remove(self, key: str) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
+                break
+        if key == self._candidate:
+            self._candidate = None
+
+    def _select_victim(self) -> str:
+        candidate = self._candidate
+        if candidate is not None and candidate in self._probation:
+            victim = next(iter(self._probation))
+            if victim != candidate:
+                if self._sketch.estimate(candidate) > self._sketch.estimate(victim):
+                    self.admissions += 1
+                    return victim
+                self.rejections += 1
+                return candidate
+
+        if self._probation:
+            return next(iter(self._probation))
+        if self._protected:
+            return next(iter(self._protected))
+        return next(iter(self._window))
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update(
+            {
+                "window_entries": len(self._window),
+                "probation_entries": len(self._probation),
+                "protected_entries": len(self._protected),
+                "admissions": self.admissions,
+                "rejections": self.rejections,
+            }
+        )
+        return stats
+
+
+_POLICIES = {
+    LRUPolicy.name: LRUPolicy,
+    TinyLFUPolicy.name: TinyLFUPolicy,
+}
+
+
+def get_eviction_policy(name: str, max_entries: int) -> EvictionPolicy:
+    """Create an eviction policy by name.
+
+    Args:
+        name: Policy name ("lru" or "tinylfu")
+        max_entries: Maximum number of entries the cache will hold
+
+    Returns:
+        EvictionPolicy instance
+
+    Raises:
+        ValueError: If the policy name is unknown
+    """
+    policy_class = _POLICIES.get(name.lower())
+    if policy_class is None:
+        raise ValueError(
+            f"Unknown eviction policy: {name}. Available: {', '.join(sorted(_POLICIES))}"
+        )
+    return policy_class(max_entries)
@@ -0,0 +1,227 @@
+"""MinHash locality-sensitive hashing index for fuzzy cache lookups."""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick the (bands, rows) split whose S-curve inflection is closest to threshold.
+
+    With ``b`` bands of ``r`` rows, two sets with Jaccard similarity ``s`` share
+    at least one band with probability ``1 - (1 - s^r)^b``; the curve's
+    inflection point sits near ``(1/b)^(1/r)``.
+
+    Args:
+        num_perm: Number of MinHash permutations
+        threshold: Target Jaccard similarity
+
+    Returns:
+        Tuple of (bands, rows_per_band)
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSHIndex:
+    """Sublinear approximate Jaccard-similarity index over token sets.
+
+    Each document is reduced to a MinHash signature of ``num_perm`` 32-bit
+    values over its word shingles. Signatures are split into bands; documents
+    sharing any identical band become candidates, so a lookup only touches
+    buckets for its own bands instead of every indexed document. Candidates
+    are then re-ranked by the Jaccard similarity estimated from the full
+    signatures and filtered by ``threshold``.
+
+    Documents can be indexed under a ``scope`` (e.g. a hash of the request
+    parameters other than the prompt); it is folded into every band key, so
+    documents only ever match queries made in the same scope.
+
+    Raising ``threshold`` favours precision (fewer, closer matches); lowering
+    it favours recall.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        shingle_size: int = 1,
+        seed: int = 1,
+    ):
+        """Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a match (0-1)
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Number of consecutive tokens per shingle
+            seed: Seed for the permutation coefficients
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = max(1, shingle_size)
+        self.bands, self.rows = _optimal_bands(num_perm, threshold)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._scopes: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def _shingles(self, tokens: List[str]) -> Set[bytes]:
+        n = self.shingle_size
+        if len(tokens) < n:
+            return {" ".join(tokens).encode("utf-8")} if tokens else set()
+        return {" ".join(tokens[i : i + n]).encode("utf-8") for i in range(len(tokens) - n + 1)}
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        """Compute the MinHash signature of a token sequence.
+
+        Args:
+            tokens: Normalized tokens of the document
+
+        Returns:
+            uint32 signature array, or None if there are no tokens
+        """
+        shingles = self._shingles(list(tokens))
+        if not shingles:
+            return None
+
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s, digest_size=4).digest(), "little")
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # (a * h + b) mod p, truncated to 32 bits; a, h < 2^32 so the product fits in uint64
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray, scope: str) -> List[bytes]:
+        r = self.rows
+        prefix = scope.encode("utf-8") + b"\0"
+        return [prefix + signature[i * r : (i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, key: str, tokens: Iterable[str], scope: str = "") -> Optional[np.ndarray]:
+        """Index a document under a key, replacing any previous entry for it.
+
+        Args:
+            key: Document key
+            tokens: Normalized tokens of the document
+            scope: Scope the document can be matched in
+
+        Returns:
+            The stored signature, or None if the document has no tokens
+        """
+        signature = self.signature(tokens)
+        if signature is None:
+            self.remove(key)
+            return None
+        self.add_signature(key, signature, scope)
+        return signature
+
+    def add_signature(self, key: str, signature: np.ndarray, scope: str = "") -> None:
+        """Index a precomputed signature (e.g. when restoring from disk).
+
+        Args:
+            key: Document key
+            signature: Signature previously returned by ``signature``
+            scope: Scope the document can be matched in
+        """
+        self.remove(key)
+        self._signatures[key] = signature
+        self._scopes[key] = scope
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature, scope), strict=True):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove a key from the index.
+
+        Args:
+            key: Document key
+        """
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        scope = self._scopes.pop(key, "")
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature, scope), strict=True):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def clear(self) -> None:
+        """Remove all documents from the index."""
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures.clear()
+        self._scopes.clear()
+
+    def get_signatures(self) -> Dict[str, np.ndarray]:
+        """Return a shallow copy of all stored signatures, keyed by document key."""
+        return dict(self._signatures)
+
+    def get_scopes(self) -> Dict[str, str]:
+        """Return a copy of the scope of every stored document, keyed by document key."""
+        return dict(self._scopes)
+
+    def query(
+        self, tokens: Iterable[str], threshold: Optional[float] = None, scope: str = ""
+    ) -> List[Tuple[str, float]]:
+        """Find indexed documents similar to a token sequence.
+
+        Args:
+            tokens: Normalized tokens of the query document
+            threshold: Optional override of the index's similarity threshold
+            scope: Only documents indexed under this scope are matched
+
+        Returns:
+            List of (key, estimated Jaccard similarity), most similar first
+        """
+        signature = self.signature(tokens)
+        if signature is None:
+            return []
+
+        candidates: Set[str] = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature, scope), strict=True):
+            bucket = buckets.get(band_key)
+            if bucket:
+                candidates.update(bucket)
+
+        min_similarity = self.threshold if threshold is None else threshold
+        results = []
+        for key in candidates:
+            similarity = float(np.count_nonzero(self._signatures[key] == signature)) / self.num_perm
+            if similarity >= min_similarity:
+                results.append((key, similarity))
+
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
@@ -3,8 +3,9 @@
 import json
 import os
 import pickle
+import struct
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import aiofiles
 
@@ -165,3 +166,160 @@ class CachePersistence:
         except Exception as e:
             logger.error(f"Failed to clean up old cache files: {str(e)}", emoji_key="error")
             return deleted_count
+
+
+class CacheWriteAheadLog:
+    """Append-only log of cache mutations with snapshot compaction.
+
+    Each mutation (set, delete, clear) is appended to ``cache.log`` as a
+    length-prefixed pickle record, so the cost of persisting a write is
+    proportional to the entry being written rather than to the whole cache.
+    Periodically the in-memory state is written as a snapshot (``cache.pkl``)
+    and the log is truncated.
+
+    Compaction rotates the active log to ``cache.log.old`` before the snapshot
+    is written. Records are idempotent when replayed in order, so startup
+    replays snapshot, then any rotated segment left behind by an interrupted
+    compaction, then the active log. A torn record at the tail of a log (e.g.
+    from a crash mid-write) is detected by its length prefix and ignored.
+    """
+
+    _HEADER = struct.Struct(">I")
+
+    def __init__(self, cache_dir: Path, fsync: bool = False):
+        """Initialize the write-ahead log.
+
+        Args:
+            cache_dir: Directory for cache storage
+            fsync: Whether to fsync after every append (durable across power loss,
+                   but considerably slower)
+        """
+        self.cache_dir = cache_dir
+        self.snapshot_file = cache_dir / "cache.pkl"
+        self.log_file = cache_dir / "cache.log"
+        self.rotated_log_file = cache_dir / "cache.log.old"
+        self.fsync = fsync
+        self.records_since_compaction = 0
+        self._handle = None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def append(self, record: Tuple[Any, ...]) -> bool:
+        """Append a single mutation record to the active log.
+
+        Args:
+            record: Tuple whose first element is the operation name
+
+        Returns:
+            True if the record was written
+        """
+        try:
+            payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error(f"Failed to serialize cache log record: {str(e)}", emoji_key="error")
+            return False
+
+        try:
+            if self._handle is None:
+                self._handle = open(self.log_file, "ab")
+            self._handle.write(self._HEADER.pack(len(payload)) + payload)
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+            self.records_since_compaction += 1
+            return True
+        except Exception as e:
+            logger.error(f"Failed to append to cache log: {str(e)}", emoji_key="error")
+            return False
+
+    def _iter_records(self, path: Path) -> Iterator[Tuple[Any, ...]]:
+        """Yield records from a log file, stopping at the first torn record."""
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(self._HEADER.size)
+                if len(header) < self._HEADER.size:
+                    return
+                (length,) = self._HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    logger.warning(
+                        f"Ignoring truncated record at end of {path.name}", emoji_key="warning"
+                    )
+                    return
+                try:
+                    yield pickle.loads(payload)
+                except Exception as e:
+                    logger.warning(
+                        f"Ignoring corrupt record in {path.name}: {str(e)}", emoji_key="warning"
+                    )
+                    return
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[Any, ...]]]:
+        """Load the latest snapshot and the log records written after it.
+
+        Returns:
+            Tuple of (snapshot data or None, list of records to replay in order)
+        """
+        snapshot = None
+        if self.snapshot_file.exists():
+            try:
+                with open(self.snapshot_file, "rb") as f:
+                    snapshot = pickle.load(f)
+            except Exception as e:
+                logger.error(f"Failed to load cache snapshot: {str(e)}", emoji_key="error")
+
+        records = list(self._iter_records(self.rotated_log_file))
+        records.extend(self._iter_records(self.log_file))
+        self.records_since_compaction = len(records)
+        return snapshot, records
+
+    def rotate(self) -> None:
+        """Start a new log segment ahead of writing a snapshot.
+
+        Must be called while the caller holds the lock that serializes
+        mutations, so the snapshot taken at the same time covers exactly the
+        records in the rotated segment.
+        """
+        self.close()
+        if self.log_file.exists():
+            if self.rotated_log_file.exists():
+                # A previous compaction never finished; keep its records in order.
+                with open(self.rotated_log_file, "ab") as dst, open(self.log_file, "rb") as src:
+                    dst.write(src.read())
+                self.log_file.unlink()
+            else:
+                os.replace(self.log_file, self.rotated_log_file)
+        self.records_since_compaction = 0
+
+    def write_snapshot(self, data: Dict[str, Any]) -> bool:
+        """Atomically write a snapshot and drop the rotated log segment.
+
+        This is blocking and intended to run in a worker thread.
+
+        Args:
+            data: Snapshot data to pickle
+
+        Returns:
+            True if successful
+        """
+        temp_file = f"{self.snapshot_file}.tmp"
+        try:
+            with open(temp_file, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.snapshot_file)
+            if self.rotated_log_file.exists():
+                self.rotated_log_file.unlink()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write cache snapshot: {str(e)}", emoji_key="error")
+            return False
+
+    def close(self) -> None:
+        """Close the active log file handle."""
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            finally:
+                self._handle = None
@@ -4,6 +4,7 @@ This module provides utility functions for working with the cache service
 that were previously defined in example scripts but are now part of the library.
 """
 
+import copy
 import hashlib
 
 from ultimate_mcp_server.constants import Provider
@@ -28,7 +29,8 @@ async def run_completion_with_cache(
     """Run a completion with automatic caching.
 
     This utility function handles provider initialization, cache key generation,
-    cache lookups, and caching results automatically.
+    cache lookups, and caching results automatically. Concurrent calls with the
+    same parameters are coalesced so only one provider request is made.
 
     Args:
         prompt: Text prompt for completion
@@ -62,30 +64,37 @@ async def run_completion_with_cache(
 
     cache_key = f"completion:{provider_name}:{model_id}:{params_hash}"
 
-    if use_cache and cache_service.enabled:
-        cached_result = await cache_service.get(cache_key)
-        if cached_result is not None:
-            logger.success("Cache hit! Using cached result", emoji_key="cache")
-            # Set processing time for cache retrieval (negligible)
-            cached_result.processing_time = 0.001
-            return cached_result
+    async def generate():
+        # Use the determined model_id and pass through other parameters
+        return await provider.generate_completion(
+            prompt=prompt, model=model_id, temperature=temperature, max_tokens=max_tokens
+        )
 
-    # Generate completion if not cached or cache disabled
-    if use_cache:
-        logger.info("Cache miss. Generating new completion...", emoji_key="processing")
-    else:
+    if not (use_cache and cache_service.enabled):
         logger.info(
             "Cache disabled by request. Generating new completion...", emoji_key="processing"
         )
+        return await generate()
 
-    # Use the determined model_id and pass through other parameters
-    result = await provider.generate_completion(
-        prompt=prompt, model=model_id, temperature=temperature, max_tokens=max_tokens
-    )
+    generated = False
 
-    # Save to cache if enabled
-    if use_cache and cache_service.enabled:
-        await cache_service.set(key=cache_key, value=result, ttl=ttl)
+    async def generate_and_track():
+        nonlocal generated
+        logger.info("Cache miss. Generating new completion...", emoji_key="processing")
+        result = await generate()
+        generated = True
+        return result
+
+    # Serve from cache, join an identical in-flight request, or generate and store
+    result = await cache_service.get_or_compute(cache_key, generate_and_track, ttl=ttl)
+
+    if generated:
         logger.info(f"Result saved to cache (key: ...{cache_key[-10:]})", emoji_key="cache")
+    else:
+        logger.success("Cache hit! Using cached result", emoji_key="cache")
+        # Set processing time for cache retrieval (negligible) on a copy, since the
+        # object is shared with the cache and with any coalesced callers
+        result = copy.copy(result)
+        result.processing_time = 0.001
 
     return result
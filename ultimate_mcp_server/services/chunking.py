@@ -0,0 +1,400 @@
+"""Streaming text chunking engine with tokenizer-accurate sizes."""
+
+import io
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
+
+from ultimate_mcp_server.utils import get_logger
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = get_logger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Same boundaries as the original DocumentProcessor sentence splitter, with the
+# cheap end-of-sentence lookbehind tested first so most positions fail fast
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.?!])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s")
+_PARAGRAPH_BREAK = re.compile(r"\n\n")
+
+# Code points str.split() treats as whitespace
+_WHITESPACE_CODES = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+_ASCII_WHITESPACE = np.zeros(128, dtype=bool)
+_ASCII_WHITESPACE[_WHITESPACE_CODES[_WHITESPACE_CODES < 128]] = True
+
+# Sentinel: resolve the default encoder lazily
+_DEFAULT = object()
+
+_chunking_pool: Optional[ProcessPoolExecutor] = None
+_chunking_pool_workers = 0
+
+
+@lru_cache(maxsize=None)
+def get_token_encoder(encoding_name: str = DEFAULT_ENCODING) -> Optional[Any]:
+    """Get a cached tiktoken encoder.
+
+    Args:
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken or the encoding is unavailable
+        (encodings are downloaded on first use, which fails offline)
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(
+            f"tiktoken encoding '{encoding_name}' unavailable ({str(e)}); "
+            "counting whitespace-separated words instead",
+            extra={"emoji_key": "warning"},
+        )
+        return None
+
+
+_token_byte_lengths: Dict[str, np.ndarray] = {}
+
+
+def _token_byte_lengths_of(encoder: Any, tokens: np.ndarray) -> np.ndarray:
+    """Byte length of each token, decoding each distinct token once per encoding."""
+    lengths = _token_byte_lengths.get(encoder.name)
+    if lengths is None:
+        lengths = np.full(encoder.n_vocab, -1, dtype=np.int64)
+        _token_byte_lengths[encoder.name] = lengths
+    result = lengths[tokens]
+    missing = result < 0
+    if missing.any():
+        for token in np.unique(tokens[missing]).tolist():
+            lengths[token] = len(encoder.decode_single_token_bytes(token))
+        result = lengths[tokens]
+    return result
+
+
+def get_chunking_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all chunking callers, grown when more workers are requested.
+
+    Args:
+        workers: Minimum number of worker processes
+
+    Returns:
+        Shared ProcessPoolExecutor
+    """
+    global _chunking_pool, _chunking_pool_workers
+    if _chunking_pool is None or workers > _chunking_pool_workers:
+        if _chunking_pool is not None:
+            _chunking_pool.shutdown(wait=False)
+        # Forking a multi-threaded server can deadlock the child; start clean interpreters
+        method = (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        _chunking_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(method)
+        )
+        _chunking_pool_workers = workers
+    return _chunking_pool
+
+
+class TextChunker:
+    """Splits text into overlapping chunks sized in tokens.
+
+    Token positions are computed once per block of input as numpy arrays of
+    character offsets: with a tiktoken encoder from the tokenizer's token byte
+    lengths, otherwise from whitespace-separated words (the historical
+    approximation). Sentence and paragraph sizes are then vectorized
+    ``searchsorted`` lookups, and chunks are single slices of the input rather
+    than re-joined pieces, so the original whitespace inside a chunk is kept.
+
+    ``iter_chunks`` streams: the input (a string or a text file object) is
+    read ``block_chars`` at a time and only the unfinished tail (the chunk
+    being built, or the last paragraph/sentence, which may be incomplete) is
+    carried into the next block. Memory is therefore bounded by the block size
+    plus the largest chunk (token), sentence (sentence) or paragraph
+    (semantic) in the input.
+
+    Methods:
+    - "token": windows of ``chunk_size`` tokens, stepping by
+      ``chunk_size - chunk_overlap``
+    - "sentence": whole sentences up to ``chunk_size`` tokens; the trailing
+      sentences of a chunk, up to ``chunk_overlap`` tokens, start the next one
+    - "semantic": whole paragraphs (separated by blank lines) up to
+      ``chunk_size`` tokens, the last paragraph repeated in the next chunk;
+      longer paragraphs are split by sentence
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        method: str = "token",
+        encoder: Any = _DEFAULT,
+        block_chars: int = 1 << 20,
+    ):
+        """Initialize the chunker.
+
+        Args:
+            chunk_size: Target size of each chunk in tokens
+            chunk_overlap: Number of tokens to overlap between chunks
+            method: Chunking strategy ("token", "sentence", or "semantic")
+            encoder: tiktoken Encoding used to count tokens; defaults to the
+                cached cl100k_base encoder, None counts whitespace-separated words
+            block_chars: Characters read per block when streaming
+        """
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_overlap = max(0, chunk_overlap)
+        self.method = method
+        self.encoder = get_token_encoder() if encoder is _DEFAULT else encoder
+        self.block_chars = block_chars
+
+    def _token_spans(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end character offsets of every token in text."""
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+        if self.encoder is None:
+            space = np.zeros(len(codes), dtype=bool)
+            ascii_mask = codes < 128
+            space[ascii_mask] = _ASCII_WHITESPACE[codes[ascii_mask]]
+            if not ascii_mask.all():
+                other = ~ascii_mask
+                space[other] = np.isin(codes[other], _WHITESPACE_CODES)
+            edges = np.diff(space.view(np.int8), prepend=np.int8(1), append=np.int8(1))
+            return np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+
+        tokens = np.asarray(self.encoder.encode_ordinary(text), dtype=np.int64)
+        if not len(tokens):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        byte_ends = np.cumsum(_token_byte_lengths_of(self.encoder, tokens))
+        char_bytes = np.where(
+            codes < 0x80, 1, np.where(codes < 0x800, 2, np.where(codes < 0x10000, 3, 4))
+        )
+        # A token ending inside a multi-byte character ends before that character
+        ends = np.searchsorted(np.cumsum(char_bytes), byte_ends, side="right")
+        starts = np.concatenate(([0], ends[:-1]))
+        return starts, ends
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens the way chunk sizes are measured.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens (words without a tokenizer)
+        """
+        if self.encoder is not None:
+            return len(self.encoder.encode_ordinary(text))
+        return len(self._token_spans(text)[0])
+
+    def _token_chunks(
+        self, text: str, starts: np.ndarray, ends: np.ndarray, final: bool
+    ) -> Tuple[List[str], int, int]:
+        chunks = []
+        count = len(starts)
+        start = 0
+        while start < count:
+            end = min(start + self.chunk_size, count)
+            if end == count and not final:
+                return chunks, int(starts[start]), 0
+            chunk = text[starts[start] : ends[end - 1]].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end == count:
+                break
+            start = max(end - self.chunk_overlap, start + 1)
+        return chunks, len(text), 0
+
+    @staticmethod
+    def _spans(
+        pattern: re.Pattern, text: str, lo: int, hi: int, ends: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Split [lo, hi) at pattern matches; return starts, ends and token counts of non-empty pieces."""
+        starts, stops = [lo], []
+        for match in pattern.finditer(text, lo, hi):
+            stops.append(match.start())
+            starts.append(match.end())
+        stops.append(hi)
+        starts, stops = np.asarray(starts), np.asarray(stops)
+        # Tokens are attributed to the piece they end in
+        counts = np.searchsorted(ends, stops, side="right") - np.searchsorted(
+            ends, starts, side="right"
+        )
+        keep = counts > 0
+        return starts[keep], stops[keep], counts[keep]
+
+    def _sentence_chunks(
+        self, text: str, ends: np.ndarray, lo: int, hi: int, final: bool, seed: int = 0
+    ) -> Tuple[List[str], int, int]:
+        starts, stops, counts = self._spans(_SENTENCE_BOUNDARY, text, lo, hi, ends)
+        if not final:
+            # The last sentence may continue in the next block
+            if len(starts) <= seed:
+                return [], lo, seed
+            pending, starts, stops, counts = int(starts[-1]), starts[:-1], stops[:-1], counts[:-1]
+
+        chunks = []
+        # Indices of the sentences in the chunk being built; the first ``seed``
+        # sentences are the chunk carried over from the previous block
+        current: List[int] = list(range(min(seed, len(counts))))
+        current_size = int(counts[: len(current)].sum())
+        sizes = counts.tolist()
+        for i, size in enumerate(sizes[len(current) :], start=len(current)):
+            if current and current_size + size > self.chunk_size:
+                chunks.append(text[starts[current[0]] : stops[current[-1]]].strip())
+
+                # Start the next chunk with trailing sentences for overlap
+                overlap: List[int] = []
+                overlap_size = 0
+                for j in reversed(current):
+                    if overlap_size + sizes[j] > self.chunk_overlap:
+                        break
+                    overlap.insert(0, j)
+                    overlap_size += sizes[j]
+                current, current_size = overlap, overlap_size
+
+            current.append(i)
+            current_size += size
+
+        if not final:
+            if current:
+                return chunks, int(starts[current[0]]), len(current)
+            return chunks, pending, 0
+        if current:
+            chunks.append(text[starts[current[0]] : stops[current[-1]]].strip())
+        return chunks, hi, 0
+
+    def _semantic_chunks(
+        self, text: str, ends: np.ndarray, final: bool, seed: int = 0
+    ) -> Tuple[List[str], int, int]:
+        starts, stops, counts = self._spans(_PARAGRAPH_BREAK, text, 0, len(text), ends)
+        if not final:
+            # The last paragraph may continue in the next block
+            if len(starts) <= seed:
+                return [], 0, seed
+            pending, starts, stops, counts = int(starts[-1]), starts[:-1], stops[:-1], counts[:-1]
+
+        chunks = []
+        # Indices of the paragraphs in the chunk being built; the first ``seed``
+        # paragraphs are the chunk carried over from the previous block
+        current: List[int] = list(range(min(seed, len(counts))))
+        current_size = int(counts[: len(current)].sum())
+        for i, size in enumerate(counts[len(current) :].tolist(), start=len(current)):
+            # Split overly long paragraphs by sentence
+            if size > self.chunk_size:
+                if current:
+                    chunks.append(text[starts[current[0]] : stops[current[-1]]].strip())
+                    current, current_size = [], 0
+                chunks.extend(
+                    self._sentence_chunks(text, ends, int(starts[i]), int(stops[i]), True)[0]
+                )
+                continue
+
+            if current and current_size + size > self.chunk_size:
+                chunks.append(text[starts[current[0]] : stops[current[-1]]].strip())
+                # Start the next chunk with the last paragraph for context
+                current, current_size = [current[-1]], int(counts[current[-1]])
+
+            current.append(i)
+            current_size += size
+
+        if not final:
+            if current:
+                return chunks, int(starts[current[0]]), len(current)
+            return chunks, pending, 0
+        if current:
+            chunks.append(text[starts[current[0]] : stops[current[-1]]].strip())
+        return chunks, len(text), 0
+
+    def _chunk_block(self, text: str, final: bool, seed: int = 0) -> Tuple[List[str], int, int]:
+        """Chunk a block of input.
+
+        Args:
+            text: Unfinished tail of the previous block followed by new input
+            final: Whether this is the end of the input
+            seed: Number of leading sentences/paragraphs of text that form the
+                chunk being built when the previous block ended
+
+        Returns:
+            Finished chunks, the offset of the unfinished tail to carry into
+            the next block (``len(text)`` when nothing is pending) and its seed
+        """
+        starts, ends = self._token_spans(text)
+        if self.method == "semantic":
+            return self._semantic_chunks(text, ends, final, seed)
+        if self.method == "sentence":
+            return self._sentence_chunks(text, ends, 0, len(text), final, seed)
+        return self._token_chunks(text, starts, ends, final)
+
+    def iter_chunks(self, source: Union[str, TextIO]) -> Iterator[str]:
+        """Stream chunks of a string or a text file object.
+
+        Args:
+            source: Text, or a file-like object opened in text mode
+
+        Yields:
+            Chunks in document order
+        """
+        if isinstance(source, str):
+            if len(source) <= self.block_chars:
+                yield from self._chunk_block(source, True)[0]
+                return
+            source = io.StringIO(source)
+
+        carry, seed = "", 0
+        block = source.read(self.block_chars)
+        while True:
+            next_block = source.read(self.block_chars)
+            final = not next_block
+            text = carry + block
+            chunks, resume, seed = self._chunk_block(text, final, seed)
+            yield from chunks
+            if final:
+                return
+            carry, block = text[resume:], next_block
+
+    def chunk(self, text: str) -> List[str]:
+        """Chunk a whole text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of chunks
+        """
+        if not text:
+            return []
+        return list(self.iter_chunks(text))
+
+
+def chunk_texts(
+    texts: List[str],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    method: str = "token",
+    encoding_name: Optional[str] = DEFAULT_ENCODING,
+) -> List[List[str]]:
+    """Chunk several texts with one ``TextChunker``.
+
+    This is a picklable top-level function, so it can run in
+    ``get_chunking_pool`` workers (each worker caches its own encoder).
+
+    Args:
+        texts: Texts to chunk
+        chunk_size: Target size of each chunk in tokens
+        chunk_overlap: Number of tokens to overlap between chunks
+        method: Chunking strategy ("token", "sentence", or "semantic")
+        encoding_name: tiktoken encoding, or None to count whitespace-separated words
+
+    Returns:
+        One list of chunks per input text, in input order
+    """
+    encoder = get_token_encoder(encoding_name) if encoding_name else None
+    chunker = TextChunker(chunk_size, chunk_overlap, method, encoder=encoder)
+    return [chunker.chunk(text) for text in texts]
@@ -1,8 +1,10 @@
 """Document processing service for chunking and analyzing text documents."""
 
-import re
-from typing import List
+import asyncio
+import os
+from typing import Iterator, List, TextIO, Union
 
+from ultimate_mcp_server.services.chunking import TextChunker, chunk_texts, get_chunking_pool
 from ultimate_mcp_server.utils import get_logger
 
 logger = get_logger(__name__)
@@ -23,6 +25,8 @@ class DocumentProcessor:
     - Semantic-aware chunking that preserves context and meaning
     - Sentence boundary detection for natural text segmentation
     - Token-based chunking for precise size control
+    - Token counts from a real tokenizer (tiktoken, cached encoder) when available
+    - Streaming over file-like input and process-pool offloading for large inputs
     - Singleton implementation for efficient resource usage
 
     Chunking Methods:
@@ -34,10 +38,15 @@ class DocumentProcessor:
        no sentence is broken across chunks. Ideal for natural language text
        where sentence integrity is important.
 
-    3. Token Chunking: Divides text based on approximate token counts without
-       special consideration for semantic boundaries. Provides the most precise
+    3. Token Chunking: Divides text based on token counts without special
+       consideration for semantic boundaries. Provides the most precise
        control over chunk size for token-limited systems.
 
+    The chunking itself is done by ``TextChunker`` (see services/chunking.py),
+    which works on numpy arrays of token offsets and slices the input instead
+    of re-joining words. Documents larger than ``inline_chunk_chars`` are
+    chunked in a shared process pool so the event loop is not blocked.
+
     Each method implements configurable overlap between chunks to maintain
     context across chunk boundaries, ensuring information isn't lost when a
     concept spans multiple chunks.
@@ -87,6 +96,10 @@ class DocumentProcessor:
         if getattr(self, "_initialized", False):
             return
 
+        # Larger documents are chunked in worker processes
+        self.inline_chunk_chars = 200_000
+        self.chunk_workers = min(4, os.cpu_count() or 1)
+
         logger.info("Document processor initialized", extra={"emoji_key": "success"})
         self._initialized = True
 
@@ -130,7 +143,7 @@ class DocumentProcessor:
 
         Args:
             document: Text content to be chunked
-            chunk_size: Target size of each chunk in approximate tokens (default: 1000)
+            chunk_size: Target size of each chunk in tokens (default: 1000)
             chunk_overlap: Number of tokens to overlap between chunks (default: 200)
             method: Chunking strategy to use ("token", "sentence", or "semantic")
 
@@ -139,9 +152,10 @@ class DocumentProcessor:
 
         Note:
             Returns an empty list if the input document is empty or None.
-            The token estimation is approximate and based on whitespace splitting,
-            not a true tokenizer, so actual token counts may differ when processed
-            by specific models.
+            Tokens are counted with tiktoken's cl100k_base encoding; when the
+            encoding cannot be loaded (it is downloaded on first use) they fall
+            back to whitespace-separated words. Documents longer than
+            ``inline_chunk_chars`` are chunked in the shared process pool.
         """
         if not document:
             return []
@@ -151,6 +165,19 @@ class DocumentProcessor:
             extra={"emoji_key": "processing"},
         )
 
+        if len(document) > self.inline_chunk_chars:
+            try:
+                pool = get_chunking_pool(self.chunk_workers)
+                chunks = await asyncio.get_running_loop().run_in_executor(
+                    pool, chunk_texts, [document], chunk_size, chunk_overlap, method
+                )
+                return chunks[0]
+            except Exception as e:
+                logger.warning(
+                    f"Process pool chunking failed ({str(e)}); chunking on the event loop",
+                    extra={"emoji_key": "warning"},
+                )
+
         if method == "semantic":
             return await self._chunk_semantic(document, chunk_size, chunk_overlap)
         elif method == "sentence":
@@ -208,31 +235,7 @@ class DocumentProcessor:
             requiring exact token counts, consider using the model's specific
             tokenizer for more accurate size estimates.
         """
-        # Simple token estimation (split by whitespace)
-        words = document.split()
-
-        # No words, return empty list
-        if not words:
-            return []
-
-        # Simple chunking
-        chunks = []
-        start = 0
-
-        while start < len(words):
-            # Calculate end position with potential overlap
-            end = min(start + chunk_size, len(words))
-
-            # Create chunk
-            chunk = " ".join(words[start:end])
-            chunks.append(chunk)
-
-            # Move to next chunk with overlap
-            start = end - chunk_overlap
-
-            # Avoid getting stuck at the end
-            if start >= len(words) - chunk_overlap:
-                break
+        chunks = TextChunker(chunk_size, chunk_overlap, "token").chunk(document)
 
         logger.debug(
             f"Split document into {len(chunks)} chunks by token", extra={"emoji_key": "processing"}
@@ -290,52 +293,7 @@ class DocumentProcessor:
             For specialized text with unusual punctuation patterns, additional
             customization may be needed.
         """
-        # Simple sentence splitting (not perfect but works for most cases)
-        sentence_delimiters = r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s"
-        sentences = re.split(sentence_delimiters, document)
-        sentences = [s.strip() for s in sentences if s.strip()]
-
-        # No sentences, return empty list
-        if not sentences:
-            return []
-
-        # Chunk by sentences, trying to reach target size
-        chunks = []
-        current_chunk = []
-        current_size = 0
-
-        for sentence in sentences:
-            # Estimate size in tokens (approximate)
-            sentence_size = len(sentence.split())
-
-            # If adding this sentence exceeds the chunk size and we have content,
-            # finalize the current chunk
-            if current_chunk and current_size + sentence_size > chunk_size:
-                chunks.append(" ".join(current_chunk))
-
-                # Start new chunk with overlap
-                overlap_size = 0
-                overlap_chunk = []
-
-                # Add sentences from the end of previous chunk for overlap
-                for s in reversed(current_chunk):
-                    s_size = len(s.split())
-                    if overlap_size + s_size <= chunk_overlap:
-                        overlap_chunk.insert(0, s)
-                        overlap_size += s_size
-                    else:
-                        break
-
-                current_chunk = overlap_chunk
-                current_size = overlap_size
-
-            # Add current sentence
-            current_chunk.append(sentence)
-            current_size += sentence_size
-
-        # Add the last chunk if not empty
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        chunks = TextChunker(chunk_size, chunk_overlap, "sentence").chunk(document)
 
         logger.debug(
             f"Split document into {len(chunks)} chunks by sentence",
@@ -392,60 +350,7 @@ class DocumentProcessor:
             as maintaining coherent paragraph groups takes precedence over exact
             size enforcement. For strict size control, use token-based chunking.
         """
-        # For simplicity, this implementation is similar to sentence chunking
-        # but with paragraph awareness
-
-        # Split by paragraphs first
-        paragraphs = [p.strip() for p in document.split("\n\n") if p.strip()]
-
-        # Fallback to sentence chunking if no clear paragraphs
-        if len(paragraphs) <= 1:
-            return await self._chunk_by_sentence(document, chunk_size, chunk_overlap)
-
-        # Process each paragraph and create semantic chunks
-        chunks = []
-        current_chunk = []
-        current_size = 0
-
-        for paragraph in paragraphs:
-            # Estimate size in tokens
-            paragraph_size = len(paragraph.split())
-
-            # If paragraph is very large, chunk it further
-            if paragraph_size > chunk_size:
-                # Add current chunk if not empty
-                if current_chunk:
-                    chunks.append("\n\n".join(current_chunk))
-                    current_chunk = []
-                    current_size = 0
-
-                # Chunk large paragraph by sentences
-                paragraph_chunks = await self._chunk_by_sentence(
-                    paragraph, chunk_size, chunk_overlap
-                )
-                chunks.extend(paragraph_chunks)
-                continue
-
-            # If adding this paragraph exceeds the chunk size and we have content,
-            # finalize the current chunk
-            if current_chunk and current_size + paragraph_size > chunk_size:
-                chunks.append("\n\n".join(current_chunk))
-
-                # Start new chunk with last paragraph for better context
-                if current_chunk[-1] != paragraph and len(current_chunk) > 0:
-                    current_chunk = [current_chunk[-1]]
-                    current_size = len(current_chunk[-1].split())
-                else:
-                    current_chunk = []
-                    current_size = 0
-
-            # Add current paragraph
-            current_chunk.append(paragraph)
-            current_size += paragraph_size
-
-        # Add the last chunk if not empty
-        if current_chunk:
-            chunks.append("\n\n".join(current_chunk))
+        chunks = TextChunker(chunk_size, chunk_overlap, "semantic").chunk(document)
 
         logger.debug(
             f"Split document into {len(chunks)} chunks semantically",
@@ -454,6 +359,75 @@ class DocumentProcessor:
 
         return chunks
 
+    def iter_chunks(
+        self,
+        source: Union[str, TextIO],
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        method: str = "token",
+    ) -> Iterator[str]:
+        """
+        Stream chunks of a document or a text file without loading it whole.
+
+        The input is read in blocks and chunks are yielded as soon as they are
+        complete, producing the same chunks as ``chunk_document`` on the whole
+        text. This runs synchronously; iterate it in a worker thread or process
+        when called from async code.
+
+        Args:
+            source: Text, or a file-like object opened in text mode
+            chunk_size: Target size of each chunk in tokens
+            chunk_overlap: Number of tokens to overlap between chunks
+            method: Chunking strategy to use ("token", "sentence", or "semantic")
+
+        Yields:
+            Chunks in document order
+        """
+        return TextChunker(chunk_size, chunk_overlap, method).iter_chunks(source)
+
+    async def chunk_documents(
+        self,
+        documents: List[str],
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        method: str = "token",
+        docs_per_task: int = 32,
+    ) -> List[List[str]]:
+        """
+        Chunk a batch of documents in the shared process pool.
+
+        Documents are sent to worker processes ``docs_per_task`` at a time;
+        batches smaller than ``inline_chunk_chars`` in total are chunked inline,
+        where process start-up and pickling would dominate.
+
+        Args:
+            documents: Texts to chunk
+            chunk_size: Target size of each chunk in tokens
+            chunk_overlap: Number of tokens to overlap between chunks
+            method: Chunking strategy to use ("token", "sentence", or "semantic")
+            docs_per_task: Documents per worker task
+
+        Returns:
+            One list of chunks per input document, in input order
+        """
+        if sum(len(document) for document in documents) <= self.inline_chunk_chars:
+            return chunk_texts(documents, chunk_size, chunk_overlap, method)
+
+        loop = asyncio.get_running_loop()
+        pool = get_chunking_pool(self.chunk_workers)
+        tasks = [
+            loop.run_in_executor(
+                pool,
+                chunk_texts,
+                documents[i : i + docs_per_task],
+                chunk_size,
+                chunk_overlap,
+                method,
+            )
+            for i in range(0, len(documents), docs_per_task)
+        ]
+        return [chunks for group in await asyncio.gather(*tasks) for chunks in group]
+
 
 # Singleton instance
 _document_processor = None
@@ -0,0 +1,315 @@
+"""Two-level answer cache for retrieval-augmented generation."""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ultimate_mcp_server.services.cache import get_cache_service
+from ultimate_mcp_server.services.vector import get_embedding_service
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class _QueryBucket:
+    """Unit-normalized embeddings of answered queries sharing one request configuration."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.matrix: Optional[np.ndarray] = None
+        self.count = 0
+        self.answer_keys: List[str] = []
+
+    def add(self, vector: np.ndarray, answer_key: str) -> None:
+        if self.matrix is None:
+            self.matrix = np.empty((16, len(vector)), dtype=np.float32)
+        elif self.count == self.max_entries:
+            # Forget the older half
+            keep = self.count // 2
+            self.matrix[:keep] = self.matrix[self.count - keep : self.count]
+            self.answer_keys = self.answer_keys[-keep:]
+            self.count = keep
+        if self.count == len(self.matrix):
+            matrix = np.empty(
+                (min(2 * self.count, self.max_entries), self.matrix.shape[1]), np.float32
+            )
+            matrix[: self.count] = self.matrix
+            self.matrix = matrix
+        self.matrix[self.count] = vector
+        self.answer_keys.append(answer_key)
+        self.count += 1
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self.count:
+            return None, 0.0
+        similarities = self.matrix[: self.count] @ vector
+        best = int(np.argmax(similarities))
+        return self.answer_keys[best], float(similarities[best])
+
+
+class RAGAnswerCache:
+    """Caches RAG answers by query similarity and by retrieved context.
+
+    Level one matches the embedding of an incoming query against previously
+    answered queries of the same knowledge base and request configuration, so
+    rephrasings of a question skip retrieval and generation. Level two keys
+    answers on the retrieved chunks (IDs and content hashes) plus everything
+    that shapes the prompt and the completion, so a question that retrieves
+    the same context reuses the answer and only generation is skipped.
+
+    Answers live in the shared cache service under their level-two key; level
+    one only holds pointers to those keys and is dropped whenever a knowledge
+    base changes, while level-two keys stay valid because they hash the chunk
+    content itself.
+    """
+
+    def __init__(
+        self,
+        cache_service=None,
+        similarity_threshold: float = 0.95,
+        max_queries_per_kb: int = 4096,
+        ttl: int = 86400,
+    ):
+        """Initialize the answer cache.
+
+        Args:
+            cache_service: Cache service holding the answers (shared service if None)
+            similarity_threshold: Minimum cosine similarity for a level-one hit
+            max_queries_per_kb: Query embeddings kept per knowledge base and configuration
+            ttl: Answer lifetime in seconds
+        """
+        self.cache_service = cache_service or get_cache_service()
+        self.similarity_threshold = similarity_threshold
+        self.max_queries_per_kb = max_queries_per_kb
+        self.ttl = ttl
+        self._buckets: Dict[str, Dict[str, _QueryBucket]] = {}  # KB -> request key -> bucket
+        self._versions: Dict[str, int] = {}
+
+        # Statistics
+        self.lookups = 0
+        self.query_hits = 0
+        self.context_hits = 0
+        self.time_saved = 0.0
+
+    def version(self, kb_name: str) -> int:
+        """Get the change counter of a knowledge base.
+
+        Callers take it before retrieving and pass it back when storing, so an
+        answer computed while the knowledge base changed is not indexed.
+        """
+        return self._versions.get(kb_name, 0)
+
+    def invalidate(self, kb_name: str) -> None:
+        """Forget level-one entries of a knowledge base after it changed.
+
+        Args:
+            kb_name: Knowledge base name
+        """
+        self._versions[kb_name] = self.version(kb_name) + 1
+        self._buckets.pop(kb_name, None)
+
+    @staticmethod
+    def request_key(params: Dict[str, Any]) -> str:
+        """Key the request configuration a level-one match must share.
+
+        Args:
+            params: Request parameters other than the query
+
+        Returns:
+            Configuration key
+        """
+        return _digest(params)
+
+    @staticmethod
+    def context_key(
+        kb_name: str,
+        results: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        query: Optional[str] = None,
+    ) -> str:
+        """Key an answer on its retrieved context and generation parameters.
+
+        Args:
+            kb_name: Knowledge base name
+            results: Retrieved chunks with ``id`` and ``document``
+            params: Generation parameters (provider, model, template text, ...)
+            query: Query text, for templates whose prompt contains it
+
+        Returns:
+            Cache key for the answer
+        """
+        chunks = sorted(
+            (result["id"], hashlib.blake2b(result["document"].encode(), digest_size=8).hexdigest())
+            for result in results
+        )
+        normalized_query = " ".join(query.lower().split()) if query is not None else None
+        return "rag_answer:" + _digest([kb_name, chunks, params, normalized_query])
+
+    async def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query for level-one lookups.
+
+        The retriever embeds the same text right after, which the embedding
+        service then serves from its cache.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Unit-normalized embedding, or None if embedding failed
+        """
+        try:
+            embedding = (await get_embedding_service().create_embeddings([query]))[0]
+        except Exception as e:
+            logger.error(
+                f"Error embedding query for answer cache: {str(e)}", extra={"emoji_key": "error"}
+            )
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    async def _get_answer(self, answer_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.cache_service.get(answer_key, fuzzy=False)
+        except Exception as e:
+            logger.error(f"Error checking cache: {str(e)}", extra={"emoji_key": "error"})
+            return None
+
+    async def get_by_query(
+        self, kb_name: str, query_vector: Optional[np.ndarray], request_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """Level one: find the answer of a sufficiently similar earlier query.
+
+        Args:
+            kb_name: Knowledge base name
+            query_vector: Embedding from ``embed_query``
+            request_key: Key from ``request_key``
+
+        Returns:
+            Cached response or None
+        """
+        self.lookups += 1
+        bucket = self._buckets.get(kb_name, {}).get(request_key)
+        if bucket is None or query_vector is None:
+            return None
+        answer_key, similarity = bucket.nearest(query_vector)
+        if answer_key is None or similarity < self.similarity_threshold:
+            return None
+        return await self._get_answer(answer_key)
+
+    async def get_by_context(self, answer_key: str) -> Optional[Dict[str, Any]]:
+        """Level two: find the answer generated for the same context and parameters.
+
+        Args:
+            answer_key: Key from ``context_key``
+
+        Returns:
+            Cached response or None
+        """
+        return await self._get_answer(answer_key)
+
+    def remember_query(
+        self,
+        kb_name: str,
+        version: int,
+        query_vector: Optional[np.ndarray],
+        request_key: str,
+        answer_key: str,
+    ) -> None:
+        """Point a query embedding at a cached answer.
+
+        Args:
+            kb_name: Knowledge base name
+            version: ``version(kb_name)`` taken before retrieval
+            query_vector: Embedding from ``embed_query``
+            request_key: Key from ``request_key``
+            answer_key: Key the answer is stored under
+        """
+        if query_vector is None or version != self.version(kb_name):
+            return
+        buckets = self._buckets.setdefault(kb_name, {})
+        bucket = buckets.get(request_key)
+        if bucket is None:
+            bucket = buckets[request_key] = _QueryBucket(self.max_queries_per_kb)
+        bucket.add(query_vector, answer_key)
+
+    async def put(
+        self,
+        kb_name: str,
+        version: int,
+        query_vector: Optional[np.ndarray],
+        request_key: str,
+        answer_key: str,
+        response: Dict[str, Any],
+    ) -> None:
+        """Store an answer at both levels.
+
+        Args:
+            kb_name: Knowledge base name
+            version: ``version(kb_name)`` taken before retrieval
+            query_vector: Embedding from ``embed_query``
+            request_key: Key from ``request_key``
+            answer_key: Key from ``context_key``
+            response: Response to cache
+        """
+        try:
+            await self.cache_service.set(answer_key, response, ttl=self.ttl)
+        except Exception as e:
+            logger.error(f"Error caching response: {str(e)}", extra={"emoji_key": "error"})
+            return
+        self.remember_query(kb_name, version, query_vector, request_key, answer_key)
+
+    def record_hit(self, level: str, seconds_saved: float) -> None:
+        """Count a cache hit and the time it saved.
+
+        Args:
+            level: "query" or "context"
+            seconds_saved: Estimated time saved
+        """
+        if level == "query":
+            self.query_hits += 1
+        else:
+            self.context_hits += 1
+        self.time_saved += max(0.0, seconds_saved)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit ratios and time saved.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        hits = self.query_hits + self.context_hits
+        return {
+            "lookups": self.lookups,
+            "query_hits": self.query_hits,
+            "context_hits": self.context_hits,
+            "hit_ratio": hits / self.lookups if self.lookups else 0.0,
+            "time_saved": self.time_saved,
+            "indexed_queries": sum(
+                bucket.count for buckets in self._buckets.values() for bucket in buckets.values()
+            ),
+        }
+
+
+# Singleton instance
+_rag_answer_cache = None
+
+
+def get_rag_answer_cache() -> RAGAnswerCache:
+    """Get or create a RAG answer cache instance.
+
+    Returns:
+        RAGAnswerCache: RAG answer cache instance
+    """
+    global _rag_answer_cache
+
+    if _rag_answer_cache is None:
+        _rag_answer_cache = RAGAnswerCache()
+
+    return _rag_answer_cache
@@ -1,9 +1,13 @@
 """Feedback and adaptive learning service for RAG."""
 
+import asyncio
+import atexit
 import json
+import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 
@@ -13,14 +17,219 @@ from ultimate_mcp_server.utils import get_logger
 logger = get_logger(__name__)
 
 
+class _QueryEmbeddingIndex:
+    """Embeddings of previously seen queries of one knowledge base.
+
+    Unit-normalized rows live in a capacity-doubling float32 matrix, so finding
+    similar queries is one matrix-vector product. Rows are appended to
+    ``<name>.f32`` and their keys to ``<name>.keys`` (one JSON string per line);
+    a torn trailing row is dropped on load. ``<name>.json`` records the
+    embedding model, and the index starts over when the model changes.
+
+    ``add`` updates the in-memory matrix and ``write`` appends the same rows to
+    the files, so callers can run the file I/O on a worker thread.
+    """
+
+    def __init__(self, base_path: Path, model_name: str):
+        self.base_path = base_path
+        self.model_name = model_name
+        self.meta_file = base_path.with_suffix(".json")
+        self.vectors_file = base_path.with_suffix(".f32")
+        self.keys_file = base_path.with_suffix(".keys")
+        self.keys: List[str] = []
+        self.key_to_row: Dict[str, int] = {}
+        self.dim: Optional[int] = None
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_row
+
+    def _load(self) -> None:
+        if not self.meta_file.exists():
+            return
+        meta = json.loads(self.meta_file.read_text())
+        if meta.get("model") != self.model_name:
+            self.discard_files(self.base_path)
+            return
+
+        self.dim = int(meta["dim"])
+        keys = []
+        if self.keys_file.exists():
+            keys = [json.loads(line) for line in self.keys_file.read_text().splitlines() if line]
+        raw = np.fromfile(self.vectors_file, dtype=np.float32) if self.vectors_file.exists() else []
+        rows = min(len(keys), len(raw) // self.dim)
+        if rows < len(keys) or len(raw) != rows * self.dim:
+            # Drop a partially written trailing row
+            keys = keys[:rows]
+            with open(self.vectors_file, "r+b") as f:
+                f.truncate(rows * self.dim * 4)
+            self.keys_file.write_text("".join(json.dumps(key) + "\n" for key in keys))
+
+        self._matrix = np.array(raw[: rows * self.dim], dtype=np.float32).reshape(rows, self.dim)
+        self.keys = keys
+        self.key_to_row = {key: row for row, key in enumerate(keys)}
+
+    @staticmethod
+    def discard_files(base_path: Path) -> None:
+        """Delete the files of an index, which then starts over empty."""
+        for suffix in (".json", ".f32", ".keys"):
+            base_path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def add(self, keys: List[str], vectors: np.ndarray) -> np.ndarray:
+        """Append query embeddings in memory.
+
+        Args:
+            keys: Query keys
+            vectors: (len(keys), dim) embeddings
+
+        Returns:
+            The normalized rows, to be persisted with ``write``
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+
+        count = len(self.keys)
+        needed = count + len(keys)
+        if needed > len(self._matrix):
+            matrix = np.empty((max(64, 2 * len(self._matrix), needed), self.dim), np.float32)
+            matrix[:count] = self._matrix[:count]
+            self._matrix = matrix
+        self._matrix[count:needed] = vectors
+        self.keys.extend(keys)
+        for row, key in enumerate(keys, start=count):
+            self.key_to_row[key] = row
+        return vectors
+
+    def write(self, keys: List[str], vectors: np.ndarray) -> None:
+        """Append rows returned by ``add`` to the index files.
+
+        Args:
+            keys: Query keys
+            vectors: Normalized rows returned by ``add``
+        """
+        if not self.meta_file.exists():
+            self.meta_file.write_text(json.dumps({"model": self.model_name, "dim": self.dim}))
+        with open(self.vectors_file, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.keys_file, "a") as f:
+            f.write("".join(json.dumps(key) + "\n" for key in keys))
+
+    def search(self, vector: np.ndarray, top_k: int, threshold: float) -> List[Tuple[str, float]]:
+        """Find the stored queries most similar to an embedding.
+
+        Args:
+            vector: Query embedding
+            top_k: Maximum number of results
+            threshold: Minimum cosine similarity
+
+        Returns:
+            (key, similarity) pairs, most similar first
+        """
+        if not self.keys or top_k <= 0:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return []
+        similarities = self._matrix[: len(self.keys)] @ (vector / norm)
+        candidates = np.flatnonzero(similarities >= threshold)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-similarities[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        return [(self.keys[row], float(similarities[row])) for row in candidates]
+
+
+# In-memory feedback tables persisted as rows of the feedback store
+_FEEDBACK_TABLES = ("document_feedback", "query_feedback", "retrieval_stats")
+
+
+class _FeedbackStore:
+    """SQLite persistence for feedback rows.
+
+    Each row is one entry of one feedback table (a document's feedback, a
+    query's stats, ...) stored as JSON and keyed by (table, knowledge base,
+    key), so recording feedback upserts only the rows it touched. The
+    connection is shared between the event loop and writer threads and
+    guarded by a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS feedback ("
+            "tbl TEXT NOT NULL, kb TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (tbl, kb, key))"
+        )
+        self._conn.commit()
+
+    def load(self, kb_name: str) -> Dict[str, Dict[str, Any]]:
+        """Read all feedback rows of a knowledge base.
+
+        Args:
+            kb_name: Knowledge base name
+
+        Returns:
+            Table name -> key -> row data
+        """
+        tables: Dict[str, Dict[str, Any]] = {table: {} for table in _FEEDBACK_TABLES}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tbl, key, data FROM feedback WHERE kb = ?", (kb_name,)
+            ).fetchall()
+        for table, key, data in rows:
+            tables.setdefault(table, {})[key] = json.loads(data)
+        return tables
+
+    def upsert(self, rows: List[Tuple[str, str, str, str]]) -> None:
+        """Insert or replace rows in one transaction.
+
+        Args:
+            rows: (table, knowledge base, key, JSON data) tuples
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO feedback (tbl, kb, key, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (tbl, kb, key) DO UPDATE SET data = excluded.data",
+                rows,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class RAGFeedbackService:
-    """Service for collecting and utilizing feedback for RAG."""
+    """Service for collecting and utilizing feedback for RAG.
+
+    Feedback is kept in memory per knowledge base, loaded on first use, and
+    written to a SQLite store by a background writer that batches the rows
+    changed since its last flush.
+    """
 
-    def __init__(self, storage_dir: Optional[str] = None):
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        flush_interval: float = 1.0,
+        flush_batch_size: int = 500,
+    ):
         """Initialize the feedback service.
 
         Args:
             storage_dir: Directory to store feedback data
+            flush_interval: Seconds changed rows may wait before being written
+            flush_batch_size: Number of changed rows that triggers an immediate write
         """
         if storage_dir:
             self.storage_dir = Path(storage_dir)
@@ -34,9 +243,19 @@ class RAGFeedbackService:
         self.document_feedback = {}  # Knowledge base -> document_id -> feedback
         self.query_feedback = {}  # Knowledge base -> query -> feedback
         self.retrieval_stats = {}  # Knowledge base -> document_id -> usage stats
-
-        # Load existing feedback data
-        self._load_feedback_data()
+        self._query_indexes: Dict[str, _QueryEmbeddingIndex] = {}
+        self._query_index_lock = asyncio.Lock()  # Serializes adding missing queries
+
+        # Persistence: knowledge bases are loaded lazily, changed rows written in batches
+        self._store = _FeedbackStore(self.storage_dir / "feedback.db")
+        self._loaded_kbs: Set[str] = set()
+        self._dirty: Dict[Tuple[str, str, str], None] = {}  # Ordered set of changed rows
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._batch_full: Optional[asyncio.Future] = None  # Cuts a pending flush delay short
+        atexit.register(self._flush_sync)
 
         # Get embedding service for similarity calculations
         self.embedding_service = get_embedding_service()
@@ -53,7 +272,7 @@ class RAGFeedbackService:
         logger.info("RAG feedback service initialized", extra={"emoji_key": "success"})
 
     def _get_feedback_file(self, kb_name: str) -> Path:
-        """Get path to feedback file for a knowledge base.
+        """Get path to the JSON feedback file earlier versions wrote for a knowledge base.
 
         Args:
             kb_name: Knowledge base name
@@ -63,62 +282,144 @@ class RAGFeedbackService:
         """
         return self.storage_dir / f"{kb_name}_feedback.json"
 
-    def _load_feedback_data(self):
-        """Load feedback data from storage."""
-        try:
-            # Load all feedback files
-            for file_path in self.storage_dir.glob("*_feedback.json"):
-                try:
-                    kb_name = file_path.stem.replace("_feedback", "")
+    def _load_feedback_data(self, kb_name: str) -> None:
+        """Load feedback data of a knowledge base on first use.
 
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
+        Feedback written by earlier versions to ``<kb>_feedback.json`` is
+        imported into the store once and the file renamed to
+        ``<kb>_feedback.json.migrated``.
 
-                    self.document_feedback[kb_name] = data.get("document_feedback", {})
-                    self.query_feedback[kb_name] = data.get("query_feedback", {})
-                    self.retrieval_stats[kb_name] = data.get("retrieval_stats", {})
+        Args:
+            kb_name: Knowledge base name
+        """
+        if kb_name in self._loaded_kbs:
+            return
+        self._loaded_kbs.add(kb_name)
 
-                    logger.debug(
-                        f"Loaded feedback data for knowledge base '{kb_name}'",
-                        extra={"emoji_key": "cache"},
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error loading feedback data from {file_path}: {str(e)}",
-                        extra={"emoji_key": "error"},
-                    )
+        try:
+            tables = self._store.load(kb_name)
+            legacy_file = self._get_feedback_file(kb_name)
+            if not any(tables.values()) and legacy_file.exists():
+                with open(legacy_file, "r") as f:
+                    data = json.load(f)
+                tables = {table: data.get(table, {}) for table in _FEEDBACK_TABLES}
+                self._store.upsert(
+                    [
+                        (table, kb_name, key, json.dumps(value))
+                        for table, rows in tables.items()
+                        for key, value in rows.items()
+                    ]
+                )
+                legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+                logger.info(
+                    f"Migrated feedback data for knowledge base '{kb_name}' to {self._store.db_path}",
+                    extra={"emoji_key": "cache"},
+                )
         except Exception as e:
-            logger.error(f"Error loading feedback data: {str(e)}", extra={"emoji_key": "error"})
+            logger.error(
+                f"Error loading feedback data for knowledge base '{kb_name}': {str(e)}",
+                extra={"emoji_key": "error"},
+            )
+            return
 
-    def _save_feedback_data(self, kb_name: str):
-        """Save feedback data to storage.
+        if any(tables.values()):
+            self.document_feedback[kb_name] = tables["document_feedback"]
+            self.query_feedback[kb_name] = tables["query_feedback"]
+            self.retrieval_stats[kb_name] = tables["retrieval_stats"]
+            logger.debug(
+                f"Loaded feedback data for knowledge base '{kb_name}'",
+                extra={"emoji_key": "cache"},
+            )
+
+    def _mark_dirty(self, table: str, kb_name: str, key: str) -> None:
+        """Queue a changed row for the background writer.
 
         Args:
+            table: Feedback table name
             kb_name: Knowledge base name
+            key: Row key within the table
         """
+        self._dirty[(table, kb_name, key)] = None
+        if len(self._dirty) >= self.flush_batch_size:
+            if self._batch_full is not None and not self._batch_full.done():
+                self._batch_full.set_result(None)
+        if self._flush_task is not None and not self._flush_task.done():
+            return
         try:
-            file_path = self._get_feedback_file(kb_name)
-
-            # Prepare data
-            data = {
-                "document_feedback": self.document_feedback.get(kb_name, {}),
-                "query_feedback": self.query_feedback.get(kb_name, {}),
-                "retrieval_stats": self.retrieval_stats.get(kb_name, {}),
-                "last_updated": time.time(),
-            }
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No running loop (e.g. called from sync code); written by the next flush
+            pass
 
-            # Save to file
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
+    async def _flush_later(self) -> None:
+        """Flush after ``flush_interval`` (or once a batch is full) until nothing is queued.
 
-            logger.debug(
-                f"Saved feedback data for knowledge base '{kb_name}'", extra={"emoji_key": "cache"}
-            )
+        Rows marked while a write is in progress find this task still running,
+        so it keeps going rather than leaving them for an unrelated later event.
+        """
+        failed = False
+        while self._dirty:
+            if failed:
+                await asyncio.sleep(self.flush_interval)
+            elif len(self._dirty) < self.flush_batch_size:
+                self._batch_full = asyncio.get_running_loop().create_future()
+                try:
+                    await asyncio.wait_for(self._batch_full, self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._batch_full = None
+            failed = not await self._flush()
+
+    def _take_dirty_rows(
+        self,
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str, str]]]:
+        """Detach the queued rows and serialize their current values."""
+        dirty, self._dirty = list(self._dirty), {}
+        tables = {
+            "document_feedback": self.document_feedback,
+            "query_feedback": self.query_feedback,
+            "retrieval_stats": self.retrieval_stats,
+        }
+        rows = []
+        for table, kb_name, key in dirty:
+            value = tables[table].get(kb_name, {}).get(key)
+            if value is not None:
+                rows.append((table, kb_name, key, json.dumps(value)))
+        return dirty, rows
+
+    async def flush(self) -> None:
+        """Write all changed feedback rows to the store.
+
+        Rows are serialized on the event loop (only the changed ones) and
+        written in one transaction in a worker thread.
+        """
+        await self._flush()
+
+    async def _flush(self) -> bool:
+        """Write all changed feedback rows, returning False if the write failed."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return True
+            dirty, rows = self._take_dirty_rows()
+            try:
+                await asyncio.to_thread(self._store.upsert, rows)
+                logger.debug(f"Saved {len(rows)} feedback rows", extra={"emoji_key": "cache"})
+                return True
+            except Exception as e:
+                logger.error(f"Error saving feedback data: {str(e)}", extra={"emoji_key": "error"})
+                for row in dirty:  # Retry with the next flush
+                    self._dirty.setdefault(row, None)
+                return False
+
+    def _flush_sync(self) -> None:
+        """Write pending rows at interpreter exit."""
+        if not self._dirty:
+            return
+        try:
+            self._store.upsert(self._take_dirty_rows()[1])
         except Exception as e:
-            logger.error(
-                f"Error saving feedback data for knowledge base '{kb_name}': {str(e)}",
-                extra={"emoji_key": "error"},
-            )
+            logger.error(f"Error saving feedback data: {str(e)}", extra={"emoji_key": "error"})
 
     async def record_retrieval_feedback(
         self,
@@ -140,6 +441,8 @@ class RAGFeedbackService:
         Returns:
             Feedback recording result
         """
+        self._load_feedback_data(knowledge_base_name)
+
         # Initialize structures if needed
         if knowledge_base_name not in self.document_feedback:
             self.document_feedback[knowledge_base_name] = {}
@@ -172,6 +475,7 @@ class RAGFeedbackService:
         # Update query stats
         self.query_feedback[knowledge_base_name][query_hash]["count"] += 1
         self.query_feedback[knowledge_base_name][query_hash]["last_used"] = time.time()
+        self._mark_dirty("query_feedback", knowledge_base_name, query_hash)
 
         # Process each retrieved document
         for doc in retrieved_documents:
@@ -190,6 +494,7 @@ class RAGFeedbackService:
 
             # Update document stats
             doc_feedback = self.document_feedback[knowledge_base_name][doc_id]
+            self._mark_dirty("document_feedback", knowledge_base_name, doc_id)
             doc_feedback["retrieved_count"] += 1
             doc_feedback["last_used"] = time.time()
 
@@ -222,9 +527,6 @@ class RAGFeedbackService:
                     doc_id
                 )
 
-        # Save feedback data
-        self._save_feedback_data(knowledge_base_name)
-
         logger.info(
             f"Recorded feedback for {len(retrieved_documents)} documents in knowledge base '{knowledge_base_name}'",
             extra={"emoji_key": "success"},
@@ -248,25 +550,59 @@ class RAGFeedbackService:
         Returns:
             Relevance boost factor
         """
-        if (
-            knowledge_base_name not in self.document_feedback
-            or document_id not in self.document_feedback[knowledge_base_name]
-        ):
-            return 0.0
-
-        # Get document feedback
-        doc_feedback = self.document_feedback[knowledge_base_name][document_id]
-
-        # Calculate time decay
-        time_since_last_use = time.time() - doc_feedback.get("last_used", 0)
-        time_decay = min(1.0, time_since_last_use / (86400 * 30))  # 30 days max decay
-
-        # Apply decay to adjustment
-        adjustment = doc_feedback["relevance_adjustment"] * (
-            1.0 - time_decay * self.feedback_weights["time_decay"]
-        )
+        boosts = await self.get_document_boosts(knowledge_base_name, [document_id])
+        return boosts[document_id]
+
+    async def get_document_boosts(
+        self, knowledge_base_name: str, document_ids: Iterable[str]
+    ) -> Dict[str, float]:
+        """Get relevance boosts for several documents at once.
+
+        Args:
+            knowledge_base_name: Knowledge base name
+            document_ids: Document IDs
+
+        Returns:
+            Document ID -> relevance boost factor (0.0 without feedback)
+        """
+        self._load_feedback_data(knowledge_base_name)
+        kb_feedback = self.document_feedback.get(knowledge_base_name, {})
+        now = time.time()
+        decay_weight = self.feedback_weights["time_decay"]
+
+        boosts = {}
+        for document_id in document_ids:
+            doc_feedback = kb_feedback.get(document_id)
+            if doc_feedback is None:
+                boosts[document_id] = 0.0
+                continue
+
+            # Calculate time decay (30 days max decay) and apply it to the adjustment
+            time_since_last_use = now - doc_feedback.get("last_used", 0)
+            time_decay = min(1.0, time_since_last_use / (86400 * 30))
+            boosts[document_id] = doc_feedback["relevance_adjustment"] * (
+                1.0 - time_decay * decay_weight
+            )
 
-        return adjustment
+        return boosts
+
+    def _get_query_index(self, kb_name: str) -> _QueryEmbeddingIndex:
+        """Get the query-embedding index of a knowledge base, loading it if needed."""
+        index = self._query_indexes.get(kb_name)
+        if index is None or index.model_name != self.embedding_service.model_name:
+            base_path = self.storage_dir / f"{kb_name}_queries"
+            model_name = self.embedding_service.model_name
+            try:
+                index = _QueryEmbeddingIndex(base_path, model_name)
+            except Exception as e:
+                logger.warning(
+                    f"Rebuilding unreadable query index of knowledge base '{kb_name}': {str(e)}",
+                    extra={"emoji_key": "warning"},
+                )
+                _QueryEmbeddingIndex.discard_files(base_path)
+                index = _QueryEmbeddingIndex(base_path, model_name)
+            self._query_indexes[kb_name] = index
+        return index
 
     async def get_similar_queries(
         self, knowledge_base_name: str, query: str, top_k: int = 3, threshold: float = 0.8
@@ -282,6 +618,7 @@ class RAGFeedbackService:
         Returns:
             List of similar queries with metadata
         """
+        self._load_feedback_data(knowledge_base_name)
         if knowledge_base_name not in self.query_feedback:
             return []
 
@@ -290,42 +627,46 @@ class RAGFeedbackService:
         if not query_feedback:
             return []
 
-        # Get embedding for the query
-        query_embedding = await self.embedding_service.get_embedding(query)
-
-        # Calculate similarity with all previous queries
-        similarities = []
-
-        for _query_hash, data in query_feedback.items():
-            try:
-                prev_query = data["query"]
-                prev_embedding = await self.embedding_service.get_embedding(prev_query)
-
-                # Calculate cosine similarity
-                similarity = np.dot(query_embedding, prev_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(prev_embedding)
-                )
-
-                if similarity >= threshold:
-                    similarities.append(
-                        {
-                            "query": prev_query,
-                            "similarity": float(similarity),
-                            "count": data["count"],
-                            "last_used": data["last_used"],
-                            "retrieved_docs": data["retrieved_docs"],
-                        }
+        # Embed the query together with any previous queries not yet indexed;
+        # every unique query is embedded once and its vector persisted
+        try:
+            index = self._get_query_index(knowledge_base_name)
+            if all(key in index for key in query_feedback):
+                embeddings = await self.embedding_service.create_embeddings([query])
+            else:
+                # Concurrent lookups would otherwise embed and append the same queries
+                async with self._query_index_lock:
+                    index = self._get_query_index(knowledge_base_name)
+                    missing = [key for key in query_feedback if key not in index]
+                    embeddings = await self.embedding_service.create_embeddings(
+                        [query] + [query_feedback[key]["query"] for key in missing]
                     )
-            except Exception as e:
-                logger.error(
-                    f"Error calculating similarity for query: {str(e)}",
-                    extra={"emoji_key": "error"},
-                )
+                    if missing:
+                        rows = index.add(missing, np.asarray(embeddings[1:], dtype=np.float32))
+                        await asyncio.to_thread(index.write, missing, rows)
+        except Exception as e:
+            logger.error(
+                f"Error embedding queries for similarity lookup: {str(e)}",
+                extra={"emoji_key": "error"},
+            )
+            return []
 
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x["similarity"], reverse=True)
+        similarities = []
+        for key, similarity in index.search(embeddings[0], top_k, threshold):
+            data = query_feedback.get(key)
+            if data is None:
+                continue
+            similarities.append(
+                {
+                    "query": data["query"],
+                    "similarity": similarity,
+                    "count": data["count"],
+                    "last_used": data["last_used"],
+                    "retrieved_docs": data["retrieved_docs"],
+                }
+            )
 
-        return similarities[:top_k]
+        return similarities
 
     async def apply_feedback_adjustments(
         self, knowledge_base_name: str, results: List[Dict[str, Any]], query: str
@@ -341,6 +682,7 @@ class RAGFeedbackService:
             Adjusted retrieval results
         """
         # Check if we have feedback data
+        self._load_feedback_data(knowledge_base_name)
         if knowledge_base_name not in self.document_feedback:
             return results
 
@@ -354,15 +696,18 @@ class RAGFeedbackService:
         for sq in similar_queries:
             similar_doc_ids.update(sq["retrieved_docs"])
 
+        # Look up document-specific boosts for the whole result list at once
+        boosts = await self.get_document_boosts(
+            knowledge_base_name, [result["id"] for result in results]
+        )
+
         # Apply boosts to results
         adjusted_results = []
 
         for result in results:
             doc_id = result["id"]
             score = result["score"]
-
-            # Apply document-specific boost
-            doc_boost = await self.get_document_boost(knowledge_base_name, doc_id)
+            doc_boost = boosts[doc_id]
 
             # Apply boost for documents from similar queries
             similar_query_boost = 0.05 if doc_id in similar_doc_ids else 0.0
@@ -0,0 +1,478 @@
+"""Streaming chunk-and-embed ingestion pipeline for knowledge bases."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ultimate_mcp_server.services.chunking import chunk_texts, get_chunking_pool
+from ultimate_mcp_server.services.document import get_document_processor
+from ultimate_mcp_server.services.knowledge_base.keyword_index import KeywordIndexService
+from ultimate_mcp_server.services.vector import VectorCollection, VectorDatabaseService
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+# A chunk on its way to the collection: (document index, chunk id, text, metadata)
+_ChunkItem = Tuple[int, str, str, Dict[str, Any]]
+
+
+def _document_ids(documents: List[str], ids: Optional[List[str]]) -> List[str]:
+    """Use the given IDs, or derive stable ones from content so a rerun maps to the same IDs."""
+    if ids is not None:
+        return list(ids)
+    seen: Dict[str, int] = {}
+    derived = []
+    for document in documents:
+        doc_id = "doc_" + hashlib.blake2b(document.encode("utf-8"), digest_size=8).hexdigest()
+        occurrence = seen.get(doc_id, 0)
+        seen[doc_id] = occurrence + 1
+        derived.append(doc_id if occurrence == 0 else f"{doc_id}_{occurrence}")
+    return derived
+
+
+def _to_ranges(indices: Set[int]) -> List[List[int]]:
+    """Compress a set of indices into sorted [start, end) ranges."""
+    ranges: List[List[int]] = []
+    for index in sorted(indices):
+        if ranges and ranges[-1][1] == index:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+    return ranges
+
+
+class IngestionProgress:
+    """Progress of one ingestion run, passed to progress callbacks."""
+
+    def __init__(self, knowledge_base_name: str, documents_total: int, documents_skipped: int):
+        self.knowledge_base_name = knowledge_base_name
+        self.documents_total = documents_total
+        self.documents_skipped = documents_skipped  # Completed by an earlier, interrupted run
+        self.documents_chunked = 0
+        self.documents_done = documents_skipped
+        self.chunks_added = 0
+        self.started_at = time.time()
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get progress as a dictionary.
+
+        Returns:
+            Dictionary of counters and throughput
+        """
+        elapsed = self.elapsed
+        processed = self.documents_done - self.documents_skipped
+        return {
+            "knowledge_base_name": self.knowledge_base_name,
+            "documents_total": self.documents_total,
+            "documents_done": self.documents_done,
+            "documents_skipped": self.documents_skipped,
+            "documents_chunked": self.documents_chunked,
+            "chunks_added": self.chunks_added,
+            "elapsed": elapsed,
+            "documents_per_second": processed / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class IngestionPipeline:
+    """
+    Streams documents through chunking, embedding and insertion.
+
+    Stages:
+    1. Chunking: batches of documents are split with ``DocumentProcessor`` in a
+       process pool (or inline for small inputs, where process start-up would
+       dominate). At most ``2 * chunk_workers`` batches are in flight.
+    2. A bounded queue of chunk batches connects chunking to embedding. When
+       embedding falls behind the queue fills up and chunking pauses, so memory
+       stays bounded no matter how many documents are ingested.
+    3. ``embed_concurrency`` consumers embed each batch with one call and
+       bulk-insert the vectors into the collection and the keyword index.
+
+    Progress is reported through an optional callback after every batch.
+
+    The collection and keyword index are written to disk (on a worker thread,
+    with inserts paused) at most every ``checkpoint_interval`` seconds, and only
+    once the chunks added since the last write at least match what that write
+    stored, so a run rewrites O(N) data in total rather than O(N) per interval.
+    Each write is followed by one line appended to a checkpoint journal with
+    the documents it made durable and the stored chunks of documents still in
+    progress. Re-running the same ingestion (same knowledge base, document IDs
+    and chunk settings) skips the completed documents and the stored chunks of
+    the others.
+    """
+
+    def __init__(
+        self,
+        vector_service: VectorDatabaseService,
+        keyword_index: KeywordIndexService,
+        checkpoint_dir: Optional[str] = None,
+        chunk_workers: Optional[int] = None,
+        docs_per_chunk_task: int = 32,
+        embed_batch_size: int = 256,
+        embed_concurrency: int = 2,
+        queue_size: int = 8,
+        inline_chunk_chars: int = 200_000,
+        checkpoint_interval: float = 30.0,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            vector_service: Vector database service holding the collections
+            keyword_index: Keyword index service kept in step with the collections
+            checkpoint_dir: Directory for resumable checkpoints
+            chunk_workers: Chunking processes (default: min(4, CPU count))
+            docs_per_chunk_task: Documents sent to a chunking process per task
+            embed_batch_size: Chunks per embedding call and bulk insert
+            embed_concurrency: Concurrent embedding/insert consumers
+            queue_size: Chunk batches buffered between chunking and embedding
+            inline_chunk_chars: Inputs smaller than this (in characters) are
+                chunked on the event loop instead of in the process pool
+            checkpoint_interval: Minimum seconds between checkpoints
+        """
+        self.vector_service = vector_service
+        self.keyword_index = keyword_index
+        if checkpoint_dir:
+            self.checkpoint_dir = Path(checkpoint_dir)
+        else:
+            self.checkpoint_dir = Path("storage") / "ingest_checkpoints"
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_workers = chunk_workers or min(4, os.cpu_count() or 1)
+        self.docs_per_chunk_task = docs_per_chunk_task
+        self.embed_batch_size = embed_batch_size
+        self.embed_concurrency = embed_concurrency
+        self.queue_size = queue_size
+        self.inline_chunk_chars = inline_chunk_chars
+        self.checkpoint_interval = checkpoint_interval
+
+    def _get_checkpoint_file(self, kb_name: str) -> Path:
+        return self.checkpoint_dir / f"{kb_name}.jsonl"
+
+    def _load_checkpoint(
+        self, kb_name: str, fingerprint: str
+    ) -> Optional[Tuple[Set[int], Dict[int, Set[int]]]]:
+        """Progress of an interrupted run, or None if there is none.
+
+        Returns:
+            Completed document indices, and the stored chunk indices of
+            documents that were in progress
+        """
+        file_path = self._get_checkpoint_file(kb_name)
+        if not file_path.exists():
+            return None
+        try:
+            with open(file_path, "r") as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+        except Exception as e:
+            logger.warning(
+                f"Ignoring unreadable ingestion checkpoint {file_path}: {str(e)}",
+                extra={"emoji_key": "warning"},
+            )
+            return None
+        if header.get("fingerprint") != fingerprint:
+            return None
+
+        done: Set[int] = set()
+        partial: Dict[int, Set[int]] = {}
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # Torn final append; the records before it still hold
+            done.update(index for start, end in record["done"] for index in range(start, end))
+            partial = {
+                int(doc_index): {index for start, end in ranges for index in range(start, end)}
+                for doc_index, ranges in record["partial"].items()
+            }
+        return done, partial
+
+    def _start_checkpoint(self, kb_name: str, fingerprint: str) -> None:
+        """Start an empty journal for a new run."""
+        file_path = self._get_checkpoint_file(kb_name)
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"fingerprint": fingerprint, "started_at": time.time()}) + "\n")
+        os.replace(tmp_path, file_path)
+
+    def _append_checkpoint(
+        self, kb_name: str, done: Set[int], partial: Dict[int, Set[int]]
+    ) -> None:
+        """Append the documents completed since the last record to the journal."""
+        record = {
+            "done": _to_ranges(done),
+            "partial": {str(doc_index): _to_ranges(rows) for doc_index, rows in partial.items()},
+            "updated_at": time.time(),
+        }
+        with open(self._get_checkpoint_file(kb_name), "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _chunk_group(
+        self, documents: List[str], chunk_size: int, chunk_overlap: int, method: str, inline: bool
+    ) -> List[List[str]]:
+        if not inline:
+            try:
+                pool = get_chunking_pool(self.chunk_workers)
+                return await asyncio.get_running_loop().run_in_executor(
+                    pool, chunk_texts, documents, chunk_size, chunk_overlap, method
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Process pool chunking failed ({str(e)}); chunking on the event loop",
+                    extra={"emoji_key": "warning"},
+                )
+        processor = get_document_processor()
+        return [
+            await processor.chunk_document(document, chunk_size, chunk_overlap, method)
+            for document in documents
+        ]
+
+    async def run(
+        self,
+        knowledge_base_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        chunk_method: str = "semantic",
+        progress_callback: Optional[Callable[[IngestionProgress], Any]] = None,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """Chunk, embed and insert documents into a knowledge base.
+
+        Each chunk is stored under the ID of its document when the document
+        yields a single chunk, and under ``"{document_id}_chunk_{i}"`` otherwise;
+        its metadata is the document metadata plus ``document_id`` and
+        ``chunk_index``.
+
+        Args:
+            knowledge_base_name: Knowledge base (collection) name
+            documents: Document texts
+            metadatas: Optional metadata per document
+            ids: Optional document IDs (derived from content if omitted)
+            chunk_size: Chunk size for document processing
+            chunk_overlap: Chunk overlap for document processing
+            chunk_method: Chunking method (token, sentence, semantic)
+            progress_callback: Optional callable (sync or async) receiving an
+                IngestionProgress after every inserted batch
+            resume: Whether to continue from a matching checkpoint
+
+        Returns:
+            Dictionary with document IDs, chunk counts and timing
+
+        Raises:
+            ValueError: If metadatas or ids do not match the number of documents
+        """
+        if metadatas is not None and len(metadatas) != len(documents):
+            raise ValueError(f"Got {len(metadatas)} metadatas for {len(documents)} documents")
+        if ids is not None and len(ids) != len(documents):
+            raise ValueError(f"Got {len(ids)} ids for {len(documents)} documents")
+
+        doc_ids = _document_ids(documents, ids)
+        fingerprint_source = json.dumps(
+            [knowledge_base_name, chunk_size, chunk_overlap, chunk_method, doc_ids]
+        )
+        fingerprint = hashlib.blake2b(fingerprint_source.encode("utf-8")).hexdigest()
+
+        checkpoint_state = (
+            self._load_checkpoint(knowledge_base_name, fingerprint) if resume else None
+        )
+        resuming = checkpoint_state is not None
+        done, stored_chunks = checkpoint_state or (set(), {})
+        pending = [i for i in range(len(documents)) if i not in done]
+        progress = IngestionProgress(knowledge_base_name, len(documents), len(done))
+        if resuming:
+            logger.info(
+                f"Resuming ingestion into '{knowledge_base_name}': "
+                f"{len(done)}/{len(documents)} documents already done",
+                extra={"emoji_key": "processing"},
+            )
+
+        inline = sum(len(documents[i]) for i in pending) < self.inline_chunk_chars
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        remaining_chunks: Dict[int, int] = {}
+        unrecorded: Set[int] = set()  # Done, but not yet in the journal
+        # Inserts and saves take turns, so a save on a worker thread sees no writes
+        write_lock = asyncio.Lock()
+        if not resuming:
+            # Record the run up front so a crash before the first checkpoint is resumable
+            self._start_checkpoint(knowledge_base_name, fingerprint)
+        last_checkpoint = time.monotonic()
+        collection = await self.vector_service.get_collection(knowledge_base_name)
+        saved_chunks = len(collection) if isinstance(collection, VectorCollection) else 0
+        unsaved_chunks = 0
+
+        def mark_done(doc_index: int) -> None:
+            done.add(doc_index)
+            unrecorded.add(doc_index)
+            stored_chunks.pop(doc_index, None)
+            progress.documents_done += 1
+
+        def save_indexes() -> None:
+            if not self.vector_service.save_collection(knowledge_base_name):
+                raise RuntimeError(f"Failed to save collection '{knowledge_base_name}'")
+            self.keyword_index.save(knowledge_base_name)
+
+        async def checkpoint(force: bool = False) -> None:
+            nonlocal last_checkpoint, saved_chunks, unsaved_chunks
+            if not force and (
+                time.monotonic() - last_checkpoint < self.checkpoint_interval
+                or unsaved_chunks < max(saved_chunks, self.embed_batch_size)
+            ):
+                return
+            async with write_lock:
+                # Flush data before recording it as done
+                await asyncio.to_thread(save_indexes)
+                saved_chunks += unsaved_chunks
+                unsaved_chunks = 0
+                self._append_checkpoint(knowledge_base_name, unrecorded, stored_chunks)
+                unrecorded.clear()
+                last_checkpoint = time.monotonic()
+
+        async def produce() -> None:
+            batch: List[_ChunkItem] = []
+            in_flight: deque = deque()
+
+            async def drain_one() -> None:
+                nonlocal batch
+                group, future = in_flight.popleft()
+                for doc_index, chunks in zip(group, await future, strict=True):
+                    progress.documents_chunked += 1
+                    if not chunks:
+                        mark_done(doc_index)
+                        continue
+                    stored = stored_chunks.get(doc_index, set())
+                    remaining_chunks[doc_index] = len(chunks) - len(stored)
+                    if not remaining_chunks[doc_index]:
+                        del remaining_chunks[doc_index]
+                        mark_done(doc_index)
+                        continue
+                    doc_id = doc_ids[doc_index]
+                    doc_metadata = metadatas[doc_index] if metadatas else None
+                    for chunk_index, chunk in enumerate(chunks):
+                        if chunk_index in stored:
+                            continue  # Saved by the interrupted run
+                        chunk_id = doc_id if len(chunks) == 1 else f"{doc_id}_chunk_{chunk_index}"
+                        metadata = {
+                            **(doc_metadata or {}),
+                            "document_id": doc_id,
+                            "chunk_index": chunk_index,
+                        }
+                        batch.append((doc_index, chunk_id, chunk, metadata))
+                        if len(batch) >= self.embed_batch_size:
+                            await queue.put(batch)  # Blocks while embedding is behind
+                            batch = []
+
+            for start in range(0, len(pending), self.docs_per_chunk_task):
+                group = pending[start : start + self.docs_per_chunk_task]
+                future = asyncio.ensure_future(
+                    self._chunk_group(
+                        [documents[i] for i in group],
+                        chunk_size,
+                        chunk_overlap,
+                        chunk_method,
+                        inline,
+                    )
+                )
+                in_flight.append((group, future))
+                if len(in_flight) >= 2 * self.chunk_workers:
+                    await drain_one()
+            while in_flight:
+                await drain_one()
+            if batch:
+                await queue.put(batch)
+
+        async def consume() -> None:
+            nonlocal unsaved_chunks
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                chunk_ids = [chunk_id for _, chunk_id, _, _ in batch]
+                texts = [text for _, _, text, _ in batch]
+                embeddings = await self.vector_service.embedding_service.create_embeddings(texts)
+
+                async with write_lock:
+                    if resuming:
+                        # Chunks written after the last checkpoint may have been
+                        # saved anyway; this only tombstones rows that exist
+                        collection = await self.vector_service.get_collection(knowledge_base_name)
+                        if collection is not None:
+                            collection.delete(ids=chunk_ids)
+                    await self.vector_service.add_texts(
+                        collection_name=knowledge_base_name,
+                        texts=texts,
+                        metadatas=[metadata for _, _, _, metadata in batch],
+                        ids=chunk_ids,
+                        embeddings=embeddings,
+                    )
+                    self.keyword_index.add_documents(
+                        knowledge_base_name, chunk_ids, texts, persist=False
+                    )
+
+                    progress.chunks_added += len(batch)
+                    unsaved_chunks += len(batch)
+                    for doc_index, _, _, metadata in batch:
+                        stored_chunks.setdefault(doc_index, set()).add(metadata["chunk_index"])
+                        remaining_chunks[doc_index] -= 1
+                        if remaining_chunks[doc_index] == 0:
+                            del remaining_chunks[doc_index]
+                            mark_done(doc_index)
+
+                if progress_callback is not None:
+                    outcome = progress_callback(progress)
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+                await checkpoint()
+
+        async def produce_then_stop() -> None:
+            await produce()
+            for _ in range(self.embed_concurrency):
+                await queue.put(None)
+
+        tasks = [asyncio.ensure_future(produce_then_stop())] + [
+            asyncio.ensure_future(consume()) for _ in range(self.embed_concurrency)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await checkpoint(force=True)
+            except Exception as e:
+                logger.error(
+                    f"Failed to checkpoint ingestion into '{knowledge_base_name}': {str(e)}",
+                    extra={"emoji_key": "error"},
+                )
+            raise
+
+        # Everything is in: flush once and forget the checkpoint
+        await asyncio.to_thread(save_indexes)
+        self._get_checkpoint_file(knowledge_base_name).unlink(missing_ok=True)
+
+        stats = progress.to_dict()
+        logger.info(
+            f"Ingested {len(pending)} documents ({progress.chunks_added} chunks) into "
+            f"'{knowledge_base_name}' in {stats['elapsed']:.2f}s "
+            f"({stats['documents_per_second']:.1f} docs/s)",
+            extra={"emoji_key": "success"},
+        )
+        return {
+            "ids": doc_ids,
+            "documents_added": len(pending),
+            "documents_skipped": progress.documents_skipped,
+            "chunks_created": progress.chunks_added,
+            "elapsed": stats["elapsed"],
+        }
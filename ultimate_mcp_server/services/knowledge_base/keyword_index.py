@@ -0,0 +1,493 @@
+"""BM25 keyword index for knowledge base hybrid retrieval."""
+
+import asyncio
+import atexit
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ultimate_mcp_server.services.knowledge_base.utils import STOP_WORDS
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens, dropping stop words.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens in document order
+    """
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """Incremental in-memory inverted index scored with Okapi BM25.
+
+    Each document gets a slot; postings map a term to the slots containing it
+    and the term frequency in each. Postings are appended to as documents are
+    added and turned into numpy arrays lazily on first use, so a query costs one
+    vectorized update per query term plus a top-k selection.
+
+    Removed (or replaced) documents are tombstoned: they stop matching
+    immediately, and their slots and postings are dropped once tombstones
+    outnumber live documents, or when the index is serialized.
+    """
+
+    # Compact once tombstoned slots outnumber live ones (and reach this count)
+    _COMPACT_MIN_DEAD = 256
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self._ids: List[Optional[str]] = []  # slot -> document id (None when removed)
+        self._id_to_slot: Dict[str, int] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._length_norm: Optional[np.ndarray] = None
+        self._dead: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._id_to_slot)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._id_to_slot
+
+    def _invalidate(self) -> None:
+        self._length_norm = None
+        self._dead = None
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """Index documents, replacing any already indexed under the same id.
+
+        Args:
+            ids: Document IDs
+            texts: Document texts
+
+        Raises:
+            ValueError: If ids and texts differ in length
+        """
+        if len(ids) != len(texts):
+            raise ValueError(f"Got {len(ids)} ids for {len(texts)} texts")
+
+        self.remove([doc_id for doc_id in ids if doc_id in self._id_to_slot])
+        for doc_id, text in zip(ids, texts, strict=True):
+            slot = len(self._ids)
+            counts = Counter(tokenize(text or ""))
+            self._ids.append(doc_id)
+            self._id_to_slot[doc_id] = slot
+            length = sum(counts.values())
+            self._lengths.append(length)
+            self._total_length += length
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = ([], [])
+                posting[0].append(slot)
+                posting[1].append(tf)
+                self._arrays.pop(term, None)
+        self._invalidate()
+
+    def remove(self, ids: List[str]) -> int:
+        """Remove documents from the index.
+
+        Args:
+            ids: Document IDs to remove
+
+        Returns:
+            Number of documents removed
+        """
+        removed = 0
+        for doc_id in ids:
+            slot = self._id_to_slot.pop(doc_id, None)
+            if slot is None:
+                continue
+            self._ids[slot] = None
+            self._total_length -= self._lengths[slot]
+            removed += 1
+        if removed:
+            self._invalidate()
+            dead = len(self._ids) - len(self._id_to_slot)
+            if dead >= self._COMPACT_MIN_DEAD and dead > len(self._id_to_slot):
+                self._compact()
+        return removed
+
+    def _compacted(
+        self,
+    ) -> Tuple[List[Optional[str]], List[int], Dict[str, Tuple[List[int], List[int]]]]:
+        """Slots, lengths and postings without removed documents, renumbered."""
+        remap = {}
+        ids, lengths = [], []
+        for slot, doc_id in enumerate(self._ids):
+            if doc_id is not None:
+                remap[slot] = len(ids)
+                ids.append(doc_id)
+                lengths.append(self._lengths[slot])
+
+        postings = {}
+        for term, (slots, tfs) in self._postings.items():
+            kept = [(remap[slot], tf) for slot, tf in zip(slots, tfs, strict=True) if slot in remap]
+            if kept:
+                postings[term] = ([slot for slot, _ in kept], [tf for _, tf in kept])
+        return ids, lengths, postings
+
+    def _compact(self) -> None:
+        """Drop removed documents' slots and postings."""
+        ids, lengths, postings = self._compacted()
+        self._ids = ids
+        self._id_to_slot = {doc_id: slot for slot, doc_id in enumerate(ids)}
+        self._lengths = lengths
+        self._postings = postings
+        self._arrays = {}
+        self._invalidate()
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self._postings.get(term)
+            if posting is None:
+                return None
+            arrays = (
+                np.asarray(posting[0], dtype=np.int64),
+                np.asarray(posting[1], dtype=np.float32),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _norms(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-slot BM25 length normalization and the tombstone mask."""
+        if self._length_norm is None:
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            avg_length = self._total_length / max(len(self), 1) or 1.0
+            self._length_norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+            self._dead = np.fromiter(
+                (doc_id is None for doc_id in self._ids), dtype=bool, count=len(self._ids)
+            )
+        return self._length_norm, self._dead
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Score documents against a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+
+        Returns:
+            (document id, BM25 score) pairs, best first; only documents sharing
+            at least one term with the query are returned
+        """
+        terms = Counter(tokenize(query))
+        live = len(self)
+        if not terms or not live or top_k <= 0:
+            return []
+
+        length_norm, dead = self._norms()
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        for term, query_tf in terms.items():
+            arrays = self._term_arrays(term)
+            if arrays is None:
+                continue
+            slots, tfs = arrays
+            # Postings of removed documents linger until the next compaction,
+            # so the document frequency can overcount slightly in between
+            df = min(len(slots), live)
+            idf = math.log(1.0 + (live - df + 0.5) / (df + 0.5))
+            scores[slots] += (query_tf * idf) * tfs * (self.k1 + 1.0) / (tfs + length_norm[slots])
+        scores[dead] = 0.0
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self._ids[slot], float(scores[slot])) for slot in hits]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index, dropping removed documents.
+
+        Returns:
+            JSON-compatible representation
+        """
+        if len(self._ids) != len(self._id_to_slot):
+            ids, lengths, postings = self._compacted()
+        else:
+            ids, lengths, postings = self._ids, self._lengths, self._postings
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": list(ids),
+            "lengths": list(lengths),
+            "postings": {term: [list(slots), list(tfs)] for term, (slots, tfs) in postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        """Restore an index serialized with ``to_dict``.
+
+        Args:
+            data: Serialized index
+
+        Returns:
+            BM25Index instance
+        """
+        index = cls(k1=data.get("k1", 1.2), b=data.get("b", 0.75))
+        index._ids = list(data["ids"])
+        index._id_to_slot = {doc_id: slot for slot, doc_id in enumerate(index._ids)}
+        index._lengths = list(data["lengths"])
+        index._total_length = sum(index._lengths)
+        index._postings = {
+            term: (list(slots), list(tfs)) for term, (slots, tfs) in data["postings"].items()
+        }
+        return index
+
+
+class KeywordIndexService:
+    """Keeps one BM25 index per knowledge base, persisted as JSON files.
+
+    Changed indexes are written behind: additions mark the knowledge base
+    dirty and a background task rewrites its file at most every
+    ``flush_interval`` seconds, with the file I/O on a worker thread.
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None, flush_interval: float = 5.0):
+        """Initialize the keyword index service.
+
+        Args:
+            storage_dir: Directory to store keyword indexes
+            flush_interval: Seconds a changed index may wait before being written
+        """
+        if storage_dir:
+            self.storage_dir = Path(storage_dir)
+        else:
+            self.storage_dir = Path("storage") / "keyword_index"
+
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.indexes: Dict[str, BM25Index] = {}
+        self.flush_interval = flush_interval
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._builds: Dict[str, asyncio.Task] = {}  # Indexes being built from collections
+        atexit.register(self._flush_sync)
+
+    def _get_index_file(self, kb_name: str) -> Path:
+        return self.storage_dir / f"{kb_name}.json"
+
+    def get_index(self, kb_name: str) -> Optional[BM25Index]:
+        """Get the index of a knowledge base, loading it from disk if needed.
+
+        Args:
+            kb_name: Knowledge base name
+
+        Returns:
+            BM25Index, or None if the knowledge base has never been indexed
+        """
+        index = self.indexes.get(kb_name)
+        if index is None:
+            file_path = self._get_index_file(kb_name)
+            if not file_path.exists():
+                return None
+            try:
+                with open(file_path, "r") as f:
+                    index = BM25Index.from_dict(json.load(f))
+            except Exception as e:
+                logger.error(
+                    f"Error loading keyword index from {file_path}: {str(e)}",
+                    extra={"emoji_key": "error"},
+                )
+                return None
+            self.indexes[kb_name] = index
+        return index
+
+    async def ensure_index(self, kb_name: str, collection: Any) -> BM25Index:
+        """Get the index of a knowledge base, building it from its collection if missing.
+
+        Knowledge bases filled before keyword indexing existed have no index
+        yet; their documents are read back from the collection once, on a
+        worker thread. Concurrent callers share one build, and documents added
+        with ``add_documents`` while it runs are kept.
+
+        Args:
+            kb_name: Knowledge base name
+            collection: ChromaDB or local collection holding the documents
+
+        Returns:
+            BM25Index for the knowledge base
+        """
+        index = self.get_index(kb_name)
+        if index is not None:
+            return index
+        build = self._builds.get(kb_name)
+        if build is None:
+            build = asyncio.get_running_loop().create_task(self._build_index(kb_name, collection))
+            self._builds[kb_name] = build
+        # Concurrent callers share the build; a cancelled caller does not cancel it
+        return await asyncio.shield(build)
+
+    async def _build_index(self, kb_name: str, collection: Any) -> BM25Index:
+        """Build an index from a collection and install it, merging concurrent additions."""
+        build = asyncio.current_task()
+
+        def read() -> Tuple[List[str], List[str], BM25Index]:
+            stored = collection.get(include=["documents"])
+            ids, texts = list(stored["ids"]), list(stored["documents"] or [])
+            built = BM25Index()
+            built.add(ids, texts)
+            return ids, texts, built
+
+        try:
+            ids, texts, built = await asyncio.to_thread(read)
+        finally:
+            current = self._builds.get(kb_name) is build
+            if current:
+                del self._builds[kb_name]
+        if not current:
+            # Deleted while building; do not bring the index back
+            return built
+
+        index = self.indexes.get(kb_name)
+        if index is None:
+            index = self.indexes[kb_name] = built
+        else:
+            # add_documents created an index meanwhile; its documents are newer
+            missing = [i for i, doc_id in enumerate(ids) if doc_id not in index]
+            index.add([ids[i] for i in missing], [texts[i] for i in missing])
+        self._mark_dirty(kb_name)
+        logger.info(
+            f"Built keyword index for '{kb_name}' ({len(index)} documents)",
+            extra={"emoji_key": "processing"},
+        )
+        return index
+
+    def add_documents(
+        self, kb_name: str, ids: List[str], texts: List[str], persist: bool = True
+    ) -> None:
+        """Index documents of a knowledge base.
+
+        Args:
+            kb_name: Knowledge base name
+            ids: Document IDs
+            texts: Document texts
+            persist: Whether to queue a background write of the index; bulk
+                loaders pass False and call ``save`` at their own checkpoints
+        """
+        index = self.get_index(kb_name)
+        if index is None:
+            index = self.indexes[kb_name] = BM25Index()
+        index.add(ids, texts)
+        if persist:
+            self._mark_dirty(kb_name)
+
+    def _mark_dirty(self, kb_name: str) -> None:
+        """Queue a changed index for the background writer."""
+        self._dirty.add(kb_name)
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_later(self.flush_interval)
+            )
+        except RuntimeError:
+            # No running loop (e.g. called from sync code); written by the next flush
+            pass
+
+    async def _flush_later(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write every changed index to disk.
+
+        Indexes are serialized on the event loop, so writes cannot interleave
+        with the serialization, and written to disk in a worker thread.
+        """
+        async with self._flush_lock:
+            while self._dirty:
+                kb_name = self._dirty.pop()
+                index = self.indexes.get(kb_name)
+                if index is not None:
+                    data = index.to_dict()
+                    if not await asyncio.to_thread(self._write, kb_name, data):
+                        self._dirty.add(kb_name)  # Retry with the next flush
+                        break
+
+    def _flush_sync(self) -> None:
+        """Write pending indexes at interpreter exit."""
+        for kb_name in list(self._dirty):
+            self.save(kb_name)
+
+    def save(self, kb_name: str) -> None:
+        """Write the index of a knowledge base to disk atomically.
+
+        Args:
+            kb_name: Knowledge base name
+        """
+        index = self.indexes.get(kb_name)
+        if index is None:
+            return
+        self._dirty.discard(kb_name)
+        if not self._write(kb_name, index.to_dict()):
+            self._dirty.add(kb_name)
+
+    def _write(self, kb_name: str, data: Dict[str, Any]) -> bool:
+        file_path = self._get_index_file(kb_name)
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, file_path)
+            return True
+        except Exception as e:
+            logger.error(
+                f"Error saving keyword index for knowledge base '{kb_name}': {str(e)}",
+                extra={"emoji_key": "error"},
+            )
+            return False
+
+    def delete_index(self, kb_name: str) -> None:
+        """Drop the index of a knowledge base.
+
+        Args:
+            kb_name: Knowledge base name
+        """
+        self.indexes.pop(kb_name, None)
+        self._builds.pop(kb_name, None)
+        self._dirty.discard(kb_name)
+        self._get_index_file(kb_name).unlink(missing_ok=True)
+
+
+# Singleton instance
+_keyword_index_service = None
+
+
+def get_keyword_index_service() -> KeywordIndexService:
+    """Get or create a keyword index service instance.
+
+    Returns:
+        KeywordIndexService: Keyword index service instance
+    """
+    global _keyword_index_service
+
+    if _keyword_index_service is None:
+        _keyword_index_service = KeywordIndexService()
+
+    return _keyword_index_service
@@ -1,8 +1,14 @@
 """Knowledge base manager for RAG functionality."""
 
 import time
-from typing import Any, Dict, List, Optional
-
+from typing import Any, Callable, Dict, List, Optional
+
+from ultimate_mcp_server.services.knowledge_base.answer_cache import get_rag_answer_cache
+from ultimate_mcp_server.services.knowledge_base.ingestion import (
+    IngestionPipeline,
+    IngestionProgress,
+)
+from ultimate_mcp_server.services.knowledge_base.keyword_index import get_keyword_index_service
 from ultimate_mcp_server.services.vector import VectorDatabaseService
 from ultimate_mcp_server.utils import get_logger
 
@@ -88,6 +94,9 @@ class KnowledgeBaseManager:
             vector_service: Vector database service for storing embeddings
         """
         self.vector_service = vector_service
+        self.keyword_index = get_keyword_index_service()
+        self.answer_cache = get_rag_answer_cache()
+        self.ingestion = IngestionPipeline(vector_service, self.keyword_index)
         logger.info("Knowledge base manager initialized", extra={"emoji_key": "success"})
 
     async def create_knowledge_base(
@@ -136,6 +145,8 @@ class KnowledgeBaseManager:
             try:
                 # Force delete any existing collection
                 await self.vector_service.delete_collection(name)
+                self.keyword_index.delete_index(name)
+                self.answer_cache.invalidate(name)
                 logger.debug(f"Force deleted existing collection '{name}' for clean creation")
                 # Add a small delay to ensure deletion completes
                 import asyncio
@@ -172,8 +183,10 @@ class KnowledgeBaseManager:
             logger.warning(f"Knowledge base '{name}' not found", extra={"emoji_key": "warning"})
             return {"status": "not_found", "name": name}
 
-        # Delete collection
+        # Delete collection, its keyword index and cached answers
         await self.vector_service.delete_collection(name)
+        self.keyword_index.delete_index(name)
+        self.answer_cache.invalidate(name)
 
         logger.info(f"Deleted knowledge base '{name}'", extra={"emoji_key": "success"})
 
@@ -241,9 +254,15 @@ class KnowledgeBaseManager:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         chunk_method: str = "semantic",
+        progress_callback: Optional[Callable[[IngestionProgress], Any]] = None,
+        resume: bool = True,
     ) -> Dict[str, Any]:
         """Add documents to a knowledge base.
 
+        Documents are chunked, embedded in batches and bulk-inserted through the
+        streaming ingestion pipeline; see ``IngestionPipeline`` for chunk IDs
+        and checkpoint behavior.
+
         Args:
             knowledge_base_name: Knowledge base name
             documents: List of document texts
@@ -253,6 +272,8 @@ class KnowledgeBaseManager:
             chunk_size: Chunk size for document processing
             chunk_overlap: Chunk overlap for document processing
             chunk_method: Chunking method (token, semantic, etc.)
+            progress_callback: Optional callable receiving ingestion progress
+            resume: Whether to continue an interrupted ingestion of the same documents
 
         Returns:
             Document addition status
@@ -275,14 +296,27 @@ class KnowledgeBaseManager:
             return {"status": "not_found", "name": knowledge_base_name}
 
         try:
-            # Add documents to vector store
-            doc_ids = await self.vector_service.add_texts(
-                collection_name=knowledge_base_name,
-                texts=documents,
-                metadatas=metadatas,
-                ids=ids,
-                embedding_model=embedding_model,
-            )
+            # Index any documents added before keyword indexing existed
+            collection = await self.vector_service.get_collection(knowledge_base_name)
+            if collection is not None:
+                await self.keyword_index.ensure_index(knowledge_base_name, collection)
+
+            # Chunk, embed and insert into the vector store and keyword index
+            try:
+                ingested = await self.ingestion.run(
+                    knowledge_base_name,
+                    documents,
+                    metadatas=metadatas,
+                    ids=ids,
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    chunk_method=chunk_method,
+                    progress_callback=progress_callback,
+                    resume=resume,
+                )
+            finally:
+                # Even a partial ingestion changes what queries retrieve
+                self.answer_cache.invalidate(knowledge_base_name)
 
             # Update document count in metadata
             current_metadata = await self.vector_service.get_collection_metadata(
@@ -303,7 +337,8 @@ class KnowledgeBaseManager:
             )
 
             logger.info(
-                f"Added {len(documents)} documents to knowledge base '{knowledge_base_name}'",
+                f"Added {len(documents)} documents ({ingested['chunks_created']} chunks) "
+                f"to knowledge base '{knowledge_base_name}'",
                 extra={"emoji_key": "success"},
             )
 
@@ -311,7 +346,8 @@ class KnowledgeBaseManager:
                 "status": "success",
                 "name": knowledge_base_name,
                 "added_count": len(documents),
-                "ids": doc_ids,
+                "chunks_created": ingested["chunks_created"],
+                "ids": ingested["ids"],
             }
         except Exception as e:
             logger.error(
@@ -4,7 +4,7 @@ import time
 from typing import Any, Dict, List, Optional, Set
 
 from ultimate_mcp_server.core.models.requests import CompletionRequest
-from ultimate_mcp_server.services.cache import get_cache_service
+from ultimate_mcp_server.services.knowledge_base.answer_cache import get_rag_answer_cache
 from ultimate_mcp_server.services.knowledge_base.feedback import get_rag_feedback_service
 from ultimate_mcp_server.services.knowledge_base.retriever import KnowledgeBaseRetriever
 from ultimate_mcp_server.services.knowledge_base.utils import (
@@ -77,12 +77,11 @@ class RAGEngine:
         # Initialize feedback service
         self.feedback_service = get_rag_feedback_service()
 
-        # Initialize cache service
-        self.cache_service = get_cache_service()
+        # Initialize answer cache
+        self.answer_cache = get_rag_answer_cache()
 
-        # Register RAG templates
-        for template_name, template_text in DEFAULT_RAG_TEMPLATES.items():
-            self.prompt_service.register_template(template_name, template_text)
+        # RAG templates (the prompt service has no runtime template registry)
+        self.templates = dict(DEFAULT_RAG_TEMPLATES)
 
         logger.info("RAG engine initialized", extra={"emoji_key": "success"})
 
@@ -255,56 +254,32 @@ class RAGEngine:
 
         return used_ids
 
-    async def _check_cached_response(
-        self, knowledge_base_name: str, query: str
-    ) -> Optional[Dict[str, Any]]:
-        """Check for cached RAG response.
+    def _cached_response(
+        self, cached: Dict[str, Any], level: str, query: str, start_time: float
+    ) -> Dict[str, Any]:
+        """Return a cached answer, recording the hit.
 
         Args:
-            knowledge_base_name: Knowledge base name
-            query: Query text
+            cached: Cached response
+            level: Cache level that matched ("query" or "context")
+            query: Query being answered
+            start_time: When the request started
 
         Returns:
-            Cached response or None
-        """
-        if not self.cache_service:
-            return None
-
-        cache_key = f"rag_{knowledge_base_name}_{query}"
-
-        try:
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.info(
-                    f"Using cached RAG response for query in '{knowledge_base_name}'",
-                    extra={"emoji_key": "cache"},
-                )
-                return cached
-        except Exception as e:
-            logger.error(f"Error checking cache: {str(e)}", extra={"emoji_key": "error"})
-
-        return None
-
-    async def _cache_response(
-        self, knowledge_base_name: str, query: str, response: Dict[str, Any]
-    ) -> None:
-        """Cache RAG response.
-
-        Args:
-            knowledge_base_name: Knowledge base name
-            query: Query text
-            response: Response to cache
+            Copy of the cached response for this query
         """
-        if not self.cache_service:
-            return
-
-        cache_key = f"rag_{knowledge_base_name}_{query}"
+        metrics = cached.get("metrics", {})
+        if level == "query":
+            original_time = metrics.get("total_time", cached.get("total_time", 0.0))
+        else:
+            original_time = metrics.get("generation_time", 0.0)
+        self.answer_cache.record_hit(level, original_time - (time.time() - start_time))
 
-        try:
-            # Cache for 1 day
-            await self.cache_service.set(cache_key, response, ttl=86400)
-        except Exception as e:
-            logger.error(f"Error caching response: {str(e)}", extra={"emoji_key": "error"})
+        logger.info(
+            f"Using cached RAG response ({level} match) for query in '{cached.get('knowledge_base')}'",
+            extra={"emoji_key": "cache"},
+        )
+        return {**cached, "query": query, "cached": True, "cache_level": level}
 
     async def generate_with_rag(
         self,
@@ -351,11 +326,32 @@ class RAGEngine:
         start_time = time.time()
         operation_metrics = {}
 
-        # Check cache first if enabled
+        # Check for an answer to a similar query with the same settings first
         if use_cache:
-            cached_response = await self._check_cached_response(knowledge_base_name, query)
+            cache_version = self.answer_cache.version(knowledge_base_name)
+            request_key = self.answer_cache.request_key(
+                {
+                    "provider": provider,
+                    "model": model,
+                    "template": template,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "top_k": top_k,
+                    "retrieval_method": retrieval_method,
+                    "min_score": min_score,
+                    "metadata_filter": metadata_filter,
+                    "include_metadata": include_metadata,
+                    "include_sources": include_sources,
+                    "apply_feedback": apply_feedback,
+                    "search_params": search_params,
+                }
+            )
+            query_vector = await self.answer_cache.embed_query(query)
+            cached_response = await self.answer_cache.get_by_query(
+                knowledge_base_name, query_vector, request_key
+            )
             if cached_response:
-                return cached_response
+                return self._cached_response(cached_response, "query", query, start_time)
 
         # Auto-select model if not specified
         if not provider or not model:
@@ -434,13 +430,21 @@ class RAGEngine:
                 "status": "no_results",
                 "message": "No relevant documents found for query",
                 "query": query,
+                "knowledge_base": knowledge_base_name,
                 "retrieval_time": retrieval_time,
                 "total_time": time.time() - start_time,
             }
 
             # Cache error response if enabled
             if use_cache:
-                await self._cache_response(knowledge_base_name, query, error_response)
+                await self.answer_cache.put(
+                    knowledge_base_name,
+                    cache_version,
+                    query_vector,
+                    request_key,
+                    self.answer_cache.context_key(knowledge_base_name, [], {}, query),
+                    error_response,
+                )
 
             return error_response
 
@@ -450,11 +454,34 @@ class RAGEngine:
         )
 
         # Get prompt template
-        template_text = self.prompt_service.get_template(template)
+        template_text = self.templates.get(template)
         if not template_text:
             # Fallback to default template
             template_text = DEFAULT_RAG_TEMPLATES["rag_default"]
 
+        # Reuse the answer generated for the same context and generation settings
+        if use_cache:
+            answer_key = self.answer_cache.context_key(
+                knowledge_base_name,
+                retrieval_result["results"],
+                {
+                    "provider": provider,
+                    "model": model,
+                    "template": template_text,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "include_metadata": include_metadata,
+                    "include_sources": include_sources,
+                },
+                query if "{query}" in template_text else None,
+            )
+            cached_response = await self.answer_cache.get_by_context(answer_key)
+            if cached_response:
+                self.answer_cache.remember_query(
+                    knowledge_base_name, cache_version, query_vector, request_key, answer_key
+                )
+                return self._cached_response(cached_response, "context", query, start_time)
+
         # Format prompt with template
         rag_prompt = template_text.format(context=context, query=query)
 
@@ -543,6 +570,13 @@ class RAGEngine:
 
         # Cache response if enabled
         if use_cache:
-            await self._cache_response(knowledge_base_name, query, response)
+            await self.answer_cache.put(
+                knowledge_base_name,
+                cache_version,
+                query_vector,
+                request_key,
+                answer_key,
+                response,
+            )
 
         return response
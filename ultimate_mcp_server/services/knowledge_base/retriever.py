@@ -4,6 +4,7 @@ import time
 from typing import Any, Dict, List, Optional
 
 from ultimate_mcp_server.services.knowledge_base.feedback import get_rag_feedback_service
+from ultimate_mcp_server.services.knowledge_base.keyword_index import get_keyword_index_service
 from ultimate_mcp_server.services.knowledge_base.utils import build_metadata_filter
 from ultimate_mcp_server.services.vector import VectorDatabaseService
 from ultimate_mcp_server.utils import get_logger
@@ -103,6 +104,7 @@ class KnowledgeBaseRetriever:
         """
         self.vector_service = vector_service
         self.feedback_service = get_rag_feedback_service()
+        self.keyword_index = get_keyword_index_service()
 
         # Get embedding service for generating query embeddings
         from ultimate_mcp_server.services.vector.embeddings import get_embedding_service
@@ -138,6 +140,62 @@ class KnowledgeBaseRetriever:
 
         return {"status": "valid", "name": name, "metadata": metadata}
 
+    async def _query_collection(
+        self,
+        collection: Any,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Run a vector query against a ChromaDB or local collection.
+
+        Args:
+            collection: Collection returned by the vector service
+            query: Query text
+            n_results: Number of results to request
+            where: Optional ChromaDB-style metadata filter
+            where_document: Optional document content filter
+
+        Returns:
+            Query results in ChromaDB format, or None if the query could not be embedded
+        """
+        includes = ["documents", "metadatas", "distances"]
+
+        # Use correct query method based on collection type
+        if hasattr(collection, "query") and not hasattr(collection, "search_by_text"):
+            # ChromaDB collection: embed with our service so the model matches ingestion
+            query_embeddings = await self.embedding_service.create_embeddings(texts=[query])
+            if not query_embeddings:
+                logger.error(f"Failed to generate embedding for query: {query}")
+                return None
+
+            logger.debug(
+                f"Generated query embedding with model: {self.embedding_service.model_name}, "
+                f"dimension: {len(query_embeddings[0])}"
+            )
+            try:
+                return collection.query(
+                    query_embeddings=[query_embeddings[0]],
+                    n_results=n_results,
+                    where=where,
+                    where_document=where_document,
+                    include=includes,
+                )
+            except Exception as e:
+                logger.error(f"ChromaDB query error: {str(e)}")
+                raise
+
+        # Our custom VectorCollection
+        logger.debug("Using VectorCollection search method")
+        return await collection.query(
+            query_texts=[query],
+            n_results=n_results,
+            where=where,
+            where_document=where_document,
+            include=includes,
+        )
+
     async def retrieve(
         self,
         knowledge_base_name: str,
@@ -217,9 +275,6 @@ class KnowledgeBaseRetriever:
                 },
             )
 
-        # Create includes parameter
-        includes = ["documents", "metadatas", "distances"]
-
         # Create where_document parameter for content filtering
         where_document = {"$contains": content_filter} if content_filter else None
 
@@ -231,47 +286,11 @@ class KnowledgeBaseRetriever:
         )
 
         try:
-            # Generate embedding directly with our embedding service
-            # Call create_embeddings with a list and get the first result
-            query_embeddings = await self.embedding_service.create_embeddings(
-                texts=[query],
-                # model=embedding_model # Model is set during service init
+            search_results = await self._query_collection(
+                collection, query, top_k * 2, chroma_filter, where_document
             )
-            if not query_embeddings:
-                logger.error(f"Failed to generate embedding for query: {query}")
+            if search_results is None:
                 return {"status": "error", "message": "Failed to generate query embedding"}
-            query_embedding = query_embeddings[0]
-
-            logger.debug(
-                f"Generated query embedding with model: {self.embedding_service.model_name}, dimension: {len(query_embedding)}"
-            )
-
-            # Use correct query method based on collection type
-            if hasattr(collection, "query") and not hasattr(collection, "search_by_text"):
-                # ChromaDB collection
-                logger.debug("Using ChromaDB direct query with embeddings")
-                try:
-                    search_results = collection.query(
-                        query_embeddings=[query_embedding],  # Use our embedding directly
-                        n_results=top_k * 2,
-                        where=chroma_filter,
-                        where_document=where_document,
-                        include=includes,
-                    )
-                except Exception as e:
-                    logger.error(f"ChromaDB query error: {str(e)}")
-                    raise
-            else:
-                # Our custom VectorCollection
-                logger.debug("Using VectorCollection search method")
-                search_results = await collection.query(
-                    query_texts=[query],
-                    n_results=top_k * 2,
-                    where=chroma_filter,
-                    where_document=where_document,
-                    include=includes,
-                    embedding_model=embedding_model,
-                )
 
             # Debug raw results
             logger.debug(f"DEBUG: Raw search results - keys: {search_results.keys()}")
@@ -364,7 +383,12 @@ class KnowledgeBaseRetriever:
         apply_feedback: bool = True,
         search_params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Retrieve documents using hybrid search.
+        """Retrieve documents using hybrid vector + BM25 keyword search.
+
+        Vector similarities and BM25 scores (normalized so the best keyword
+        match scores 1.0) are blended with the given weights. Keyword-only
+        matches that the vector search did not return are included with a
+        vector score of 0.
 
         Args:
             knowledge_base_name: Knowledge base name
@@ -412,22 +436,19 @@ class KnowledgeBaseRetriever:
         # Convert metadata filter format if provided
         chroma_filter = build_metadata_filter(metadata_filter) if metadata_filter else None
 
-        # Create content filter based on query and additional keywords
-        content_text = query
+        # Keyword side matches the query terms plus any additional keywords
+        keyword_text = query
         if additional_keywords:
-            content_text = f"{query} {' '.join(additional_keywords)}"
+            keyword_text = f"{query} {' '.join(additional_keywords)}"
 
-        # Use ChromaDB's hybrid search by providing both query text and content filter
         try:
-            # Vector search results with content filter
-            search_results = await collection.query(
-                query_texts=[query],
-                n_results=top_k * 3,  # Get more results for combining
-                where=chroma_filter,
-                where_document={"$contains": content_text} if content_text else None,
-                include=["documents", "metadatas", "distances"],
-                embedding_model=None,  # Use default embedding model
+            # Vector search results (no content filter: keyword matching is done by BM25)
+            n_candidates = top_k * 3  # Get more results for combining
+            search_results = await self._query_collection(
+                collection, query, n_candidates, chroma_filter
             )
+            if search_results is None:
+                return {"status": "error", "message": "Failed to generate query embedding"}
 
             # Process results
             combined_results = {}
@@ -448,40 +469,44 @@ class KnowledgeBaseRetriever:
                     "score": vector_score * vector_weight,
                 }
 
-            # Now do a keyword-only search if we have keywords component
+            # BM25 keyword search over the knowledge base's inverted index
             if keyword_weight > 0:
-                keyword_results = await collection.query(
-                    query_texts=None,  # No vector query
-                    n_results=top_k * 3,
-                    where=chroma_filter,
-                    where_document={"$contains": content_text},
-                    include=["documents", "metadatas"],
-                    embedding_model=None,  # No embedding model needed for keyword-only search
+                keyword_index = await self.keyword_index.ensure_index(
+                    knowledge_base_name, collection
+                )
+                # Over-fetch when filtering, since metadata is checked after scoring
+                keyword_hits = keyword_index.search(
+                    keyword_text, n_candidates * 4 if chroma_filter else n_candidates
                 )
 
-                # Process keyword results
-                for i, doc in enumerate(keyword_results["documents"][0]):
-                    doc_id = keyword_results["ids"][0][i]
-                    # Approximate keyword score based on position (best = 1.0)
-                    keyword_score = 1.0 - (i / len(keyword_results["documents"][0]))
-
-                    if doc_id in combined_results:
-                        # Update existing result
-                        combined_results[doc_id]["keyword_score"] = keyword_score
-                        combined_results[doc_id]["score"] += keyword_score * keyword_weight
-                    else:
-                        # Add new result
+                # Fetch documents the vector side did not return, applying the filter
+                missing = [doc_id for doc_id, _ in keyword_hits if doc_id not in combined_results]
+                if missing:
+                    fetched = collection.get(
+                        ids=missing, where=chroma_filter, include=["documents", "metadatas"]
+                    )
+                    fetched_metadatas = fetched.get("metadatas") or [{}] * len(fetched["ids"])
+                    for i, doc_id in enumerate(fetched["ids"]):
                         combined_results[doc_id] = {
                             "id": doc_id,
-                            "document": doc,
-                            "metadata": keyword_results["metadatas"][0][i]
-                            if keyword_results["metadatas"]
-                            else {},
+                            "document": fetched["documents"][i],
+                            "metadata": fetched_metadatas[i] or {},
                             "vector_score": 0.0,
-                            "keyword_score": keyword_score,
-                            "score": keyword_score * keyword_weight,
+                            "keyword_score": 0.0,
+                            "score": 0.0,
                         }
 
+                # Normalize BM25 scores by the best admissible hit and blend
+                keyword_hits = [
+                    (doc_id, bm25) for doc_id, bm25 in keyword_hits if doc_id in combined_results
+                ][:n_candidates]
+                if keyword_hits:
+                    best_bm25 = keyword_hits[0][1]
+                    for doc_id, bm25 in keyword_hits:
+                        keyword_score = bm25 / best_bm25
+                        combined_results[doc_id]["keyword_score"] = keyword_score
+                        combined_results[doc_id]["score"] += keyword_score * keyword_weight
+
             # Convert to list and filter by min_score
             results = [r for r in combined_results.values() if r["score"] >= min_score]
 
@@ -2,6 +2,34 @@
 
 from typing import Any, Dict, List, Optional
 
+# Common English words ignored by keyword extraction and keyword indexing
+STOP_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "a",
+        "an",
+        "in",
+        "on",
+        "at",
+        "to",
+        "for",
+        "with",
+        "by",
+        "is",
+        "are",
+        "was",
+        "were",
+        "be",
+        "been",
+        "has",
+        "have",
+        "had",
+        "of",
+        "that",
+    }
+)
+
 
 def build_metadata_filter(
     filters: Optional[Dict[str, Any]] = None, operator: str = "$and"
@@ -61,35 +89,10 @@ def extract_keywords(text: str, min_length: int = 3, max_keywords: int = 10) ->
     words = text.lower().split()
 
     # Filter out short words and common stop words
-    stop_words = {
-        "the",
-        "and",
-        "a",
-        "an",
-        "in",
-        "on",
-        "at",
-        "to",
-        "for",
-        "with",
-        "by",
-        "is",
-        "are",
-        "was",
-        "were",
-        "be",
-        "been",
-        "has",
-        "have",
-        "had",
-        "of",
-        "that",
-    }
-
     keywords = [
         word.strip(".,?!\"'()[]{}:;")
         for word in words
-        if len(word) >= min_length and word.lower() not in stop_words
+        if len(word) >= min_length and word.lower() not in STOP_WORDS
     ]
 
     # Count occurrences
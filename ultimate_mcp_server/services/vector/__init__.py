@@ -1,9 +1,14 @@
 """Vector database and embedding operations for Ultimate MCP Server."""
 
 from ultimate_mcp_server.services.vector.embeddings import (
+    EmbeddingCache,
     EmbeddingService,
     get_embedding_service,
 )
+from ultimate_mcp_server.services.vector.local_embeddings import (
+    HashingEmbeddingBackend,
+    LocalEmbeddingBackend,
+)
 from ultimate_mcp_server.services.vector.vector_service import (
     VectorCollection,
     VectorDatabaseService,
@@ -14,8 +19,11 @@ from ultimate_mcp_server.services.vector.vector_service import (
 get_vector_database_service = get_vector_db_service
 
 __all__ = [
+    "EmbeddingCache",
     "EmbeddingService",
     "get_embedding_service",
+    "HashingEmbeddingBackend",
+    "LocalEmbeddingBackend",
     "VectorCollection",
     "VectorDatabaseService",
     "get_vector_db_service",
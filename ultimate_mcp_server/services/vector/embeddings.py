@@ -2,30 +2,190 @@
 
 import asyncio
 import hashlib
+import json
 import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
+import openai
 from openai import AsyncOpenAI
 
 from ultimate_mcp_server.config import get_config
+from ultimate_mcp_server.services.vector.local_embeddings import (
+    LocalEmbeddingBackend,
+    create_local_backend,
+)
 from ultimate_mcp_server.utils import get_logger
+from ultimate_mcp_server.utils.async_utils import async_retry
+from ultimate_mcp_server.utils.text import count_tokens
 
 logger = get_logger(__name__)
 
 # Global dictionary to store embedding instances (optional)
 embedding_instances = {}
 
+# Default model per provider type, used when no model name is given
+_DEFAULT_EMBEDDING_MODELS = {
+    "openai": "text-embedding-3-small",
+    "local": "all-MiniLM-L6-v2",
+    "sentence-transformers": "all-MiniLM-L6-v2",
+    "hashing": "hashing-384",
+}
+_LOCAL_PROVIDER_TYPES = ("local", "sentence-transformers", "hashing")
+
+
+class _EmbeddingSegmentStore:
+    """Append-only, segment-based embedding matrix for a single model.
+
+    Vectors are stored row-wise in fixed-capacity segment files
+    (``segment-00000.bin``, ...) of raw float32/float16 data that are read via
+    ``np.memmap``; a parallel ``keys-00000.bin`` holds the 16-byte MD5 digest of
+    the text for each row. The key -> (segment, row) index is rebuilt from the
+    key files on open. Rows are appended vector-first, and on open both files
+    are truncated to the rows present in both, so a crash mid-append never
+    misaligns keys and vectors.
+    """
+
+    _KEY_SIZE = 16
+
+    def __init__(self, directory: Path, dtype: str, segment_rows: int):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.meta_file = directory / "meta.json"
+        self.segment_rows = segment_rows
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.index: Dict[bytes, Tuple[int, int]] = {}  # digest -> (segment, row)
+        self._segment_lengths: List[int] = []
+        self._maps: Dict[int, np.memmap] = {}
+
+        if self.meta_file.exists():
+            meta = json.loads(self.meta_file.read_text())
+            self.dim = int(meta["dim"])
+            self.dtype = np.dtype(meta["dtype"])
+            self.segment_rows = int(meta.get("segment_rows", segment_rows))
+            self._load_index()
+
+    def _vector_path(self, segment: int) -> Path:
+        return self.directory / f"segment-{segment:05d}.bin"
+
+    def _key_path(self, segment: int) -> Path:
+        return self.directory / f"keys-{segment:05d}.bin"
+
+    def _load_index(self) -> None:
+        row_bytes = self.dim * self.dtype.itemsize
+        segment = 0
+        while self._key_path(segment).exists():
+            key_path, vector_path = self._key_path(segment), self._vector_path(segment)
+            keys = key_path.read_bytes()
+            vector_rows = vector_path.stat().st_size // row_bytes if vector_path.exists() else 0
+            rows = min(len(keys) // self._KEY_SIZE, vector_rows)
+            # Drop any partially written tail so keys and vectors stay aligned
+            if len(keys) != rows * self._KEY_SIZE:
+                with open(key_path, "r+b") as f:
+                    f.truncate(rows * self._KEY_SIZE)
+            if vector_path.exists() and vector_path.stat().st_size != rows * row_bytes:
+                with open(vector_path, "r+b") as f:
+                    f.truncate(rows * row_bytes)
+            for row in range(rows):
+                digest = keys[row * self._KEY_SIZE : (row + 1) * self._KEY_SIZE]
+                self.index[digest] = (segment, row)
+            self._segment_lengths.append(rows)
+            segment += 1
+
+    def _map(self, segment: int) -> np.memmap:
+        rows = self._segment_lengths[segment]
+        mapped = self._maps.get(segment)
+        if mapped is None or mapped.shape[0] != rows:
+            mapped = np.memmap(
+                self._vector_path(segment), dtype=self.dtype, mode="r", shape=(rows, self.dim)
+            )
+            self._maps[segment] = mapped
+        return mapped
+
+    def read(self, locations: List[Tuple[int, int]]) -> np.ndarray:
+        """Read rows at the given (segment, row) locations into a float32 matrix."""
+        out = np.empty((len(locations), self.dim), dtype=np.float32)
+        for i, (segment, row) in enumerate(locations):
+            out[i] = self._map(segment)[row]
+        return out
+
+    def append(self, digests: List[bytes], vectors: np.ndarray) -> None:
+        """Append rows, rolling over to a new segment when the active one is full."""
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self.meta_file.write_text(
+                json.dumps(
+                    {"dim": self.dim, "dtype": self.dtype.name, "segment_rows": self.segment_rows}
+                )
+            )
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}"
+            )
+
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        start = 0
+        while start < len(digests):
+            if not self._segment_lengths or self._segment_lengths[-1] >= self.segment_rows:
+                self._segment_lengths.append(0)
+            segment = len(self._segment_lengths) - 1
+            first_row = self._segment_lengths[segment]
+            count = min(self.segment_rows - first_row, len(digests) - start)
+
+            with open(self._vector_path(segment), "ab") as f:
+                f.write(vectors[start : start + count].tobytes())
+            with open(self._key_path(segment), "ab") as f:
+                f.write(b"".join(digests[start : start + count]))
+
+            for offset in range(count):
+                self.index[digests[start + offset]] = (segment, first_row + offset)
+            self._segment_lengths[segment] += count
+            start += count
+
+    def iter_segments(self) -> Iterator[Tuple[List[bytes], np.ndarray]]:
+        """Yield (digests, read-only memmap view) for every non-empty segment."""
+        for segment, rows in enumerate(self._segment_lengths):
+            if not rows:
+                continue
+            keys = self._key_path(segment).read_bytes()
+            digests = [keys[i * self._KEY_SIZE : (i + 1) * self._KEY_SIZE] for i in range(rows)]
+            yield digests, self._map(segment)
+
+    def close(self) -> None:
+        self._maps.clear()
+
 
 class EmbeddingCache:
-    """Cache for embeddings to avoid repeated API calls."""
+    """Persistent cache for embeddings to avoid repeated API calls.
+
+    Embeddings are stored per model in append-only, memory-mapped segment
+    matrices (see ``_EmbeddingSegmentStore``) rather than one file per vector,
+    with a bounded in-memory LRU of recently used vectors on top. Batch
+    ``get_many``/``set_many`` calls touch each segment file once per batch.
+    """
 
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_items: int = 10_000,
+        dtype: str = "float32",
+        segment_rows: int = 65_536,
+    ):
         """Initialize the embedding cache.
 
         Args:
             cache_dir: Directory to store cache files
+            max_memory_items: Maximum number of vectors kept in the in-memory hot set
+            dtype: On-disk storage dtype, "float32" or "float16" (halves disk and page cache)
+            segment_rows: Number of rows per segment file
         """
         if cache_dir:
             self.cache_dir = Path(cache_dir)
@@ -35,37 +195,47 @@ class EmbeddingCache:
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # In-memory cache
-        self.cache = {}
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float16)):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.dtype = dtype
+        self.segment_rows = segment_rows
+        self.max_memory_items = max_memory_items
+
+        # Bounded in-memory hot set: (model, digest) -> vector
+        self.cache: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._stores: Dict[str, _EmbeddingSegmentStore] = {}
+        self._lock = threading.Lock()
 
         logger.info(
             f"Embeddings cache initialized (directory: {self.cache_dir})", emoji_key="cache"
         )
 
-    def _get_cache_key(self, text: str, model: str) -> str:
-        """Generate a cache key for text and model.
+    def _get_cache_key(self, text: str) -> bytes:
+        """Generate the cache key digest for a text.
 
         Args:
             text: Text to embed
-            model: Embedding model name
-
-        Returns:
-            Cache key
-        """
-        # Create a hash based on text and model
-        text_hash = hashlib.md5(text.encode("utf-8")).hexdigest()
-        return f"{model}_{text_hash}"
-
-    def _get_cache_file_path(self, key: str) -> Path:
-        """Get cache file path for a key.
-
-        Args:
-            key: Cache key
 
         Returns:
-            Cache file path
+            16-byte MD5 digest of the text
         """
-        return self.cache_dir / f"{key}.npy"
+        return hashlib.md5(text.encode("utf-8")).digest()
+
+    def _get_store(self, model: str) -> _EmbeddingSegmentStore:
+        """Get (opening if needed) the segment store for a model."""
+        store = self._stores.get(model)
+        if store is None:
+            directory = self.cache_dir / re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+            store = _EmbeddingSegmentStore(directory, self.dtype, self.segment_rows)
+            self._stores[model] = store
+        return store
+
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        # A copy, so the entry neither pins the batch it came from nor changes with it
+        self.cache[key] = vector.copy()
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_memory_items:
+            self.cache.popitem(last=False)
 
     def get(self, text: str, model: str) -> Optional[np.ndarray]:
         """Get embedding from cache.
@@ -77,24 +247,46 @@ class EmbeddingCache:
         Returns:
             Cached embedding or None if not found
         """
-        key = self._get_cache_key(text, model)
+        return self.get_many([text], model)[0]
 
-        # Check in-memory cache first
-        if key in self.cache:
-            return self.cache[key]
+    def get_many(self, texts: List[str], model: str) -> List[Optional[np.ndarray]]:
+        """Get embeddings for many texts in one pass.
 
-        # Check disk cache
-        cache_file = self._get_cache_file_path(key)
-        if cache_file.exists():
-            try:
-                embedding = np.load(str(cache_file))
-                # Add to in-memory cache
-                self.cache[key] = embedding
-                return embedding
-            except Exception as e:
-                logger.error(f"Failed to load embedding from cache: {str(e)}", emoji_key="error")
+        Args:
+            texts: Texts to look up
+            model: Embedding model name
 
-        return None
+        Returns:
+            List aligned with ``texts`` containing float32 vectors or None for misses
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            store = self._get_store(model)
+            pending: List[Tuple[int, Tuple[str, bytes], Tuple[int, int]]] = []
+            for i, text in enumerate(texts):
+                key = (model, self._get_cache_key(text))
+                vector = self.cache.get(key)
+                if vector is not None:
+                    self.cache.move_to_end(key)
+                    results[i] = vector.copy()  # Callers may modify what they get
+                    continue
+                location = store.index.get(key[1])
+                if location is not None:
+                    pending.append((i, key, location))
+
+            if pending:
+                try:
+                    matrix = store.read([location for _, _, location in pending])
+                except Exception as e:
+                    logger.error(
+                        f"Failed to load embeddings from cache: {str(e)}", emoji_key="error"
+                    )
+                    return results
+                for row, (i, key, _) in enumerate(pending):
+                    results[i] = matrix[row].copy()
+                    self._remember(key, matrix[row])
+
+        return results
 
     def set(self, text: str, model: str, embedding: np.ndarray) -> None:
         """Set embedding in cache.
@@ -104,58 +296,206 @@ class EmbeddingCache:
             model: Embedding model name
             embedding: Embedding vector
         """
-        key = self._get_cache_key(text, model)
+        self.set_many([text], model, [embedding])
 
-        # Add to in-memory cache
-        self.cache[key] = embedding
+    def set_many(self, texts: List[str], model: str, embeddings) -> None:
+        """Store embeddings for many texts with a single append per segment.
 
-        # Save to disk
-        cache_file = self._get_cache_file_path(key)
-        try:
-            np.save(str(cache_file), embedding)
-        except Exception as e:
-            logger.error(f"Failed to save embedding to cache: {str(e)}", emoji_key="error")
+        Texts already present in the store are skipped (entries are immutable).
+
+        Args:
+            texts: Texts that were embedded
+            model: Embedding model name
+            embeddings: Sequence of vectors or a 2-D array aligned with ``texts``
+
+        Raises:
+            ValueError: If the embedding dimension differs from the model's stored vectors
+        """
+        if not texts:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+
+        with self._lock:
+            store = self._get_store(model)
+            new_digests: List[bytes] = []
+            new_rows: List[int] = []
+            seen = set()
+            for i, text in enumerate(texts):
+                digest = self._get_cache_key(text)
+                self._remember((model, digest), matrix[i])
+                if digest in store.index or digest in seen:
+                    continue
+                seen.add(digest)
+                new_digests.append(digest)
+                new_rows.append(i)
+
+            if new_digests:
+                try:
+                    store.append(new_digests, matrix[new_rows])
+                except OSError as e:
+                    logger.error(f"Failed to save embeddings to cache: {str(e)}", emoji_key="error")
+
+    def iter_segments(self, model: str) -> Iterator[Tuple[List[bytes], np.ndarray]]:
+        """Iterate the stored embeddings of a model segment by segment without copying.
+
+        Each item is ``(digests, matrix)`` where ``matrix`` is a read-only memmap view
+        (in the storage dtype) whose rows align with the MD5 digests of the texts.
+        Suitable for bulk-loading vectors into a collection.
+
+        Args:
+            model: Embedding model name
+        """
+        with self._lock:
+            store = self._get_store(model)
+            segments = list(store.iter_segments())
+        yield from segments
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(store.index) for store in self._stores.values())
 
     def clear(self) -> None:
         """Clear the embedding cache."""
-        # Clear in-memory cache
-        self.cache.clear()
-
-        # Clear disk cache
-        for cache_file in self.cache_dir.glob("*.npy"):
-            try:
-                cache_file.unlink()
-            except Exception as e:
-                logger.error(
-                    f"Failed to delete cache file {cache_file}: {str(e)}", emoji_key="error"
-                )
+        with self._lock:
+            # Clear in-memory cache
+            self.cache.clear()
+            for store in self._stores.values():
+                store.close()
+            self._stores.clear()
+
+            # Clear disk cache: one directory per model, plus legacy per-vector .npy files
+            for path in self.cache_dir.iterdir():
+                try:
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    elif path.suffix == ".npy":
+                        path.unlink()
+                except Exception as e:
+                    logger.error(f"Failed to delete cache path {path}: {str(e)}", emoji_key="error")
 
         logger.info("Embeddings cache cleared", emoji_key="cache")
 
 
+class EmbeddingMetrics:
+    """Throughput and cache statistics for an embedding service."""
+
+    def __init__(self):
+        self.texts_requested = 0
+        self.unique_texts = 0
+        self.cache_hits = 0
+        self.texts_embedded = 0
+        self.batches = 0
+        self.retries = 0
+        self.embed_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to dictionary."""
+        return {
+            "texts_requested": self.texts_requested,
+            "unique_texts": self.unique_texts,
+            "cache_hits": self.cache_hits,
+            "texts_embedded": self.texts_embedded,
+            "batches": self.batches,
+            "retries": self.retries,
+            "cache_hit_ratio": self.cache_hit_ratio,
+            "texts_per_second": self.texts_per_second,
+        }
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Fraction of unique texts served from the embedding cache."""
+        return (self.cache_hits / self.unique_texts) if self.unique_texts else 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        """Requested texts served per second of wall time spent in create_embeddings."""
+        return (self.texts_requested / self.embed_seconds) if self.embed_seconds else 0.0
+
+
+# Provider errors worth retrying with backoff (throttling and transient failures)
+_RETRYABLE_EMBEDDING_ERRORS = [
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+]
+
+
+def _count_batch_tokens(text: str) -> int:
+    """Count tokens for batching, falling back to a conservative estimate.
+
+    The tokenizer may be unavailable offline (tiktoken downloads its encodings on
+    first use); batching then assumes ~3 characters per token so batches stay
+    under the provider's token limit.
+    """
+    try:
+        return count_tokens(text) or 1
+    except Exception:
+        return len(text) // 3 + 1
+
+
 class EmbeddingService:
-    """Generic service to create embeddings using different providers."""
+    """Generic service to create embeddings using different providers.
+
+    ``create_embeddings`` is a batching pipeline: inputs are de-duplicated,
+    served from the persistent ``EmbeddingCache`` where possible, and the misses
+    are split into micro-batches bounded by input count and token count that are
+    dispatched concurrently (under a semaphore) with retry on rate limits.
+    Results are reassembled in input order.
+
+    Local providers (``"local"``/``"sentence-transformers"`` and ``"hashing"``)
+    run inference in-process on a thread pool instead of calling a remote API.
+    """
 
     def __init__(
         self,
         provider_type: str = "openai",
-        model_name: str = "text-embedding-3-small",
+        model_name: Optional[str] = None,
         api_key: Optional[str] = None,
         **kwargs,
     ):
         """Initialize the embedding service.
 
         Args:
-            provider_type: The type of embedding provider (e.g., 'openai').
-            model_name: The specific embedding model to use.
+            provider_type: The type of embedding provider: 'openai', 'local'
+                (alias 'sentence-transformers', falls back to hashing when the
+                model is unavailable) or 'hashing'.
+            model_name: The specific embedding model to use (defaults per provider).
             api_key: Optional API key. If not provided, attempts to load from config.
-            **kwargs: Additional provider-specific arguments.
+            **kwargs: Additional provider-specific arguments, plus pipeline settings:
+                max_batch_size (inputs per request, default 2048),
+                max_batch_tokens (tokens per request, default 250000),
+                max_concurrency (concurrent requests, default 4),
+                max_retries (retries per batch on throttling/transient errors, default 5),
+                retry_delay (initial backoff in seconds, default 1.0),
+                use_cache (default True, False for 'hashing') and cache (an
+                EmbeddingCache instance). Local providers also accept device
+                (default 'cpu') and dimension (hashing only, default 384).
         """
         self.provider_type = provider_type.lower()
-        self.model_name = model_name
+        self.model_name = model_name or _DEFAULT_EMBEDDING_MODELS.get(
+            self.provider_type, _DEFAULT_EMBEDDING_MODELS["openai"]
+        )
         self.client = None
         self.api_key = api_key
         self.kwargs = kwargs
+        self.is_local = self.provider_type in _LOCAL_PROVIDER_TYPES
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.max_batch_size = int(kwargs.pop("max_batch_size", 256 if self.is_local else 2048))
+        self.max_batch_tokens = int(kwargs.pop("max_batch_tokens", 250_000))
+        self.max_concurrency = int(kwargs.pop("max_concurrency", min(4, os.cpu_count() or 1)))
+        self.max_retries = int(kwargs.pop("max_retries", 5))
+        self.retry_delay = float(kwargs.pop("retry_delay", 1.0))
+        cache = kwargs.pop("cache", None)
+        # Hashing is cheaper to recompute than to read back from disk
+        use_cache = kwargs.pop("use_cache", self.provider_type != "hashing")
+        self.cache: Optional[EmbeddingCache] = (
+            cache if cache is not None else (EmbeddingCache() if use_cache else None)
+        )
+        self.metrics = EmbeddingMetrics()
 
         try:
             config = get_config()
@@ -181,6 +521,21 @@ class EmbeddingService:
                     f"Initialized AsyncOpenAI embedding client for model: {self.model_name}"
                 )
 
+            elif self.is_local:
+                backend = create_local_backend(
+                    self.provider_type,
+                    model_name=self.model_name,
+                    dimension=int(self.kwargs.pop("dimension", 384)),
+                    device=self.kwargs.pop("device", "cpu"),
+                )
+                # Record the model actually serving requests (differs after a fallback)
+                self.model_name = backend.model_name
+                self.client = backend
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="embeddings"
+                )
+                logger.info(f"Initialized local embedding backend for model: {self.model_name}")
+
             else:
                 raise ValueError(f"Unsupported embedding provider type: {self.provider_type}")
 
@@ -194,11 +549,14 @@ class EmbeddingService:
     async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Create embeddings for a list of texts.
 
+        Duplicate inputs are embedded once, cached embeddings are reused, and the
+        remaining texts are embedded in concurrent, size-bounded micro-batches.
+
         Args:
             texts: A list of strings to embed.
 
         Returns:
-            A list of embedding vectors (each a list of floats).
+            A list of embedding vectors (each a list of floats), aligned with ``texts``.
 
         Raises:
             ValueError: If the provider type is unsupported or embedding fails.
@@ -206,19 +564,37 @@ class EmbeddingService:
         """
         if self.client is None:
             raise RuntimeError("Embedding client is not initialized.")
+        if not texts:
+            return []
 
-        try:
-            if self.provider_type == "openai":
-                response = await self.client.embeddings.create(input=texts, model=self.model_name)
-                # Extract the embedding data
-                embeddings = [item.embedding for item in response.data]
-                logger.debug(
-                    f"Successfully created {len(embeddings)} embeddings using {self.model_name}."
-                )
-                return embeddings
+        start_time = time.perf_counter()
+        unique_texts = list(dict.fromkeys(texts))
+        vectors: Dict[str, List[float]] = {}
 
-            else:
-                raise ValueError(f"Unsupported provider type: {self.provider_type}")
+        # Serve cache hits
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get_many, unique_texts, self.model_name)
+            for text, vector in zip(unique_texts, cached, strict=True):
+                if vector is not None:
+                    vectors[text] = vector.tolist()
+        misses = [text for text in unique_texts if text not in vectors]
+
+        try:
+            if misses:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+
+                async def run_batch(batch: List[str]) -> None:
+                    async with semaphore:
+                        embeddings = await self._embed_batch(batch)
+                    vectors.update(zip(batch, embeddings, strict=True))
+                    if self.cache is not None:
+                        await asyncio.to_thread(
+                            self.cache.set_many, batch, self.model_name, embeddings
+                        )
+
+                batches = self._make_batches(misses)
+                await asyncio.gather(*(run_batch(batch) for batch in batches))
+                self.metrics.batches += len(batches)
 
         except Exception as e:
             logger.error(
@@ -228,20 +604,125 @@ class EmbeddingService:
             # Re-raise the error or return an empty list/handle appropriately
             raise ValueError(f"Embedding creation failed: {e}") from e
 
+        self.metrics.texts_requested += len(texts)
+        self.metrics.unique_texts += len(unique_texts)
+        self.metrics.cache_hits += len(unique_texts) - len(misses)
+        self.metrics.texts_embedded += len(misses)
+        self.metrics.embed_seconds += time.perf_counter() - start_time
+        logger.debug(
+            f"Created {len(texts)} embeddings using {self.model_name} "
+            f"({len(unique_texts) - len(misses)} cached, {len(misses)} embedded)."
+        )
+        return [vectors[text] for text in texts]
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into batches bounded by input count and token count.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of batches preserving input order
+        """
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in texts:
+            # Local backends have no request token limit, so skip tokenization
+            tokens = 0 if self.is_local else _count_batch_tokens(text)
+            if current and (
+                len(current) >= self.max_batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one micro-batch with the provider, retrying on throttling.
+
+        Args:
+            batch: Texts to embed in a single request
+
+        Returns:
+            Embedding vectors aligned with ``batch``
+        """
+        attempts = 0
+
+        @async_retry(
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay,
+            backoff_factor=2.0,
+            retry_exceptions=_RETRYABLE_EMBEDDING_ERRORS,
+            max_backoff=30.0,
+        )
+        async def call() -> List[List[float]]:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                self.metrics.retries += 1
+            if self.provider_type == "openai":
+                response = await self.client.embeddings.create(input=batch, model=self.model_name)
+                # Extract the embedding data, ordered by input index
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            if isinstance(self.client, LocalEmbeddingBackend):
+                loop = asyncio.get_running_loop()
+                matrix = await loop.run_in_executor(self._executor, self.client.embed, batch)
+                return matrix.tolist()
+            raise ValueError(f"Unsupported provider type: {self.provider_type}")
+
+        return await call()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get throughput and cache statistics for this service.
+
+        Returns:
+            Dictionary of embedding metrics
+        """
+        return self.metrics.to_dict()
+
+
+def _resolve_embedding_defaults(
+    provider_type: Optional[str], model_name: Optional[str]
+) -> Tuple[str, str]:
+    """Fill in the provider and model from the agent memory config when omitted."""
+    agent_memory = get_config().agent_memory
+    configured_provider = (agent_memory.default_embedding_provider or "openai").lower()
+    provider_type = (provider_type or configured_provider).lower()
+    if model_name:
+        return provider_type, model_name
+
+    configured_model = agent_memory.default_embedding_model
+    default_model = _DEFAULT_EMBEDDING_MODELS.get(provider_type, configured_model)
+    # The configured model belongs to the configured provider; ignore the stock
+    # OpenAI default when a local provider is selected.
+    if provider_type == configured_provider and (
+        provider_type == "openai" or configured_model != _DEFAULT_EMBEDDING_MODELS["openai"]
+    ):
+        return provider_type, configured_model
+    return provider_type, default_model
+
 
 def get_embedding_service(
-    provider_type: str = "openai", model_name: str = "text-embedding-3-small", **kwargs
+    provider_type: Optional[str] = None, model_name: Optional[str] = None, **kwargs
 ) -> EmbeddingService:
     """Factory function to get or create an EmbeddingService instance.
 
     Args:
-        provider_type: The type of embedding provider.
-        model_name: The specific embedding model.
+        provider_type: The type of embedding provider ('openai', 'local' or 'hashing').
+            Defaults to ``agent_memory.default_embedding_provider`` from the config.
+        model_name: The specific embedding model. Defaults to the configured model,
+            or the provider's default model.
         **kwargs: Additional arguments passed to the EmbeddingService constructor.
 
     Returns:
         An initialized EmbeddingService instance.
     """
+    provider_type, model_name = _resolve_embedding_defaults(provider_type, model_name)
     # Optional: Implement caching/singleton pattern for instances if desired
     instance_key = (provider_type, model_name)
     if instance_key in embedding_instances:
@@ -0,0 +1,191 @@
+"""Local CPU embedding backends usable without network access."""
+
+import hashlib
+import re
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ultimate_mcp_server.utils import get_logger
+
+logger = get_logger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class LocalEmbeddingBackend(ABC):
+    """Abstract base class for in-process embedding backends.
+
+    Backends expose a synchronous ``embed`` that turns a batch of texts into a
+    ``(len(texts), dimension)`` float32 matrix of L2-normalized vectors. The
+    embedding service runs it in a worker thread so the event loop is never
+    blocked by inference.
+    """
+
+    model_name: str = "local"
+    dimension: int = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+
+
+class HashingEmbeddingBackend(LocalEmbeddingBackend):
+    """Deterministic feature-hashing vectorizer.
+
+    Lowercased word n-grams are hashed (BLAKE2b) into ``dimension`` buckets with
+    a hash-derived sign, counted, and L2-normalized. There is no model to load
+    and the output is stable across processes and machines, so it works as an
+    offline fallback; similarity is lexical rather than semantic.
+    """
+
+    def __init__(self, dimension: int = 384, ngram_range: Tuple[int, int] = (1, 2)):
+        """Initialize the backend.
+
+        Args:
+            dimension: Output vector dimension
+            ngram_range: Inclusive (min, max) word n-gram sizes to hash
+        """
+        if dimension <= 0:
+            raise ValueError(f"dimension must be positive, got {dimension}")
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.model_name = f"hashing-{dimension}"
+        self._bucket = lru_cache(maxsize=200_000)(self._hash_feature)
+
+    def _hash_feature(self, feature: str) -> Tuple[int, float]:
+        digest = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        return digest % self.dimension, 1.0 if digest >> 63 else -1.0
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        low, high = self.ngram_range
+        features = []
+        for n in range(max(1, low), high + 1):
+            if n == 1:
+                features.extend(tokens)
+            else:
+                features.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        # Accumulate every (row, bucket) hit of the batch in one bincount
+        flat_indexes: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            offset = row * self.dimension
+            for feature in self._features(text):
+                index, sign = self._bucket(feature)
+                flat_indexes.append(offset + index)
+                signs.append(sign)
+
+        matrix = (
+            np.bincount(flat_indexes, weights=signs, minlength=len(texts) * self.dimension)
+            .astype(np.float32)
+            .reshape(len(texts), self.dimension)
+        )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class SentenceTransformerEmbeddingBackend(LocalEmbeddingBackend):
+    """CPU inference with a sentence-transformers model.
+
+    The model is loaded from the local Hugging Face cache (or downloaded once)
+    when the backend is created. ``encode`` releases the GIL inside torch, so
+    concurrent batches from the service's thread pool overlap.
+    """
+
+    def __init__(
+        self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu", batch_size: int = 64
+    ):
+        """Initialize the backend and load the model.
+
+        Args:
+            model_name: sentence-transformers model name or local path
+            device: Torch device to run inference on
+            batch_size: Inference batch size used inside ``encode``
+
+        Raises:
+            ImportError: If sentence-transformers is not installed
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model_name, device=device)
+        self.dimension = int(self._model.get_sentence_embedding_dimension())
+        logger.info(
+            f"Loaded local embedding model {model_name} ({self.dimension} dims) on {device}",
+            emoji_key="model",
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_backend_lock = threading.Lock()
+
+
+def create_local_backend(
+    provider_type: str,
+    model_name: Optional[str] = None,
+    dimension: int = 384,
+    device: str = "cpu",
+) -> LocalEmbeddingBackend:
+    """Create a local embedding backend for a provider type.
+
+    ``"hashing"`` always returns a ``HashingEmbeddingBackend``. ``"local"`` (alias
+    ``"sentence-transformers"``) loads a sentence-transformers model and falls
+    back to hashing if the package or the model weights are unavailable.
+
+    Args:
+        provider_type: "local", "sentence-transformers" or "hashing"
+        model_name: Model name for the sentence-transformers backend
+        dimension: Vector dimension for the hashing backend
+        device: Torch device for the sentence-transformers backend
+
+    Returns:
+        LocalEmbeddingBackend instance
+
+    Raises:
+        ValueError: If the provider type is not a local provider
+    """
+    provider_type = provider_type.lower()
+    if provider_type == "hashing":
+        return HashingEmbeddingBackend(dimension=dimension)
+    if provider_type not in ("local", "sentence-transformers"):
+        raise ValueError(f"Unsupported local embedding provider type: {provider_type}")
+
+    with _backend_lock:  # avoid loading the same weights twice concurrently
+        try:
+            return SentenceTransformerEmbeddingBackend(
+                model_name or "all-MiniLM-L6-v2", device=device
+            )
+        except Exception as e:
+            logger.warning(
+                f"Local embedding model {model_name} unavailable ({e}); "
+                f"falling back to hashing embeddings ({dimension} dims).",
+                emoji_key="warning",
+            )
+            return HashingEmbeddingBackend(dimension=dimension)
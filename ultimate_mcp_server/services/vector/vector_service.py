@@ -2,13 +2,16 @@
 
 import asyncio
 import json
+import os
+import sqlite3
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 from ultimate_mcp_server.services.vector.embeddings import get_embedding_service
 from ultimate_mcp_server.utils import get_logger
@@ -37,8 +40,94 @@ except ImportError:
     HNSW_INDEX = None
 
 
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _build_postings(
+    metadatas: List[Dict[str, Any]], offset: int = 0
+) -> Dict[str, Dict[Any, Set[int]]]:
+    """Build an inverted index of metadata key -> value -> row numbers.
+
+    Args:
+        metadatas: Metadata dicts, one per row
+        offset: Row number of the first metadata dict
+
+    Returns:
+        Nested dictionary of row sets; unhashable values are not indexed
+    """
+    postings: Dict[str, Dict[Any, Set[int]]] = {}
+    for row, metadata in enumerate(metadatas, start=offset):
+        if not isinstance(metadata, dict):
+            continue
+        for key, value in metadata.items():
+            if _is_hashable(value):
+                postings.setdefault(key, {}).setdefault(value, set()).add(row)
+    return postings
+
+
+_compaction_executor: Optional[ThreadPoolExecutor] = None
+
+# On-disk collection format (version 2): a JSON manifest, raw float32 row and
+# norm files that are memory-mapped on load, the serialized HNSW graph, and a
+# SQLite table of ids and per-row metadata.
+_COLLECTION_FORMAT_VERSION = 2
+_MANIFEST_FILE = "collection.json"
+_VECTORS_FILE = "vectors.f32"
+_NORMS_FILE = "norms.f32"
+_INDEX_FILE = "index.hnsw"
+_METADATA_DB_FILE = "metadata.db"
+# Version 1 files, still readable
+_LEGACY_VECTORS_FILE = "vectors.npy"
+_LEGACY_DATA_FILE = "data.json"
+
+
+def _document_from_metadata(metadata: Any) -> str:
+    """Document text stored alongside a vector (local collections keep it in metadata)."""
+    if isinstance(metadata, str):
+        return metadata
+    for key in ("text", "document", "content"):
+        if metadata.get(key):
+            return metadata[key]
+    return ""
+
+
+def _get_compaction_executor() -> ThreadPoolExecutor:
+    global _compaction_executor
+    if _compaction_executor is None:
+        _compaction_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="vector-compaction"
+        )
+    return _compaction_executor
+
+
 class VectorCollection:
-    """A collection of vectors with metadata."""
+    """A collection of vectors with metadata.
+
+    Vectors live in a single growable, C-contiguous float32 matrix (capacity
+    doubles as it fills) alongside their L2 norms. For the cosine metric the
+    rows are stored pre-normalized, so a brute-force search is one matrix
+    product followed by an ``argpartition`` top-k; raw vectors are rebuilt from
+    the stored norms only when a caller asks for them.
+
+    Metadata equality filters are answered from an inverted index (key -> value
+    -> rows). Large filtered candidate sets are searched through the HNSW index
+    with a label filter; small ones are scored exactly. Deletes only tombstone
+    rows (``mark_deleted`` in HNSW); once tombstones pass a fraction of the
+    collection, a replacement index is built on a background thread and swapped
+    in on the next operation, so a delete never rebuilds the index inline.
+    """
+
+    _INITIAL_CAPACITY = 1024
+    # Filtered searches with at most this many candidates are scored exactly
+    _EXACT_SEARCH_MAX_CANDIDATES = 5000
+    # Compact once tombstones exceed this fraction of rows (and this count)
+    _COMPACTION_RATIO = 0.2
+    _COMPACTION_MIN_TOMBSTONES = 1000
 
     def __init__(
         self,
@@ -61,9 +150,7 @@ class VectorCollection:
         self.metadata = metadata or {}
 
         # Initialize storage
-        self.vectors = []
-        self.ids = []
-        self.metadatas = []
+        self._reset_storage()
 
         # Create embedding service
         self.embedding_service = get_embedding_service()
@@ -76,6 +163,133 @@ class VectorCollection:
             extra={"emoji_key": "vector"},
         )
 
+    def __len__(self) -> int:
+        return self._count - len(self._tombstones)
+
+    def _reset_storage(
+        self,
+        vectors: Optional[np.ndarray] = None,
+        ids: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Replace all rows, optionally with an initial set of raw vectors."""
+        self._matrix = np.empty((0, self.dimension), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._live = np.empty(0, dtype=bool)
+        self._count = 0
+        self._ids: List[str] = []
+        self._metadatas: Optional[List[Dict[str, Any]]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {}
+        self._tombstones: Set[int] = set()
+        self._compaction: Optional[Dict[str, Any]] = None
+        self._close_metadata_store()
+        # Directory this collection was opened from, and whether it changed since
+        self._source_dir: Optional[Path] = None
+        self._dirty = False
+        if vectors is not None and len(vectors):
+            self._append_rows(vectors, list(ids), list(metadatas))
+
+    def _close_metadata_store(self) -> None:
+        conn = getattr(self, "_metadata_conn", None)
+        if conn is not None:
+            conn.close()
+        self._metadata_conn: Optional[sqlite3.Connection] = None
+
+    def _metadata_for(self, row: int) -> Dict[str, Any]:
+        """Metadata of one row, read from the on-disk store if not yet loaded."""
+        if self._metadatas is not None:
+            return self._metadatas[row]
+        cursor = self._metadata_conn.execute("SELECT metadata FROM entries WHERE row = ?", (row,))
+        found = cursor.fetchone()
+        return json.loads(found[0]) if found else {}
+
+    def _ensure_metadata_loaded(self) -> None:
+        """Materialize all metadata and the inverted filter index from disk.
+
+        Opened collections defer this until a filter, write or full listing
+        needs it, so unfiltered searches on a freshly opened collection only
+        read the metadata of the rows they return.
+        """
+        if self._metadatas is not None:
+            return
+        rows = self._metadata_conn.execute("SELECT metadata FROM entries ORDER BY row").fetchall()
+        self._metadatas = [json.loads(metadata) for (metadata,) in rows]
+        self._postings = _build_postings(self._metadatas)
+        for row in self._tombstones:
+            self._remove_postings(row)
+        self._close_metadata_store()
+
+    def _append_rows(
+        self, vectors: np.ndarray, ids: List[str], metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """Append raw vectors and their ids/metadata, growing storage geometrically."""
+        self._ensure_metadata_loaded()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        start = self._count
+        needed = start + len(vectors)
+        if needed > len(self._matrix):
+            capacity = max(self._INITIAL_CAPACITY, len(self._matrix) * 2, needed)
+            matrix = np.empty((capacity, self.dimension), dtype=np.float32)
+            matrix[:start] = self._matrix[:start]
+            norms = np.empty(capacity, dtype=np.float32)
+            norms[:start] = self._norms[:start]
+            live = np.zeros(capacity, dtype=bool)
+            live[:start] = self._live[:start]
+            self._matrix, self._norms, self._live = matrix, norms, live
+
+        norms = np.linalg.norm(vectors, axis=1)
+        rows = vectors
+        if self.similarity_metric == "cosine":
+            rows = vectors / np.where(norms > 0, norms, 1.0)[:, None]
+        self._matrix[start:needed] = rows
+        self._norms[start:needed] = norms
+        self._live[start:needed] = True
+        self._count = needed
+
+        self._ids.extend(ids)
+        self._metadatas.extend(metadatas)
+        for row, id in enumerate(ids, start=start):
+            self._id_to_row[id] = row
+        for key, values in _build_postings(metadatas, offset=start).items():
+            key_postings = self._postings.setdefault(key, {})
+            for value, rows_for_value in values.items():
+                key_postings.setdefault(value, set()).update(rows_for_value)
+
+    def _raw_vectors(self, indices: Union[np.ndarray, List[int], slice]) -> np.ndarray:
+        """Return the original (un-normalized) vectors for the given rows."""
+        rows = self._matrix[: self._count][indices]
+        if self.similarity_metric == "cosine":
+            rows = rows * self._norms[: self._count][indices][..., None]
+        return rows
+
+    def _live_rows(self) -> Optional[np.ndarray]:
+        """Row numbers of non-deleted vectors, or None when nothing is tombstoned."""
+        if not self._tombstones:
+            return None
+        return np.flatnonzero(self._live[: self._count])
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All stored vectors as an (n, dimension) float32 array."""
+        live_rows = self._live_rows()
+        return self._raw_vectors(slice(None) if live_rows is None else live_rows)
+
+    @property
+    def ids(self) -> List[str]:
+        """IDs of all stored vectors."""
+        if not self._tombstones:
+            return self._ids
+        return [id for id, live in zip(self._ids, self._live, strict=False) if live]
+
+    @property
+    def metadatas(self) -> List[Dict[str, Any]]:
+        """Metadata of all stored vectors."""
+        self._ensure_metadata_loaded()
+        if not self._tombstones:
+            return self._metadatas
+        return [m for m, live in zip(self._metadatas, self._live, strict=False) if live]
+
     def _init_search_index(self):
         """Initialize search index based on available libraries."""
         self.index_type = "numpy"  # Fallback
@@ -126,10 +340,21 @@ class VectorCollection:
 
         Returns:
             List of vector IDs
+
+        Raises:
+            ValueError: If the vectors do not match the collection dimension
         """
-        # Ensure vectors is a numpy array
-        if not isinstance(vectors, np.ndarray):
-            vectors = np.array(vectors, dtype=np.float32)
+        self._finish_compaction()
+
+        # Ensure vectors is a 2D float32 array
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match collection "
+                f"'{self.name}' dimension {self.dimension}"
+            )
 
         # Generate IDs if not provided
         if ids is None:
@@ -140,23 +365,14 @@ class VectorCollection:
             metadatas = [{} for _ in range(len(vectors))]
 
         # Add to storage
-        for _i, (vector, id, metadata) in enumerate(zip(vectors, ids, metadatas, strict=False)):
-            self.vectors.append(vector)
-            self.ids.append(id)
-            self.metadatas.append(metadata)
+        start_idx = self._count
+        self._append_rows(vectors, list(ids), list(metadatas))
+        self._dirty = True
 
         # Update index if using HNSW
         if self.index_type == "hnswlib" and self.index is not None:
             try:
-                # Resize index if needed
-                if len(self.vectors) > self.index.get_max_elements():
-                    new_size = max(1000, len(self.vectors) * 2)
-                    self.index.resize_index(new_size)
-
-                # Add vectors to index
-                start_idx = len(self.vectors) - len(vectors)
-                for i, vector in enumerate(vectors):
-                    self.index.add_items(vector, start_idx + i)
+                self._add_to_index(self.index, start_idx, self._count)
             except Exception as e:
                 logger.error(f"Failed to update HNSW index: {str(e)}", emoji_key="error")
                 # Rebuild index
@@ -168,22 +384,38 @@ class VectorCollection:
 
         return ids
 
+    def _add_to_index(self, index: Any, start: int, end: int) -> None:
+        """Insert rows [start, end) into an HNSW index, labelled by row number."""
+        if end <= start:
+            return
+        # Resize index if needed
+        if end > index.get_max_elements():
+            index.resize_index(max(1000, end * 2))
+        index.add_items(self._matrix[start:end], np.arange(start, end))
+
+    def _build_index(self, rows: np.ndarray) -> Any:
+        """Build a fresh HNSW index over rows labelled 0..len(rows)-1.
+
+        Only reads ``rows``, so it is safe to run on the compaction thread.
+        """
+        index = HNSW_INDEX(space=self._get_hnswlib_space(), dim=self.dimension)
+        index.init_index(max_elements=max(1000, len(rows) * 2), ef_construction=200, M=16)
+        index.set_ef(50)
+        if len(rows):
+            index.add_items(rows, np.arange(len(rows)))
+        return index
+
     def _rebuild_index(self):
         """Rebuild the search index from scratch."""
-        if not HNSWLIB_AVAILABLE or not self.vectors:
+        if not HNSWLIB_AVAILABLE or not self._count:
             return
 
         try:
-            # Re-initialize index
-            self.index = HNSW_INDEX(space=self._get_hnswlib_space(), dim=self.dimension)
-            self.index.init_index(
-                max_elements=max(1000, len(self.vectors) * 2), ef_construction=200, M=16
-            )
-            self.index.set_ef(50)
-
-            # Add all vectors
-            vectors_array = np.array(self.vectors, dtype=np.float32)
-            self.index.add_items(vectors_array, np.arange(len(self.vectors)))
+            # Re-initialize index with every row, then re-apply tombstones
+            self.index = self._build_index(self._matrix[: self._count])
+            for row in self._tombstones:
+                self.index.mark_deleted(row)
+            self.index_type = "hnswlib"
 
             logger.info(f"Rebuilt HNSW index for collection '{self.name}'", emoji_key="vector")
         except Exception as e:
@@ -191,12 +423,136 @@ class VectorCollection:
             self.index = None
             self.index_type = "numpy"
 
+    def _format_result(self, idx: int, similarity: float, include_vectors: bool) -> Dict[str, Any]:
+        result = {
+            "id": self._ids[idx],
+            "similarity": float(similarity),
+            "metadata": self._metadata_for(idx),
+        }
+        if include_vectors:
+            result["vector"] = self._raw_vectors([idx])[0].tolist()
+        return result
+
+    def _score(self, queries: np.ndarray, candidates: Optional[np.ndarray]) -> np.ndarray:
+        """Score queries against stored rows (all rows, or a candidate subset).
+
+        Args:
+            queries: (n_queries, dimension) float32 query matrix
+            candidates: Optional row indices to restrict scoring to
+
+        Returns:
+            (n_queries, n_rows) similarity matrix
+        """
+        matrix = self._matrix[: self._count]
+        norms = self._norms[: self._count]
+        if candidates is not None:
+            matrix = matrix[candidates]
+            norms = norms[candidates]
+
+        if self.similarity_metric == "dot":
+            return queries @ matrix.T
+        if self.similarity_metric == "euclidean":
+            # |x - q|^2 = |x|^2 - 2 x.q + |q|^2 (rows are stored raw for this metric)
+            squared = (
+                np.square(norms)[None, :]
+                - 2.0 * (queries @ matrix.T)
+                + np.einsum("ij,ij->i", queries, queries)[:, None]
+            )
+            return 1.0 / (1.0 + np.sqrt(np.maximum(squared, 0.0)))
+
+        # Cosine (default): rows are pre-normalized, so normalize queries only
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        return (queries / np.where(query_norms > 0, query_norms, 1.0)) @ matrix.T
+
+    def search_batch(
+        self,
+        query_vectors: Union[List[List[float]], np.ndarray],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        similarity_threshold: float = 0.0,
+        include_vectors: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """Exact (brute-force) search for several query vectors at once.
+
+        Args:
+            query_vectors: Query vectors, shape (n_queries, dimension)
+            top_k: Number of results to return per query
+            filter: Optional metadata filter
+            similarity_threshold: Minimum similarity score (0.0 to 1.0)
+            include_vectors: Whether to include the stored vector in each result
+
+        Returns:
+            One list of results (with scores and metadata) per query, best first
+        """
+        self._finish_compaction()
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if not len(queries):
+            return []
+
+        # Filter vectors based on metadata if needed
+        if filter:
+            candidates = np.asarray(self._apply_filter(filter), dtype=np.intp)
+            logger.debug(f"Filter reduced search space to {len(candidates)} vectors")
+        else:
+            candidates = self._live_rows()
+        return self._exact_search(queries, candidates, top_k, similarity_threshold, include_vectors)
+
+    def _exact_search(
+        self,
+        queries: np.ndarray,
+        candidates: Optional[np.ndarray],
+        top_k: int,
+        similarity_threshold: float,
+        include_vectors: bool,
+    ) -> List[List[Dict[str, Any]]]:
+        """Score queries against all rows (or candidate rows) and take the top-k."""
+        num_candidates = self._count if candidates is None else len(candidates)
+        if num_candidates == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        start_time = time.time()
+        scores = self._score(queries, candidates)
+
+        # Top-k per query without sorting every score
+        k = min(top_k, num_candidates)
+        if k < num_candidates:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(num_candidates), (len(queries), num_candidates))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        if candidates is not None:
+            top = candidates[top]
+
+        all_results = []
+        for rows, row_scores in zip(top, top_scores, strict=True):
+            all_results.append(
+                [
+                    self._format_result(int(idx), score, include_vectors)
+                    for idx, score in zip(rows, row_scores, strict=True)
+                    if score >= similarity_threshold
+                ]
+            )
+
+        search_time = time.time() - start_time
+        logger.debug(
+            f"Numpy search of {len(queries)} queries over {num_candidates} vectors "
+            f"completed in {search_time:.6f}s"
+        )
+        return all_results
+
     def search(
         self,
         query_vector: Union[List[float], np.ndarray],
         top_k: int = 5,
         filter: Optional[Dict[str, Any]] = None,
         similarity_threshold: float = 0.0,
+        include_vectors: bool = False,
     ) -> List[Dict[str, Any]]:
         """Search for similar vectors.
 
@@ -205,44 +561,55 @@ class VectorCollection:
             top_k: Number of results to return
             filter: Optional metadata filter
             similarity_threshold: Minimum similarity score (0.0 to 1.0)
+            include_vectors: Whether to include the stored vector in each result
 
         Returns:
             List of results with scores and metadata
         """
+        self._finish_compaction()
+
         # Ensure query_vector is a numpy array
-        if not isinstance(query_vector, np.ndarray):
-            query_vector = np.array(query_vector, dtype=np.float32)
+        query_vector = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
 
         # Log some diagnostic information
-        logger.debug(f"Collection '{self.name}' contains {len(self.vectors)} vectors")
+        logger.debug(f"Collection '{self.name}' contains {len(self)} vectors")
         logger.debug(
             f"Searching for top {top_k} matches with filter: {filter} and threshold: {similarity_threshold}"
         )
 
         # Filter vectors based on metadata if needed
         if filter:
-            filtered_indices = self._apply_filter(filter)
-            if not filtered_indices:
-                logger.debug(f"No vectors match the filter criteria: {filter}")
-                return []
-            logger.debug(f"Filter reduced search space to {len(filtered_indices)} vectors")
+            candidates = np.asarray(self._apply_filter(filter), dtype=np.intp)
+            logger.debug(f"Filter reduced search space to {len(candidates)} vectors")
+            num_candidates = len(candidates)
         else:
-            filtered_indices = list(range(len(self.vectors)))
-            logger.debug(f"No filter applied, searching all {len(filtered_indices)} vectors")
+            candidates = None
+            num_candidates = len(self)
 
         # If no vectors to search, return empty results
-        if not filtered_indices:
+        if num_candidates == 0 or top_k <= 0:
             logger.debug("No vectors to search, returning empty results")
             return []
 
-        # Perform search based on index type
-        if self.index_type == "hnswlib" and self.index is not None and not filter:
-            # Use HNSW for fast search (only if no filter)
+        # Perform search based on index type; small filtered sets are cheaper to score exactly
+        use_index = self.index_type == "hnswlib" and self.index is not None
+        if use_index and (candidates is None or num_candidates > self._EXACT_SEARCH_MAX_CANDIDATES):
             try:
                 start_time = time.time()
-                labels, distances = self.index.knn_query(
-                    query_vector, k=min(top_k, len(self.vectors))
-                )
+                k = min(top_k, num_candidates)
+                if candidates is None:
+                    labels, distances = self.index.knn_query(query_vector, k=k)
+                else:
+                    # Push the metadata filter into the graph traversal via a label bitset
+                    allowed = np.zeros(self._count, dtype=bool)
+                    allowed[candidates] = True
+                    self.index.set_ef(max(50, k))
+                    labels, distances = self.index.knn_query(
+                        query_vector,
+                        k=k,
+                        num_threads=1,
+                        filter=lambda label: bool(allowed[label]),
+                    )
                 search_time = time.time() - start_time
 
                 # Convert distances to similarities based on metric
@@ -252,32 +619,15 @@ class VectorCollection:
                     similarities = 1.0 / (1.0 + distances[0])  # Convert distance to similarity
 
                 # Format results
-                results = []
-                for _i, (label, similarity) in enumerate(
-                    zip(labels[0], similarities, strict=False)
-                ):
-                    # Apply similarity threshold
-                    if similarity < similarity_threshold:
-                        continue
-
-                    results.append(
-                        {
-                            "id": self.ids[label],
-                            "similarity": float(similarity),
-                            "metadata": self.metadatas[label],
-                            "vector": self.vectors[label].tolist(),
-                        }
-                    )
+                results = [
+                    self._format_result(int(label), similarity, include_vectors)
+                    for label, similarity in zip(labels[0], similarities, strict=False)
+                    if similarity >= similarity_threshold
+                ]
 
                 logger.debug(
                     f"HNSW search completed in {search_time:.6f}s, found {len(results)} results"
                 )
-
-                for i, result in enumerate(results):
-                    logger.debug(
-                        f"Result {i + 1}: id={result['id']}, similarity={result['similarity']:.4f}, metadata={result['metadata']}"
-                    )
-
                 return results
             except Exception as e:
                 logger.error(
@@ -285,73 +635,88 @@ class VectorCollection:
                 )
                 # Fall back to numpy search
 
-        # Numpy-based search (slower but always works)
-        start_time = time.time()
-
-        # Calculate similarities
-        results = []
-        for idx in filtered_indices:
-            vector = self.vectors[idx]
-
-            # Calculate similarity based on metric
-            if self.similarity_metric == "cosine":
-                similarity = cosine_similarity(query_vector, vector)
-            elif self.similarity_metric == "dot":
-                similarity = np.dot(query_vector, vector)
-            elif self.similarity_metric == "euclidean":
-                similarity = 1.0 / (1.0 + np.linalg.norm(query_vector - vector))
-            else:
-                similarity = cosine_similarity(query_vector, vector)
-
-            # Apply similarity threshold
-            if similarity < similarity_threshold:
-                continue
-
-            results.append(
-                {
-                    "id": self.ids[idx],
-                    "similarity": float(similarity),
-                    "metadata": self.metadatas[idx],
-                    "vector": vector.tolist(),
-                }
-            )
-
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x["similarity"], reverse=True)
+        # Numpy-based exact search
+        if candidates is None:
+            candidates = self._live_rows()
+        return self._exact_search(
+            query_vector, candidates, top_k, similarity_threshold, include_vectors
+        )[0]
 
-        # Limit to top_k
-        results = results[:top_k]
+    def _apply_filter(self, filter: Dict[str, Any]) -> List[int]:
+        """Apply metadata filter to get matching indices.
 
-        search_time = time.time() - start_time
-        logger.debug(f"Numpy search completed in {search_time:.6f}s, found {len(results)} results")
+        Equality conditions on hashable values are answered from the inverted
+        index; any other condition is checked against the remaining candidates.
 
-        for i, result in enumerate(results):
-            logger.debug(
-                f"Result {i + 1}: id={result['id']}, similarity={result['similarity']:.4f}, metadata={result['metadata']}"
-            )
+        Args:
+            filter: Metadata filter
 
-        return results
+        Returns:
+            Sorted list of matching (non-deleted) row indices
+        """
+        self._ensure_metadata_loaded()
+        indexed = [(k, v) for k, v in filter.items() if _is_hashable(v)]
+        unindexed = [(k, v) for k, v in filter.items() if not _is_hashable(v)]
+
+        if indexed:
+            row_sets = [self._postings.get(k, {}).get(v, set()) for k, v in indexed]
+            row_sets.sort(key=len)
+            matches = set(row_sets[0])
+            for rows in row_sets[1:]:
+                matches &= rows
+                if not matches:
+                    return []
+        else:
+            matches = set(range(self._count))
+        matches -= self._tombstones
+
+        if unindexed:
+            matches = {
+                row
+                for row in matches
+                if all(
+                    k in self._metadatas[row] and self._metadatas[row][k] == v for k, v in unindexed
+                )
+            }
+        return sorted(matches)
 
-    def _apply_filter(self, filter: Dict[str, Any]) -> List[int]:
-        """Apply metadata filter to get matching indices.
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, List[Any]]:
+        """Get entries by id and/or metadata filter (compatibility with ChromaDB).
 
         Args:
-            filter: Metadata filter
+            ids: Optional IDs to fetch; unknown IDs are skipped
+            where: Optional metadata filter
+            include: Optional list of fields to include ("documents", "metadatas", "embeddings")
 
         Returns:
-            List of matching indices
+            Dictionary with flat "ids" and the requested field lists
         """
-        filtered_indices = []
-        for i, metadata in enumerate(self.metadatas):
-            # Simple equality filter for now
-            match = True
-            for k, v in filter.items():
-                if k not in metadata or metadata[k] != v:
-                    match = False
-                    break
-            if match:
-                filtered_indices.append(i)
-        return filtered_indices
+        include = ["documents", "metadatas"] if include is None else include
+        if ids is not None:
+            rows = [self._id_to_row[i] for i in ids if i in self._id_to_row]
+            if where:
+                allowed = set(self._apply_filter(where))
+                rows = [row for row in rows if row in allowed]
+        elif where:
+            rows = self._apply_filter(where)
+        else:
+            live = self._live_rows()
+            rows = list(range(self._count)) if live is None else live.tolist()
+
+        results: Dict[str, List[Any]] = {"ids": [self._ids[row] for row in rows]}
+        metadatas = [self._metadata_for(row) for row in rows]
+        if "metadatas" in include:
+            results["metadatas"] = metadatas
+        if "documents" in include:
+            results["documents"] = [_document_from_metadata(m) for m in metadatas]
+        if "embeddings" in include:
+            results["embeddings"] = self._raw_vectors(rows).tolist() if rows else []
+        return results
 
     async def search_by_text(
         self,
@@ -360,6 +725,7 @@ class VectorCollection:
         filter: Optional[Dict[str, Any]] = None,
         model: Optional[str] = None,
         similarity_threshold: float = 0.0,
+        include_vectors: bool = False,
     ) -> List[Dict[str, Any]]:
         """Search by text query.
 
@@ -369,6 +735,7 @@ class VectorCollection:
             filter: Optional metadata filter
             model: Embedding model name
             similarity_threshold: Minimum similarity score (0.0 to 1.0)
+            include_vectors: Whether to include the stored vector in each result
 
         Returns:
             List of results with scores and metadata
@@ -385,13 +752,19 @@ class VectorCollection:
         query_embedding = query_embeddings[0]  # Get the first (only) embedding
 
         # Search with the embedding
-        return self.search(query_embedding, top_k, filter, similarity_threshold)
+        return self.search(
+            query_embedding, top_k, filter, similarity_threshold, include_vectors=include_vectors
+        )
 
     def delete(
         self, ids: Optional[List[str]] = None, filter: Optional[Dict[str, Any]] = None
     ) -> int:
         """Delete vectors from the collection.
 
+        Rows are tombstoned (and marked deleted in the HNSW index) rather than
+        removed; storage and index are compacted in the background once enough
+        tombstones accumulate.
+
         Args:
             ids: IDs of vectors to delete
             filter: Metadata filter for vectors to delete
@@ -402,30 +775,39 @@ class VectorCollection:
         if ids is None and filter is None:
             return 0
 
+        self._finish_compaction()
+        self._ensure_metadata_loaded()
+
         # Get indices to delete
         indices_to_delete = set()
 
         # Add indices by ID
         if ids:
-            for i, id in enumerate(self.ids):
-                if id in ids:
-                    indices_to_delete.add(i)
+            for id in ids:
+                row = self._id_to_row.get(id)
+                if row is not None and self._live[row]:
+                    indices_to_delete.add(row)
 
         # Add indices by filter
         if filter:
             filtered_indices = self._apply_filter(filter)
             indices_to_delete.update(filtered_indices)
 
-        # Delete vectors (in reverse order to avoid index issues)
-        indices_to_delete = sorted(indices_to_delete, reverse=True)
-        for idx in indices_to_delete:
-            del self.vectors[idx]
-            del self.ids[idx]
-            del self.metadatas[idx]
+        for row in indices_to_delete:
+            self._live[row] = False
+            self._tombstones.add(row)
+            if self._id_to_row.get(self._ids[row]) == row:
+                del self._id_to_row[self._ids[row]]
+            self._remove_postings(row)
+            if self.index_type == "hnswlib" and self.index is not None:
+                try:
+                    self.index.mark_deleted(row)
+                except Exception as e:
+                    logger.warning(f"Failed to tombstone HNSW label {row}: {e}")
 
-        # Rebuild index if using HNSW
-        if self.index_type == "hnswlib" and self.index is not None:
-            self._rebuild_index()
+        if indices_to_delete:
+            self._dirty = True
+            self._maybe_compact()
 
         logger.info(
             f"Deleted {len(indices_to_delete)} vectors from collection '{self.name}'",
@@ -434,9 +816,119 @@ class VectorCollection:
 
         return len(indices_to_delete)
 
+    def _remove_postings(self, row: int) -> None:
+        metadata = self._metadatas[row]
+        if not isinstance(metadata, dict):
+            return
+        for key, value in metadata.items():
+            if not _is_hashable(value):
+                continue
+            values = self._postings.get(key)
+            rows = values.get(value) if values else None
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del values[value]
+
+    def _maybe_compact(self) -> None:
+        """Start a compaction when tombstones exceed the configured share of rows."""
+        if self._compaction is not None:
+            return
+        threshold = max(self._COMPACTION_MIN_TOMBSTONES, self._COMPACTION_RATIO * self._count)
+        if len(self._tombstones) < threshold:
+            return
+
+        if self.index_type != "hnswlib" or self.index is None:
+            # Without a graph index compaction is just a copy; do it inline
+            self.compact()
+            return
+
+        keep = self._live[: self._count].copy()
+        rows = self._matrix[: self._count][keep]  # copy, unaffected by later appends
+        self._compaction = {
+            "keep": keep,
+            "snapshot_count": self._count,
+            "future": _get_compaction_executor().submit(self._build_index, rows),
+        }
+        logger.debug(
+            f"Started background compaction of collection '{self.name}' "
+            f"({len(self._tombstones)} tombstones)"
+        )
+
+    def _finish_compaction(self, wait: bool = False) -> None:
+        """Swap in a background-built index once it is ready.
+
+        Rows appended while the index was being built are inserted into it, and
+        rows deleted meanwhile are re-tombstoned, so no writes are lost.
+
+        Args:
+            wait: Block until a pending build finishes
+        """
+        compaction = self._compaction
+        if compaction is None or (not wait and not compaction["future"].done()):
+            return
+        self._compaction = None
+        try:
+            new_index = compaction["future"].result()
+        except Exception as e:
+            logger.error(f"Background compaction failed: {e}", emoji_key="error")
+            return
+
+        snapshot_count = compaction["snapshot_count"]
+        keep = np.concatenate(
+            [compaction["keep"], np.ones(self._count - snapshot_count, dtype=bool)]
+        )
+        compacted_snapshot = int(compaction["keep"].sum())
+        self._compact_storage(keep)
+
+        self._add_to_index(new_index, compacted_snapshot, self._count)
+        for row in self._tombstones:
+            new_index.mark_deleted(row)
+        self.index = new_index
+        self._dirty = True  # The next save drops the tombstoned rows from disk too
+        logger.info(f"Compacted collection '{self.name}' to {self._count} rows", emoji_key="vector")
+
+    def _compact_storage(self, keep: np.ndarray) -> None:
+        """Drop rows not in ``keep`` from storage and renumber the remaining rows."""
+        self._ensure_metadata_loaded()
+        remaining = int(keep.sum())
+        self._matrix[:remaining] = self._matrix[: self._count][keep]
+        self._norms[:remaining] = self._norms[: self._count][keep]
+        self._live[:remaining] = self._live[: self._count][keep]
+        self._live[remaining:] = False
+        self._count = remaining
+        self._ids = [id for id, k in zip(self._ids, keep, strict=True) if k]
+        self._metadatas = [m for m, k in zip(self._metadatas, keep, strict=True) if k]
+
+        self._tombstones = set(np.flatnonzero(~self._live[:remaining]).tolist())
+        self._id_to_row = {
+            id: row for row, id in enumerate(self._ids) if row not in self._tombstones
+        }
+        self._postings = _build_postings(self._metadatas)
+        for row in self._tombstones:
+            self._remove_postings(row)
+
+    def compact(self) -> None:
+        """Synchronously drop tombstoned rows and rebuild the index."""
+        self._finish_compaction(wait=True)
+        if not self._tombstones:
+            return
+        self._compact_storage(self._live[: self._count].copy())
+        if self.index_type == "hnswlib" and self.index is not None:
+            self._rebuild_index()
+
     def save(self, directory: Union[str, Path]) -> bool:
         """Save collection to disk.
 
+        Writes the version 2 format: ``collection.json`` (manifest),
+        ``vectors.f32``/``norms.f32`` (raw rows for memory-mapping),
+        ``index.hnsw`` (serialized HNSW graph, if any) and ``metadata.db``
+        (SQLite ids and metadata). Tombstoned rows are written as they are and
+        listed in the manifest, so a save never compacts; compaction stays
+        with ``delete``. Each file is written to a temporary name and renamed
+        into place, with the manifest last. Saving an unmodified collection
+        back to the directory it was opened from is a no-op.
+
         Args:
             directory: Directory to save to
 
@@ -444,37 +936,100 @@ class VectorCollection:
             True if successful
         """
         directory = Path(directory)
+        if not self._dirty and self._source_dir is not None and directory == self._source_dir:
+            return True
         directory.mkdir(parents=True, exist_ok=True)
 
         try:
-            # Save vectors
-            vectors_array = np.array(self.vectors, dtype=np.float32)
-            np.save(str(directory / "vectors.npy"), vectors_array)
+            # Swap in a finished background compaction; a pending one is not waited for
+            self._finish_compaction()
+            self._ensure_metadata_loaded()
+
+            def write_atomic(filename: str, writer) -> None:
+                tmp_path = directory / f".{filename}.tmp"
+                writer(tmp_path)
+                os.replace(tmp_path, directory / filename)
+
+            # Save vectors (stored rows, pre-normalized for cosine) and norms
+            write_atomic(_VECTORS_FILE, self._matrix[: self._count].tofile)
+            write_atomic(_NORMS_FILE, self._norms[: self._count].tofile)
+
+            # Save the HNSW graph so loading does not rebuild it
+            has_index = self.index_type == "hnswlib" and self.index is not None
+            if has_index:
+                write_atomic(_INDEX_FILE, lambda path: self.index.save_index(str(path)))
+            elif (directory / _INDEX_FILE).exists():
+                (directory / _INDEX_FILE).unlink()
 
             # Save IDs and metadata
-            with open(directory / "data.json", "w") as f:
-                json.dump(
-                    {
-                        "name": self.name,
-                        "dimension": self.dimension,
-                        "similarity_metric": self.similarity_metric,
-                        "metadata": self.metadata,
-                        "ids": self.ids,
-                        "metadatas": self.metadatas,
-                    },
-                    f,
-                )
+            def write_metadata(path: Path) -> None:
+                if path.exists():
+                    path.unlink()
+                conn = sqlite3.connect(str(path))
+                try:
+                    conn.execute(
+                        "CREATE TABLE entries (row INTEGER PRIMARY KEY, id TEXT NOT NULL, "
+                        "metadata TEXT NOT NULL)"
+                    )
+                    conn.executemany(
+                        "INSERT INTO entries (row, id, metadata) VALUES (?, ?, ?)",
+                        (
+                            (row, id, json.dumps(metadata))
+                            for row, (id, metadata) in enumerate(
+                                zip(self._ids, self._metadatas, strict=True)
+                            )
+                        ),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+
+            write_atomic(_METADATA_DB_FILE, write_metadata)
+
+            manifest = {
+                "format_version": _COLLECTION_FORMAT_VERSION,
+                "name": self.name,
+                "dimension": self.dimension,
+                "similarity_metric": self.similarity_metric,
+                "metadata": self.metadata,
+                "count": self._count,
+                "tombstones": sorted(self._tombstones),
+                "has_index": has_index,
+            }
+            write_atomic(
+                _MANIFEST_FILE, lambda path: path.write_text(json.dumps(manifest), encoding="utf-8")
+            )
+
+            # Remove version 1 files superseded by this save
+            for legacy_file in (_LEGACY_VECTORS_FILE, _LEGACY_DATA_FILE):
+                if (directory / legacy_file).exists():
+                    (directory / legacy_file).unlink()
 
+            self._source_dir = directory
+            self._dirty = False
             logger.info(f"Saved collection '{self.name}' to {directory}", emoji_key="vector")
             return True
         except Exception as e:
             logger.error(f"Failed to save collection: {str(e)}", emoji_key="error")
             return False
 
+    @staticmethod
+    def exists_at(directory: Union[str, Path]) -> bool:
+        """Check whether a directory contains a saved collection (any format version)."""
+        directory = Path(directory)
+        return (directory / _MANIFEST_FILE).exists() or (
+            (directory / _LEGACY_VECTORS_FILE).exists() and (directory / _LEGACY_DATA_FILE).exists()
+        )
+
     @classmethod
     def load(cls, directory: Union[str, Path]) -> "VectorCollection":
         """Load collection from disk.
 
+        Version 2 collections open lazily: vectors are memory-mapped
+        copy-on-write, the saved HNSW graph is loaded as is, and metadata stays
+        in SQLite until a filter or write needs it. Version 1 collections
+        (``vectors.npy`` + ``data.json``) are read fully and re-indexed.
+
         Args:
             directory: Directory to load from
 
@@ -487,20 +1042,91 @@ class VectorCollection:
         """
         directory = Path(directory)
 
-        # Check if files exist
-        vectors_file = directory / "vectors.npy"
-        data_file = directory / "data.json"
-
-        if not vectors_file.exists() or not data_file.exists():
+        if not cls.exists_at(directory):
             raise FileNotFoundError(f"Collection files not found in {directory}")
+        if not (directory / _MANIFEST_FILE).exists():
+            return cls._load_legacy(directory)
+
+        try:
+            manifest = json.loads((directory / _MANIFEST_FILE).read_text(encoding="utf-8"))
+            if manifest.get("format_version") != _COLLECTION_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported collection format version: {manifest.get('format_version')}"
+                )
+
+            # Create collection
+            collection = cls(
+                name=manifest["name"],
+                dimension=manifest["dimension"],
+                similarity_metric=manifest["similarity_metric"],
+                metadata=manifest["metadata"],
+            )
+            collection._open_files(directory, manifest)
+
+            logger.info(
+                f"Opened collection '{collection.name}' from {directory} ({len(collection)} vectors)",
+                emoji_key="vector",
+            )
+            return collection
+        except Exception as e:
+            logger.error(f"Failed to load collection: {str(e)}", emoji_key="error")
+            raise ValueError(f"Failed to load collection: {str(e)}") from e
+
+    def _open_files(self, directory: Path, manifest: Dict[str, Any]) -> None:
+        """Attach version 2 collection files without reading them into memory."""
+        count = int(manifest["count"])
+        self._reset_storage()
+        if count:
+            # Copy-on-write maps: in-place compaction never touches the files
+            self._matrix = np.memmap(
+                directory / _VECTORS_FILE, dtype=np.float32, mode="c", shape=(count, self.dimension)
+            )
+            self._norms = np.memmap(
+                directory / _NORMS_FILE, dtype=np.float32, mode="c", shape=(count,)
+            )
+            self._live = np.ones(count, dtype=bool)
+            self._count = count
+        # Rows deleted before the save; the saved HNSW graph has them marked deleted
+        self._tombstones = set(manifest.get("tombstones", []))
+        self._live[list(self._tombstones)] = False
+
+        self._metadata_conn = sqlite3.connect(
+            f"file:{directory / _METADATA_DB_FILE}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._ids = [
+            id for (id,) in self._metadata_conn.execute("SELECT id FROM entries ORDER BY row")
+        ]
+        self._id_to_row = {
+            id: row for row, id in enumerate(self._ids) if row not in self._tombstones
+        }
+        self._metadatas = None
+        self._postings = {}
+
+        index_path = directory / _INDEX_FILE
+        if self.index_type == "hnswlib" and manifest.get("has_index") and index_path.exists():
+            try:
+                index = HNSW_INDEX(space=self._get_hnswlib_space(), dim=self.dimension)
+                index.load_index(str(index_path), max_elements=max(1000, count * 2))
+                index.set_ef(50)
+                self.index = index
+            except Exception as e:
+                logger.warning(f"Failed to load saved HNSW index ({e}); rebuilding.")
+                self._rebuild_index()
+        elif self.index_type == "hnswlib":
+            self._rebuild_index()
 
+        self._source_dir = directory
+        self._dirty = False
+
+    @classmethod
+    def _load_legacy(cls, directory: Path) -> "VectorCollection":
+        """Load a version 1 collection (``vectors.npy`` + ``data.json``)."""
         try:
             # Load vectors
-            vectors_array = np.load(str(vectors_file))
-            vectors = [vectors_array[i] for i in range(len(vectors_array))]
+            vectors_array = np.load(str(directory / _LEGACY_VECTORS_FILE))
 
             # Load data
-            with open(data_file, "r") as f:
+            with open(directory / _LEGACY_DATA_FILE, "r") as f:
                 data = json.load(f)
 
             # Create collection
@@ -512,15 +1138,16 @@ class VectorCollection:
             )
 
             # Set data
-            collection.ids = data["ids"]
-            collection.metadatas = data["metadatas"]
-            collection.vectors = vectors
+            collection._reset_storage(vectors_array, data["ids"], data["metadatas"])
 
             # Rebuild index
             collection._rebuild_index()
 
+            # Mark dirty so the next save upgrades the directory to the current format
+            collection._dirty = True
+
             logger.info(
-                f"Loaded collection '{collection.name}' from {directory} ({len(vectors)} vectors)",
+                f"Loaded collection '{collection.name}' from {directory} ({len(collection)} vectors)",
                 emoji_key="vector",
             )
 
@@ -529,6 +1156,10 @@ class VectorCollection:
             logger.error(f"Failed to load collection: {str(e)}", emoji_key="error")
             raise ValueError(f"Failed to load collection: {str(e)}") from e
 
+    def close(self) -> None:
+        """Release the on-disk metadata store (vector maps are freed with the object)."""
+        self._close_metadata_store()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get collection statistics.
 
@@ -539,16 +1170,17 @@ class VectorCollection:
             "name": self.name,
             "dimension": self.dimension,
             "similarity_metric": self.similarity_metric,
-            "vectors_count": len(self.vectors),
+            "vectors_count": len(self),
+            "tombstones": len(self._tombstones),
+            "compaction_pending": self._compaction is not None,
             "index_type": self.index_type,
             "metadata": self.metadata,
         }
 
     def clear(self) -> None:
         """Clear all vectors from the collection."""
-        self.vectors = []
-        self.ids = []
-        self.metadatas = []
+        self._reset_storage()
+        self._dirty = True
 
         # Reset index
         self._init_search_index()
@@ -582,72 +1214,58 @@ class VectorCollection:
             f"DEBUG VectorCollection.query: where={where}, where_document={where_document}"
         )
         logger.debug(f"DEBUG VectorCollection.query: include={include}")
-        logger.debug(
-            f"DEBUG VectorCollection.query: Collection has {len(self.vectors)} vectors and {len(self.ids)} IDs"
-        )
+        logger.debug(f"DEBUG VectorCollection.query: Collection has {len(self)} vectors")
+
+        include_embeddings = "embeddings" in (include or [])
 
         # Initialize results
         results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
 
-        # Process each query
-        for query_text in query_texts:
-            # Get embedding using the async embedding service (which uses its configured model)
-            logger.debug(
-                f"DEBUG VectorCollection.query: Getting embedding for '{query_text}' using service model: {self.embedding_service.model_name}"
+        # Embed all query texts in one batched call to the embedding service
+        logger.debug(
+            f"DEBUG VectorCollection.query: Getting embeddings for {len(query_texts)} queries using service model: {self.embedding_service.model_name}"
+        )
+        try:
+            query_embeddings_list = await self.embedding_service.create_embeddings(
+                list(query_texts)
             )
-            try:
-                query_embeddings_list = await self.embedding_service.create_embeddings([query_text])
-                if not query_embeddings_list or not query_embeddings_list[0]:
-                    logger.error(f"Failed to generate embedding for query: '{query_text[:50]}...'")
-                    # Add empty results for this query and continue
-                    results["ids"].append([])
-                    results["documents"].append([])
-                    results["metadatas"].append([])
-                    results["distances"].append([])
-                    if "embeddings" in (include or []):
-                        results["embeddings"].append([])
-                    continue  # Skip to next query_text
-                query_embedding = np.array(query_embeddings_list[0], dtype=np.float32)
-                if query_embedding.size == 0:
-                    logger.warning(
-                        f"Generated query embedding is empty for: '{query_text[:50]}...'. Skipping search for this query."
-                    )
-                    # Add empty results for this query and continue
-                    results["ids"].append([])
-                    results["documents"].append([])
-                    results["metadatas"].append([])
-                    results["distances"].append([])
-                    if "embeddings" in (include or []):
-                        results["embeddings"].append([])
-                    continue  # Skip to next query_text
-
-            except Exception as embed_err:
-                logger.error(
-                    f"Error generating embedding for query '{query_text[:50]}...': {embed_err}",
-                    exc_info=True,
-                )
-                # Add empty results for this query and continue
-                results["ids"].append([])
-                results["documents"].append([])
-                results["metadatas"].append([])
-                results["distances"].append([])
-                if "embeddings" in (include or []):
-                    results["embeddings"].append([])
-                continue  # Skip to next query_text
-
-            logger.debug(f"DEBUG VectorCollection.query: Embedding shape: {query_embedding.shape}")
-
-            # Search with the embedding
-            logger.debug(f"Searching for query text: '{query_text}' in collection '{self.name}'")
-            search_results = self.search(
-                query_vector=query_embedding,  # Use the generated embedding
-                top_k=n_results,
-                filter=where,
-                similarity_threshold=0.0,  # Set to 0 to get all results for debugging
+        except Exception as embed_err:
+            logger.error(f"Error generating query embeddings: {embed_err}", exc_info=True)
+            query_embeddings_list = []
+
+        valid_positions = [
+            i
+            for i, embedding in enumerate(query_embeddings_list[: len(query_texts)])
+            if embedding is not None and len(embedding) > 0
+        ]
+        if len(valid_positions) < len(query_texts):
+            logger.warning(
+                f"Failed to generate embeddings for {len(query_texts) - len(valid_positions)} "
+                f"of {len(query_texts)} queries; returning empty results for them."
             )
 
+        # Search: the exact numpy path scores every query with one matrix product
+        results_by_position: Dict[int, List[Dict[str, Any]]] = {}
+        if valid_positions:
+            query_matrix = np.asarray(
+                [query_embeddings_list[i] for i in valid_positions], dtype=np.float32
+            )
+            if self.index_type == "hnswlib" and self.index is not None:
+                searched = [
+                    self.search(vector, n_results, where, 0.0, include_vectors=include_embeddings)
+                    for vector in query_matrix
+                ]
+            else:
+                searched = self.search_batch(
+                    query_matrix, n_results, where, 0.0, include_vectors=include_embeddings
+                )
+            results_by_position = dict(zip(valid_positions, searched, strict=True))
+
+        # Process each query
+        for position, query_text in enumerate(query_texts):
+            search_results = results_by_position.get(position, [])
             logger.debug(
-                f"DEBUG VectorCollection.query: Found {len(search_results)} raw search results"
+                f"DEBUG VectorCollection.query: Found {len(search_results)} raw search results for '{query_text[:50]}'"
             )
 
             # Format results in ChromaDB format
@@ -658,19 +1276,9 @@ class VectorCollection:
             embeddings = []
 
             for i, item in enumerate(search_results):
-                ids.append(item["id"])
-
                 # Extract document from metadata (keep existing robust logic)
                 metadata = item.get("metadata", {})
-                doc = ""
-                if "text" in metadata:
-                    doc = metadata["text"]
-                elif "document" in metadata:
-                    doc = metadata["document"]
-                elif "content" in metadata:
-                    doc = metadata["content"]
-                if not doc and isinstance(metadata, str):
-                    doc = metadata
+                doc = _document_from_metadata(metadata)
 
                 # Apply document content filter if specified
                 if where_document and where_document.get("$contains"):
@@ -685,11 +1293,12 @@ class VectorCollection:
                     f"Result {i + 1}: id={item['id']}, similarity={item.get('similarity', 0.0):.4f}, doc_length={len(doc)}"
                 )
 
+                ids.append(item["id"])
                 documents.append(doc)
                 metadatas.append(metadata)
                 distance = 1.0 - item.get("similarity", 0.0)
                 distances.append(distance)
-                if "embeddings" in (include or []):
+                if include_embeddings:
                     embeddings.append(item.get("vector", []))
 
             # Add results for the current query_text
@@ -697,7 +1306,7 @@ class VectorCollection:
             results["documents"].append(documents)
             results["metadatas"].append(metadatas)
             results["distances"].append(distances)
-            if "embeddings" in (include or []):
+            if include_embeddings:
                 results["embeddings"].append(embeddings)
 
             logger.debug(
@@ -720,13 +1329,18 @@ class VectorDatabaseService:
         return cls._instance
 
     def __init__(
-        self, base_dir: Optional[Union[str, Path]] = None, use_chromadb: Optional[bool] = None
+        self,
+        base_dir: Optional[Union[str, Path]] = None,
+        use_chromadb: Optional[bool] = None,
+        max_resident_collections: int = 16,
     ):
         """Initialize the vector database service.
 
         Args:
             base_dir: Base directory for storage
             use_chromadb: Whether to use ChromaDB (if available)
+            max_resident_collections: Maximum number of local collections kept open;
+                the least recently used ones are saved and closed beyond this
         """
         # Only initialize once for singleton
         if self._initialized:
@@ -787,8 +1401,11 @@ class VectorDatabaseService:
 
             self.use_chromadb = False
 
-        # Collections
-        self.collections = {}
+        # Collections, least recently used first; local ones are opened on first use
+        self.collections: "OrderedDict[str, Union[VectorCollection, Any]]" = OrderedDict()
+        self.max_resident_collections = max(1, max_resident_collections)
+        # Evicted collections whose final save is still running on a worker thread
+        self._evictions: Dict[str, "asyncio.Task[None]"] = {}
 
         # Get embedding service
         self.embedding_service = get_embedding_service()
@@ -800,6 +1417,48 @@ class VectorDatabaseService:
             emoji_key="vector",
         )
 
+    def _collection_dir(self, name: str) -> Path:
+        return self.base_dir / "collections" / name
+
+    async def _make_resident(self, name: str, collection: Union[VectorCollection, Any]) -> None:
+        """Register an open collection and close the least recently used local ones."""
+        self.collections[name] = collection
+        self.collections.move_to_end(name)
+
+        local_names = [n for n, c in self.collections.items() if isinstance(c, VectorCollection)]
+        evictions = []
+        for evict_name in local_names[: max(0, len(local_names) - self.max_resident_collections)]:
+            task = asyncio.ensure_future(self._evict(evict_name, self.collections.pop(evict_name)))
+            self._evictions[evict_name] = task
+            evictions.append(task)
+        if evictions:
+            # Shielded so a cancelled caller does not abandon a half-finished eviction
+            await asyncio.shield(asyncio.gather(*evictions))
+
+    async def _evict(self, name: str, collection: VectorCollection) -> None:
+        """Save an evicted collection on a worker thread, then close it."""
+        try:
+            # Persist unsaved changes before dropping the in-memory copy
+            saved = await asyncio.to_thread(collection.save, self._collection_dir(name))
+            if not saved:
+                logger.error(
+                    f"Keeping collection '{name}' resident: saving it failed",
+                    emoji_key="error",
+                )
+                self.collections.setdefault(name, collection)
+                self.collections.move_to_end(name, last=False)
+                return
+            collection.close()
+            logger.debug(f"Closed idle collection '{name}'")
+        finally:
+            self._evictions.pop(name, None)
+
+    async def _wait_for_eviction(self, name: str) -> None:
+        """Wait until a pending eviction of ``name`` has finished writing its files."""
+        task = self._evictions.get(name)
+        if task is not None:
+            await asyncio.shield(task)
+
     async def _reset_chroma_client(self) -> bool:
         """Reset or recreate the ChromaDB client.
 
@@ -859,6 +1518,8 @@ class VectorDatabaseService:
         Raises:
             ValueError: If collection already exists and overwrite is False
         """
+        await self._wait_for_eviction(name)
+
         # Check if collection already exists in memory
         if name in self.collections and not overwrite:
             raise ValueError(f"Collection '{name}' already exists")
@@ -908,7 +1569,7 @@ class VectorDatabaseService:
 
                 logger.info(f"Created ChromaDB collection '{name}'", emoji_key="vector")
 
-                self.collections[name] = collection
+                await self._make_resident(name, collection)
                 return collection
             except Exception as e:
                 # Instead of falling back to local storage, raise the error
@@ -923,7 +1584,7 @@ class VectorDatabaseService:
                 metadata=metadata,
             )
 
-            self.collections[name] = collection
+            await self._make_resident(name, collection)
             return collection
 
     async def get_collection(self, name: str) -> Optional[Union[VectorCollection, Any]]:
@@ -935,8 +1596,11 @@ class VectorDatabaseService:
         Returns:
             Collection or None if not found
         """
+        await self._wait_for_eviction(name)
+
         # Check if collection is already loaded
         if name in self.collections:
+            self.collections.move_to_end(name)
             return self.collections[name]
 
         # Try to load from disk
@@ -962,17 +1626,17 @@ class VectorDatabaseService:
 
                 if name in existing_collection_names:
                     collection = self.chroma_client.get_collection(name)
-                    self.collections[name] = collection
+                    await self._make_resident(name, collection)
                     return collection
             except Exception as e:
                 logger.error(f"Failed to get ChromaDB collection: {str(e)}", emoji_key="error")
 
-        # Try to load local collection
-        collection_dir = self.base_dir / "collections" / name
-        if collection_dir.exists():
+        # Try to open local collection (memory-mapped, metadata loaded lazily)
+        collection_dir = self._collection_dir(name)
+        if VectorCollection.exists_at(collection_dir):
             try:
                 collection = VectorCollection.load(collection_dir)
-                self.collections[name] = collection
+                await self._make_resident(name, collection)
                 return collection
             except Exception as e:
                 logger.error(f"Failed to load collection '{name}': {str(e)}", emoji_key="error")
@@ -1013,7 +1677,7 @@ class VectorDatabaseService:
         collections_dir = self.base_dir / "collections"
         if collections_dir.exists():
             for path in collections_dir.iterdir():
-                if path.is_dir() and (path / "data.json").exists():
+                if path.is_dir() and VectorCollection.exists_at(path):
                     collection_names.add(path.name)
 
         return list(collection_names)
@@ -1027,9 +1691,13 @@ class VectorDatabaseService:
         Returns:
             True if successful
         """
+        await self._wait_for_eviction(name)
+
         # Remove from loaded collections
         if name in self.collections:
-            del self.collections[name]
+            collection = self.collections.pop(name)
+            if isinstance(collection, VectorCollection):
+                collection.close()
 
         success = True
 
@@ -1084,6 +1752,7 @@ class VectorDatabaseService:
         ids: Optional[List[str]] = None,
         embedding_model: Optional[str] = None,
         batch_size: int = 100,
+        embeddings: Optional[List[List[float]]] = None,
     ) -> List[str]:
         """Add texts to a collection.
 
@@ -1094,33 +1763,39 @@ class VectorDatabaseService:
             ids: Optional IDs for the texts
             embedding_model: Embedding model name (NOTE: Model is set during EmbeddingService init)
             batch_size: Maximum batch size for embedding generation
+            embeddings: Embeddings of ``texts`` computed by the caller with this
+                service's embedding model; generation is skipped when given
 
         Returns:
             List of document IDs
 
         Raises:
-            ValueError: If collection not found
+            ValueError: If collection not found, or embeddings do not match texts
         """
         # Get or create collection
         collection = await self.get_collection(collection_name)
         if collection is None:
             collection = await self.create_collection(collection_name)
 
-        # Generate embeddings
-        logger.debug(
-            f"Generating embeddings for {len(texts)} texts using model: {self.embedding_service.model_name}"
-        )
-        embeddings = []
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i : i + batch_size]
-            batch_embeddings = await self.embedding_service.create_embeddings(
-                texts=batch_texts,
+        if embeddings is not None:
+            if len(embeddings) != len(texts):
+                raise ValueError(f"Got {len(embeddings)} embeddings for {len(texts)} texts")
+        else:
+            # Generate embeddings
+            logger.debug(
+                f"Generating embeddings for {len(texts)} texts using model: {self.embedding_service.model_name}"
             )
-            embeddings.extend(batch_embeddings)
-            if len(texts) > batch_size:  # Add delay if batching
-                await asyncio.sleep(0.1)  # Small delay between batches
+            embeddings = []
+            for i in range(0, len(texts), batch_size):
+                batch_texts = texts[i : i + batch_size]
+                batch_embeddings = await self.embedding_service.create_embeddings(
+                    texts=batch_texts,
+                )
+                embeddings.extend(batch_embeddings)
+                if len(texts) > batch_size:  # Add delay if batching
+                    await asyncio.sleep(0.1)  # Small delay between batches
 
-        logger.debug(f"Generated {len(embeddings)} embeddings")
+            logger.debug(f"Generated {len(embeddings)} embeddings")
 
         # Add to collection
         if self.use_chromadb and isinstance(collection, chromadb.Collection):
@@ -1276,6 +1951,7 @@ class VectorDatabaseService:
                 filter=filter,
                 # model=embedding_model, # Pass model used by the collection's service instance
                 similarity_threshold=similarity_threshold,
+                include_vectors=include_vectors,
             )
 
             # Format results
@@ -1307,6 +1983,22 @@ class VectorDatabaseService:
         # Simple equality filter for now
         return filter
 
+    def save_collection(self, name: str) -> bool:
+        """Save a loaded local collection to disk.
+
+        ChromaDB collections persist on write, so this is a no-op for them.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if the collection is durable on disk afterwards
+        """
+        collection = self.collections.get(name)
+        if not isinstance(collection, VectorCollection):
+            return True
+        return collection.save(self._collection_dir(name))
+
     def save_all_collections(self) -> int:
         """Save all local collections to disk.
 
@@ -1430,6 +2122,8 @@ class VectorDatabaseService:
             elif hasattr(collection, "metadata"):
                 # Local collection
                 collection.metadata.update(metadata)
+                if isinstance(collection, VectorCollection):
+                    collection._dirty = True
 
             logger.info(f"Updated metadata for collection '{name}'", emoji_key="vector")
             return True
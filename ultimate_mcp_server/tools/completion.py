@@ -1,10 +1,16 @@
 """Text completion tools for Ultimate MCP Server."""
 
 import asyncio
+import contextlib
 import time
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
 from ultimate_mcp_server.constants import Provider, TaskType
+from ultimate_mcp_server.core.providers.admission import (
+    Priority,
+    estimate_tokens,
+    get_admission_controller,
+)
 from ultimate_mcp_server.core.providers.base import get_provider, parse_model_string
 from ultimate_mcp_server.exceptions import ProviderError, ToolError, ToolInputError
 from ultimate_mcp_server.services.cache import with_cache
@@ -13,6 +19,18 @@ from ultimate_mcp_server.utils import get_logger
 
 logger = get_logger("ultimate_mcp_server.tools.completion")
 
+
+def _parse_priority(priority: str) -> Priority:
+    try:
+        return Priority(priority)
+    except ValueError as e:
+        raise ToolInputError(
+            f"Invalid priority '{priority}'. Use one of: {', '.join(p.value for p in Priority)}",
+            param_name="priority",
+            provided_value=priority,
+        ) from e
+
+
 # --- Tool Functions (Standalone, Decorated) ---
 
 
@@ -27,6 +45,7 @@ async def generate_completion(
     stream: bool = False,
     json_mode: bool = False,
     additional_params: Optional[Dict[str, Any]] = None,
+    priority: str = Priority.INTERACTIVE.value,
 ) -> Dict[str, Any]:
     """Generates a single, complete text response for a given prompt (non-streaming).
 
@@ -49,6 +68,8 @@ async def generate_completion(
         json_mode: (Optional) When True, instructs the model to return a valid JSON response. Default False.
                    Note: Support and behavior varies by provider.
         additional_params: (Optional) Dictionary of additional provider-specific parameters (e.g., `{"top_p": 0.9}`).
+        priority: (Optional) Admission lane when the provider is at its rate or concurrency limit:
+                  "interactive" (default) requests are sent before waiting "batch" requests.
 
     Returns:
         A dictionary containing the full completion and metadata:
@@ -67,7 +88,7 @@ async def generate_completion(
         }
 
     Raises:
-        ToolInputError: If `stream` is set to True.
+        ToolInputError: If `stream` is set to True or `priority` is invalid.
         ProviderError: If the provider is unavailable or the LLM request fails.
         ToolError: For other internal errors.
     """
@@ -78,6 +99,7 @@ async def generate_completion(
             param_name="stream",
             provided_value=stream,
         )
+    lane = _parse_priority(priority)
 
     start_time = time.time()
 
@@ -122,8 +144,12 @@ async def generate_completion(
     final_provider_params = {**params_for_provider, **additional_params}
 
     try:
-        # Generate completion
-        result = await provider_instance.generate_completion(**final_provider_params)
+        # Generate completion once the provider's admission control lets the request through
+        async with get_admission_controller().admit(
+            provider, estimate_tokens(prompt, max_tokens), lane
+        ) as ticket:
+            result = await provider_instance.generate_completion(**final_provider_params)
+            ticket.record_usage(result.total_tokens)
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -174,6 +200,7 @@ async def stream_completion(
     temperature: float = 0.7,
     json_mode: bool = False,
     additional_params: Optional[Dict[str, Any]] = None,
+    priority: str = Priority.INTERACTIVE.value,
 ) -> AsyncGenerator[Dict[str, Any], None]:
     """Generates a text completion for a prompt and streams the response chunk by chunk.
 
@@ -192,6 +219,8 @@ async def stream_completion(
         temperature: (Optional) Controls response randomness (0.0=deterministic, 1.0=creative). Default 0.7.
         json_mode: (Optional) When True, instructs the model to return a valid JSON response. Default False.
         additional_params: (Optional) Dictionary of additional provider-specific parameters (e.g., `{"top_p": 0.9}`).
+        priority: (Optional) Admission lane when the provider is at its rate or concurrency limit:
+                  "interactive" (default) requests are sent before waiting "batch" requests.
 
     Yields:
         A stream of dictionary chunks. Each chunk contains:
@@ -219,9 +248,11 @@ async def stream_completion(
         }
 
     Raises:
+        ToolInputError: If `priority` is invalid.
         ProviderError: If the provider is unavailable or the LLM stream request fails initially.
                        Errors during the stream yield an error message in the final chunk.
     """
+    lane = _parse_priority(priority)
     start_time = time.time()
 
     # Add MCP annotations for audience and priority
@@ -276,33 +307,40 @@ async def stream_completion(
     actual_model_used = model  # Keep track of the actual model used
 
     try:
-        # Get stream, passing json_mode directly
-        stream = provider_instance.generate_completion_stream(
-            prompt=prompt,
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            json_mode=json_mode,  # Pass the flag here
-            **additional_params,
+        # Get stream, passing json_mode directly. The admission slot is released as soon
+        # as the provider stream ends or this generator is closed
+        stream = get_admission_controller().admit_stream(
+            provider,
+            provider_instance.generate_completion_stream(
+                prompt=prompt,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                json_mode=json_mode,  # Pass the flag here
+                **additional_params,
+            ),
+            estimate_tokens(prompt, max_tokens),
+            lane,
+            usage=lambda item: item[1].get("total_tokens"),
         )
-
-        async for chunk, metadata in stream:
-            chunk_count += 1
-            full_text += chunk
-            final_metadata.update(metadata)  # Keep track of latest metadata
-            actual_model_used = metadata.get(
-                "model", actual_model_used
-            )  # Update if metadata provides it
-
-            # Yield chunk with metadata
-            yield {
-                "text": chunk,
-                "chunk_index": chunk_count,
-                "provider": provider,
-                "model": actual_model_used,
-                "finish_reason": metadata.get("finish_reason"),
-                "finished": False,
-            }
+        async with contextlib.aclosing(stream):
+            async for chunk, metadata in stream:
+                chunk_count += 1
+                full_text += chunk
+                final_metadata.update(metadata)  # Keep track of latest metadata
+                actual_model_used = metadata.get(
+                    "model", actual_model_used
+                )  # Update if metadata provides it
+
+                # Yield chunk with metadata
+                yield {
+                    "text": chunk,
+                    "chunk_index": chunk_count,
+                    "provider": provider,
+                    "model": actual_model_used,
+                    "finish_reason": metadata.get("finish_reason"),
+                    "finished": False,
+                }
 
     except Exception as e:
         error_during_stream = (
@@ -369,6 +407,7 @@ async def generate_completion_stream(
     temperature: float = 0.7,
     json_mode: bool = False,
     additional_params: Optional[Dict[str, Any]] = None,
+    priority: str = Priority.INTERACTIVE.value,
 ) -> AsyncGenerator[Dict[str, Any], None]:
     """Generates a text response in a streaming fashion for a given prompt.
 
@@ -384,6 +423,8 @@ async def generate_completion_stream(
         temperature: Controls randomness in the output (0.0-1.0).
         json_mode: Whether to request JSON formatted output from the model.
         additional_params: Additional provider-specific parameters.
+        priority: Admission lane when the provider is at its rate or concurrency limit:
+                  "interactive" (default) or "batch".
 
     Yields:
         Dictionary containing the generated text chunk and metadata:
@@ -394,8 +435,10 @@ async def generate_completion_stream(
         }
 
     Raises:
+        ToolInputError: If `priority` is invalid.
         ToolError: If an error occurs during text generation.
     """
+    lane = _parse_priority(priority)
     # Initialize variables to track metrics
     start_time = time.time()
 
@@ -410,24 +453,32 @@ async def generate_completion_stream(
         if json_mode:
             params["json_mode"] = True
 
-        # Stream the completion
-        async for chunk, metadata in provider_instance.generate_completion_stream(
-            prompt=prompt, model=model, max_tokens=max_tokens, temperature=temperature, **params
-        ):
-            # Calculate elapsed time for each chunk
-            elapsed_time = time.time() - start_time
-
-            # Include additional metadata with each chunk
-            response = {
-                "text": chunk,
-                "metadata": {
-                    **metadata,
-                    "elapsed_time": elapsed_time,
-                },
-                "done": metadata.get("finish_reason") is not None,
-            }
+        stream = get_admission_controller().admit_stream(
+            provider,
+            provider_instance.generate_completion_stream(
+                prompt=prompt, model=model, max_tokens=max_tokens, temperature=temperature, **params
+            ),
+            estimate_tokens(prompt, max_tokens),
+            lane,
+            usage=lambda item: item[1].get("total_tokens"),
+        )
+        async with contextlib.aclosing(stream):
+            # Stream the completion
+            async for chunk, metadata in stream:
+                # Calculate elapsed time for each chunk
+                elapsed_time = time.time() - start_time
+
+                # Include additional metadata with each chunk
+                response = {
+                    "text": chunk,
+                    "metadata": {
+                        **metadata,
+                        "elapsed_time": elapsed_time,
+                    },
+                    "done": metadata.get("finish_reason") is not None,
+                }
 
-            yield response
+                yield response
 
     except Exception as e:
         logger.error(f"Error in generate_completion_stream: {str(e)}", exc_info=True)
@@ -447,6 +498,7 @@ async def chat_completion(
     system_prompt: Optional[str] = None,
     json_mode: bool = False,
     additional_params: Optional[Dict[str, Any]] = None,
+    priority: str = Priority.INTERACTIVE.value,
 ) -> Dict[str, Any]:
     """Generates a response within a conversational context (multi-turn chat).
 
@@ -471,6 +523,8 @@ async def chat_completion(
                        If provided, it's effectively prepended to the `messages` list as a system message.
         json_mode: (Optional) Request structured JSON output from the LLM. Default False.
         additional_params: (Optional) Dictionary of additional provider-specific parameters (e.g., `{"top_p": 0.9}`).
+        priority: (Optional) Admission lane when the provider is at its rate or concurrency limit:
+                  "interactive" (default) or "batch".
 
     Returns:
         A dictionary containing the assistant's response message and metadata:
@@ -493,7 +547,7 @@ async def chat_completion(
         }
 
     Raises:
-        ToolInputError: If the `messages` format is invalid.
+        ToolInputError: If the `messages` format or `priority` is invalid.
         ProviderError: If the provider is unavailable or the LLM request fails (after retries).
         ToolError: For other internal errors.
     """
@@ -508,6 +562,7 @@ async def chat_completion(
             param_name="messages",
             provided_value=messages,
         )
+    lane = _parse_priority(priority)
 
     # Prepend system prompt if provided
     if system_prompt:
@@ -539,14 +594,19 @@ async def chat_completion(
     if json_mode:
         additional_params["json_mode"] = True
 
+    prompt_text = "".join(str(message.get("content", "")) for message in processed_messages)
     try:
-        result = await provider_instance.generate_completion(
-            messages=processed_messages,
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            **additional_params,
-        )
+        async with get_admission_controller().admit(
+            provider, estimate_tokens(prompt_text, max_tokens), lane
+        ) as ticket:
+            result = await provider_instance.generate_completion(
+                messages=processed_messages,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **additional_params,
+            )
+            ticket.record_usage(result.total_tokens)
 
         processing_time = time.time() - start_time
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+import csv
 import datetime as dt
 import hashlib
 import json
@@ -10,12 +11,14 @@ import re
 import tempfile
 import time
 import uuid
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
 
 # --- START: Expanded typing imports ---
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 # --- END: Expanded typing imports ---
 # --- Removed BaseTool import ---
@@ -24,7 +27,8 @@ from sqlalchemy import inspect as sa_inspect
 from sqlalchemy import text
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncResult, create_async_engine
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
 
 # Local imports
 from ultimate_mcp_server.exceptions import ToolError, ToolInputError
@@ -57,6 +61,13 @@ try:
 except ImportError:
     pa = None
 
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+    pq = None
+
 try:
     import prometheus_client as prom
 except ImportError:
@@ -108,6 +119,7 @@ class ConnectionManager:
                 logger.error(f"Error during connection cleanup: {e}", exc_info=True)
 
     async def cleanup_inactive_connections(self):
+        await _sql_prune_stream_cursors()  # Release connections of idle stream cursors
         current_time = time.time()
         conn_ids_to_close = []
 
@@ -185,6 +197,7 @@ class ConnectionManager:
 
         if engine:
             logger.info(f"Closing connection {conn_id}...")
+            await _sql_close_stream_cursors(conn_id)
             try:
                 await engine.dispose()
                 logger.info(f"Connection {conn_id} disposed successfully.")
@@ -260,6 +273,37 @@ class ConnectionManager:
 
 _connection_manager = ConnectionManager()
 
+
+# --- Streaming Cursors ---
+@dataclass
+class _SqlStreamCursor:
+    """Server-side cursor of a streamed execute_sql query, resumable by token."""
+
+    connection_id: str
+    sql: str
+    params: Dict[str, Any]
+    columns: List[str] = field(default_factory=list)
+    page_size: int = 0  # Page size of the previous page
+    offset: int = 0  # Rows returned so far
+    conn: Optional[AsyncConnection] = None
+    result: Optional[AsyncResult] = None
+    lookahead: List[Dict[str, Any]] = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+_STREAM_CURSORS: Dict[str, _SqlStreamCursor] = {}
+_STREAM_CURSOR_TTL = 300.0  # Idle seconds before a cursor token expires
+_STREAM_CURSOR_HOLD = 30.0  # Idle seconds a cursor keeps its connection (and read snapshot)
+_MAX_OPEN_STREAM_CURSORS = 16  # Per engine; cursors past the cap re-execute on resume
+_STREAM_BATCH_SIZE = 1000  # Rows per driver round trip when streaming
+_STREAMING_EXPORT_FORMATS = ("csv", "parquet")
+_ROW_QUERY_RX = re.compile(r"^\s*\(*\s*(SELECT|WITH|VALUES|TABLE)\b", re.I)
+# String literals, quoted identifiers and comments, skipped when scanning WITH queries
+_SQL_QUOTED_RX = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/", re.S)
+_SQL_ROW_LOCK_RX = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b", re.I)
+_SQL_DATA_MODIFYING_RX = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE)\b", re.I)
+
 # --- Security and Validation ---
 _PROHIBITED_SQL_PATTERN = r"""^\s*(DROP\s+(TABLE|DATABASE|INDEX|VIEW|FUNCTION|PROCEDURE|USER|ROLE)|
              TRUNCATE\s+TABLE|
@@ -280,6 +324,9 @@ _TABLE_RX = re.compile(r"\b(?:FROM|JOIN|UPDATE|INSERT\s+INTO|DELETE\s+FROM)\s+([
 class MaskRule:
     rx: re.Pattern
     repl: Union[str, callable]
+    # Substrings, with ASCII digits written as 0, at least one of which occurs in every
+    # value `rx` matches; lets a whole column be screened instead of matching each value
+    hints: Tuple[str, ...] = ()
 
 
 # Helper lambda for credit card masking
@@ -299,10 +346,18 @@ def _mask_email(v: str) -> str:
 
 
 _MASKING_RULES = [
-    MaskRule(re.compile(r"^\d{3}-\d{2}-\d{4}$"), "***-**-XXXX"),  # SSN
-    MaskRule(re.compile(r"(\b\d{4}-?){3}\d{4}\b"), _mask_cc),  # CC basic mask
-    MaskRule(re.compile(r"[\w\.-]+@[\w\.-]+\.\w+"), _mask_email),  # Email
+    MaskRule(re.compile(r"^\d{3}-\d{2}-\d{4}$"), "***-**-XXXX", ("000-00-0000",)),  # SSN
+    MaskRule(
+        re.compile(r"(\b\d{4}-?){3}\d{4}\b"), _mask_cc, ("00000000", "0000-0000")
+    ),  # CC basic mask
+    MaskRule(re.compile(r"[\w\.-]+@[\w\.-]+\.\w+"), _mask_email, ("@",)),  # Email
 ]
+_DIGITS_TO_ZERO = str.maketrans("0123456789", "0" * 10)
+
+# Column names that suggest every value needs checking (skips the column scan)
+_PII_COLUMN_RX = re.compile(r"e?mail|ssn|social|card|credit|(?:^|_)(?:cc|pan)(?:_|$)", re.I)
+_MASK_SAMPLE_SIZE = 16  # Values sampled to decide whether a column is mostly PII
+_MASK_DENSE_RATIO = 0.5
 
 # --- ACLs ---
 _RESTRICTED_TABLES: Set[str] = set()
@@ -416,6 +471,7 @@ async def shutdown_sql_tools():
         await asyncio.wait_for(_connection_manager.shutdown(), timeout=8.0)
     except asyncio.TimeoutError:
         logger.warning("Connection Manager shutdown timed out after 8 seconds")
+    await _sql_close_stream_cursors()
     # Clear other global state if necessary (e.g., save audit log)
     logger.info("SQL Tools module shutdown complete.")
 
@@ -676,6 +732,82 @@ def _sql_mask_row(row: Dict[str, Any]) -> Dict[str, Any]:
     # return {k: _sql_mask_val(v) for k, v in row.items()} # Keep single-line comprehension
 
 
+def _sql_mask_candidates(strings: Sequence[str]) -> Optional[List[int]]:
+    """Indices of the values containing a masking rule's hint (None if all need checking)."""
+    hints = {hint for rule in _MASKING_RULES for hint in rule.hints}
+    if not hints or any(not rule.hints for rule in _MASKING_RULES):
+        return None
+    joined = "\n".join(strings)
+    if not joined.isascii():
+        return None  # \d also matches non-ASCII digits
+    # Substring searches over the whole column instead of regex matches per value
+    normalized = joined.translate(_DIGITS_TO_ZERO)
+    starts = [m.start() for hint in hints for m in re.finditer(re.escape(hint), normalized)]
+    if not starts:
+        return []
+    ends = list(accumulate(len(v) + 1 for v in strings))
+    return sorted({bisect_right(ends, start) for start in starts})
+
+
+def _sql_mask_column(name: str, values: Sequence[Any]) -> Optional[List[Any]]:
+    """Apply masking rules to one result column; returns None if no value changed."""
+    types = set(map(type, values))
+    if not any(issubclass(t, str) for t in types):
+        return None  # Rules only apply to strings
+
+    if types == {str}:
+        positions = None
+        strings = values
+    else:
+        positions = [i for i, v in enumerate(values) if isinstance(v, str)]
+        strings = [values[i] for i in positions]
+
+    # Columns that are mostly PII are checked value by value without screening
+    is_dense = _PII_COLUMN_RX.search(name) is not None
+    if not is_dense:
+        step = max(1, len(strings) // _MASK_SAMPLE_SIZE)
+        sample = strings[::step][:_MASK_SAMPLE_SIZE]
+        hits = sum(1 for v in sample if _sql_mask_val(v) is not v)
+        is_dense = hits >= len(sample) * _MASK_DENSE_RATIO
+    candidates = None if is_dense else _sql_mask_candidates(strings)
+    if candidates is None:
+        candidates = range(len(strings))
+
+    masked: Optional[List[Any]] = None
+    for candidate in candidates:
+        index = candidate if positions is None else positions[candidate]
+        value = values[index]
+        masked_value = _sql_mask_val(value)
+        if masked_value is not value:
+            if masked is None:
+                masked = list(values)
+            masked[index] = masked_value
+    return masked
+
+
+def _sql_mask_rows(cols: List[str], rows: List[Any]) -> List[Dict[str, Any]]:
+    """Apply masking rules to a batch of result rows, column by column.
+
+    Gives the same result as _sql_mask_row on every row. Columns without
+    string values are skipped. In the others, only values containing one of
+    the rules' hints (found by substring search over the whole column) are
+    matched against the rules, unless the column's name or a sample suggests
+    most values are PII.
+    """
+    if not rows:
+        return []
+    columns = list(zip(*rows, strict=True))
+    changed = False
+    for index, name in enumerate(cols):
+        masked = _sql_mask_column(name, columns[index])
+        if masked is not None:
+            columns[index] = masked
+            changed = True
+    if changed:
+        rows = zip(*columns, strict=True)
+    return [dict(zip(cols, row, strict=True)) for row in rows]
+
+
 def _sql_driver_url(conn_str: str) -> Tuple[str, str]:
     """Convert generic connection string to dialect-specific async URL."""
     # Check if it looks like a path (no ://) and exists or is :memory:
@@ -821,6 +953,22 @@ def _sql_extract_tables(sql: str) -> List[str]:
     return sorted_tables
 
 
+def _sql_is_row_query(sql: str) -> bool:
+    """Whether a statement only reads rows and can run on a streaming cursor.
+
+    SELECT, VALUES and TABLE statements qualify, as do WITH queries unless their
+    CTEs or main statement insert, update, delete or merge rows; those run as
+    ordinary statements.
+    """
+    match = _ROW_QUERY_RX.match(sql)
+    if match is None:
+        return False
+    if match.group(1).upper() != "WITH":
+        return True
+    body = _SQL_ROW_LOCK_RX.sub(" ", _SQL_QUOTED_RX.sub(" ", sql))
+    return _SQL_DATA_MODIFYING_RX.search(body) is None
+
+
 def _sql_check_safe(sql: str, read_only: bool = True) -> None:
     """Validate SQL for safety using global patterns and ACLs."""
     # Check ACLs first
@@ -893,57 +1041,40 @@ async def _sql_exec(
         _Q_CNT.labels(tool=tool_name, action=action_name, db=db_dialect).inc()
 
     cols: List[str] = []
-    rows_raw: List[Any] = []
     row_count: int = 0
     masked_rows: List[Dict[str, Any]] = []
 
     async def _run(conn: AsyncConnection):
-        nonlocal cols, rows_raw, row_count, masked_rows
+        nonlocal cols, row_count, masked_rows
         statement = text(sql)
         query_params = params or {}
+        needs_limit = limit is not None and limit >= 0
         try:
-            res = await conn.execute(statement, query_params)
-            has_cursor = res.cursor is not None
-            has_description = has_cursor and res.cursor.description is not None
-            if not has_cursor or not has_description:
-                logger.debug(f"Query did not return rows or description. Action: {action_name}")
-                # Ternary okay
-                res_rowcount = res.rowcount if res.rowcount >= 0 else 0
-                row_count = res_rowcount
-                masked_rows = []  # Ensure it's an empty list
-                empty_cols: List[str] = []
-                empty_rows: List[Dict[str, Any]] = []
-                return empty_cols, empty_rows, row_count  # Return empty lists for cols/rows
+            if _sql_is_row_query(sql):
+                # Row queries run on a server-side cursor, so only the rows within
+                # `limit` are transferred from the database
+                batch_size = min(limit, _STREAM_BATCH_SIZE) if needs_limit else _STREAM_BATCH_SIZE
+                res = await conn.stream(
+                    statement, query_params, execution_options={"yield_per": max(batch_size, 1)}
+                )
+            else:
+                res = await conn.execute(statement, query_params)
+                if not res.returns_rows:
+                    logger.debug(f"Query did not return rows or description. Action: {action_name}")
+                    row_count = res.rowcount if res.rowcount >= 0 else 0
+                    masked_rows = []
+                    return [], [], row_count
 
             cols = list(res.keys())
             try:
-                # --- START: Restored SQLite Handling ---
-                is_sqlite = db_dialect == "sqlite"
-                if is_sqlite:
-                    # aiosqlite fetchall/fetchmany might not work reliably with async iteration or limits in all cases
-                    # Fetch all as mappings (dicts) directly
-                    # Lambda okay if single line
-                    def sync_lambda(sync_conn):
-                        return list(sync_conn.execute(statement, query_params).mappings())
-
-                    all_rows_mapped = await conn.run_sync(sync_lambda)
-                    rows_raw = all_rows_mapped  # Keep the dict list format
-                    needs_limit = limit is not None and limit >= 0
-                    if needs_limit:
-                        rows_raw = rows_raw[:limit]  # Apply limit in Python
+                if not needs_limit:
+                    rows_raw = await res.fetchall() if isinstance(res, AsyncResult) else res.all()
+                elif limit == 0:
+                    rows_raw = []
+                elif isinstance(res, AsyncResult):
+                    rows_raw = await res.fetchmany(limit)
                 else:
-                    # Standard async fetching for other dialects
-                    needs_limit = limit is not None and limit >= 0
-                    if needs_limit:
-                        fetched_rows = await res.fetchmany(limit)  # Returns Row objects
-                        rows_raw = fetched_rows
-                    else:
-                        fetched_rows = await res.fetchall()  # Returns Row objects
-                        rows_raw = fetched_rows
-                # --- END: Restored SQLite Handling ---
-
-                row_count = len(rows_raw)  # Count based on fetched/limited rows
-
+                    rows_raw = res.fetchmany(limit)
             except Exception as fetch_err:
                 log_msg = f"Error fetching rows for {tool_name}/{action_name}: {fetch_err}"
                 logger.error(log_msg, exc_info=True)
@@ -952,19 +1083,15 @@ async def _sql_exec(
                 raise ToolError(
                     f"Error fetching results: {fetch_err}", http_status_code=500, details=details
                 ) from fetch_err
+            finally:
+                if isinstance(res, AsyncResult):
+                    await res.close()  # Discards the rows beyond the limit
+                else:
+                    res.close()
 
-            # Apply masking using _sql_mask_row which uses global rules
-            # Adjust masking based on fetched format
-            if is_sqlite:
-                # List comprehension okay
-                masked_rows_list = [_sql_mask_row(r) for r in rows_raw]  # Already dicts
-                masked_rows = masked_rows_list
-            else:
-                # List comprehension okay
-                masked_rows_list = [
-                    _sql_mask_row(r._mapping) for r in rows_raw
-                ]  # Convert Row objects
-                masked_rows = masked_rows_list
+            # Apply masking rules column by column
+            masked_rows = _sql_mask_rows(cols, rows_raw)
+            row_count = len(masked_rows)  # Count based on fetched/limited rows
 
             return cols, masked_rows, row_count
 
@@ -1033,6 +1160,357 @@ async def _sql_exec(
         ) from e
 
 
+async def _sql_stream_guard(coro: Any, sql: str, timeout: float) -> Any:
+    """Await one step of a streamed query with _sql_exec's timeout and error mapping."""
+    query_preview = sql[:100] + "..."
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        details = {"timeout": timeout, "query": query_preview}
+        raise ToolError(
+            f"Query timed out after {timeout} seconds", http_status_code=504, details=details
+        ) from None
+    except (ProgrammingError, OperationalError) as db_err:
+        details = {"db_error": str(db_err), "query": query_preview}
+        raise ToolError(
+            f"Database Error: {db_err}", http_status_code=400, details=details
+        ) from db_err
+    except SQLAlchemyError as sa_err:
+        details = {"sqlalchemy_error": str(sa_err), "query": query_preview}
+        raise ToolError(
+            f"SQLAlchemy Error: {sa_err}", http_status_code=500, details=details
+        ) from sa_err
+
+
+async def _sql_open_stream(
+    eng: AsyncEngine, sql: str, params: Optional[Dict[str, Any]], batch_size: int
+) -> Tuple[AsyncConnection, AsyncResult]:
+    """Execute a row query on a server-side cursor fetching `batch_size` rows per round trip."""
+    conn = await eng.connect()
+    try:
+        res = await conn.stream(
+            text(sql), params or {}, execution_options={"yield_per": max(batch_size, 1)}
+        )
+    except BaseException:
+        await conn.close()
+        raise
+    return conn, res
+
+
+async def _sql_fetch_masked(res: AsyncResult, count: int) -> List[Dict[str, Any]]:
+    """Fetch up to `count` rows from a streamed result as masked dicts."""
+    rows = await res.fetchmany(count) if count > 0 else []
+    return _sql_mask_rows(list(res.keys()), rows)
+
+
+async def _sql_close_stream(stream_cursor: _SqlStreamCursor) -> None:
+    """Close a cursor's result and connection; it re-executes if resumed later."""
+    res, conn = stream_cursor.result, stream_cursor.conn
+    stream_cursor.result = None
+    stream_cursor.conn = None
+    stream_cursor.lookahead = []
+    try:
+        if res is not None:
+            await res.close()
+        if conn is not None:
+            await conn.close()
+    except Exception as e:
+        logger.warning(f"Error closing streaming cursor for {stream_cursor.connection_id}: {e}")
+
+
+async def _sql_close_stream_cursors(connection_id: Optional[str] = None) -> None:
+    """Discard the streaming cursors of a connection (all cursors if None)."""
+    for token, stream_cursor in list(_STREAM_CURSORS.items()):
+        if connection_id is None or stream_cursor.connection_id == connection_id:
+            _STREAM_CURSORS.pop(token, None)
+            async with stream_cursor.lock:
+                await _sql_close_stream(stream_cursor)
+
+
+def _sql_stream_connection_cap(eng: Optional[AsyncEngine]) -> int:
+    """Number of an engine's stream cursors that may keep a pooled connection between pages.
+
+    Half the capacity (pool_size + max_overflow) of a bounded pool, so held
+    cursors never exhaust it for other queries; none on single-connection pools.
+    """
+    pool = eng.sync_engine.pool if eng is not None else None
+    if pool is None or isinstance(pool, (StaticPool, SingletonThreadPool)):
+        return 0
+    if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+        return min(_MAX_OPEN_STREAM_CURSORS, (pool.size() + pool._max_overflow) // 2)
+    return _MAX_OPEN_STREAM_CURSORS
+
+
+async def _sql_prune_stream_cursors() -> None:
+    """Expire idle cursor tokens and release connections of idle or least recently used cursors.
+
+    A cursor keeps its connection for at most `_STREAM_CURSOR_HOLD` idle
+    seconds, so it does not pin a read transaction (which blocks SQLite WAL
+    checkpoints) for the whole token TTL, and each engine keeps at most
+    `_sql_stream_connection_cap` cursors open.
+    """
+    now = time.monotonic()
+    to_release: List[_SqlStreamCursor] = []
+    held: Dict[str, List[_SqlStreamCursor]] = {}
+    for token, stream_cursor in list(_STREAM_CURSORS.items()):
+        idle = now - stream_cursor.last_used
+        if idle > _STREAM_CURSOR_TTL and not stream_cursor.lock.locked():
+            _STREAM_CURSORS.pop(token, None)
+            to_release.append(stream_cursor)
+        elif stream_cursor.conn is not None:
+            if idle > _STREAM_CURSOR_HOLD and not stream_cursor.lock.locked():
+                to_release.append(stream_cursor)
+            else:
+                held.setdefault(stream_cursor.connection_id, []).append(stream_cursor)
+
+    for connection_id, cursors in held.items():
+        engine_entry = _connection_manager.connections.get(connection_id)
+        cap = _sql_stream_connection_cap(engine_entry[0] if engine_entry else None)
+        excess = len(cursors) - cap  # Cursors fetching right now count but are never released
+        idle_cursors = sorted(
+            (c for c in cursors if not c.lock.locked()), key=lambda c: c.last_used
+        )
+        to_release.extend(idle_cursors[: max(0, excess)])
+
+    for stream_cursor in to_release:
+        async with stream_cursor.lock:
+            await _sql_close_stream(stream_cursor)
+
+
+async def _sql_stream_page(
+    stream_cursor: _SqlStreamCursor, page_size: int, timeout: float
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch the next page of a streamed query.
+
+    A cursor whose connection was released is re-executed and fast-forwarded
+    past the rows already returned, which is only consistent if the data did
+    not change in between.
+
+    Returns:
+        The page's masked rows and whether more rows follow
+    """
+
+    async def _fetch() -> List[Dict[str, Any]]:
+        if stream_cursor.result is None:
+            eng = await _sql_get_engine(stream_cursor.connection_id)
+            stream_cursor.conn, stream_cursor.result = await _sql_open_stream(
+                eng, stream_cursor.sql, stream_cursor.params, page_size + 1
+            )
+            stream_cursor.columns = list(stream_cursor.result.keys())
+            to_skip = stream_cursor.offset
+            while to_skip > 0:
+                skipped = await stream_cursor.result.fetchmany(min(to_skip, _STREAM_BATCH_SIZE))
+                if not skipped:
+                    break
+                to_skip -= len(skipped)
+        wanted = page_size + 1 - len(stream_cursor.lookahead)  # One extra row to detect a next page
+        return stream_cursor.lookahead + await _sql_fetch_masked(stream_cursor.result, wanted)
+
+    async with stream_cursor.lock:
+        try:
+            rows = await _sql_stream_guard(_fetch(), stream_cursor.sql, timeout)
+        except BaseException:
+            await _sql_close_stream(stream_cursor)
+            raise
+        page, stream_cursor.lookahead = rows[:page_size], rows[page_size:]
+        stream_cursor.page_size = page_size
+        stream_cursor.offset += len(page)
+        stream_cursor.last_used = time.monotonic()
+        has_more = bool(stream_cursor.lookahead)
+        if not has_more:
+            await _sql_close_stream(stream_cursor)
+    return page, has_more
+
+
+class _SqlExportWriter:
+    """Writes query results to a CSV or Parquet file one batch at a time."""
+
+    def __init__(self, export_format: str, path: str, columns: List[str]):
+        self.export_format = export_format
+        self.path = path
+        self.columns = columns
+        self._file = None
+        self._csv_writer = None
+        self._parquet_writer = None
+        if export_format == "csv":
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._csv_writer = csv.writer(self._file)
+            self._csv_writer.writerow(columns)
+        elif pyarrow is None:
+            details = {"library": "pyarrow"}
+            msg = "PyArrow library is not installed. Cannot export to 'parquet'."
+            raise ToolError(msg, http_status_code=501, details=details)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self._csv_writer is not None:
+            self._csv_writer.writerows([row.get(c) for c in self.columns] for row in rows)
+            return
+        if self._parquet_writer is None:
+            table = pyarrow.Table.from_pylist(rows)
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            # Column types are inferred from the first batch; columns that were
+            # NULL throughout it take their type from the first batch with values
+            schema = self._parquet_writer.schema
+            if any(pyarrow.types.is_null(f.type) for f in schema):
+                inferred = pyarrow.Table.from_pylist(rows).schema
+                widened = pyarrow.schema(
+                    inferred.field(f.name)
+                    if pyarrow.types.is_null(f.type) and inferred.get_field_index(f.name) >= 0
+                    else f
+                    for f in schema
+                )
+                if not widened.equals(schema):
+                    self._rewrite(widened)
+                    schema = widened
+            table = pyarrow.Table.from_pylist(rows, schema=schema)
+        self._parquet_writer.write_table(table)
+
+    def _rewrite(self, schema: "pyarrow.Schema") -> None:
+        """Copy the rows written so far into a new file with a widened schema."""
+        self._parquet_writer.close()
+        self._parquet_writer = None
+        written = f"{self.path}.partial"
+        os.replace(self.path, written)
+        try:
+            writer = pq.ParquetWriter(self.path, schema)
+            try:
+                for batch in pq.ParquetFile(written).iter_batches():
+                    writer.write_table(pyarrow.Table.from_batches([batch]).cast(schema))
+            except BaseException:
+                writer.close()
+                raise
+            self._parquet_writer = writer
+        finally:
+            Path(written).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        elif self._parquet_writer is not None:
+            self._parquet_writer.close()
+        elif self.export_format == "parquet":  # No rows: write the columns only
+            empty = pyarrow.table({c: pyarrow.array([], pyarrow.null()) for c in self.columns})
+            pq.write_table(empty, self.path)
+
+
+def _sql_export_path(export_format: str, export_path: Optional[str]) -> Tuple[str, bool]:
+    """Resolve the export file path (creating its directory) or create a temporary file.
+
+    Returns:
+        The file path and whether it is a temporary file
+    """
+    if export_path:
+        try:
+            # Chained calls okay
+            path_obj = Path(export_path)
+            path_expanded = path_obj.expanduser()
+            path_resolved = path_expanded.resolve()
+            parent_dir = path_resolved.parent
+            parent_dir.mkdir(parents=True, exist_ok=True)
+            final_path = str(path_resolved)
+            logger.info(f"Using specified export path: {final_path}")
+            return final_path, False
+        except OSError as e:
+            details = {"path": export_path}
+            raise ToolError(
+                f"Cannot create directory for export path '{export_path}': {e}",
+                http_status_code=500,
+                details=details,
+            ) from e
+        except Exception as e:  # Catch other path errors
+            details = {"path": export_path}
+            msg = f"Invalid export path provided: {export_path}. Error: {e}"
+            raise ToolInputError(msg, param_name="export.path", details=details) from e
+
+    suffix = {"excel": ".xlsx", "parquet": ".parquet"}.get(export_format, ".csv")
+    try:
+        prefix = f"mcp_export_{export_format}_"
+        fd, final_path = tempfile.mkstemp(suffix=suffix, prefix=prefix)
+        os.close(fd)
+        logger.info(f"Created temporary file for export: {final_path}")
+        return final_path, True
+    except Exception as e:
+        logger.error(f"Failed to create temporary file for export: {e}", exc_info=True)
+        raise ToolError(f"Failed to create temporary file: {e}", http_status_code=500) from e
+
+
+def _sql_remove_failed_export(final_path: str, temp_file_created: bool) -> None:
+    path_exists = Path(final_path).exists()
+    if temp_file_created and path_exists:
+        try:
+            Path(final_path).unlink()
+        except OSError:
+            logger.warning(f"Could not clean up temporary export file: {final_path}")
+
+
+async def _sql_export_stream(
+    eng: AsyncEngine,
+    sql: str,
+    params: Optional[Dict[str, Any]],
+    export_format: str,
+    export_path: Optional[str],
+    *,
+    preview_rows: int,
+    timeout: float,
+) -> Tuple[List[str], List[Dict[str, Any]], int, str]:
+    """Stream every row of a query into a CSV or Parquet file without buffering the result.
+
+    `timeout` applies to each batch fetched from the database, not the whole export.
+
+    Returns:
+        Columns, the first `preview_rows` rows, the number of rows written and the file path
+    """
+    final_path, temp_file_created = _sql_export_path(export_format, export_path)
+    conn: Optional[AsyncConnection] = None
+    res: Optional[AsyncResult] = None
+    writer: Optional[_SqlExportWriter] = None
+    preview: List[Dict[str, Any]] = []
+    written = 0
+    try:
+        conn, res = await _sql_stream_guard(
+            _sql_open_stream(eng, sql, params, _STREAM_BATCH_SIZE), sql, timeout
+        )
+        cols = list(res.keys())
+        writer = _SqlExportWriter(export_format, final_path, cols)
+        while True:
+            batch = await _sql_stream_guard(
+                _sql_fetch_masked(res, _STREAM_BATCH_SIZE), sql, timeout
+            )
+            if not batch:
+                break
+            await asyncio.to_thread(writer.write, batch)
+            if len(preview) < preview_rows:
+                preview.extend(batch[: preview_rows - len(preview)])
+            written += len(batch)
+        await asyncio.to_thread(writer.close)
+        writer = None
+        logger.info(f"Streamed {written} rows to {export_format.upper()} file: {final_path}")
+        return cols, preview, written, final_path
+    except (ToolError, ToolInputError):
+        _sql_remove_failed_export(final_path, temp_file_created)
+        raise
+    except Exception as e:
+        log_msg = f"Error streaming export to {export_format} file '{final_path}': {e}"
+        logger.error(log_msg, exc_info=True)
+        _sql_remove_failed_export(final_path, temp_file_created)
+        raise ToolError(
+            f"Failed to export data to {export_format}: {e}", http_status_code=500
+        ) from e
+    finally:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if res is not None:
+            await res.close()
+        if conn is not None:
+            await conn.close()
+
+
 def _sql_export_rows(
     cols: List[str],
     rows: List[Dict[str, Any]],
@@ -1043,11 +1521,34 @@ def _sql_export_rows(
     if not export_format:
         return None, None
     export_format_lower = export_format.lower()
-    supported_formats = ["pandas", "excel", "csv"]
+    supported_formats = ["pandas", "excel", "csv", "parquet"]
     if export_format_lower not in supported_formats:
         details = {"format": export_format}
-        msg = f"Unsupported export format: '{export_format}'. Use 'pandas', 'excel', or 'csv'."
+        msg = f"Unsupported export format: '{export_format}'. Use 'pandas', 'excel', 'csv' or 'parquet'."
         raise ToolInputError(msg, param_name="export.format", details=details)
+
+    if export_format_lower in _STREAMING_EXPORT_FORMATS:
+        # Written directly from the row dicts, without building a DataFrame
+        final_path, temp_file_created = _sql_export_path(export_format_lower, export_path)
+        try:
+            writer = _SqlExportWriter(export_format_lower, final_path, cols)
+            try:
+                writer.write(rows)
+            finally:
+                writer.close()
+        except ToolError:
+            _sql_remove_failed_export(final_path, temp_file_created)
+            raise
+        except Exception as e:
+            log_msg = f"Error exporting rows to {export_format_lower} file '{final_path}': {e}"
+            logger.error(log_msg, exc_info=True)
+            _sql_remove_failed_export(final_path, temp_file_created)
+            raise ToolError(
+                f"Failed to export data to {export_format_lower}: {e}", http_status_code=500
+            ) from e
+        logger.info(f"Exported data to {export_format_lower.upper()} file: {final_path}")
+        return None, final_path
+
     if pd is None:
         details = {"library": "pandas"}
         msg = f"Pandas library is not installed. Cannot export to '{export_format_lower}'."
@@ -1065,60 +1566,16 @@ def _sql_export_rows(
         logger.debug("Returning raw Pandas DataFrame.")
         return df, None
 
-    final_path: str
-    temp_file_created = False
-    if export_path:
-        try:
-            # Chained calls okay
-            path_obj = Path(export_path)
-            path_expanded = path_obj.expanduser()
-            path_resolved = path_expanded.resolve()
-            parent_dir = path_resolved.parent
-            parent_dir.mkdir(parents=True, exist_ok=True)
-            final_path = str(path_resolved)
-            logger.info(f"Using specified export path: {final_path}")
-        except OSError as e:
-            details = {"path": export_path}
-            raise ToolError(
-                f"Cannot create directory for export path '{export_path}': {e}",
-                http_status_code=500,
-                details=details,
-            ) from e
-        except Exception as e:  # Catch other path errors
-            details = {"path": export_path}
-            msg = f"Invalid export path provided: {export_path}. Error: {e}"
-            raise ToolInputError(msg, param_name="export.path", details=details) from e
-    else:
-        # Ternary okay
-        suffix = ".xlsx" if export_format_lower == "excel" else ".csv"
-        try:
-            prefix = f"mcp_export_{export_format_lower}_"
-            fd, final_path_temp = tempfile.mkstemp(suffix=suffix, prefix=prefix)
-            final_path = final_path_temp
-            os.close(fd)
-            temp_file_created = True
-            logger.info(f"Created temporary file for export: {final_path}")
-        except Exception as e:
-            logger.error(f"Failed to create temporary file for export: {e}", exc_info=True)
-            raise ToolError(f"Failed to create temporary file: {e}", http_status_code=500) from e
-
+    final_path, temp_file_created = _sql_export_path(export_format_lower, export_path)
     try:
-        if export_format_lower == "excel":
-            df.to_excel(final_path, index=False, engine="xlsxwriter")
-        elif export_format_lower == "csv":
-            df.to_csv(final_path, index=False)
+        df.to_excel(final_path, index=False, engine="xlsxwriter")
         log_msg = f"Exported data to {export_format_lower.upper()} file: {final_path}"
         logger.info(log_msg)
         return None, final_path
     except Exception as e:
         log_msg = f"Error exporting DataFrame to {export_format_lower} file '{final_path}': {e}"
         logger.error(log_msg, exc_info=True)
-        path_exists = Path(final_path).exists()
-        if temp_file_created and path_exists:
-            try:
-                Path(final_path).unlink()
-            except OSError:
-                logger.warning(f"Could not clean up temporary export file: {final_path}")
+        _sql_remove_failed_export(final_path, temp_file_created)
         raise ToolError(
             f"Failed to export data to {export_format_lower}: {e}", http_status_code=500
         ) from e
@@ -1726,6 +2183,8 @@ async def execute_sql(
     confidence_threshold: float = 0.6,
     user_id: Optional[str] = None,
     session_id: Optional[str] = None,
+    stream: bool = False,
+    cursor: Optional[str] = None,
     ctx: Optional[Dict] = None,  # Added ctx
     **options: Any,
 ) -> Dict[str, Any]:
@@ -1743,13 +2202,19 @@ async def execute_sql(
         pagination: Dict with "page" (>=1) and "page_size" (>=1) for paginated results.
                     Cannot be used with max_rows clipping if the dialect requires LIMIT/OFFSET.
         read_only: If True (default), enforces safety checks against write operations (UPDATE, DELETE, etc.). Set to False only if writes are explicitly intended and allowed.
-        export: Dictionary with "format" ('pandas', 'excel', 'csv') and optional "path" (string) for exporting results.
+        export: Dictionary with "format" ('pandas', 'excel', 'csv', 'parquet') and optional "path" (string) for exporting results.
+                With stream=True, 'csv' and 'parquet' exports receive every row of the query in batches
+                (max_rows then only limits the returned preview rows).
         timeout: Maximum execution time in seconds (default: 60.0).
         validate_schema: A Pandera schema object to validate the results DataFrame against.
         max_rows: Maximum number of rows to return in the result (default: 1000). Set to None or -1 for unlimited (potentially dangerous).
         confidence_threshold: Minimum confidence score (0.0-1.0) required from the LLM for NL-to-SQL conversion (default: 0.6).
         user_id: Optional user identifier for audit logging.
         session_id: Optional session identifier for audit logging.
+        stream: If True, run the query on a server-side cursor and return one page of rows
+                (pagination "page_size", default max_rows) plus a `pagination.cursor` token for the next page.
+        cursor: Token from a previous streamed result; fetches the next page of that query
+                (do not pass query or natural_language). Tokens expire after 5 minutes without use.
         ctx: Optional context from MCP server.
         **options: Additional options for audit logging or future extensions.
 
@@ -1759,7 +2224,9 @@ async def execute_sql(
         - rows (List[Dict[str, Any]]): List of data rows (masked).
         - row_count (int): Number of rows returned in this batch/page.
         - truncated (bool): True if max_rows limited the results.
-        - pagination (Optional[Dict]): Info about the current page if pagination was used.
+        - pagination (Optional[Dict]): Info about the current page if pagination was used
+          (for streamed queries: page_size, offset, has_next_page and the next page's cursor).
+        - exported_row_count (Optional[int]): Rows written by a streamed export.
         - generated_sql (Optional[str]): The SQL query generated from natural language, if applicable.
         - confidence (Optional[float]): The confidence score from the NL-to-SQL conversion, if applicable.
         - validation_status (Optional[str]): 'success', 'failed', 'skipped'.
@@ -1782,6 +2249,8 @@ async def execute_sql(
     tables: List[str] = []
     # Dict unpacking okay
     audit_extras = {**options}
+    stream_cursor: Optional[_SqlStreamCursor] = None
+    export_streamed = False
 
     try:
         # 1. Determine Query
@@ -1790,14 +2259,29 @@ async def execute_sql(
         is_ambiguous = natural_language and query
         no_input = not natural_language and not query
 
+        if cursor and not no_input:
+            msg = "Provide 'cursor' alone to continue a streamed query, without 'query' or 'natural_language'."
+            raise ToolInputError(msg, param_name="cursor")
         if is_ambiguous:
             msg = "Provide either 'query' or 'natural_language', not both."
             raise ToolInputError(msg, param_name="query/natural_language")
-        if no_input:
+        if no_input and not cursor:
             msg = "Either 'query' or 'natural_language' must be provided."
             raise ToolInputError(msg, param_name="query/natural_language")
 
-        if use_nl:
+        if cursor:
+            stream_cursor = _STREAM_CURSORS.get(cursor)
+            if stream_cursor is None or stream_cursor.connection_id != connection_id:
+                details = {"error_type": "CURSOR_NOT_FOUND"}
+                msg = "Unknown or expired cursor. Run the query again with stream=True."
+                raise ToolInputError(msg, param_name="cursor", details=details)
+            final_query = stream_cursor.sql
+            final_params = stream_cursor.params
+            original_query_input = final_query
+            logger.info(
+                f"Continuing streamed query on {connection_id} at row {stream_cursor.offset}"
+            )
+        elif use_nl:
             action_name = "nl_to_sql_exec"
             nl_preview = natural_language[:100]
             log_msg = (
@@ -1852,8 +2336,83 @@ async def execute_sql(
         # 3. Get Engine
         eng = await _sql_get_engine(connection_id)
 
-        # 4. Handle Pagination or Standard Execution
-        if pagination:
+        # 4. Handle Streaming, Pagination or Standard Execution
+        if stream or cursor:
+            action_name = "query_stream"
+            if not _sql_is_row_query(final_query):
+                msg = (
+                    "Streaming requires a read-only row query (SELECT, VALUES, TABLE, or WITH "
+                    "without INSERT, UPDATE, DELETE or MERGE)."
+                )
+                raise ToolInputError(msg, param_name="stream")
+            if pagination and pagination.get("page", 1) != 1:
+                msg = "Streamed results are paged with 'cursor' tokens, not 'page'."
+                raise ToolInputError(msg, param_name="pagination.page")
+            page_size = (pagination or {}).get("page_size")
+            if page_size is None and stream_cursor is not None:
+                page_size = stream_cursor.page_size
+            if page_size is None:
+                page_size = (
+                    max_rows if max_rows is not None and max_rows > 0 else _STREAM_BATCH_SIZE
+                )
+            if not isinstance(page_size, int) or page_size < 1:
+                raise ToolInputError(
+                    "Pagination 'page_size' must be an integer >= 1.",
+                    param_name="pagination.page_size",
+                )
+
+            export_format_lower = str((export or {}).get("format") or "").lower()
+            export_streamed = not cursor and export_format_lower in _STREAMING_EXPORT_FORMATS
+            if export_streamed:
+                # Every row goes to the file; only a preview is returned
+                cols, preview, written, export_path = await _sql_export_stream(
+                    eng,
+                    final_query,
+                    final_params,
+                    export_format_lower,
+                    export.get("path"),
+                    preview_rows=page_size,
+                    timeout=timeout,
+                )
+                result = {}
+                result["columns"] = cols
+                result["rows"] = preview
+                result["row_count"] = len(preview)
+                result["truncated"] = written > len(preview)
+                result["exported_row_count"] = written
+                result[f"{export_format_lower}_path"] = export_path
+                result["export_status"] = "success"
+                result["success"] = True
+                audit_extras["export_format"] = export_format_lower
+                audit_extras["export_path"] = export_path
+            else:
+                if stream_cursor is None:
+                    stream_cursor = _SqlStreamCursor(connection_id, final_query, final_params)
+                page_offset = stream_cursor.offset
+                page_rows, has_more = await _sql_stream_page(stream_cursor, page_size, timeout)
+                next_cursor = None
+                if has_more:
+                    next_cursor = cursor or uuid.uuid4().hex
+                    _STREAM_CURSORS[next_cursor] = stream_cursor
+                elif cursor:
+                    _STREAM_CURSORS.pop(cursor, None)
+                await _sql_prune_stream_cursors()
+
+                pagination_info = {}
+                pagination_info["page_size"] = page_size
+                pagination_info["offset"] = page_offset
+                pagination_info["has_next_page"] = has_more
+                pagination_info["cursor"] = next_cursor
+
+                result = {}
+                result["columns"] = stream_cursor.columns
+                result["rows"] = page_rows
+                result["row_count"] = len(page_rows)
+                result["pagination"] = pagination_info
+                result["truncated"] = has_more
+                result["success"] = True
+
+        elif pagination:
             action_name = "query_paginated"
             page = pagination.get("page", 1)
             page_size = pagination.get("page_size", 100)
@@ -2008,7 +2567,7 @@ async def execute_sql(
 
         # 6. Handle Export
         export_requested = export and export.get("format")
-        if export_requested:
+        if export_requested and not export_streamed:
             export_format = export["format"]  # Keep original case for path key
             export_format_lower = export_format.lower()
             req_path = export.get("path")
@@ -2054,7 +2613,7 @@ async def execute_sql(
             user_id=user_id,
             session_id=session_id,
             read_only=read_only,
-            pagination_used=bool(pagination),
+            pagination_used=bool(pagination or stream or cursor),
             validation_status=audit_val_status,
             export_status=audit_exp_status,
             **audit_extras,
@@ -16,13 +16,14 @@ Key Features:
 """
 
 import asyncio
+import atexit
 import contextlib
 import json
 import math
 import os
 import random
 import re
-import threading
+import sqlite3
 import time
 import uuid
 from collections import defaultdict
@@ -30,14 +31,24 @@ from contextvars import ContextVar
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import aiosqlite
 import markdown
 import networkx as nx
 import numpy as np
 from pygments.formatters import HtmlFormatter
-from sklearn.metrics.pairwise import cosine_similarity as sk_cosine_similarity
 
 from ultimate_mcp_server.config import get_config
 from ultimate_mcp_server.constants import (
@@ -119,6 +130,9 @@ try:
     _defaults = {
         # --- relevance / similarity ---
         "memory_decay_rate": 0.001,  # per-hour linear decay
+        "relevance_refresh_interval": 600,  # seconds between stored relevance refreshes
+        "access_flush_interval": 2.0,  # seconds buffered access stats may wait
+        "access_flush_batch_size": 500,  # buffered accesses that force a write
         "similarity_threshold": 0.85,  # cosine-similarity cutoff
         # --- serialization ---
         "max_text_length": 64_000,  # byte-cap enforced by MemoryUtils.serialize
@@ -127,6 +141,10 @@ try:
         "ttl_episodic": 86_400,  # 24 hours default for EPISODIC memories
         # --- search tuning used by hybrid_search_memories (new) ---
         "max_semantic_candidates": 500,  # hard ceiling on candidate pool
+        # --- connection pool used by DBConnection ---
+        "read_pool_size": 8,  # idle read-only connections kept per database
+        "mmap_size_mb": 256,  # PRAGMA mmap_size per connection
+        "cache_size_mb": 16,  # PRAGMA cache_size per connection
         # --- multi-tool support ---
         "enable_batched_operations": True,  # allow multiple tool calls per turn
         "max_tools_per_batch": 20,  # prevent abuse
@@ -471,6 +489,8 @@ SCHEMA_STATEMENTS = [
         thought_id  TEXT REFERENCES thoughts(thought_id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED,
         artifact_id TEXT REFERENCES artifacts(artifact_id) ON DELETE SET NULL,
         idempotency_key TEXT NULL,
+        relevance_score REAL,            -- periodically refreshed snapshot, see _refresh_memory_relevance
+        relevance_scored_at INTEGER,
         UNIQUE(workflow_id, idempotency_key)
     );""",
     """CREATE TABLE IF NOT EXISTS goals (
@@ -585,6 +605,7 @@ SCHEMA_STATEMENTS = [
     "CREATE INDEX IF NOT EXISTS idx_memories_action_id ON memories(action_id);",
     "CREATE INDEX IF NOT EXISTS idx_memories_thought_id ON memories(thought_id);",
     "CREATE INDEX IF NOT EXISTS idx_memories_artifact_id ON memories(artifact_id);",
+    "CREATE INDEX IF NOT EXISTS idx_memories_relevance ON memories(workflow_id, relevance_score DESC);",
     "CREATE INDEX IF NOT EXISTS idx_memory_links_source ON memory_links(source_memory_id);",
     "CREATE INDEX IF NOT EXISTS idx_memory_links_target ON memory_links(target_memory_id);",
     "CREATE INDEX IF NOT EXISTS idx_memory_links_type ON memory_links(link_type);",
@@ -625,7 +646,10 @@ SCHEMA_STATEMENTS = [
         INSERT INTO memory_fts(memory_fts, rowid, content, description, reasoning, tags, workflow_id, memory_id)
         VALUES ('delete', old.rowid, old.content, old.description, old.reasoning, old.tags, old.workflow_id, old.memory_id);
     END;""",
-    """CREATE TRIGGER IF NOT EXISTS memories_after_update_sync AFTER UPDATE ON memories BEGIN
+    # Only text edits re-index; access stats and relevance refreshes leave the FTS row alone
+    "DROP TRIGGER IF EXISTS memories_after_update_sync;",
+    """CREATE TRIGGER IF NOT EXISTS memories_after_update_fts
+        AFTER UPDATE OF content, description, reasoning, tags, workflow_id, memory_id ON memories BEGIN
         INSERT OR REPLACE INTO memory_fts(rowid, content, description, reasoning, tags, workflow_id, memory_id)
         VALUES (new.rowid, new.content, new.description, new.reasoning, new.tags, new.workflow_id, new.memory_id);
     END;""",
@@ -642,6 +666,12 @@ SCHEMA_STATEMENTS = [
     "ON goals (parent_goal_id, sequence_number) WHERE parent_goal_id IS NOT NULL;",
 ]
 
+# Columns added after the first release; ALTERed into existing databases before
+# SCHEMA_STATEMENTS run (CREATE TABLE IF NOT EXISTS leaves old tables untouched)
+SCHEMA_COLUMN_MIGRATIONS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "memories": (("relevance_score", "REAL"), ("relevance_scored_at", "INTEGER")),
+}
+
 
 def _fmt_id(val: Any, length: int = 8) -> str:
     """Return a short id string safe for logs."""
@@ -928,12 +958,190 @@ def safe_mkdir(path: Path) -> bool:
         return False
 
 
+def _trace_mutations(sql: str) -> None:
+    """Logging-only trace callback installed on pooled connections."""
+    if _MUTATION_SQL.match(sql):
+        logger.debug(f"DB TRACE: {sql.split(None, 1)[0]} …")
+
+
+class UMSConnectionPool:
+    """
+    Long-lived SQLite connections to one UMS database, owned by one event loop.
+
+    • One **writer** connection serves every write transaction in turn.  Writers
+      queue on a FIFO asyncio.Lock, so they never race for SQLite's write lock
+      inside this process and never pay for a new connection.
+
+    • Read-only transactions borrow one of up to ``max_readers`` idle **reader**
+      connections.  When all of them are busy (nested read transactions are
+      common) an extra reader is opened and closed on release instead of making
+      the caller wait, so borrowing can never deadlock.
+
+    Connections are configured once (PRAGMAs, UDFs, trace callback) when opened.
+    The database runs in WAL mode, so readers and the writer do not block each
+    other; the writer stays open for the pool's lifetime, which keeps the WAL
+    index available to the ``mode=ro`` readers.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        max_readers: int,
+        configure: Callable[..., Awaitable[None]],
+    ):
+        self.db_path = db_path
+        self.max_readers = max(0, max_readers)
+        self._configure = configure
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+        self._idle: List[aiosqlite.Connection] = []
+        self._closed = False
+        # metrics
+        self._readers_in_use = 0
+        self._writers_waiting = 0
+        self.reader_acquires = 0
+        self.reader_connections_opened = 0
+        self.reader_connections_closed = 0
+        self.writer_acquires = 0
+        self.writer_wait_total = 0.0
+        self.writer_wait_max = 0.0
+        self.busy_retries = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def _connect(self, *, readonly: bool) -> aiosqlite.Connection:
+        uri = f"file:{self.db_path}?mode=ro" if readonly else f"file:{self.db_path}"
+        conn = await aiosqlite.connect(
+            uri,
+            uri=True,
+            timeout=agent_memory_config.connection_timeout,
+            cached_statements=128,
+        )
+        conn.row_factory = aiosqlite.Row
+        try:
+            await self._configure(conn, readonly=readonly)
+            await conn.set_trace_callback(_trace_mutations)
+        except BaseException:
+            await self._discard(conn)
+            raise
+        return conn
+
+    @staticmethod
+    async def _discard(conn: aiosqlite.Connection) -> None:
+        with contextlib.suppress(Exception):
+            await conn.close()
+
+    @staticmethod
+    async def _reset(conn: aiosqlite.Connection) -> bool:
+        """Roll back anything the borrower left open; False if *conn* is unusable."""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    async def _writer_connection(self) -> aiosqlite.Connection:
+        if self._writer is None:
+            async with self._open_lock:
+                if self._writer is None:
+                    self._writer = await self._connect(readonly=False)
+        return self._writer
+
+    @contextlib.asynccontextmanager
+    async def writer(self):
+        """Borrow the writer connection, queueing behind earlier writers."""
+        if self._closed:
+            raise ToolError(f"Connection pool for {self.db_path} is closed")
+        self._writers_waiting += 1
+        t0 = time.perf_counter()
+        try:
+            await self._write_lock.acquire()
+        finally:
+            self._writers_waiting -= 1
+        waited = time.perf_counter() - t0
+        self.writer_acquires += 1
+        self.writer_wait_total += waited
+        self.writer_wait_max = max(self.writer_wait_max, waited)
+        try:
+            conn = await self._writer_connection()
+            try:
+                yield conn
+            finally:
+                if not await self._reset(conn) or self._closed:
+                    self._writer = None
+                    await self._discard(conn)
+        finally:
+            self._write_lock.release()
+
+    @contextlib.asynccontextmanager
+    async def reader(self):
+        """Borrow a read-only connection; never waits for other readers."""
+        if self._closed:
+            raise ToolError(f"Connection pool for {self.db_path} is closed")
+        await self._writer_connection()
+        self.reader_acquires += 1
+        if self._idle:
+            conn = self._idle.pop()
+        else:
+            conn = await self._connect(readonly=True)
+            self.reader_connections_opened += 1
+        self._readers_in_use += 1
+        try:
+            yield conn
+        finally:
+            self._readers_in_use -= 1
+            if await self._reset(conn) and not self._closed and len(self._idle) < self.max_readers:
+                self._idle.append(conn)
+            else:
+                self.reader_connections_closed += 1
+                await self._discard(conn)
+
+    def connection(self, *, readonly: bool = False):
+        return self.reader() if readonly else self.writer()
+
+    async def close(self) -> None:
+        """Close idle connections now; borrowed ones are closed when released."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+        if self._writer is not None and not self._write_lock.locked():
+            writer, self._writer = self._writer, None
+            await self._discard(writer)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "closed": self._closed,
+            "max_readers": self.max_readers,
+            "readers_idle": len(self._idle),
+            "readers_in_use": self._readers_in_use,
+            "reader_acquires": self.reader_acquires,
+            "reader_connections_opened": self.reader_connections_opened,
+            "reader_connections_closed": self.reader_connections_closed,
+            "writer_open": self._writer is not None,
+            "writer_acquires": self.writer_acquires,
+            "writer_queue_depth": self._writers_waiting,
+            "writer_wait_avg_ms": round(
+                1000 * self.writer_wait_total / max(1, self.writer_acquires), 3
+            ),
+            "writer_wait_max_ms": round(1000 * self.writer_wait_max, 3),
+            "busy_retries": self.busy_retries,
+        }
+
+
 class DBConnection:
     __slots__ = ("db_path", "_managed_conn")
     _schema_lock = asyncio.Lock()
     _schema_ready: Set[str] = set()
-    _write: Dict[str, asyncio.Lock] = {}  # db_path → asyncio.Lock
-    _write_guard: threading.Lock = threading.Lock()
+    # (db_path, event loop) → pool; aiosqlite connections work from any loop,
+    # but the pool's asyncio locks belong to the loop that created them.
+    _pools: Dict[Tuple[str, asyncio.AbstractEventLoop], UMSConnectionPool] = {}
     _MAX_TX = 6
     _MAX_COMMIT = 4
     _BASE = 0.05
@@ -968,55 +1176,36 @@ class DBConnection:
     async def _pause(self, n: int):
         await asyncio.sleep(min(self._CAP, self._BASE * 2**n) * (0.5 + random.random() / 2))
 
-    @classmethod
-    def _w(cls, path: str) -> asyncio.Lock:
-        """
-        Return a process-wide asyncio.Lock scoped to *path*.
-
-        The registry update is protected by a plain threading.Lock so
-        only one asyncio.Lock can ever be created for a given database
-        file, even when several event loops in different threads hit
-        this code concurrently.
-        """
-        try:  # common fast path
-            return cls._write[path]
-        except KeyError:  # first access for this path
-            with cls._write_guard:  # threadsafe critical section
-                return cls._write.setdefault(path, asyncio.Lock())
-
     async def _cfg(self, conn: aiosqlite.Connection, *, readonly: bool = False) -> None:
         """
         Apply connection-scoped PRAGMAs.
 
         Rationale
         ---------
-        • **Readers** use `journal_mode=OFF` + shared locking – they never write a
-          rollback journal and therefore never block writers.
-
-        • **Writers** use `journal_mode=TRUNCATE` (single persistent journal file)
-          together with `locking_mode=EXCLUSIVE`.
-          Acquiring the exclusive lock up-front removes the
-          *commit-time* DELETE-mode race that produced frequent
-          `OperationalError: database is locked`.  Durability remains identical to
-          DELETE when `synchronous=NORMAL`.
+        • The database runs in **WAL** mode: readers see a consistent snapshot
+          while the writer appends to the log, so neither blocks the other.
+          `synchronous=NORMAL` is durable across application crashes in WAL mode
+          and only syncs at checkpoints.
+
+        • Pooled connections live for the whole process, so each gets a
+          memory-mapped window and a page cache sized by the
+          `mmap_size_mb` / `cache_size_mb` settings.
+
+        • **Readers** are opened with `mode=ro` and leave the journal mode alone.
         """
         pragmas: list[str] = [
             "PRAGMA foreign_keys=ON;",
             "PRAGMA busy_timeout=60000;",  # 60 s back-off already mirrored in Python
             "PRAGMA temp_store=MEMORY;",
+            f"PRAGMA mmap_size={agent_memory_config.mmap_size_mb * 1024 * 1024};",
+            f"PRAGMA cache_size=-{agent_memory_config.cache_size_mb * 1024};",  # KiB
         ]
 
-        if readonly:
+        if not readonly:
             pragmas[:0] = [
-                "PRAGMA journal_mode=OFF;",
-                "PRAGMA locking_mode=SHARED;",  # the default, but make it explicit
-                "PRAGMA synchronous=OFF;",  # safe because we only read
-            ]
-        else:
-            pragmas[:0] = [
-                "PRAGMA journal_mode=TRUNCATE;",  # keeps a pre-allocated journal file
-                "PRAGMA locking_mode=EXCLUSIVE;",  # grab the write lock immediately
+                "PRAGMA journal_mode=WAL;",  # persistent; set once by the writer
                 "PRAGMA synchronous=NORMAL;",
+                "PRAGMA journal_size_limit=67108864;",  # truncate the WAL to 64 MiB
             ]
 
         await conn.executescript("".join(pragmas))
@@ -1025,9 +1214,8 @@ class DBConnection:
         await conn.create_function("json_contains", 2, _json_contains, deterministic=True)
         await conn.create_function("json_contains_any", 2, _json_contains_any, deterministic=True)
         await conn.create_function("json_contains_all", 2, _json_contains_all, deterministic=True)
-        await conn.create_function(
-            "compute_memory_relevance", 5, _compute_memory_relevance, deterministic=True
-        )
+        # Not deterministic: the score depends on the current time
+        await conn.create_function("compute_memory_relevance", 5, _compute_memory_relevance)
 
     async def _bootstrap(self):
         async with self._schema_lock:
@@ -1041,6 +1229,14 @@ class DBConnection:
                 conn.row_factory = aiosqlite.Row
                 await self._cfg(conn)
                 await conn.execute("BEGIN IMMEDIATE;")
+                for table, columns in SCHEMA_COLUMN_MIGRATIONS.items():
+                    existing = {
+                        r["name"]
+                        for r in await conn.execute_fetchall(f"PRAGMA table_info({table})")
+                    }
+                    for name, decl in columns:
+                        if existing and name not in existing:  # Table predates the column
+                            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
                 for stmt in SCHEMA_STATEMENTS:
                     await conn.execute(stmt)
                 await conn.commit()
@@ -1058,45 +1254,60 @@ class DBConnection:
     # public async-context APIs                                          #
     # ------------------------------------------------------------------ #
 
-    @contextlib.asynccontextmanager
-    async def transaction(self, *, readonly: bool = False, mode: str | None = None):
+    async def pool(self) -> UMSConnectionPool:
+        """Return the connection pool for this database on the running event loop."""
+        key = (self.db_path, asyncio.get_running_loop())
+        pool = self._pools.get(key)
+        if pool is not None and not pool.closed:
+            return pool
         await self._bootstrap()
+        for stale in [k for k in self._pools if k[1].is_closed()]:
+            await self._pools.pop(stale).close()
+        pool = self._pools.get(key)
+        if pool is None or pool.closed:
+            pool = self._pools[key] = UMSConnectionPool(
+                self.db_path,
+                max_readers=agent_memory_config.read_pool_size,
+                configure=self._cfg,
+            )
+        return pool
 
-        uri_path = (
-            f"file:{self.db_path}?mode=ro&cache=shared" if readonly else f"file:{self.db_path}"
-        )
-        lock_cm = contextlib.nullcontext() if readonly else self._w(self.db_path)
-
-        for attempt in range(self._MAX_TX):
-            async with lock_cm:
-                conn: Optional[aiosqlite.Connection] = None
-                try:
-                    conn = await aiosqlite.connect(
-                        uri_path,
-                        uri=True,  # always a URI now
-                        timeout=agent_memory_config.connection_timeout,
-                        cached_statements=64,
-                    )
-                    conn.row_factory = aiosqlite.Row
-                    await self._cfg(conn, readonly=readonly)
+    @classmethod
+    async def close_connection(cls, db_path: Optional[str] = None) -> None:
+        """Flush buffered memory accesses and close pooled connections of *db_path* or of all."""
+        path = str(Path(db_path).resolve()) if db_path else None
+        await _flush_memory_access(path)
+        for key in [k for k in cls._pools if path is None or k[0] == path]:
+            await cls._pools.pop(key).close()
+            cls._schema_ready.discard(key[0])
+            _drop_memory_vector_indexes(key[0])
+            for refreshed in [k for k in _RELEVANCE_REFRESHED_AT if k[0] == key[0]]:
+                del _RELEVANCE_REFRESHED_AT[refreshed]
 
-                    # ----- logging-only trace callback ---------------------------------
-                    def _trace(sql: str) -> None:
-                        if _MUTATION_SQL.match(sql):
-                            logger.debug(f"DB TRACE: {sql.split(None, 1)[0]} …")
+    @classmethod
+    def get_pool_metrics(cls, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Metrics of the open pools for *db_path*, or for every database."""
+        path = str(Path(db_path).resolve()) if db_path else None
+        return [p.get_metrics() for k, p in cls._pools.items() if path is None or k[0] == path]
 
-                    await conn.set_trace_callback(_trace)
-                    # ------------------------------------------------------------------
+    @contextlib.asynccontextmanager
+    async def transaction(self, *, readonly: bool = False, mode: str | None = None):
+        pool = await self.pool()
 
+        for attempt in range(self._MAX_TX):
+            async with pool.connection(readonly=readonly) as conn:
+                try:
                     await conn.execute(
                         "BEGIN DEFERRED;" if readonly else f"BEGIN {mode or 'IMMEDIATE'};"
                     )
                     baseline_changes = conn.total_changes  # snapshot *after* BEGIN
+                    after_commit = _AFTER_COMMIT[conn] = []
 
                     # --------------------- caller block -------------------------------
                     try:
                         yield conn
                     finally:
+                        _AFTER_COMMIT.pop(conn, None)
                         wrote = conn.total_changes != baseline_changes
                         logger.debug(
                             f"DB transaction finished. readonly={readonly} "
@@ -1113,9 +1324,12 @@ class DBConnection:
                                 for c_attempt in range(self._MAX_COMMIT):
                                     try:
                                         await conn.commit()
+                                        for callback in after_commit:
+                                            callback()
                                         break
                                     except aiosqlite.OperationalError as e:
                                         if "database is locked" in str(e).lower():
+                                            pool.busy_retries += 1
                                             await self._pause(c_attempt)
                                             continue
                                         await conn.rollback()
@@ -1126,17 +1340,11 @@ class DBConnection:
                 except aiosqlite.OperationalError as e:
                     if "database is locked" not in str(e).lower():
                         raise
+                    pool.busy_retries += 1
                     await self._pause(attempt)
-                    continue  # retry outer loop
-                finally:
-                    if conn:
-                        # Safety net: roll back stale txn before closing.
-                        if conn.in_transaction:
-                            await conn.rollback()
-                        await conn.set_trace_callback(None)
-                        await conn.close()
-
-                return  # successful run
+                    continue  # retry outer loop (the pool rolls back on release)
+
+            return  # successful run
         raise ToolError("Maximum SQLite transaction retries exceeded")
 
     async def __aenter__(self) -> aiosqlite.Connection:
@@ -1219,10 +1427,16 @@ def _json_contains_all(j: str | None, vs: str | None) -> bool:
 
 
 def _compute_memory_relevance(
-    imp: float, conf: float, created: int, cnt: int, last: int | None
+    imp: float | None, conf: float | None, created: int, cnt: int | None, last: int | None
 ) -> float:
-    """Calculate memory relevance score (0-10) using consistent time units and smooth decay."""
+    """Calculate memory relevance score (0-10) using consistent time units and smooth decay.
+
+    Scalar counterpart of `_compute_memory_relevance_batch`; NULL columns take
+    their schema defaults.
+    """
     now = time.time()
+    imp = 5.0 if imp is None else imp
+    conf = 1.0 if conf is None else conf
     created = created or now
     last = last or created
 
@@ -1232,14 +1446,14 @@ def _compute_memory_relevance(
 
     # Smooth exponential decay instead of cliff-drop
     age_hours = age_seconds / 3600
-    decay_factor = np.exp(-MEMORY_DECAY_RATE * age_hours)  # Exponential decay
+    decay_factor = math.exp(-MEMORY_DECAY_RATE * age_hours)  # Exponential decay
 
     # Recency boost (higher for recently accessed memories)
     recency_days = recency_seconds / 86400
     recency_factor = 1 / (1 + recency_days)
 
     # Usage boost with logarithmic scaling (diminishing returns)
-    usage_factor = 1 + np.log(1 + cnt) / 10  # Smooth scaling
+    usage_factor = 1 + math.log(1 + (cnt or 0)) / 10  # Smooth scaling
 
     # Combine all factors
     score = imp * decay_factor * usage_factor * conf * recency_factor
@@ -1247,25 +1461,432 @@ def _compute_memory_relevance(
     return max(0, min(score, 10))
 
 
+def _compute_memory_relevance_batch(
+    importance: Sequence[Optional[float]],
+    confidence: Sequence[Optional[float]],
+    created_at: Sequence[Optional[int]],
+    access_count: Sequence[Optional[int]],
+    last_accessed: Sequence[Optional[int]],
+    *,
+    now: Optional[float] = None,
+) -> np.ndarray:
+    """Vectorised `_compute_memory_relevance` over columns of memory rows.
+
+    Each argument is one column (NULLs allowed); every row is scored against
+    the same *now*.  Returns a float64 array of scores in [0, 10].
+    """
+    now = time.time() if now is None else now
+    imp = np.array(importance, dtype=np.float64)
+    conf = np.array(confidence, dtype=np.float64)
+    created = np.array(created_at, dtype=np.float64)
+    cnt = np.array(access_count, dtype=np.float64)
+    last = np.array(last_accessed, dtype=np.float64)
+
+    imp[np.isnan(imp)] = 5.0
+    conf[np.isnan(conf)] = 1.0
+    cnt[np.isnan(cnt)] = 0.0
+    created[np.isnan(created) | (created == 0)] = now
+    missing_last = np.isnan(last) | (last == 0)
+    last[missing_last] = created[missing_last]
+
+    decay_factor = np.exp(-MEMORY_DECAY_RATE * (now - created) / 3600)
+    recency_factor = 1 / (1 + (now - last) / 86400)
+    usage_factor = 1 + np.log1p(cnt) / 10
+    return np.clip(imp * decay_factor * usage_factor * conf * recency_factor, 0, 10)
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the *k* highest *scores*, best first (partial sort via argpartition)."""
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
+
+_RELEVANCE_SQL_COLUMNS = (
+    "importance, confidence, created_at, access_count, last_accessed"  # batch argument order
+)
+_RELEVANCE_FETCH_BATCH = 10_000
+
+
+def _relevance_upper_bound_sql(now: float, alias: str = "m") -> str:
+    """
+    SQL arithmetic bounding `_compute_memory_relevance` from above for rows
+    without future timestamps, using ``exp(-x) ≤ 1/(1+x)`` and
+    ``ln(1+n) ≤ n``; plain arithmetic, so it runs in SQLite's C core.
+    """
+    created = f"COALESCE(NULLIF({alias}.created_at, 0), {now!r})"
+    last = f"COALESCE(NULLIF({alias}.last_accessed, 0), {created})"
+    return (
+        f"IFNULL({alias}.importance, 5.0) * IFNULL({alias}.confidence, 1.0)"
+        f" * (1 + IFNULL({alias}.access_count, 0) / 10.0)"
+        f" / ((1 + {float(MEMORY_DECAY_RATE)!r} * ({now!r} - {created}) / 3600.0)"
+        f" * (1 + ({now!r} - {last}) / 86400.0))"
+    )
+
+
+async def _stream_top_by_relevance(
+    conn: aiosqlite.Connection,
+    sql: str,
+    params: Sequence[Any],
+    k: int,
+    *,
+    now: float,
+    ascending: bool = False,
+) -> List[Tuple[Any, float]]:
+    """Score the rows of *sql* (a key, then `_RELEVANCE_SQL_COLUMNS`) in batches
+    and keep a running top-k, so memory stays bounded however many rows match."""
+    sign = -1.0 if ascending else 1.0
+    best_keys: List[Any] = []
+    best_scores = np.empty(0, dtype=np.float64)
+    async with conn.execute(sql, params) as cursor:
+        while rows := await cursor.fetchmany(_RELEVANCE_FETCH_BATCH):
+            keys, *columns = zip(*rows, strict=True)
+            scores = np.concatenate(
+                (best_scores, sign * _compute_memory_relevance_batch(*columns, now=now))
+            )
+            candidates = best_keys + list(keys)
+            top = _top_k_indices(scores, k)
+            best_keys = [candidates[i] for i in top]
+            best_scores = scores[top]
+    return list(zip(best_keys, (sign * best_scores).tolist(), strict=True))
+
+
+async def _select_top_memories_by_relevance(
+    conn: aiosqlite.Connection,
+    from_sql: str,
+    params: Sequence[Any],
+    k: int,
+    *,
+    ascending: bool = False,
+    seed_order: str = "m.last_accessed DESC",
+) -> List[Tuple[str, float]]:
+    """
+    The *k* most (or least) relevant memories of *from_sql*, best first.
+
+    *from_sql* is a ``FROM memories m … WHERE …`` clause.  Relevance is
+    computed in NumPy, but shipping every matching row to Python would cost
+    more than scoring it, so the most-relevant search first scores a small
+    seed (the top rows by *seed_order*, ideally index-backed).  Its k-th best
+    score then prunes, in SQL, every row whose `_relevance_upper_bound_sql`
+    cannot reach it.  The result is exact whatever the seed; a better seed
+    only means fewer rows fetched.  Returns ``[(memory_id, relevance), …]``.
+    """
+    now = time.time()
+    select = (
+        "SELECT m.memory_id, m.importance, m.confidence, m.created_at, m.access_count, "
+        f"m.last_accessed {from_sql}"
+    )
+    if ascending:  # No useful bound from below; score every row
+        return await _stream_top_by_relevance(conn, select, params, k, now=now, ascending=True)
+
+    seed_size = max(4 * k, 64)
+    seed = await conn.execute_fetchall(
+        f"{select} ORDER BY {seed_order} LIMIT ?", [*params, seed_size]
+    )
+    if not seed:
+        return []
+    if len(seed) < seed_size:  # Every matching row is in the seed
+        keys, *columns = zip(*seed, strict=True)
+        scores = _compute_memory_relevance_batch(*columns, now=now)
+        top = _top_k_indices(scores, k)
+        return [(keys[i], float(scores[i])) for i in top]
+
+    _, *columns = zip(*seed, strict=True)
+    kth_best = np.sort(_compute_memory_relevance_batch(*columns, now=now))[-k]
+    threshold = float(kth_best) * (1 - 1e-9)  # Float slack between SQL and NumPy
+    return await _stream_top_by_relevance(
+        conn,
+        f"{select} AND ({_relevance_upper_bound_sql(now)} >= {threshold!r}"
+        f" OR m.created_at > {now!r} OR m.last_accessed > {now!r})",  # Future stamps: no bound
+        params,
+        k,
+        now=now,
+    )
+
+
+# (db_path, workflow_id) → time.monotonic() of the last full relevance refresh
+_RELEVANCE_REFRESHED_AT: Dict[Tuple[str, str], float] = {}
+_RELEVANCE_REFRESH_TOLERANCE = 0.01  # stored scores are rewritten once they drift by 1%
+
+
+async def _refresh_memory_relevance(
+    conn: aiosqlite.Connection, workflow_id: str, *, unscored_only: bool = False
+) -> int:
+    """
+    Recompute the stored ``relevance_score`` of a workflow's memories in one batch.
+
+    The stored score is a snapshot for SQL-side ordering where exact freshness
+    is not needed; exact rankings use `_select_top_memories_by_relevance`.
+    Only rows whose score moved by more than `_RELEVANCE_REFRESH_TOLERANCE`
+    are written, so refreshes of a quiet workflow are reads.  Returns the
+    number of rows written.
+    """
+    now = int(time.time())
+    rows = await conn.execute_fetchall(
+        f"SELECT rowid, {_RELEVANCE_SQL_COLUMNS}, relevance_score FROM memories "
+        "WHERE workflow_id = ?" + (" AND relevance_score IS NULL" if unscored_only else ""),
+        (workflow_id,),
+    )
+    if not rows:
+        return 0
+    rowids, *columns, stored = zip(*rows, strict=True)
+    scores = _compute_memory_relevance_batch(*columns, now=now)
+    stored = np.array(stored, dtype=np.float64)
+    drifted = np.flatnonzero(
+        np.isnan(stored)
+        | (np.abs(scores - stored) > _RELEVANCE_REFRESH_TOLERANCE * np.maximum(stored, 0.01))
+    )
+    await conn.executemany(
+        "UPDATE memories SET relevance_score = ?, relevance_scored_at = ? WHERE rowid = ?",
+        [(float(scores[i]), now, rowids[i]) for i in drifted],
+    )
+    return len(drifted)
+
+
+async def _ensure_memory_relevance_fresh(db: "DBConnection", workflow_id: str) -> None:
+    """
+    Refresh stored relevance scores at most every ``relevance_refresh_interval``
+    seconds per workflow; in between, only memories never scored are filled in.
+    """
+    key = (db.db_path, workflow_id)
+    last = _RELEVANCE_REFRESHED_AT.get(key)
+    due = last is None or time.monotonic() - last >= agent_memory_config.relevance_refresh_interval
+    if not due:
+        async with db.transaction(readonly=True) as conn:
+            if not await conn.execute_fetchval(
+                "SELECT EXISTS(SELECT 1 FROM memories "
+                "WHERE workflow_id = ? AND relevance_score IS NULL)",
+                (workflow_id,),
+            ):
+                return
+    async with db.transaction(mode="IMMEDIATE") as conn:
+        scored = await _refresh_memory_relevance(conn, workflow_id, unscored_only=not due)
+    if due:
+        _RELEVANCE_REFRESHED_AT[key] = time.monotonic()
+    logger.debug(f"Stored relevance rewritten for {scored} memories of {_fmt_id(workflow_id)}")
+
+
 # ======================================================
-# Utilities
+# Write-behind Memory Access Tracking
 # ======================================================
 
+_ACCESS_UPDATE_SQL = (
+    "UPDATE memories SET last_accessed = MAX(IFNULL(last_accessed, 0), ?), "
+    "access_count = IFNULL(access_count, 0) + ? WHERE memory_id = ?"
+)
+# Memories deleted since their access was buffered are skipped
+_ACCESS_LOG_SQL = (
+    "INSERT INTO memory_operations (operation_log_id, workflow_id, memory_id, operation, "
+    "operation_data, timestamp) SELECT ?, ?, ?, ?, ?, ? "
+    "WHERE EXISTS (SELECT 1 FROM memories WHERE memory_id = ?)"
+)
 
-async def _ensure_udfs_registered(conn: aiosqlite.Connection) -> None:
-    """Re-register UDFs if they're missing on this connection."""
-    try:
-        # Quick test if compute_memory_relevance is available
-        await conn.execute_fetchone(
-            "SELECT compute_memory_relevance(5.0, 1.0, ?, 0, NULL) AS test", (int(time.time()),)
-        )
-    except aiosqlite.OperationalError as e:
-        if "no such function" in str(e).lower() or "no such column" in str(e).lower():
-            # Re-register all UDFs by calling the existing _cfg method
-            db_conn = DBConnection()  # Create a temporary instance
-            await db_conn._cfg(conn, readonly=False)
+
+class MemoryAccessBuffer:
+    """
+    Memory reads of one database, coalesced in memory and written behind.
+
+    Read tools `record` each returned memory instead of updating its access
+    stats and logging a ``memory_operations`` row inside their own, then
+    read-write, transaction.  Hits on the same memory by the same operation
+    merge into one entry, and `flush` writes all entries in one write
+    transaction: ``access_count`` grows by the number of hits,
+    ``last_accessed`` moves to the latest hit, and each entry becomes a single
+    operation row whose ``operation_data`` carries ``hits`` and
+    ``first_accessed``.
+
+    Flush policy: entries wait at most ``access_flush_interval`` seconds, a
+    buffer of ``access_flush_batch_size`` entries is written at once, and an
+    interval of 0 writes before the read returns.  A failed flush re-queues
+    its entries; `DBConnection.close_connection` and interpreter exit write
+    whatever is left, so only a killed process loses hits (at most one
+    interval's worth).
+    """
+
+    __slots__ = ("db_path", "_pending", "_timer", "_tasks")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # (memory_id, operation) → [workflow_id, hits, first_accessed, last_accessed, data]
+        self._pending: Dict[Tuple[str, str], List[Any]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        workflow_id: str,
+        memory_id: str,
+        operation: str,
+        operation_data: Optional[Dict[str, Any]] = None,
+        *,
+        at: Optional[int] = None,
+    ) -> None:
+        """Buffer one access; *operation_data* of the latest hit is kept."""
+        at = int(time.time()) if at is None else at
+        entry = self._pending.get((memory_id, operation))
+        if entry is None:
+            self._pending[(memory_id, operation)] = [workflow_id, 1, at, at, operation_data]
         else:
-            raise
+            entry[1] += 1
+            entry[3] = max(entry[3], at)
+            entry[4] = operation_data
+
+    def _requeue(self, entries: Dict[Tuple[str, str], List[Any]]) -> None:
+        for key, (workflow_id, hits, first, last, data) in entries.items():
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [workflow_id, hits, first, last, data]
+            else:  # Hit again since; its data is newer
+                entry[1] += hits
+                entry[2] = min(entry[2], first)
+                entry[3] = max(entry[3], last)
+
+    @staticmethod
+    def _rows(entries: Dict[Tuple[str, str], List[Any]]) -> Tuple[List[tuple], List[tuple]]:
+        """Parameters of `_ACCESS_UPDATE_SQL` (one per memory) and `_ACCESS_LOG_SQL`."""
+        stats: Dict[str, List[int]] = {}
+        logs: List[tuple] = []
+        for (memory_id, operation), (workflow_id, hits, first, last, data) in entries.items():
+            if memory_id in stats:
+                stats[memory_id][0] = max(stats[memory_id][0], last)
+                stats[memory_id][1] += hits
+            else:
+                stats[memory_id] = [last, hits]
+            payload = {**(data or {}), "hits": hits, "first_accessed": first}
+            logs.append(
+                (
+                    MemoryUtils.generate_id(),
+                    workflow_id,
+                    memory_id,
+                    operation,
+                    json.dumps(payload, default=str),
+                    last,
+                    memory_id,
+                )
+            )
+        updates = [(last, hits, memory_id) for memory_id, (last, hits) in stats.items()]
+        return updates, logs
+
+    async def flush(self) -> int:
+        """Write every buffered access in one transaction; returns the entries written."""
+        if not self._pending:
+            return 0
+        entries, self._pending = self._pending, {}
+        updates, logs = self._rows(entries)
+        try:
+            async with DBConnection(self.db_path).transaction(mode="IMMEDIATE") as conn:
+                await conn.executemany(_ACCESS_UPDATE_SQL, updates)
+                await conn.executemany(_ACCESS_LOG_SQL, logs)
+        except BaseException as exc:
+            self._requeue(entries)
+            if not isinstance(exc, Exception):
+                raise
+            logger.error(
+                f"Failed to write {len(entries)} buffered memory accesses; "
+                f"they are retried with the next flush: {exc}",
+                exc_info=True,
+            )
+            return 0
+        logger.debug(f"Wrote {len(entries)} buffered memory accesses ({len(updates)} memories)")
+        return len(entries)
+
+    def flush_sync(self) -> None:
+        """Write buffered accesses without an event loop (interpreter exit)."""
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, {}
+        updates, logs = self._rows(entries)
+        try:
+            with contextlib.closing(
+                sqlite3.connect(self.db_path, timeout=agent_memory_config.connection_timeout)
+            ) as conn:
+                with conn:
+                    conn.executemany(_ACCESS_UPDATE_SQL, updates)
+                    conn.executemany(_ACCESS_LOG_SQL, logs)
+        except Exception as exc:
+            logger.error(f"Failed to write {len(entries)} buffered memory accesses: {exc}")
+
+    async def _flush_after(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        written = await self.flush()
+        if self._timer is asyncio.current_task():
+            self._timer = None
+        if self._pending:
+            # Hits recorded while the write ran saw this timer alive and did not
+            # arm another; after a failure, retry no sooner than the interval
+            self.schedule(wait=not written)
+
+    def schedule(self, *, wait: bool = False) -> None:
+        """Flush in the background: now at the batch size, otherwise after the interval."""
+        immediate = not wait and len(self._pending) >= agent_memory_config.access_flush_batch_size
+        timer = self._timer
+        if not immediate and timer is not None and not timer.done():
+            if not timer.get_loop().is_closed():
+                return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # No loop (sync caller); written by the next flush
+            return
+        task = loop.create_task(
+            self._flush_after(0.0 if immediate else agent_memory_config.access_flush_interval)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if not immediate:
+            self._timer = task
+
+
+_MEMORY_ACCESS_BUFFERS: Dict[str, MemoryAccessBuffer] = {}  # db_path → buffer
+
+
+async def _record_memory_access(
+    db_path: str,
+    accesses: Iterable[Tuple[str, str, str, Optional[Dict[str, Any]]]],
+) -> None:
+    """
+    Buffer ``(workflow_id, memory_id, operation, operation_data)`` accesses of
+    *db_path* (a resolved `DBConnection.db_path`) for a write-behind flush.
+    """
+    buffer = _MEMORY_ACCESS_BUFFERS.get(db_path)
+    if buffer is None:
+        buffer = _MEMORY_ACCESS_BUFFERS[db_path] = MemoryAccessBuffer(db_path)
+    now = int(time.time())
+    for workflow_id, memory_id, operation, operation_data in accesses:
+        buffer.record(workflow_id, memory_id, operation, operation_data, at=now)
+    if agent_memory_config.access_flush_interval <= 0:
+        await buffer.flush()
+    elif buffer:
+        buffer.schedule()
+
+
+async def _flush_memory_access(db_path: Optional[str] = None) -> int:
+    """Write buffered accesses of *db_path*, or of every database, now."""
+    path = str(Path(db_path).resolve()) if db_path else None
+    written = 0
+    for key, buffer in list(_MEMORY_ACCESS_BUFFERS.items()):
+        if path is None or key == path:
+            written += await buffer.flush()
+    return written
+
+
+def _flush_memory_access_at_exit() -> None:
+    for buffer in list(_MEMORY_ACCESS_BUFFERS.values()):
+        buffer.flush_sync()
+
+
+atexit.register(_flush_memory_access_at_exit)
+
+
+# ======================================================
+# Utilities
+# ======================================================
 
 
 def to_iso_z(ts: float) -> str:  # helper ⇒  ISO‑8601 with trailing “Z”
@@ -1548,6 +2169,7 @@ async def delete_expired_memories(
             batch = deleted_ids[i : i + BATCH]
             ph = ",".join("?" * len(batch))
             await conn.execute(f"DELETE FROM memories WHERE memory_id IN ({ph})", batch)
+        await _unindex_memories(conn, deleted_ids)
 
         # per-workflow operation log
         for wf in wf_affected:
@@ -1605,6 +2227,7 @@ async def compute_memory_statistics(
             )
             total_mem = row["cnt"] if row and row["cnt"] is not None else 0
             stats["total_memories"] = total_mem
+            stats["connection_pool"] = DBConnection.get_pool_metrics(db.db_path)
 
             if total_mem == 0:
                 logger.info(f"No memories found for statistics in scope: {stats['scope']}")
@@ -1829,6 +2452,10 @@ async def visualize_memory_network(
     links_data: list[dict[str, Any]] = []
 
     try:
+        if not center_memory_id:
+            # Node selection orders by the stored relevance snapshot
+            await _ensure_memory_relevance_fresh(DBConnection(db_path), workflow_id)
+
         # ---------- read-only snapshot ----------
         async with DBConnection(db_path).transaction(readonly=True) as conn:
             # --- 1. Initial memory selection (unchanged) ---
@@ -1901,16 +2528,11 @@ async def visualize_memory_network(
                     "SELECT memory_id "
                     "FROM memories "
                     f"WHERE {where_sql} "
-                    "ORDER BY compute_memory_relevance("
-                    "    importance, confidence, created_at, access_count, last_accessed"
-                    ") DESC "
+                    "ORDER BY relevance_score DESC "
                     "LIMIT ?"
                 )
                 params.append(max_nodes)
 
-                # Ensure UDFs are registered before using compute_memory_relevance
-                await _ensure_udfs_registered(conn)
-
                 async with conn.execute(query, params) as cursor:
                     selected_memory_ids = {row["memory_id"] for row in await cursor.fetchall()}
 
@@ -2446,30 +3068,252 @@ class MemoryUtils:
             )
             raise
 
+
+# ======================================================
+# Embedding Service Integration & Semantic Search Logic
+# ======================================================
+
+_MEMORY_INDEX_MAX_AGE = 300.0  # seconds; bounds staleness from out-of-process writers
+_MEMORY_INDEX_BATCH = 500  # embedding ids per verification query (SQLite variable limit)
+
+
+class MemoryVectorIndex:
+    """
+    Exact in-memory vector index over one database's embeddings of one dimension.
+
+    Rows hold L2-normalised float32 vectors, so a single matrix-vector product
+    scores every stored memory; the workflow filter is a mask over integer
+    workflow codes.  The index is loaded from the `embeddings` table on first
+    search and then kept in sync by `_store_embedding` and the memory deletion
+    paths.  Hits may be stale (e.g. rows removed by a cascade), so callers
+    verify them against the database.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 1024):
+        self.dimension = dimension
+        self.loaded_at = time.monotonic()
+        self.skipped = 0  # rows of this dimension that could not be indexed
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._workflows = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._memory_ids: List[Optional[str]] = []
+        self._embedding_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}  # memory_id → row
+        self._workflow_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
     @staticmethod
-    async def _update_memory_access(conn: aiosqlite.Connection, memory_id: str):
-        """Updates the last_accessed timestamp and increments access_count for a memory. Internal helper."""
-        now_unix = int(time.time())
-        try:
-            # Use COALESCE to handle the first access correctly
-            await conn.execute(
-                """
-                UPDATE memories
-                SET last_accessed = ?,
-                    access_count = COALESCE(access_count, 0) + 1
-                WHERE memory_id = ?
-                """,
-                (now_unix, memory_id),
-            )
-        except Exception as e:
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0  # zero vectors score 0, as with cosine_similarity
+        return vectors / norms
+
+    def _workflow_code(self, workflow_id: Optional[str]) -> int:
+        return self._workflow_codes.setdefault(workflow_id or "", len(self._workflow_codes))
+
+    def _reserve(self, rows: int) -> None:
+        capacity = self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2)
+        for name in ("_vectors", "_workflows", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: len(self._memory_ids)] = old[: len(self._memory_ids)]
+            setattr(self, name, new)
+
+    def upsert(
+        self,
+        memory_id: str,
+        embedding_id: str,
+        workflow_id: Optional[str],
+        vector: np.ndarray,
+    ) -> None:
+        row = self._rows.get(memory_id)
+        if row is None:
+            row = len(self._memory_ids)
+            self._reserve(row + 1)
+            self._memory_ids.append(memory_id)
+            self._embedding_ids.append(embedding_id)
+            self._rows[memory_id] = row
+        else:
+            self._embedding_ids[row] = embedding_id
+        self._vectors[row] = self._normalise(np.asarray(vector, dtype=np.float32))
+        self._workflows[row] = self._workflow_code(workflow_id)
+        self._alive[row] = True
+
+    def remove(self, memory_ids: Iterable[str]) -> None:
+        for memory_id in memory_ids:
+            row = self._rows.pop(memory_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._memory_ids[row] = self._embedding_ids[row] = None
+        if len(self._memory_ids) > 1024 and len(self._rows) < len(self._memory_ids) // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive[: len(self._memory_ids)])
+        capacity = max(1024, 2 * keep.size)
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vectors[: keep.size] = self._vectors[keep]
+        workflows = np.zeros(capacity, dtype=np.int32)
+        workflows[: keep.size] = self._workflows[keep]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: keep.size] = True
+        self._vectors, self._workflows, self._alive = vectors, workflows, alive
+        self._memory_ids = [self._memory_ids[r] for r in keep]
+        self._embedding_ids = [self._embedding_ids[r] for r in keep]
+        self._rows = {memory_id: row for row, memory_id in enumerate(self._memory_ids)}
+
+    def search(
+        self,
+        query: np.ndarray,
+        *,
+        limit: int,
+        threshold: float,
+        workflow_id: Optional[str] = None,
+    ) -> List[Tuple[str, str, float]]:
+        """Top *limit* (memory_id, embedding_id, cosine) with cosine ≥ *threshold*."""
+        n = len(self._memory_ids)
+        if not self._rows or limit <= 0:
+            return []
+        scores = self._vectors[:n] @ self._normalise(np.asarray(query, dtype=np.float32))
+        mask = self._alive[:n] & (scores >= threshold)
+        if workflow_id:
+            code = self._workflow_codes.get(workflow_id)
+            if code is None:
+                return []
+            mask &= self._workflows[:n] == code
+        rows = np.flatnonzero(mask)
+        if rows.size > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return [(self._memory_ids[r], self._embedding_ids[r], float(scores[r])) for r in rows]
+
+    @classmethod
+    async def load(cls, conn: aiosqlite.Connection, dimension: int) -> "MemoryVectorIndex":
+        rows = await conn.execute_fetchall(
+            """
+            SELECT e.id, e.memory_id, m.workflow_id, e.embedding
+            FROM   embeddings e
+            LEFT JOIN memories m ON m.memory_id = e.memory_id
+            WHERE  e.dimension = ?
+            """,
+            (dimension,),
+        )
+        usable = [r for r in rows if r[1] and r[3] and len(r[3]) == dimension * 4]
+        index = cls(dimension, capacity=max(1024, len(usable)))
+        index.skipped = len(rows) - len(usable)
+        if usable:
+            matrix = np.frombuffer(b"".join(r[3] for r in usable), dtype=np.float32)
+            index._vectors[: len(usable)] = cls._normalise(matrix.reshape(len(usable), dimension))
+            index._workflows[: len(usable)] = [index._workflow_code(r[2]) for r in usable]
+            index._alive[: len(usable)] = True
+            index._memory_ids = [r[1] for r in usable]
+            index._embedding_ids = [r[0] for r in usable]
+            index._rows = {memory_id: row for row, memory_id in enumerate(index._memory_ids)}
+        if index.skipped:
             logger.warning(
-                f"Failed to update memory access stats for {memory_id}: {e}", exc_info=True
+                f"{index.skipped} embeddings of dimension {dimension} have no memory or a "
+                "malformed vector; they are excluded from semantic search."
             )
+        return index
 
 
-# ======================================================
-# Embedding Service Integration & Semantic Search Logic
-# ======================================================
+_MEMORY_VECTOR_INDEXES: Dict[Tuple[str, int], MemoryVectorIndex] = {}  # (db_path, dim) → index
+# Index updates of a connection's open `DBConnection.transaction`, applied once it commits
+_AFTER_COMMIT: Dict[aiosqlite.Connection, List[Callable[[], None]]] = {}
+
+
+def _after_commit(conn: aiosqlite.Connection, callback: Callable[[], None]) -> None:
+    """Run *callback* when *conn*'s transaction commits (now, outside `transaction()`)."""
+    pending = _AFTER_COMMIT.get(conn)
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+
+async def _connection_db_path(conn: aiosqlite.Connection) -> str:
+    row = await conn.execute_fetchone("PRAGMA database_list")
+    return row["file"] if row else ""
+
+
+async def _memory_vector_index(
+    conn: aiosqlite.Connection, dimension: int
+) -> Optional[MemoryVectorIndex]:
+    """
+    Return the vector index of *dimension* for *conn*'s database, or None when it
+    has no such embeddings.
+
+    The index is (re)loaded when the table holds rows it may not know about, when
+    it carries many stale rows, or after `_MEMORY_INDEX_MAX_AGE` seconds.
+    """
+    count = await conn.execute_fetchval(
+        "SELECT COUNT(*) FROM embeddings WHERE dimension = ?", (dimension,)
+    )
+    key = (await _connection_db_path(conn), dimension)
+    if not count:
+        _MEMORY_VECTOR_INDEXES.pop(key, None)
+        return None
+    index = _MEMORY_VECTOR_INDEXES.get(key)
+    if index is not None:
+        known = len(index) + index.skipped
+        if (
+            count > known
+            or known > count + max(64, count // 4)
+            or time.monotonic() - index.loaded_at > _MEMORY_INDEX_MAX_AGE
+        ):
+            index = None
+    if index is None:
+        index = _MEMORY_VECTOR_INDEXES[key] = await MemoryVectorIndex.load(conn, dimension)
+    return index
+
+
+def _drop_memory_vector_indexes(db_path: Optional[str] = None) -> None:
+    for key in [k for k in _MEMORY_VECTOR_INDEXES if db_path is None or k[0] == db_path]:
+        del _MEMORY_VECTOR_INDEXES[key]
+
+
+async def _index_memory_embedding(
+    conn: aiosqlite.Connection, memory_id: str, embedding_id: str, vector: np.ndarray
+) -> None:
+    """Add or replace *memory_id*'s vector in any loaded index of its database."""
+    if not _MEMORY_VECTOR_INDEXES:
+        return
+    db_path = await _connection_db_path(conn)
+    workflow_id = await conn.execute_fetchval(
+        "SELECT workflow_id FROM memories WHERE memory_id = ?", (memory_id,)
+    )
+
+    def apply() -> None:
+        for (path, dim), index in _MEMORY_VECTOR_INDEXES.items():
+            if path != db_path:
+                continue
+            if dim == vector.shape[0]:
+                index.upsert(memory_id, embedding_id, workflow_id, vector)
+            else:
+                index.remove([memory_id])  # re-embedded with a different model
+
+    # A rolled-back re-embed must not leave its vector behind
+    _after_commit(conn, apply)
+
+
+async def _unindex_memories(conn: aiosqlite.Connection, memory_ids: Sequence[str]) -> None:
+    """Remove deleted memories from the loaded indexes of *conn*'s database."""
+    if not memory_ids or not _MEMORY_VECTOR_INDEXES:
+        return
+    db_path = await _connection_db_path(conn)
+    memory_ids = list(memory_ids)
+
+    def apply() -> None:
+        for (path, _), index in _MEMORY_VECTOR_INDEXES.items():
+            if path == db_path:
+                index.remove(memory_ids)
+
+    _after_commit(conn, apply)
 
 
 async def _store_embedding(conn: aiosqlite.Connection, memory_id: str, text: str) -> Optional[str]:
@@ -2507,22 +3351,23 @@ async def _store_embedding(conn: aiosqlite.Connection, memory_id: str, text: str
         # Get the embedding dimension
         embedding_dimension = embedding_array.shape[0]
 
-        # Generate a unique ID for this embedding entry in our DB table
+        # Generate a unique ID in case this creates a new embeddings row
         embedding_db_id = MemoryUtils.generate_id()
         embedding_bytes = embedding_array.tobytes()
         model_used = embedding_service.model_name
 
-        # Store embedding in our DB
-        await conn.execute(
+        # Store embedding in our DB.  A re-embedded memory keeps its row id:
+        # memories.embedding_id references it, so changing it would violate that FK.
+        embedding_db_id = await conn.execute_fetchval(
             """
             INSERT INTO embeddings (id, memory_id, model, embedding, dimension, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(memory_id) DO UPDATE SET
-                id = excluded.id,
                 model = excluded.model,
                 embedding = excluded.embedding,
                 dimension = excluded.dimension,
                 created_at = excluded.created_at
+            RETURNING id
             """,
             (
                 embedding_db_id,
@@ -2539,6 +3384,7 @@ async def _store_embedding(conn: aiosqlite.Connection, memory_id: str, text: str
         await conn.execute(
             "UPDATE memories SET embedding_id = ? WHERE memory_id = ?", (embedding_db_id, memory_id)
         )
+        await _index_memory_embedding(conn, memory_id, embedding_db_id, embedding_array)
 
         logger.debug(
             f"Stored embedding {embedding_db_id} (Dim: {embedding_dimension}) for memory {memory_id}"
@@ -2581,71 +3427,47 @@ async def _find_similar_memories(
             logger.warning("Query embedding empty.")
             return []
         q_dim = q_vec.shape[0]
-        q_vec_2d = q_vec.reshape(1, -1)
 
-        # 2. ─ Collect candidate embeddings from DB ────────────────────────────
-        # First check if we have any embeddings with the current dimension
-        dimension_check_sql = "SELECT COUNT(*) FROM embeddings WHERE dimension = ?"
-        async with conn.execute(dimension_check_sql, (q_dim,)) as cur:
-            count_row = await cur.fetchone()
-            current_dim_count = count_row[0] if count_row else 0
-
-        if current_dim_count == 0:
+        # 2. ─ Score every stored embedding of this dimension ────────────────
+        index = await _memory_vector_index(conn, q_dim)
+        if index is None:
             logger.warning(
                 f"No embeddings found with current model dimension {q_dim}. "
                 "This may indicate an embedding model change. Consider re-generating embeddings."
             )
             return []
 
-        sql = """
-        SELECT m.memory_id, e.embedding
-        FROM   memories  m
-        JOIN   embeddings e ON e.id = m.embedding_id
-        WHERE  e.dimension = ?
-        """
-        params: list[Any] = [q_dim]
-        if workflow_id:
-            sql += " AND m.workflow_id = ?"
-            params.append(workflow_id)
+        # 3. ─ Keep hits whose memory still uses that embedding and passes the filters
+        filter_sql = ""
+        filter_params: list[Any] = []
         if memory_level:
-            sql += " AND m.memory_level = ?"
-            params.append(memory_level.lower())
+            filter_sql += " AND m.memory_level = ?"
+            filter_params.append(memory_level.lower())
         if memory_type:
-            sql += " AND m.memory_type  = ?"
-            params.append(memory_type.lower())
-
-        now_unix = int(time.time())
-        sql += " AND (m.ttl = 0 OR m.created_at + m.ttl > ?)"
-        params.append(now_unix)
-
-        cand_limit = max(limit * 5, 50)
-        sql += """
-        ORDER BY m.last_accessed IS NULL, m.last_accessed DESC
-        LIMIT ?
-        """
-        params.append(cand_limit)
-
-        async with conn.execute(sql, params) as cur:
-            candidates = await cur.fetchall()
-
-        if not candidates:
-            return []
-
-        # 3. ─ Compute cosine similarities ─────────────────────────────────────
-        sims: list[Tuple[str, float]] = []
-        for mem_id, emb_blob in candidates:
-            emb_vec = np.frombuffer(emb_blob, dtype=np.float32)
-            if emb_vec.size != q_dim:
-                logger.warning(
-                    f"Dim mismatch for memory {mem_id}: {emb_vec.size} vs {q_dim}; skipped."
+            filter_sql += " AND m.memory_type  = ?"
+            filter_params.append(memory_type.lower())
+        filter_sql += " AND (m.ttl = 0 OR m.created_at + m.ttl > ?)"
+        filter_params.append(int(time.time()))
+
+        fetch = max(limit * 4, 20)
+        while True:
+            hits = index.search(q_vec, limit=fetch, threshold=threshold, workflow_id=workflow_id)
+            current: dict[str, str] = {}  # memory_id → embedding_id of rows passing filters
+            for i in range(0, len(hits), _MEMORY_INDEX_BATCH):
+                batch = [memory_id for memory_id, _, _ in hits[i : i + _MEMORY_INDEX_BATCH]]
+                rows = await conn.execute_fetchall(
+                    f"""
+                    SELECT m.memory_id, m.embedding_id
+                    FROM   memories m
+                    WHERE  m.memory_id IN ({",".join("?" * len(batch))}){filter_sql}
+                    """,
+                    [*batch, *filter_params],
                 )
-                continue
-            sim = sk_cosine_similarity(q_vec_2d, emb_vec.reshape(1, -1))[0][0]
-            if sim >= threshold:
-                sims.append((mem_id, float(sim)))
-
-        sims.sort(key=lambda t: t[1], reverse=True)
-        return sims[:limit]
+                current.update((r[0], r[1]) for r in rows)
+            sims = [(mem_id, sim) for mem_id, emb_id, sim in hits if current.get(mem_id) == emb_id]
+            if len(sims) >= limit or len(hits) < fetch:
+                return sims[:limit]
+            fetch *= 4  # filters rejected too many hits; look further down the ranking
 
     except Exception as e:
         logger.error(f"_find_similar_memories failed: {e}", exc_info=True)
@@ -5103,8 +5925,9 @@ async def get_memory_by_id(
     """
     Fetch a single memory row and its optional graph / semantic context.
 
-    • Access statistics are updated inside the R/W transaction.
-    • TTL-expired rows are deleted atomically and reported as errors.
+    • Reads run in a read-only transaction; the access is recorded by the
+      write-behind `MemoryAccessBuffer`.
+    • TTL-expired rows are deleted and reported as errors.
     • All integer timestamps are preserved; ISO strings are appended as *_iso.
     """
     if not memory_id:
@@ -5119,30 +5942,27 @@ async def get_memory_by_id(
                 obj[f"{k}_iso"] = safe_format_timestamp(ts)
 
     try:
-        async with db.transaction() as conn:  # R/W IMMEDIATE txn
+        async with db.transaction(readonly=True) as conn:
             mem_row = await conn.execute_fetchone(
                 "SELECT * FROM memories WHERE memory_id = ?", (memory_id,)
             )
-            if mem_row is None:
-                raise ToolInputError(f"Memory {memory_id} not found.", param_name="memory_id")
+        if mem_row is None:
+            raise ToolInputError(f"Memory {memory_id} not found.", param_name="memory_id")
 
-            mem: Dict[str, Any] = dict(mem_row)
+        mem: Dict[str, Any] = dict(mem_row)
 
-            ttl = mem.get("ttl", 0)
-            if ttl and mem["created_at"] + ttl <= int(time.time()):
-                logger.warning(f"Memory {memory_id} expired; deleting.", emoji_key="wastebasket")
+        ttl = mem.get("ttl", 0)
+        if ttl and mem["created_at"] + ttl <= int(time.time()):
+            logger.warning(f"Memory {memory_id} expired; deleting.", emoji_key="wastebasket")
+            async with db.transaction() as conn:
                 await conn.execute("DELETE FROM memories WHERE memory_id = ?", (memory_id,))
-                raise ToolError(f"Memory {memory_id} has expired and was deleted.")
+                await _unindex_memories(conn, [memory_id])
+            raise ToolError(f"Memory {memory_id} has expired and was deleted.")
 
-            mem["tags"] = await MemoryUtils.deserialize(mem.get("tags"))
-            mem["context"] = await MemoryUtils.deserialize(mem.get("context"))
-
-            # These operations modify the database:
-            await MemoryUtils._update_memory_access(conn, memory_id)
-            await MemoryUtils._log_memory_operation(
-                conn, mem["workflow_id"], "access_by_id", memory_id
-            )
+        mem["tags"] = await MemoryUtils.deserialize(mem.get("tags"))
+        mem["context"] = await MemoryUtils.deserialize(mem.get("context"))
 
+        async with db.transaction(readonly=True) as conn:
             if include_links:
                 mem["outgoing_links"], mem["incoming_links"] = [], []
                 # Using execute_fetchall as these are typically small, bounded queries for a single memory_id
@@ -5252,6 +6072,10 @@ async def get_memory_by_id(
 
             _add_iso(mem, ["created_at", "updated_at", "last_accessed"])
 
+        await _record_memory_access(
+            db.db_path, [(mem["workflow_id"], memory_id, "access_by_id", None)]
+        )
+
         processing_time = time.time() - t0
         logger.info(
             f"Memory {_fmt_id(memory_id)} retrieved (links={include_links}, ctx={include_context}) in {processing_time:.3f}s",
@@ -6316,6 +7140,100 @@ async def get_contradictions(
         raise ToolError(f"Failed to find contradictions: {e}") from e
 
 
+# Column weights for bm25(memory_fts): content, description, reasoning, tags
+_FTS_BM25_WEIGHTS = (1.0, 1.5, 0.5, 2.0)
+_KEYWORD_PRIOR_WEIGHT = 0.25  # share of the importance/recency prior in keyword scores
+
+
+async def _keyword_search_memories(
+    conn: aiosqlite.Connection,
+    query: str,
+    *,
+    limit: int,
+    workflow_id: Optional[str] = None,
+    memory_level: Optional[str] = None,
+    memory_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    min_importance: Optional[float] = None,
+    max_importance: Optional[float] = None,
+    min_confidence: Optional[float] = None,
+    min_created_at_unix: Optional[int] = None,
+    max_created_at_unix: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Keyword scores in [0, 1] for the *limit* best full-text matches of *query*.
+
+    Matches are ranked by column-weighted ``bm25(memory_fts)`` and bounded with
+    ``ORDER BY … LIMIT``, so only *limit* rows reach Python.  Ordering by the
+    bm25() expression rather than the ``rank`` column lets SQLite apply the
+    memory filters before scoring.  The importance/recency prior
+    (`_compute_memory_relevance_batch`) is blended into the normalised bm25 score
+    afterwards.
+    """
+    fts_term = re.sub(r'[^a-zA-Z0-9\s*+\-"]', "", query).strip()
+    if not fts_term:
+        return {}
+
+    wh = ["f.memory_fts MATCH ?"]
+    prm: list[Any] = [fts_term]
+    if workflow_id:
+        wh.append("m.workflow_id=?")
+        prm.append(workflow_id)
+    if memory_level:
+        wh.append("m.memory_level=?")
+        prm.append(memory_level.lower())
+    if memory_type:
+        wh.append("m.memory_type=?")
+        prm.append(memory_type.lower())
+    if min_importance is not None:
+        wh.append("m.importance>=?")
+        prm.append(min_importance)
+    if max_importance is not None:
+        wh.append("m.importance<=?")
+        prm.append(max_importance)
+    if min_confidence is not None:
+        wh.append("m.confidence>=?")
+        prm.append(min_confidence)
+    if min_created_at_unix is not None:
+        wh.append("m.created_at>=?")
+        prm.append(min_created_at_unix)
+    if max_created_at_unix is not None:
+        wh.append("m.created_at<=?")
+        prm.append(max_created_at_unix)
+    wh.append("(m.ttl=0 OR m.created_at+m.ttl>?)")
+    prm.append(int(time.time()))
+    if tags:
+        wh.append("json_contains_all(m.tags, ?)")
+        prm.append(json.dumps([t.strip().lower() for t in tags if t.strip()]))
+
+    rows = await conn.execute_fetchall(
+        f"SELECT m.memory_id, -bm25(memory_fts, {', '.join(map(str, _FTS_BM25_WEIGHTS))}) "
+        "AS bm25, m.importance, m.confidence, m.created_at, "
+        "IFNULL(m.access_count,0) AS access_count, m.last_accessed "
+        "FROM memory_fts f JOIN memories m ON m.rowid=f.rowid "
+        f"WHERE {' AND '.join(wh)} ORDER BY bm25 DESC LIMIT ?",
+        [*prm, limit],
+    )
+    if not rows:
+        return {}
+
+    _, _, *relevance_columns = zip(*rows, strict=True)
+    priors = _compute_memory_relevance_batch(*relevance_columns).tolist()
+    max_bm25 = max(r["bm25"] for r in rows) or 1e-6
+    max_prior = max(priors) or 1e-6
+    return {
+        r["memory_id"]: min(
+            max(
+                (1 - _KEYWORD_PRIOR_WEIGHT) * r["bm25"] / max_bm25
+                + _KEYWORD_PRIOR_WEIGHT * prior / max_prior,
+                0.0,
+            ),
+            1.0,
+        )
+        for r, prior in zip(rows, priors, strict=True)
+    }
+
+
 @with_tool_metrics
 @with_error_handling
 async def hybrid_search_memories(
@@ -6342,6 +7260,7 @@ async def hybrid_search_memories(
     """
     Hybrid (semantic + keyword/FTS) memory search with rich filtering.
     Returns ranked memories, preserves raw timestamps, adds *_iso strings.
+    Searches a read-only snapshot; accesses are recorded write-behind.
     """
     t0 = time.time()
 
@@ -6377,16 +7296,20 @@ async def hybrid_search_memories(
         lambda: {"semantic": 0.0, "keyword": 0.0, "hybrid": 0.0}
     )
 
-    async with db.transaction(mode="IMMEDIATE") as conn:
+    # candidates per phase; enough to fill the requested page
+    cand_limit = max(
+        min(max(limit * 10, 100), agent_memory_config.max_semantic_candidates), offset + limit
+    )
+
+    async with db.transaction(readonly=True) as conn:
         # ───── semantic phase ─────
         if w_sem:
             try:
-                sem_limit = min(max(limit * 10, 100), agent_memory_config.max_semantic_candidates)
                 sem_results = await _find_similar_memories(
                     conn=conn,
                     query_text=query,
                     workflow_id=workflow_id,
-                    limit=sem_limit,
+                    limit=cand_limit,
                     threshold=0.1,
                     memory_level=memory_level,
                     memory_type=memory_type,
@@ -6398,63 +7321,22 @@ async def hybrid_search_memories(
 
         # ───── keyword/FTS phase ─────
         if w_kw:
-            wh, prm = ["1=1"], []
-            joins = ""
-            if workflow_id:
-                wh.append("m.workflow_id=?")
-                prm.append(workflow_id)
-            if memory_level:
-                wh.append("m.memory_level=?")
-                prm.append(memory_level.lower())
-            if memory_type:
-                wh.append("m.memory_type=?")
-                prm.append(memory_type.lower())
-            if min_importance is not None:
-                wh.append("m.importance>=?")
-                prm.append(min_importance)
-            if max_importance is not None:
-                wh.append("m.importance<=?")
-                prm.append(max_importance)
-            if min_confidence is not None:
-                wh.append("m.confidence>=?")
-                prm.append(min_confidence)
-            if min_created_at_unix is not None:
-                wh.append("m.created_at>=?")
-                prm.append(min_created_at_unix)
-            if max_created_at_unix is not None:
-                wh.append("m.created_at<=?")
-                prm.append(max_created_at_unix)
-
-            now = int(time.time())
-            wh.append("(m.ttl=0 OR m.created_at+m.ttl>?)")
-            prm.append(now)
-
-            if tags:
-                tag_json = json.dumps([t.strip().lower() for t in tags if t.strip()])
-                wh.append("json_contains_all(m.tags, ?)")
-                prm.append(tag_json)
-
-            sanitized_fts_term = re.sub(r'[^a-zA-Z0-9\s*+\-"]', "", query).strip()
-            if sanitized_fts_term:
-                joins += " JOIN memory_fts f ON m.rowid=f.rowid"
-                wh.append("f.memory_fts MATCH ?")
-                prm.append(sanitized_fts_term)
-
-            sql_kw = (
-                "SELECT m.memory_id, "
-                "compute_memory_relevance(m.importance,m.confidence,m.created_at,"
-                "IFNULL(m.access_count,0),m.last_accessed) AS kw_rel "
-                "FROM memories m" + joins + (" WHERE " + " AND ".join(wh) if wh else "")
+            kw_scores = await _keyword_search_memories(
+                conn,
+                query,
+                limit=cand_limit,
+                workflow_id=workflow_id,
+                memory_level=memory_level,
+                memory_type=memory_type,
+                tags=tags,
+                min_importance=min_importance,
+                max_importance=max_importance,
+                min_confidence=min_confidence,
+                min_created_at_unix=min_created_at_unix,
+                max_created_at_unix=max_created_at_unix,
             )
-
-            # Ensure UDFs are registered before using compute_memory_relevance
-            await _ensure_udfs_registered(conn)
-
-            rows_kw = await conn.execute_fetchall(sql_kw, prm)
-            if rows_kw:
-                max_rel = max(r["kw_rel"] for r in rows_kw) or 1e-6
-                for r in rows_kw:
-                    score_map[r["memory_id"]]["keyword"] = min(max(r["kw_rel"] / max_rel, 0.0), 1.0)
+            for m_id, s in kw_scores.items():
+                score_map[m_id]["keyword"] = s
 
         # ───── hybrid scoring & ranking ─────
         for sc in score_map.values():
@@ -6511,11 +7393,7 @@ async def hybrid_search_memories(
                         async for r in cur:
                             link_map[r["target_memory_id"]]["incoming"].append(dict(r))
 
-            # ───── build return list & batched stat updates ─────
-            upd_params: list[tuple[int, str]] = []
-            log_rows: list[tuple] = []
-            ts_now = int(time.time())
-
+            # ───── build return list ─────
             for m_id in ids_page:
                 row = row_map[m_id]
                 sc = score_map[m_id]
@@ -6529,45 +7407,19 @@ async def hybrid_search_memories(
                     row["links"] = link_map[m_id]
                 memories.append(row)
 
-                # prepare access update
-                upd_params.append((ts_now, m_id))
-
-                # prepare operation-log row (batched, serialised once)
-                op_data_json = await MemoryUtils.serialize(
-                    {"query": query[:100], "hybrid_score": row["hybrid_score"]}
-                )
-                log_rows.append(
-                    (
-                        MemoryUtils.generate_id(),
-                        row["workflow_id"],
-                        m_id,
-                        None,
-                        "hybrid_access",
-                        op_data_json,
-                        ts_now,
-                    )
-                )
-
-            # batch write access stats
-            if upd_params:
-                await conn.executemany(
-                    "UPDATE memories "
-                    "SET last_accessed=?, access_count=COALESCE(access_count,0)+1 "
-                    "WHERE memory_id=?",
-                    upd_params,
-                )
-
-            # batch insert operation logs  (performance fix)
-            if log_rows:
-                await conn.executemany(
-                    """
-                    INSERT INTO memory_operations
-                        (operation_log_id, workflow_id, memory_id, action_id,
-                         operation, operation_data, timestamp)
-                    VALUES (?,?,?,?,?,?,?)
-                    """,
-                    log_rows,
-                )
+    # ───── access stats & operation log (write-behind) ─────
+    await _record_memory_access(
+        db.db_path,
+        [
+            (
+                m["workflow_id"],
+                m["memory_id"],
+                "hybrid_access",
+                {"query": query[:100], "hybrid_score": m["hybrid_score"]},
+            )
+            for m in memories
+        ],
+    )
 
     # ───── timestamp prettification ─────
     def _iso(d: dict[str, Any], key: str) -> None:
@@ -6754,7 +7606,10 @@ async def query_memories(
     Filter, rank and paginate memories **safely**.
 
     • ORDER BY now uses a constant mapping → no identifier interpolation.
-    • Batched access-stat update **and** batched operation-log insert unchanged.
+    • Relevance is scored in NumPy batches; sorting by it selects the page
+      with a partial sort instead of a per-row SQL function.
+    • Reads a read-only snapshot; access stats and operation log are written
+      behind by `MemoryAccessBuffer`.
     • Raw timestamps preserved; *_iso companions appended.
     """
     t0 = time.time()
@@ -6813,14 +7668,7 @@ async def query_memories(
     if include_content:
         sel_cols.append("m.content")
 
-    select_clause = ", ".join(
-        sel_cols
-        + [
-            "compute_memory_relevance("
-            "m.importance, m.confidence, m.created_at, "
-            "IFNULL(m.access_count,0), m.last_accessed) AS relevance"
-        ]
-    )
+    select_clause = ", ".join(sel_cols)
 
     joins: list[str] = []
     where: list[str] = ["1=1"]
@@ -6880,66 +7728,63 @@ async def query_memories(
 
     db = DBConnection(db_path)
 
-    async with db.transaction() as conn:
+    async with db.transaction(readonly=True) as conn:
         if workflow_id:
             if not await conn.execute_fetchone(
                 "SELECT 1 FROM workflows WHERE workflow_id = ?", (workflow_id,)
             ):
                 raise ToolInputError(f"Workflow {workflow_id} not found.", param_name="workflow_id")
 
-            # Ensure UDFs are registered before using compute_memory_relevance
-            await _ensure_udfs_registered(conn)
-
         total_matching = (await conn.execute_fetchone(count_sql, params + fts_params))[0]
 
-        rows = await conn.execute_fetchall(paginated_sql, params + fts_params + [limit, offset])
+        rows: list[dict[str, Any]]
+        if sort_by_lc == "relevance":
+            ranked = await _select_top_memories_by_relevance(
+                conn,
+                base_from,
+                params + fts_params,
+                offset + limit,
+                ascending=sort_order.upper() == "ASC",
+                # The stored snapshot is index-backed within a workflow
+                seed_order="m.relevance_score DESC" if workflow_id else "m.last_accessed DESC",
+            )
+            page = dict(ranked[offset:])
+            fetched = (
+                await conn.execute_fetchall(
+                    f"SELECT {select_clause} FROM memories m "
+                    f"WHERE m.memory_id IN ({','.join('?' * len(page))})",
+                    list(page),
+                )
+                if page
+                else []
+            )
+            by_id = {r["memory_id"]: dict(r) for r in fetched}
+            rows = [by_id[m_id] | {"relevance": rel} for m_id, rel in page.items() if m_id in by_id]
+        else:
+            rows = [
+                dict(r)
+                for r in await conn.execute_fetchall(
+                    paginated_sql, params + fts_params + [limit, offset]
+                )
+            ]
+            relevances = _compute_memory_relevance_batch(
+                *([r[col] for r in rows] for col in _RELEVANCE_SQL_COLUMNS.split(", "))
+            ).tolist()
+            for r, rel in zip(rows, relevances, strict=True):
+                r["relevance"] = rel
 
         memories: list[dict[str, Any]] = []
-        now_unix = int(time.time())
-        access_updates: list[tuple[int, str]] = []
-        op_rows: list[tuple[str, str, str, Any, str, str, int]] = []
-
         for r in rows:
             mem = dict(r)
             mem["tags"] = await MemoryUtils.deserialize(mem.get("tags"))
             memories.append(mem)
 
-            access_updates.append((now_unix, mem["memory_id"]))
-
-            # ---- prepare operation-log row ---------------
-            op_data_serialised = await MemoryUtils.serialize(
-                {"query_filters": {"sort": sort_by_lc, "limit": limit}}
-            )
-            op_rows.append(
-                (
-                    MemoryUtils.generate_id(),  # operation_log_id
-                    mem["workflow_id"],
-                    mem["memory_id"],
-                    None,  # action_id
-                    "query_access",
-                    op_data_serialised,
-                    now_unix,
-                )
-            )
-
-        if access_updates:
-            await conn.executemany(
-                "UPDATE memories "
-                "SET last_accessed=?, access_count=COALESCE(access_count,0)+1 "
-                "WHERE memory_id=?",
-                access_updates,
-            )
-
-        if op_rows:
-            await conn.executemany(
-                """
-                INSERT INTO memory_operations
-                    (operation_log_id, workflow_id, memory_id, action_id,
-                     operation, operation_data, timestamp)
-                VALUES (?,?,?,?,?,?,?)
-                """,
-                op_rows,
-            )
+    # ───────── access stats & operation log (write-behind) ─────────
+    query_filters = {"query_filters": {"sort": sort_by_lc, "limit": limit}}
+    await _record_memory_access(
+        db.db_path,
+        [(m["workflow_id"], m["memory_id"], "query_access", query_filters) for m in memories],
+    )
 
     # ───────── optional linked memories (read-only) ─────────
     if include_links and memories:
@@ -7144,7 +7989,8 @@ async def get_workflow_details(
 
     * Raw integer timestamps are preserved.
     * ISO-8601 siblings are added as *_iso.
-    * Memory rows include `relevance` from the deterministic UDF.
+    * Memory rows include `relevance`, the stored snapshot refreshed every
+      ``relevance_refresh_interval`` seconds.
     * Cognitive states include deserialized JSON fields and ISO timestamps.
     """
     if not workflow_id:
@@ -7160,6 +8006,9 @@ async def get_workflow_details(
                 row[f"{k}_iso"] = safe_format_timestamp(ts)
 
     try:
+        if include_memories:
+            await _ensure_memory_relevance_fresh(db, workflow_id)
+
         async with db.transaction(readonly=True) as conn:
             # ───────── workflow core ─────────
             wf_row = await conn.execute_fetchone(
@@ -7265,21 +8114,15 @@ async def get_workflow_details(
             # ───────── memories (scored) ─────────
             if include_memories:
                 details["memories_sample"] = []
-                # Ensure UDFs are registered before using compute_memory_relevance
-                await _ensure_udfs_registered(conn)
-
                 async with conn.execute(
                     """
                     SELECT memory_id, content, memory_type, memory_level,
                            importance, confidence, access_count,
                            created_at, last_accessed,
-                           compute_memory_relevance(
-                               importance, confidence, created_at,
-                               IFNULL(access_count,0), last_accessed
-                           ) AS relevance
+                           relevance_score AS relevance
                     FROM   memories
                     WHERE  workflow_id = ?
-                    ORDER  BY relevance DESC
+                    ORDER  BY relevance_score DESC
                     LIMIT  ?
                     """,
                     (workflow_id, memories_limit),
@@ -7807,7 +8650,7 @@ async def get_artifact_by_id(
         if ts := obj.get(key):
             obj[f"{key}_iso"] = safe_format_timestamp(ts)
 
-    async with db.transaction() as conn:  # R/W – we may update memory row
+    async with db.transaction(readonly=True) as conn:
         # ───────── Artifact row ─────────
         artifact_row = await conn.execute_fetchone(
             """
@@ -7836,25 +8679,27 @@ async def get_artifact_by_id(
             "SELECT memory_id, workflow_id FROM memories WHERE artifact_id = ?",
             (artifact_id,),
         )
-        if mem:
-            await MemoryUtils._update_memory_access(conn, mem["memory_id"])
-            await MemoryUtils._log_memory_operation(
-                conn,
-                mem["workflow_id"],
-                "access_via_artifact",
-                mem["memory_id"],
-                None,
-                {"artifact_id": artifact_id},
-            )
+    if mem:
+        await _record_memory_access(
+            db.db_path,
+            [
+                (
+                    mem["workflow_id"],
+                    mem["memory_id"],
+                    "access_via_artifact",
+                    {"artifact_id": artifact_id},
+                )
+            ],
+        )
 
-        # ───────── Post-transaction formatting ─────────
-        _add_iso(art, "created_at")
-        logger.info(f"Artifact {_fmt_id(artifact_id)} fetched.", emoji_key="page_facing_up")
-        return {
-            "success": True,
-            "data": art,
-            "processing_time": time.time() - start_time,
-        }
+    # ───────── Post-transaction formatting ─────────
+    _add_iso(art, "created_at")
+    logger.info(f"Artifact {_fmt_id(artifact_id)} fetched.", emoji_key="page_facing_up")
+    return {
+        "success": True,
+        "data": art,
+        "processing_time": time.time() - start_time,
+    }
 
 
 # --- 10.5 Goals ---
@@ -8664,26 +9509,17 @@ async def _add_to_active_memories(
 
             # If we exceed capacity, remove least relevant memory
             if len(target_ids) > limit and len(target_ids) > 1:
-                # Ensure UDFs are registered before using compute_memory_relevance
-                await _ensure_udfs_registered(conn)
-
                 placeholders = ",".join("?" * len(current_ids))
-                least_row = await conn.execute_fetchone(
-                    f"""
-                    SELECT memory_id
-                    FROM   memories
-                    WHERE  memory_id IN ({placeholders})
-                    ORDER BY compute_memory_relevance(
-                               importance, confidence, created_at,
-                               IFNULL(access_count,0), last_accessed
-                             ) ASC
-                    LIMIT 1
-                    """,
+                least_rows = await _select_top_memories_by_relevance(
+                    conn,
+                    f"FROM memories m WHERE m.memory_id IN ({placeholders})",
                     current_ids,
+                    1,
+                    ascending=True,
                 )
 
                 # ▸ fix #5 — if every current_id vanished between purge & query
-                if least_row is None:
+                if not least_rows:
                     logger.warning(
                         f"All working-memory IDs for context {context_id} vanished concurrently; "
                         "resetting list."
@@ -8691,7 +9527,7 @@ async def _add_to_active_memories(
                     target_ids = [memory_id]  # start fresh with just the new memory
 
                 else:
-                    removed_id = least_row["memory_id"]
+                    removed_id = least_rows[0][0]
                     if removed_id in target_ids:
                         target_ids.remove(removed_id)
                         logger.debug(
@@ -8791,10 +9627,8 @@ async def get_working_memory(
     """
     Return the current working-memory set for *context_id*.
 
-    • Opens a **read-only snapshot** when no writes are requested
-      (i.e. ``update_access=False``) to maximise concurrency.
-    • Otherwise falls back to the original ``mode="IMMEDIATE"`` write lock,
-      preserving the exact access-count / audit-log semantics.
+    • Always reads from a **read-only snapshot**; with ``update_access`` the
+      accesses are recorded by the write-behind `MemoryAccessBuffer`.
     """
     if not context_id:
         raise ToolInputError("Context ID required.", param_name="context_id")
@@ -8820,13 +9654,8 @@ async def get_working_memory(
         for i in range(0, len(seq), size):
             yield seq[i : i + size]
 
-    # ───────── dynamic transaction mode ─────────
-    txn_ctx = (
-        db.transaction(readonly=True) if not update_access else db.transaction(mode="IMMEDIATE")
-    )
-
     try:
-        async with txn_ctx as conn:
+        async with db.transaction(readonly=True) as conn:
             # 1️⃣ fetch cognitive state ------------------------------------------------
             state_row = await conn.execute_fetchone(
                 "SELECT * FROM cognitive_states WHERE state_id = ?",
@@ -8945,37 +9774,18 @@ async def get_working_memory(
                     _add_iso(row, ["created_at"])
                     mem_map[row["target_memory_id"]]["links"]["incoming"].append(row)
 
-            # 4️⃣ order, access-stats & audit (conditional) ----------------------------
-            ordered: list[Dict[str, Any]] = []
-            upd_params: list[tuple[int, str, str]] = []
-            now_ts = int(time.time())
-
-            for mid in mem_ids:
-                if mid in mem_map:
-                    ordered.append(mem_map[mid])
-                    if update_access:
-                        upd_params.append((now_ts, mid, wf_id))
-
-            if update_access and upd_params:
-                await conn.executemany(
-                    """
-                    UPDATE memories
-                    SET last_accessed = ?, access_count = COALESCE(access_count,0)+1
-                    WHERE memory_id = ? AND workflow_id = ?
-                    """,
-                    upd_params,
-                )
-                for _, mem_id, wf in upd_params:
-                    await MemoryUtils._log_memory_operation(
-                        conn,
-                        wf,
-                        "access_working",
-                        mem_id,
-                        None,
-                        {"context_id": context_id},
-                    )
+            # 4️⃣ order ------------------------------------------------------------------
+            result["working_memories"] = [mem_map[mid] for mid in mem_ids if mid in mem_map]
 
-            result["working_memories"] = ordered
+        # 5️⃣ access-stats & audit (conditional, write-behind) ---------------------------
+        if update_access:
+            await _record_memory_access(
+                db.db_path,
+                [
+                    (wf_id, m["memory_id"], "access_working", {"context_id": context_id})
+                    for m in result["working_memories"]
+                ],
+            )
 
         processing_time = time.time() - t0
         logger.info(
@@ -9210,15 +10020,22 @@ async def optimize_working_memory(
     # ───── Phase 3: score memories ─────
     now = int(time.time())
     scored: list[dict[str, Any]] = []
-
-    for row in mem_rows:  # only existing rows
+    relevances = _compute_memory_relevance_batch(
+        [r["importance"] for r in mem_rows],
+        [r["confidence"] if r["confidence"] is not None else 0.5 for r in mem_rows],
+        [r["created_at"] for r in mem_rows],
+        [r["access_count"] for r in mem_rows],
+        [r["last_accessed"] for r in mem_rows],
+        now=now,
+    ).tolist()
+
+    for row, rel in zip(mem_rows, relevances, strict=True):  # only existing rows
         imp = row["importance"] if row["importance"] is not None else 5.0
         conf = row["confidence"] if row["confidence"] is not None else 0.5
         acc = row["access_count"] if row["access_count"] is not None else 0
         created = row["created_at"] or now
         last_acc = row["last_accessed"] or None
 
-        rel = _compute_memory_relevance(imp, conf, created, acc, last_acc)
         recency = 1.0 / (1.0 + (now - (last_acc or created)) / 86_400)
 
         if strategy == "balanced":
@@ -9933,7 +10750,8 @@ async def promote_memory_level(
     db = DBConnection(db_path)
     t0 = time.time()
 
-    # ─────── 1. fetch current memory row ───────
+    # ─────── 1. fetch current memory row (with buffered accesses counted) ───────
+    await _flush_memory_access(db.db_path)
     async with db.transaction(readonly=True) as conn:
         row = await conn.execute_fetchone(
             """
@@ -10302,7 +11120,7 @@ async def get_linked_memories(
                 obj[f"{k}_iso"] = safe_format_timestamp(ts)
 
     db = DBConnection(db_path)
-    async with db.transaction() as conn:  # single R/W txn (updates access stats)
+    async with db.transaction(readonly=True) as conn:
         # ─── confirm source memory exists & capture workflow_id ───
         src_row = await conn.execute_fetchone(
             "SELECT workflow_id FROM memories WHERE memory_id = ?", (memory_id,)
@@ -10391,21 +11209,23 @@ async def get_linked_memories(
                     link["source_memory"] = await _hydrate_mem(link["source_memory_id"])
                 payload["links"]["incoming"].append(link)
 
-        # ─── update access stats & audit log ───
-        await MemoryUtils._update_memory_access(conn, memory_id)
-        await MemoryUtils._log_memory_operation(
-            conn,
-            workflow_id,
-            "access_links",
-            memory_id,
-            None,
-            {
-                "direction": direction,
-                "link_type_filter": link_type.lower() if link_type else None,
-                "returned_outgoing": len(payload["links"]["outgoing"]),
-                "returned_incoming": len(payload["links"]["incoming"]),
-            },
-        )
+    # ─── access stats & audit log (write-behind) ───
+    await _record_memory_access(
+        db.db_path,
+        [
+            (
+                workflow_id,
+                memory_id,
+                "access_links",
+                {
+                    "direction": direction,
+                    "link_type_filter": link_type.lower() if link_type else None,
+                    "returned_outgoing": len(payload["links"]["outgoing"]),
+                    "returned_incoming": len(payload["links"]["incoming"]),
+                },
+            )
+        ],
+    )
 
     processing_time = time.time() - t0
     logger.info(
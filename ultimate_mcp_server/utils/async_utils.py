@@ -3,8 +3,9 @@
 import asyncio
 import functools
 import time
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Any, Callable, List, Optional, Type, TypeVar, Union
+from typing import Any, Callable, Deque, List, Optional, Type, TypeVar, Union
 
 from ultimate_mcp_server.utils import get_logger
 
@@ -19,7 +20,7 @@ class RateLimiter:
     """
     Rate limiter for controlling request rates to external services.
 
-    This class implements a token bucket algorithm to enforce API rate limits,
+    This class implements a sliding-window limit to enforce API rate limits,
     preventing too many requests in a short period of time. It's designed for use
     in asynchronous code and will automatically pause execution when limits are reached.
 
@@ -58,7 +59,7 @@ class RateLimiter:
         """
         self.max_calls = max_calls
         self.period = period
-        self.calls = []
+        self.calls: Deque[float] = deque()
         self.lock = asyncio.Lock()
 
     async def acquire(self):
@@ -80,35 +81,23 @@ class RateLimiter:
             asyncio.CancelledError: If the task is cancelled while waiting.
         """
         async with self.lock:
-            now = time.time()
-
-            # Remove expired timestamps
-            self.calls = [t for t in self.calls if now - t < self.period]
-
-            # Check if we're under the limit
-            if len(self.calls) < self.max_calls:
-                self.calls.append(now)
-                return
-
-            # Calculate wait time
-            wait_time = self.period - (now - self.calls[0])
-            if wait_time > 0:
-                # Release lock while waiting
-                self.lock.release()
-                try:
-                    logger.debug(
-                        f"Rate limit reached, waiting {wait_time:.2f}s", emoji_key="warning"
-                    )
-                    await asyncio.sleep(wait_time)
-                finally:
-                    # Reacquire lock
-                    await self.lock.acquire()
-
-                # Retry after waiting
-                await self.acquire()
-            else:
-                # Oldest call just expired, record new call
-                self.calls = self.calls[1:] + [now]
+            while True:
+                now = time.monotonic()
+
+                # Drop timestamps that left the window (oldest first)
+                while self.calls and now - self.calls[0] >= self.period:
+                    self.calls.popleft()
+
+                # Check if we're under the limit
+                if len(self.calls) < self.max_calls:
+                    self.calls.append(now)
+                    return
+
+                # Wait for the oldest call to leave the window. The lock stays held so
+                # waiters are served in arrival order.
+                wait_time = self.period - (now - self.calls[0])
+                logger.debug(f"Rate limit reached, waiting {wait_time:.2f}s", emoji_key="warning")
+                await asyncio.sleep(wait_time)
 
 
 @asynccontextmanager